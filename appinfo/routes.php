@@ -38,6 +38,7 @@ return [
 		['name' => 'ExAppsPage#enableApp', 'url' => '/apps/enable/{appId}/{daemonId}', 'verb' => 'POST' , 'root' => ''],
 		['name' => 'ExAppsPage#getAppStatus', 'url' => '/apps/status/{appId}', 'verb' => 'GET' , 'root' => ''],
 		['name' => 'ExAppsPage#getAppLogs', 'url' => '/apps/logs/{appId}', 'verb' => 'GET' , 'root' => ''],
+		['name' => 'ExAppsPage#followAppLogs', 'url' => '/apps/logs/{appId}/follow', 'verb' => 'GET' , 'root' => ''],
 		['name' => 'ExAppsPage#getAppDeployOptions', 'url' => '/apps/deploy-options/{appId}', 'verb' => 'GET' , 'root' => ''],
 		['name' => 'ExAppsPage#disableApp', 'url' => '/apps/disable/{appId}', 'verb' => 'GET' , 'root' => ''],
 		['name' => 'ExAppsPage#updateApp', 'url' => '/apps/update/{appId}', 'verb' => 'GET' , 'root' => ''],
@@ -91,6 +92,9 @@ return [
 		['name' => 'AppConfig#setAppConfigValue', 'url' => '/api/v1/ex-app/config', 'verb' => 'POST'],
 		['name' => 'AppConfig#getAppConfigValues', 'url' => '/api/v1/ex-app/config/get-values', 'verb' => 'POST'],
 		['name' => 'AppConfig#deleteAppConfigValues', 'url' => '/api/v1/ex-app/config', 'verb' => 'DELETE'],
+		['name' => 'AppConfig#setAppConfigMap', 'url' => '/api/v1/ex-app/config/bulk', 'verb' => 'POST'],
+		['name' => 'AppConfig#getAppConfigMap', 'url' => '/api/v1/ex-app/config/bulk/get-values', 'verb' => 'POST'],
+		['name' => 'AppConfig#deleteAppConfigMap', 'url' => '/api/v1/ex-app/config/bulk', 'verb' => 'DELETE'],
 
 		// ExApp per-user preferences (backed by the server's IUserConfig / oc_preferences).
 		// Intentionally kept: the server's provisioning_api user-config routes are write-only
@@ -98,6 +102,10 @@ return [
 		['name' => 'Preferences#setUserConfigValue', 'url' => '/api/v1/ex-app/preference', 'verb' => 'POST'],
 		['name' => 'Preferences#getUserConfigValues', 'url' => '/api/v1/ex-app/preference/get-values', 'verb' => 'POST'],
 		['name' => 'Preferences#deleteUserConfigValues', 'url' => '/api/v1/ex-app/preference', 'verb' => 'DELETE'],
+		['name' => 'Preferences#setUserConfigMap', 'url' => '/api/v1/ex-app/preference/bulk', 'verb' => 'POST'],
+		['name' => 'Preferences#getUserConfigMap', 'url' => '/api/v1/ex-app/preference/bulk/get-values', 'verb' => 'POST'],
+		['name' => 'Preferences#deleteUserConfigMap', 'url' => '/api/v1/ex-app/preference/bulk', 'verb' => 'DELETE'],
+		['name' => 'Preferences#getUsersConfigMap', 'url' => '/api/v1/ex-app/preference/users/get-values', 'verb' => 'POST'],
 
 		// Notifications
 		['name' => 'Notifications#sendNotification', 'url' => '/api/v1/notification', 'verb' => 'POST'],
@@ -145,6 +153,8 @@ return [
 		['name' => 'taskProcessing#registerProvider', 'url' => '/api/v1/ai_provider/task_processing', 'verb' => 'POST'],
 		['name' => 'taskProcessing#unregisterProvider', 'url' => '/api/v1/ai_provider/task_processing', 'verb' => 'DELETE'],
 		['name' => 'taskProcessing#getProvider', 'url' => '/api/v1/ai_provider/task_processing', 'verb' => 'GET'],
+		['name' => 'taskProcessing#claimTaskBatch', 'url' => '/api/v1/ai_provider/task_processing/next_batch', 'verb' => 'POST'],
+		['name' => 'taskProcessing#setTaskResults', 'url' => '/api/v1/ai_provider/task_processing/results', 'verb' => 'POST'],
 
 		// Setup checks (admin "Security & setup warnings" panel)
 		['name' => 'SetupCheck#registerChecks', 'url' => '/api/v1/setup_check', 'verb' => 'POST'],
@@ -282,7 +282,9 @@ class Register extends Command {
 
 		$this->service->dispatchExAppInitInternal($exApp);
 		if ($input->getOption('wait-finish')) {
-			$error = $this->exAppService->waitInitStepFinish($appId);
+			$error = $this->exAppService->waitInitStepFinish($appId, $outputConsole
+				? fn (int $progress) => $output->writeln(sprintf('ExApp %s initialization progress: %d%%', $appId, $progress))
+				: null);
 			if ($error) {
 				$output->writeln($error);
 				return 1;
@@ -20,12 +20,15 @@ use OCA\AppAPI\Service\ExAppDeployOptionsService;
 use OCA\AppAPI\Service\ExAppService;
 use Psr\Log\LoggerInterface;
 use Symfony\Component\Console\Command\Command;
+use Symfony\Component\Console\Helper\Table;
 use Symfony\Component\Console\Input\InputArgument;
 use Symfony\Component\Console\Input\InputInterface;
 use Symfony\Component\Console\Input\InputOption;
+use Symfony\Component\Console\Output\BufferedOutput;
 use Symfony\Component\Console\Output\OutputInterface;
 
 class Update extends Command {
+	private const DISABLED_SKIP_MESSAGE = 'ExApp %s is disabled. Update skipped (use --include-disabled to update disabled apps).';
 
 	public function __construct(
 		private readonly AppAPIService $service,
@@ -56,16 +59,30 @@ class Update extends Command {
 		$this->addOption('all', null, InputOption::VALUE_NONE, 'Updates all enabled and updatable apps');
 		$this->addOption('showonly', null, InputOption::VALUE_NONE, 'Additional flag for "--all" to only show all updatable apps');
 		$this->addOption('include-disabled', null, InputOption::VALUE_NONE, 'Additional flag for "--all" to also update disabled apps');
+		$this->addOption('apps', null, InputOption::VALUE_REQUIRED, 'Comma-separated list of apps to update (e.g. "app1,app2")');
+		$this->addOption('parallel', null, InputOption::VALUE_REQUIRED, 'Additional flag for "--all" and "--apps": number of apps updated at the same time', '1');
+		$this->addOption('json', null, InputOption::VALUE_NONE, 'Additional flag for "--all" and "--apps": print the per-app results as JSON');
 	}
 
 	protected function execute(InputInterface $input, OutputInterface $output): int {
 		$appId = $input->getArgument('appid');
-		if (empty($appId) && !$input->getOption('all')) {
-			$output->writeln('<error>Please specify an app to update or "--all" to update all updatable apps</error>');
+		$appsOption = $input->getOption('apps');
+		$selectorsCount = (int)!empty($appId) + (int)$input->getOption('all') + (int)!empty($appsOption);
+		if ($selectorsCount === 0) {
+			$output->writeln('<error>Please specify an app to update, "--apps" or "--all" to update all updatable apps</error>');
 			return 1;
-		} elseif (!empty($appId) && $input->getOption('all')) {
-			$output->writeln('<error>The "--all" flag is mutually exclusive with specifying app</error>');
+		} elseif ($selectorsCount > 1) {
+			$output->writeln('<error>Specifying an app, "--apps" and "--all" are mutually exclusive</error>');
 			return 1;
+		}
+		$parallel = (int)$input->getOption('parallel');
+		if ($parallel < 1) {
+			$output->writeln('<error>"--parallel" must be a positive number</error>');
+			return 1;
+		}
+		if (!empty($appsOption)) {
+			$appIds = array_values(array_unique(array_filter(array_map('trim', explode(',', $appsOption)))));
+			return $this->updateExApps($input, $output, $appIds, $parallel);
 		} elseif ($input->getOption('all')) {
 			$apps = $this->exAppFetcher->get();
 			$appsWithUpdates = array_filter($apps, function (array $app) {
@@ -79,16 +96,136 @@ class Update extends Command {
 				}
 				return 0;
 			}
-			$return = 0;
-			foreach ($appsWithUpdates as $appWithUpdate) {
-				$result = $this->updateExApp($input, $output, $appWithUpdate['id']);
-				if ($result > 0) {
-					$return = $result;
+			return $this->updateExApps($input, $output, array_column($appsWithUpdates, 'id'), $parallel);
+		}
+		return $this->updateExApp($input, $output, $appId);
+	}
+
+	/**
+	 * Update several ExApps, up to `$parallel` at the same time, and report the result of each one.
+	 *
+	 * With `$parallel` > 1 every update runs in its own `occ app_api:app:update <appid>` process, so
+	 * image pulls, container recreation and heartbeats of different ExApps overlap.
+	 *
+	 * @param string[] $appIds
+	 */
+	private function updateExApps(InputInterface $input, OutputInterface $output, array $appIds, int $parallel): int {
+		$jsonOutput = (bool)$input->getOption('json');
+		$results = [];
+		$queue = [];
+		foreach ($appIds as $appId) {
+			$exApp = $this->exAppService->getExApp($appId);
+			if ($exApp === null) {
+				$results[$appId] = $this->buildUpdateResult($appId, '', 1, 0.0, sprintf('ExApp %s not found.', $appId));
+			} elseif ($input->getOption('all') && !$exApp->getEnabled() && !$input->getOption('include-disabled')) {
+				$this->logger->info(sprintf(self::DISABLED_SKIP_MESSAGE, $appId));
+				$results[$appId] = $this->buildUpdateResult($appId, $exApp->getVersion(), 0, 0.0, sprintf(self::DISABLED_SKIP_MESSAGE, $appId), 'skipped');
+			} else {
+				$queue[$appId] = $exApp->getVersion();
+			}
+		}
+
+		if ($parallel === 1) {
+			foreach ($queue as $appId => $version) {
+				$appOutput = new BufferedOutput();
+				$start = microtime(true);
+				$exitCode = $this->updateExApp($input, $appOutput, $appId);
+				$appLog = $appOutput->fetch();
+				if (!$jsonOutput) {
+					$output->write($appLog);
 				}
+				$results[$appId] = $this->buildUpdateResult($appId, $version, $exitCode, microtime(true) - $start, $appLog);
+			}
+		} else {
+			$results = array_merge($results, $this->runUpdateProcesses($input, $queue, $parallel, $jsonOutput ? null : $output));
+		}
+
+		$results = array_values(array_replace(array_fill_keys($appIds, null), $results));
+		if ($jsonOutput) {
+			$output->writeln(json_encode($results, JSON_PRETTY_PRINT | JSON_UNESCAPED_SLASHES));
+		} elseif (!empty($results)) {
+			$table = new Table($output);
+			$table->setHeaders(['App', 'Version', 'Result', 'Exit code', 'Duration (s)', 'Message']);
+			foreach ($results as $result) {
+				$table->addRow([$result['appid'], $result['version'], $result['result'], $result['exit_code'], $result['duration'], $result['message']]);
 			}
-			return $return;
+			$table->render();
 		}
-		return $this->updateExApp($input, $output, $appId);
+
+		$return = 0;
+		foreach ($results as $result) {
+			if ($result['exit_code'] > 0) {
+				$return = $result['exit_code'];
+			}
+		}
+		return $return;
+	}
+
+	/**
+	 * @param array<string, string> $queue version before the update per app id
+	 * @param OutputInterface|null $output where the output of finished updates is printed, null to not print it
+	 * @return array<string, array>
+	 */
+	private function runUpdateProcesses(InputInterface $input, array $queue, int $parallel, ?OutputInterface $output): array {
+		$occDirectory = file_exists('console.php') ? null : dirname(__FILE__, 6);
+		$results = [];
+		$running = [];
+		while (!empty($queue) || !empty($running)) {
+			while (!empty($queue) && count($running) < $parallel) {
+				$appId = array_key_first($queue);
+				$version = $queue[$appId];
+				unset($queue[$appId]);
+				$args = ['app_api:app:update', $appId, '--no-ansi', '--no-warnings'];
+				if ($input->getOption('wait-finish')) {
+					$args[] = '--wait-finish';
+				}
+				if ($input->getOption('include-disabled')) {
+					$args[] = '--include-disabled';
+				}
+				$command = 'php console.php ' . implode(' ', array_map('escapeshellarg', $args));
+				$this->logger->info(sprintf('Calling occ(directory=%s): %s', $occDirectory ?? 'null', $command));
+				$process = proc_open($command, [0 => ['pipe', 'r'], 1 => ['pipe', 'w'], 2 => ['pipe', 'w']], $pipes, $occDirectory);
+				if (!is_resource($process)) {
+					$results[$appId] = $this->buildUpdateResult($appId, $version, 1, 0.0, 'Failed to start the update process');
+					continue;
+				}
+				fclose($pipes[0]);
+				stream_set_blocking($pipes[1], false);
+				stream_set_blocking($pipes[2], false);
+				$running[$appId] = ['process' => $process, 'pipes' => $pipes, 'log' => '', 'version' => $version, 'start' => microtime(true)];
+			}
+
+			usleep(200000);
+			foreach ($running as $appId => &$update) {
+				// drain the pipes while the process runs, so it never blocks on a full pipe buffer
+				$update['log'] .= stream_get_contents($update['pipes'][1]) . stream_get_contents($update['pipes'][2]);
+				$status = proc_get_status($update['process']);
+				if ($status['running']) {
+					continue;
+				}
+				$update['log'] .= stream_get_contents($update['pipes'][1]) . stream_get_contents($update['pipes'][2]);
+				fclose($update['pipes'][1]);
+				fclose($update['pipes'][2]);
+				proc_close($update['process']);
+				$output?->write($update['log']);
+				$results[$appId] = $this->buildUpdateResult($appId, $update['version'], $status['exitcode'], microtime(true) - $update['start'], $update['log']);
+				unset($running[$appId]);
+			}
+			unset($update);
+		}
+		return $results;
+	}
+
+	private function buildUpdateResult(string $appId, string $version, int $exitCode, float $duration, string $log, ?string $result = null): array {
+		$lines = array_values(array_filter(array_map('trim', explode("\n", $log))));
+		return [
+			'appid' => $appId,
+			'version' => $version,
+			'result' => $result ?? ($exitCode === 0 ? 'ok' : 'failed'),
+			'exit_code' => $exitCode,
+			'duration' => round($duration, 1),
+			'message' => end($lines) ?: '',
+		];
 	}
 
 	private function updateExApp(InputInterface $input, OutputInterface $output, string $appId): int {
@@ -120,9 +257,9 @@ class Update extends Command {
 
 		$includeDisabledApps = $input->getOption('include-disabled');
 		if ($input->getOption('all') && !$exApp->getEnabled() && !$includeDisabledApps) {
-			$this->logger->info(sprintf('ExApp %s is disabled. Update skipped (use --include-disabled to update disabled apps).', $appId));
+			$this->logger->info(sprintf(self::DISABLED_SKIP_MESSAGE, $appId));
 			if ($outputConsole) {
-				$output->writeln(sprintf('ExApp %s is disabled. Update skipped (use --include-disabled to update disabled apps).', $appId));
+				$output->writeln(sprintf(self::DISABLED_SKIP_MESSAGE, $appId));
 			}
 			return 0;
 		}
@@ -315,7 +452,9 @@ class Update extends Command {
 
 		$this->service->dispatchExAppInitInternal($exApp);
 		if ($input->getOption('wait-finish')) {
-			$error = $this->exAppService->waitInitStepFinish($appId);
+			$error = $this->exAppService->waitInitStepFinish($appId, $outputConsole
+				? fn (int $progress) => $output->writeln(sprintf('ExApp %s initialization progress: %d%%', $appId, $progress))
+				: null);
 			if ($error) {
 				$output->writeln($error);
 				return 1;
@@ -0,0 +1,111 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI;
+
+use OCA\AppAPI\DeployActions\DockerLogDemuxer;
+use OCP\AppFramework\Http;
+use OCP\AppFramework\Http\ICallbackResponse;
+use OCP\AppFramework\Http\IOutput;
+use OCP\AppFramework\Http\Response;
+
+/**
+ * Server-sent events stream of ExApp container logs that follows new lines as they are written.
+ *
+ * Every log line is an event of type `stdout` or `stderr` with the line as data and its cursor
+ * as the event id, so a reconnecting EventSource resumes after the last line it received.
+ * A keep-alive comment is sent whenever the container was silent for the idle timeout of the logs stream;
+ * that is also when a closed connection is noticed, as PHP only notices it while writing.
+ * After MAX_DURATION seconds, or when the container stops, an `end` event is sent and the stream is closed:
+ * a reconnect has to authenticate again, so a stream does not outlive the admin session.
+ *
+ * Log lines are read from Docker only after the previous one was written, so a slow client slows down
+ * reading instead of making the server buffer the logs.
+ *
+ * @template-extends Response<Http::STATUS_OK, array<string, mixed>>
+ */
+class ContainerLogsEventStreamResponse extends Response implements ICallbackResponse {
+	public const MAX_DURATION = 3600;
+	public const END_REASON_STOPPED = 'stopped';
+	public const END_REASON_TIMEOUT = 'timeout';
+	private const RECONNECT_DELAY_MS = 3000;
+
+	/** @var array<string, string> incomplete last line of a chunk per stream, for TTY logs that are not split in lines */
+	private array $partialLines = [];
+	private float $deadline = 0.0;
+	private bool $closed = false;
+
+	public function __construct(
+		private readonly DockerLogDemuxer $logs,
+		private readonly string $resumeCursor = '',
+		private readonly int $maxDuration = self::MAX_DURATION,
+	) {
+		parent::__construct();
+		$this->addHeader('Content-Type', 'text/event-stream');
+		$this->addHeader('Cache-Control', 'no-cache');
+		$this->addHeader('X-Accel-Buffering', 'no');
+	}
+
+	public function callback(IOutput $output): void {
+		set_time_limit(0);
+		// keep running after the client disconnected, to stop reading from Docker and close the stream properly
+		ignore_user_abort(true);
+		$this->deadline = microtime(true) + $this->maxDuration;
+		$this->logs->setIdleCallback(fn (): bool => $this->send(": keep-alive\n\n"));
+
+		$this->send(sprintf("retry: %d\n\n", self::RECONNECT_DELAY_MS));
+		while (!$this->closed && ($frame = $this->logs->readFrame()) !== null) {
+			$lines = explode("\n", ($this->partialLines[$frame['stream']] ?? '') . $frame['content']);
+			$partialLine = array_pop($lines);
+			if (strlen($partialLine) >= DockerLogDemuxer::MAX_FRAME_SIZE) {
+				$lines[] = $partialLine;
+				$partialLine = '';
+			}
+			$this->partialLines[$frame['stream']] = $partialLine;
+			foreach ($lines as $line) {
+				if (!$this->sendLine($frame['stream'], $line)) {
+					break;
+				}
+			}
+		}
+		if (connection_aborted()) {
+			return;
+		}
+		if (!$this->closed) {
+			foreach ($this->partialLines as $stream => $line) {
+				if ($line !== '') {
+					$this->sendLine($stream, $line);
+				}
+			}
+		}
+		print sprintf("event: end\ndata: %s\n\n", $this->closed ? self::END_REASON_TIMEOUT : self::END_REASON_STOPPED);
+		flush();
+	}
+
+	private function sendLine(string $stream, string $line): bool {
+		$parsed = ContainerLogsResponse::parseLine($line);
+		if ($parsed['cursor'] !== '' && $parsed['cursor'] === $this->resumeCursor) {
+			return true; // `since` is inclusive, the client already has the lines of the cursor it resumes from
+		}
+		$event = $parsed['cursor'] !== '' ? sprintf("id: %s\n", $parsed['cursor']) : '';
+		return $this->send(sprintf("%sevent: %s\ndata: %s\n\n", $event, $stream, $parsed['message']));
+	}
+
+	/**
+	 * Write an event to the client, false once the stream is closed (client gone or maximum duration reached).
+	 */
+	private function send(string $event): bool {
+		print $event;
+		flush();
+		if (connection_aborted() || microtime(true) >= $this->deadline) {
+			$this->closed = true;
+		}
+		return !$this->closed;
+	}
+}
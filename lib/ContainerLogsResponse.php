@@ -0,0 +1,82 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI;
+
+use OCA\AppAPI\DeployActions\DockerLogDemuxer;
+use OCP\AppFramework\Http;
+use OCP\AppFramework\Http\DownloadResponse;
+use OCP\AppFramework\Http\ICallbackResponse;
+use OCP\AppFramework\Http\IOutput;
+
+/**
+ * Download of ExApp container logs, written frame by frame while they are read from Docker.
+ *
+ * In the JSON-lines format (`application/x-ndjson`) every frame becomes one object
+ * `{"stream": "stdout"|"stderr", "timestamp": string, "cursor": string, "message": string}`.
+ * `cursor` is the UNIX timestamp of the line with fractional seconds; it can be passed as `since`
+ * or `until` to fetch the next or previous page (both bounds are inclusive).
+ *
+ * @template-extends DownloadResponse<Http::STATUS_OK, 'text/plain'|'application/x-ndjson', array{}>
+ */
+class ContainerLogsResponse extends DownloadResponse implements ICallbackResponse {
+	public const FORMAT_TEXT = 'text';
+	public const FORMAT_JSON_LINES = 'jsonl';
+
+	public function __construct(
+		private readonly DockerLogDemuxer $logs,
+		string $filename,
+		private readonly bool $jsonLines = false,
+	) {
+		parent::__construct($filename, $jsonLines ? 'application/x-ndjson' : 'text/plain');
+	}
+
+	public function callback(IOutput $output): void {
+		while (($frame = $this->logs->readFrame()) !== null) {
+			print $this->jsonLines ? $this->formatJsonLine($frame) : $frame['content'];
+			flush();
+			if (connection_aborted()) {
+				return;
+			}
+		}
+	}
+
+	/**
+	 * @param array{stream: string, content: string} $frame a frame of logs read with timestamps
+	 */
+	private function formatJsonLine(array $frame): string {
+		return json_encode(['stream' => $frame['stream']] + self::parseLine($frame['content']), JSON_UNESCAPED_SLASHES | JSON_INVALID_UTF8_SUBSTITUTE) . "\n";
+	}
+
+	/**
+	 * Split a log line read with timestamps into its RFC3339Nano timestamp, paging cursor and message.
+	 * Timestamp and cursor are empty for a line without a timestamp prefix.
+	 *
+	 * @return array{timestamp: string, cursor: string, message: string}
+	 */
+	public static function parseLine(string $content): array {
+		$message = rtrim($content, "\r\n");
+		if (preg_match('/^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d{1,9}))?(Z|[+-]\d{2}:\d{2}) /', $message, $matches) !== 1) {
+			return ['timestamp' => '', 'cursor' => '', 'message' => $message];
+		}
+		return [
+			'timestamp' => substr($matches[0], 0, -1),
+			'cursor' => self::toCursor($matches[1], $matches[2], $matches[3]),
+			'message' => substr($message, strlen($matches[0])),
+		];
+	}
+
+	/**
+	 * UNIX timestamp with nanoseconds, in the format accepted by Docker's `since`/`until`.
+	 */
+	private static function toCursor(string $dateTime, string $fraction, string $timezone): string {
+		$seconds = (new \DateTimeImmutable($dateTime . ($timezone === 'Z' ? '+00:00' : $timezone)))->getTimestamp();
+		return sprintf('%d.%s', $seconds, str_pad($fraction, 9, '0'));
+	}
+}
@@ -26,6 +26,7 @@ use OCP\IRequest;
 /**
  * @psalm-import-type AppAPIExAppConfig from ResponseDefinitions
  * @psalm-import-type AppAPIExAppConfigValue from ResponseDefinitions
+ * @psalm-import-type AppAPIExAppConfigEntry from ResponseDefinitions
  */
 class AppConfigController extends OCSController {
 	protected $request;
@@ -109,4 +110,84 @@ class AppConfigController extends OCSController {
 		}
 		return new DataResponse($result, Http::STATUS_OK);
 	}
+
+	/**
+	 * Set several configuration values at once for the calling ExApp
+	 *
+	 * The values are written in one transaction: either all or none of them are set.
+	 *
+	 * @param array<string, mixed> $configValues Configuration keys mapped to their values
+	 * @param ?int $sensitive Whether the values are sensitive and should be stored encrypted (1) or not (0); unchanged when not given
+	 *
+	 * @return DataResponse<Http::STATUS_OK, array<string, AppAPIExAppConfigEntry>|\stdClass, array{}>
+	 * @throws OCSBadRequestException A key is empty, too many keys were given or the values could not be set
+	 *
+	 * 200: Configuration values set, mapped by key
+	 */
+	#[AppAPIAuth]
+	#[PublicPage]
+	#[NoCSRFRequired]
+	public function setAppConfigMap(array $configValues, ?int $sensitive = null): DataResponse {
+		$this->validateBulkKeys(array_keys($configValues));
+		if (array_key_exists('', $configValues)) {
+			throw new OCSBadRequestException('Config key cannot be empty');
+		}
+		$appId = $this->request->getHeader('ex-app-id');
+		$result = $this->exAppConfigService->setAppConfigMap($appId, $configValues, $sensitive);
+		if ($result === null) {
+			throw new OCSBadRequestException('Error setting app config values');
+		}
+		return new DataResponse($result ?: new \stdClass(), Http::STATUS_OK);
+	}
+
+	/**
+	 * Get configuration values of the calling ExApp as a map
+	 *
+	 * @param list<string> $configKeys Configuration keys to retrieve
+	 *
+	 * @return DataResponse<Http::STATUS_OK, array<string, string>|\stdClass, array{}>
+	 * @throws OCSBadRequestException Too many keys were given
+	 *
+	 * 200: Values of the existing keys returned, mapped by key
+	 */
+	#[AppAPIAuth]
+	#[PublicPage]
+	#[NoCSRFRequired]
+	public function getAppConfigMap(array $configKeys): DataResponse {
+		$this->validateBulkKeys($configKeys);
+		$appId = $this->request->getHeader('ex-app-id');
+		return new DataResponse($this->exAppConfigService->getAppConfigMap($appId, $configKeys) ?: new \stdClass(), Http::STATUS_OK);
+	}
+
+	/**
+	 * Delete configuration values of the calling ExApp, reporting which keys were deleted
+	 *
+	 * @param list<string> $configKeys Configuration keys to delete
+	 *
+	 * @return DataResponse<Http::STATUS_OK, array<string, bool>|\stdClass, array{}>
+	 * @throws OCSBadRequestException Too many keys were given or the values could not be deleted
+	 *
+	 * 200: Whether each key existed and was deleted, mapped by key
+	 */
+	#[AppAPIAuth]
+	#[PublicPage]
+	#[NoCSRFRequired]
+	public function deleteAppConfigMap(array $configKeys): DataResponse {
+		$this->validateBulkKeys($configKeys);
+		$appId = $this->request->getHeader('ex-app-id');
+		$result = $this->exAppConfigService->deleteAppConfigMap($appId, $configKeys);
+		if ($result === null) {
+			throw new OCSBadRequestException('Error deleting app config values');
+		}
+		return new DataResponse($result ?: new \stdClass(), Http::STATUS_OK);
+	}
+
+	/**
+	 * @throws OCSBadRequestException
+	 */
+	private function validateBulkKeys(array $configKeys): void {
+		if (count($configKeys) > ExAppConfigService::BULK_MAX_KEYS) {
+			throw new OCSBadRequestException(sprintf('At most %d keys can be given at once', ExAppConfigService::BULK_MAX_KEYS));
+		}
+	}
 }
@@ -19,8 +19,11 @@ use OCA\AppAPI\Db\ExAppMapper;
 use OCA\AppAPI\Db\ExAppRouteAccessLevel;
 use OCA\AppAPI\ProxyResponse;
 use OCA\AppAPI\Service\AppAPIService;
+use OCA\AppAPI\Service\ExAppProxyValidatorService;
+use OCA\AppAPI\Service\ExAppRouteMatcher;
 use OCA\AppAPI\Service\ExAppService;
 use OCP\AppFramework\Controller;
+use OCP\AppFramework\Http;
 use OCP\AppFramework\Http\Attribute\NoAdminRequired;
 use OCP\AppFramework\Http\Attribute\NoCSRFRequired;
 use OCP\AppFramework\Http\Attribute\OpenAPI;
@@ -47,6 +50,7 @@ class ExAppProxyController extends Controller {
 		private readonly IGroupManager $groupManager,
 		private readonly LoggerInterface $logger,
 		private readonly IThrottler $throttler,
+		private readonly ExAppProxyValidatorService $validatorService,
 	) {
 		parent::__construct(Application::APP_ID, $request);
 	}
@@ -59,15 +63,19 @@ class ExAppProxyController extends Controller {
 				$responseHeaders[$key] = $value[0];
 			}
 		}
+		if ($response->getStatusCode() === Http::STATUS_NOT_MODIFIED) {
+			// Validators matched on the ExApp side: keep the headers, but do not touch the body
+			return new ProxyResponse(Http::STATUS_NOT_MODIFIED, $responseHeaders);
+		}
+
+		// Body is a stream for proxied requests and is passed through in fixed-size chunks by ProxyResponse
 		$content = $response->getBody();
 
 		if ($isHTML) {
-			$nonce = $this->nonceManager->getNonce();
-			$content = str_replace(
-				'<script',
-				"<script nonce=\"$nonce\"",
-				$content
-			);
+			// Nonce injection changes the body length
+			$responseHeaders = array_filter($responseHeaders, static function (string $key) {
+				return strtolower($key) !== 'content-length';
+			}, ARRAY_FILTER_USE_KEY);
 		}
 
 		if (empty($response->getHeader('content-type'))) {
@@ -86,6 +94,9 @@ class ExAppProxyController extends Controller {
 		}
 
 		$proxyResponse = new ProxyResponse($response->getStatusCode(), $responseHeaders, $content);
+		if ($isHTML) {
+			$proxyResponse->setScriptNonce($this->nonceManager->getNonce());
+		}
 		if ($cache && !$isHTML && empty($response->getHeader('cache-control'))
 			&& $response->getHeader('Content-Type') !== 'application/json'
 			&& $response->getHeader('Content-Type') !== 'application/x-tar') {
@@ -107,11 +118,24 @@ class ExAppProxyController extends Controller {
 		}
 		$isHTML = pathinfo($other, PATHINFO_EXTENSION) === 'html';
 
+		$headers = $this->buildHeadersWithExclude($route, getallheaders());
+		if ($isHTML) {
+			// HTML gets a per-request CSP nonce injected, so a cached copy must never be revalidated
+			$headers = array_filter($headers, static function (string $key) {
+				return !in_array(strtolower($key), ['if-none-match', 'if-modified-since'], true);
+			}, ARRAY_FILTER_USE_KEY);
+		} else {
+			$notModifiedHeaders = $this->validatorService->getNotModifiedHeaders($exApp, $this->userId, $other, $_GET, $this->request);
+			if ($notModifiedHeaders !== null) {
+				return new ProxyResponse(Http::STATUS_NOT_MODIFIED, $notModifiedHeaders);
+			}
+		}
+
 		$response = $this->service->requestToExApp2(
 			$exApp, '/' . $other, $this->userId, 'GET', queryParams: $_GET, options: [
-				'stream' => !$isHTML, // Can't stream HTML
+				'stream' => true,
 				RequestOptions::COOKIES => $this->buildProxyCookiesJar($_COOKIE, $this->service->getExAppDomain($exApp)),
-				RequestOptions::HEADERS => $this->buildHeadersWithExclude($route, getallheaders()),
+				RequestOptions::HEADERS => $headers,
 				RequestOptions::TIMEOUT => 0,
 			],
 			request: $this->request,
@@ -121,6 +145,9 @@ class ExAppProxyController extends Controller {
 		}
 
 		$this->processBruteforce($bruteforceProtection, $delay, $response->getStatusCode());
+		if (!$isHTML) {
+			$this->validatorService->storeValidators($exApp, $this->userId, $other, $_GET, $response);
+		}
 		return $this->createProxyResponse($other, $response, $isHTML);
 	}
 
@@ -138,7 +165,7 @@ class ExAppProxyController extends Controller {
 		$isHTML = pathinfo($other, PATHINFO_EXTENSION) === 'html';
 
 		$options = [
-			'stream' => !$isHTML,
+			'stream' => true,
 			RequestOptions::COOKIES => $this->buildProxyCookiesJar($_COOKIE, $this->service->getExAppDomain($exApp)),
 			RequestOptions::HEADERS => $this->buildHeadersWithExclude($route, getallheaders()),
 			RequestOptions::TIMEOUT => 0,
@@ -182,7 +209,7 @@ class ExAppProxyController extends Controller {
 
 		$stream = fopen('php://input', 'r');
 		$options = [
-			'stream' => !$isHTML,
+			'stream' => true,
 			RequestOptions::COOKIES => $this->buildProxyCookiesJar($_COOKIE, $this->service->getExAppDomain($exApp)),
 			RequestOptions::BODY => $stream,
 			RequestOptions::HEADERS => $this->buildHeadersWithExclude($route, getallheaders()),
@@ -216,7 +243,7 @@ class ExAppProxyController extends Controller {
 
 		$stream = fopen('php://input', 'r');
 		$options = [
-			'stream' => !$isHTML,
+			'stream' => true,
 			RequestOptions::COOKIES => $this->buildProxyCookiesJar($_COOKIE, $this->service->getExAppDomain($exApp)),
 			RequestOptions::BODY => $stream,
 			RequestOptions::HEADERS => $this->buildHeadersWithExclude($route, getallheaders()),
@@ -319,26 +346,22 @@ class ExAppProxyController extends Controller {
 
 	private function passesExAppProxyRoutesChecks(ExApp $exApp, string $exAppRoute): array {
 		// Route URL is a regex matched against the request path including its leading slash, mirroring HaRP's target_path semantics.
-		$canonicalSubject = '/' . $exAppRoute;
-		foreach ($exApp->getRoutes() as $route) {
-			$pattern = '~^(?:' . str_replace('~', '\\~', $route['url']) . ')~i';
-			$matched = preg_match($pattern, $canonicalSubject) === 1;
-			if (!$matched && preg_match($pattern, $exAppRoute) === 1) {
-				// TODO(deprecation): remove this bare-path fallback once known ExApps have migrated their info.xml route URLs to the canonical `^/path$` form. Tracked by the AppAPI / context_chat_backend coordination effort.
-				$this->logger->debug(sprintf(
-					'ExApp "%s" matched route "%s" via legacy bare-path fallback. Update the info.xml route URL to start with "/" or "^/" so it matches against "%s".',
-					$exApp->getAppid(), $route['url'], $canonicalSubject
-				));
-				$matched = true;
-			}
-			if ($matched
-				&& str_contains(strtolower($route['verb']), strtolower($this->request->getMethod()))
-			) {
-				// First match by path+verb wins. Apply its access level without falling through to broader routes.
-				return $this->passesExAppProxyRouteAccessLevelCheck($route['access_level']) ? $route : [];
-			}
+		$routes = $exApp->getRoutes() ?? [];
+		$compiledRoutes = $exApp->getCompiledRoutes() ?? ExAppRouteMatcher::compile($routes);
+		$match = ExAppRouteMatcher::match($compiledRoutes, $routes, $this->request->getMethod(), $exAppRoute);
+		if ($match === null) {
+			return [];
+		}
+		$route = $match['route'];
+		if ($match['legacy']) {
+			// TODO(deprecation): remove this bare-path fallback once known ExApps have migrated their info.xml route URLs to the canonical `^/path$` form. Tracked by the AppAPI / context_chat_backend coordination effort.
+			$this->logger->debug(sprintf(
+				'ExApp "%s" matched route "%s" via legacy bare-path fallback. Update the info.xml route URL to start with "/" or "^/" so it matches against "%s".',
+				$exApp->getAppid(), $route['url'], '/' . $exAppRoute
+			));
 		}
-		return [];
+		// First match by path+verb wins. Apply its access level without falling through to broader routes.
+		return $this->passesExAppProxyRouteAccessLevelCheck($route['access_level']) ? $route : [];
 	}
 
 	private function passesExAppProxyRouteAccessLevelCheck(int $accessLevel): bool {
@@ -16,6 +16,8 @@ use OC\App\AppStore\Version\VersionParser;
 use OC\App\DependencyAnalyzer;
 use OC\App\Platform;
 use OCA\AppAPI\AppInfo\Application;
+use OCA\AppAPI\ContainerLogsEventStreamResponse;
+use OCA\AppAPI\ContainerLogsResponse;
 use OCA\AppAPI\DeployActions\DockerActions;
 use OCA\AppAPI\Fetcher\ExAppFetcher;
 use OCA\AppAPI\ResponseDefinitions;
@@ -567,45 +569,113 @@ class ExAppsPageController extends Controller {
 	/**
 	 * Download the container logs of an ExApp
 	 *
+	 * The logs are streamed from the container as they are read, so their size is not limited by memory.
+	 *
 	 * @param string $appId ID of the ExApp
 	 * @param string $tail Number of lines to return from the end of the logs, or 'all'
+	 * @param string $since Only return logs since this UNIX timestamp (fractional seconds allowed, inclusive)
+	 * @param string $until Only return logs until this UNIX timestamp (fractional seconds allowed, inclusive)
+	 * @param 'text'|'jsonl' $format 'text' for the raw logs, 'jsonl' for one JSON object per line with its stream, timestamp and paging cursor
 	 *
-	 * @return DataDownloadResponse<Http::STATUS_OK, 'text/plain', array{}>
+	 * @return ContainerLogsResponse|DataDownloadResponse<Http::STATUS_OK, 'text/plain', array{}>
 	 *
 	 * 200: ExApp logs returned
 	 */
 	#[NoCSRFRequired]
-	public function getAppLogs(string $appId, string $tail = 'all'): DataDownloadResponse {
+	public function getAppLogs(string $appId, string $tail = 'all', string $since = '', string $until = '', string $format = ContainerLogsResponse::FORMAT_TEXT): ContainerLogsResponse|DataDownloadResponse {
+		$fileName = $this->dockerActions->buildExAppContainerName($appId) . '_logs.txt';
 		$exApp = $this->exAppService->getExApp($appId);
 		if (is_null($exApp)) {
 			return new DataDownloadResponse(
 				json_encode(['error' => $this->l10n->t('ExApp not found, failed to get logs')]),
-				$this->dockerActions->buildExAppContainerName($appId) . '_logs.txt',
+				$fileName,
+				'text/plain'
+			);
+		}
+		$cursorPattern = '/^(\d+(\.\d{1,9})?)?$/';
+		if (($tail !== 'all' && !ctype_digit($tail)) || !preg_match($cursorPattern, $since) || !preg_match($cursorPattern, $until)
+			|| !in_array($format, [ContainerLogsResponse::FORMAT_TEXT, ContainerLogsResponse::FORMAT_JSON_LINES], true)) {
+			return new DataDownloadResponse(
+				json_encode(['error' => $this->l10n->t('Invalid logs range or format')]),
+				$fileName,
 				'text/plain'
 			);
 		}
 		$daemonConfig = $this->daemonConfigService->getDaemonConfigByName($exApp->getDaemonConfigName());
 		$this->dockerActions->initGuzzleClient($daemonConfig);
+		$jsonLines = $format === ContainerLogsResponse::FORMAT_JSON_LINES;
 		try {
-			$logs = $this->dockerActions->getContainerLogs(
+			$logs = $this->dockerActions->openContainerLogs(
 				$this->dockerActions->buildDockerUrl($daemonConfig),
 				$this->dockerActions->buildExAppContainerName($appId),
-				$tail
-			);
-			return new DataDownloadResponse(
-				$logs,
-				$this->dockerActions->buildExAppContainerName($appId) . '_logs.txt', 'text/plain',
-				Http::STATUS_OK
+				$tail,
+				$since,
+				$until,
+				timestamps: $jsonLines,
 			);
+			return new ContainerLogsResponse($logs, $jsonLines ? substr($fileName, 0, -4) . '.jsonl' : $fileName, $jsonLines);
 		} catch (GuzzleException $e) {
 			return new DataDownloadResponse(
 				json_encode(['error' => $this->l10n->t('Failed to get container logs. Note: Downloading Docker container works only for containers with the json-file or journald logging driver. Error: %s', [$e->getMessage()])]),
-				$this->dockerActions->buildExAppContainerName($appId) . '_logs.txt',
+				$fileName,
 				'text/plain'
 			);
 		}
 	}
 
+	/**
+	 * Follow the container logs of an ExApp as server-sent events
+	 *
+	 * Every log line is sent as a `stdout` or `stderr` event with its cursor as the event id; a reconnecting
+	 * EventSource resumes after the last line it received (`Last-Event-ID`). The stream ends with an `end` event
+	 * whose data is `stopped` (the container stopped) or `timeout` (the maximum stream duration was reached).
+	 *
+	 * @param string $appId ID of the ExApp
+	 * @param string $tail Number of existing lines to send before following new ones, or 'all'
+	 *
+	 * @return ContainerLogsEventStreamResponse|JSONResponse<Http::STATUS_BAD_REQUEST|Http::STATUS_NOT_FOUND|Http::STATUS_NOT_IMPLEMENTED|Http::STATUS_INTERNAL_SERVER_ERROR, array{error: string}, array{}>
+	 *
+	 * 200: Log events streamed
+	 * 400: Invalid tail
+	 * 404: ExApp not found
+	 * 501: Following logs is not supported by the daemon of the ExApp
+	 * 500: Failed to open the container logs
+	 */
+	#[NoCSRFRequired]
+	public function followAppLogs(string $appId, string $tail = '100'): ContainerLogsEventStreamResponse|JSONResponse {
+		$exApp = $this->exAppService->getExApp($appId);
+		if (is_null($exApp)) {
+			return new JSONResponse(['error' => $this->l10n->t('ExApp not found, failed to get logs')], Http::STATUS_NOT_FOUND);
+		}
+		if ($tail !== 'all' && !ctype_digit($tail)) {
+			return new JSONResponse(['error' => $this->l10n->t('Invalid logs range or format')], Http::STATUS_BAD_REQUEST);
+		}
+		$daemonConfig = $this->daemonConfigService->getDaemonConfigByName($exApp->getDaemonConfigName());
+		if ($daemonConfig === null || $daemonConfig->getAcceptsDeployId() !== DockerActions::DEPLOY_ID) {
+			return new JSONResponse(['error' => $this->l10n->t('Following logs is only supported for ExApps deployed with Docker')], Http::STATUS_NOT_IMPLEMENTED);
+		}
+		// a reconnecting EventSource continues from the last line it received instead of sending the tail again
+		$resumeCursor = $this->request->getHeader('Last-Event-ID');
+		if (preg_match('/^\d+\.\d{9}$/', $resumeCursor) !== 1) {
+			$resumeCursor = '';
+		}
+		$this->dockerActions->initGuzzleClient($daemonConfig);
+		try {
+			$logs = $this->dockerActions->openContainerLogs(
+				$this->dockerActions->buildDockerUrl($daemonConfig),
+				$this->dockerActions->buildExAppContainerName($appId),
+				$resumeCursor !== '' ? 'all' : $tail,
+				$resumeCursor,
+				timestamps: true,
+				follow: true,
+			);
+		} catch (GuzzleException $e) {
+			$this->logger->error(sprintf('Failed to follow logs of ExApp %s: %s', $appId, $e->getMessage()), ['exception' => $e]);
+			return new JSONResponse(['error' => $this->l10n->t('Failed to get container logs. Error: %s', [$e->getMessage()])], Http::STATUS_INTERNAL_SERVER_ERROR);
+		}
+		return new ContainerLogsEventStreamResponse($logs, $resumeCursor);
+	}
+
 	/**
 	 * Get the deploy options of an ExApp
 	 *
@@ -27,6 +27,7 @@ use OCP\IUserSession;
 /**
  * @psalm-import-type AppAPIExAppPreference from ResponseDefinitions
  * @psalm-import-type AppAPIExAppConfigValue from ResponseDefinitions
+ * @psalm-import-type AppAPIExAppConfigEntry from ResponseDefinitions
  */
 class PreferencesController extends OCSController {
 	protected $request;
@@ -114,4 +115,122 @@ class PreferencesController extends OCSController {
 		}
 		return new DataResponse($result, Http::STATUS_OK);
 	}
+
+	/**
+	 * Set several preference values at once for the current user and the calling ExApp
+	 *
+	 * The values are written in one transaction: either all or none of them are set.
+	 *
+	 * @param array<string, mixed> $configValues Preference keys mapped to their values
+	 * @param ?int $sensitive Whether the values are sensitive and should be stored encrypted (1) or not (0); unchanged when not given
+	 *
+	 * @return DataResponse<Http::STATUS_OK, array<string, AppAPIExAppConfigEntry>|\stdClass, array{}>
+	 * @throws OCSBadRequestException A key is empty, too many keys were given or the values could not be set
+	 *
+	 * 200: Preference values set, mapped by key
+	 */
+	#[AppAPIAuth]
+	#[PublicPage]
+	#[NoCSRFRequired]
+	public function setUserConfigMap(array $configValues, ?int $sensitive = null): DataResponse {
+		$this->validateBulkKeys(array_keys($configValues));
+		if (array_key_exists('', $configValues)) {
+			throw new OCSBadRequestException('Config key cannot be empty');
+		}
+		$userId = $this->userSession->getUser()->getUID();
+		$appId = $this->request->getHeader('ex-app-id');
+		$result = $this->exAppPreferenceService->setUserConfigMap($userId, $appId, $configValues, $sensitive);
+		if ($result === null) {
+			throw new OCSBadRequestException('Failed to set user config values');
+		}
+		return new DataResponse($result ?: new \stdClass(), Http::STATUS_OK);
+	}
+
+	/**
+	 * Get preference values of the current user and the calling ExApp as a map
+	 *
+	 * @param list<string> $configKeys Preference keys to retrieve
+	 *
+	 * @return DataResponse<Http::STATUS_OK, array<string, string>|\stdClass, array{}>
+	 * @throws OCSBadRequestException Too many keys were given
+	 *
+	 * 200: Values of the existing keys returned, mapped by key
+	 */
+	#[AppAPIAuth]
+	#[PublicPage]
+	#[NoCSRFRequired]
+	public function getUserConfigMap(array $configKeys): DataResponse {
+		$this->validateBulkKeys($configKeys);
+		$userId = $this->userSession->getUser()->getUID();
+		$appId = $this->request->getHeader('ex-app-id');
+		return new DataResponse($this->exAppPreferenceService->getUserConfigMap($userId, $appId, $configKeys) ?: new \stdClass(), Http::STATUS_OK);
+	}
+
+	/**
+	 * Delete preference values of the current user and the calling ExApp, reporting which keys were deleted
+	 *
+	 * @param list<string> $configKeys Preference keys to delete
+	 *
+	 * @return DataResponse<Http::STATUS_OK, array<string, bool>|\stdClass, array{}>
+	 * @throws OCSBadRequestException Too many keys were given or the values could not be deleted
+	 *
+	 * 200: Whether each key existed and was deleted, mapped by key
+	 */
+	#[AppAPIAuth]
+	#[PublicPage]
+	#[NoCSRFRequired]
+	public function deleteUserConfigMap(array $configKeys): DataResponse {
+		$this->validateBulkKeys($configKeys);
+		$userId = $this->userSession->getUser()->getUID();
+		$appId = $this->request->getHeader('ex-app-id');
+		$result = $this->exAppPreferenceService->deleteUserConfigMap($userId, $appId, $configKeys);
+		if ($result === null) {
+			throw new OCSBadRequestException('Failed to delete user config values');
+		}
+		return new DataResponse($result ?: new \stdClass(), Http::STATUS_OK);
+	}
+
+	/**
+	 * Get preference values of several users for the calling ExApp
+	 *
+	 * Without `userIds`, the users that have one of the keys set are returned page by page, ordered by user ID:
+	 * pass the returned `next_cursor` as `cursor` to get the next page; it is null on the last page.
+	 * Users without any of the keys are left out.
+	 *
+	 * @param list<string> $configKeys Preference keys to retrieve, at most 50
+	 * @param list<string> $userIds Users to read the keys of, at most 500; a page of all users with one of the keys when empty
+	 * @param string $cursor Cursor of the page to return, from the `next_cursor` of the previous page
+	 * @param int $limit Number of users per page, at most 500
+	 *
+	 * @return DataResponse<Http::STATUS_OK, array{values: array<string, array<string, string>>, next_cursor: ?string}, array{}>
+	 * @throws OCSBadRequestException Too many keys or users were given, or the values could not be read
+	 *
+	 * 200: Values returned, mapped by user and key
+	 */
+	#[AppAPIAuth]
+	#[PublicPage]
+	#[NoCSRFRequired]
+	public function getUsersConfigMap(array $configKeys, array $userIds = [], string $cursor = '', int $limit = ExAppPreferenceService::USERS_PAGE_MAX): DataResponse {
+		if (count($configKeys) > ExAppPreferenceService::USERS_KEYS_MAX) {
+			throw new OCSBadRequestException(sprintf('At most %d keys can be given at once', ExAppPreferenceService::USERS_KEYS_MAX));
+		}
+		if (count($userIds) > ExAppPreferenceService::USERS_PAGE_MAX || $limit < 1 || $limit > ExAppPreferenceService::USERS_PAGE_MAX) {
+			throw new OCSBadRequestException(sprintf('At most %d users can be read at once', ExAppPreferenceService::USERS_PAGE_MAX));
+		}
+		$appId = $this->request->getHeader('ex-app-id');
+		$result = $this->exAppPreferenceService->getUsersConfigMap($appId, $configKeys, $userIds, $cursor, $limit);
+		if ($result === null) {
+			throw new OCSBadRequestException('Failed to get user config values');
+		}
+		return new DataResponse($result, Http::STATUS_OK);
+	}
+
+	/**
+	 * @throws OCSBadRequestException
+	 */
+	private function validateBulkKeys(array $configKeys): void {
+		if (count($configKeys) > ExAppPreferenceService::BULK_MAX_KEYS) {
+			throw new OCSBadRequestException(sprintf('At most %d keys can be given at once', ExAppPreferenceService::BULK_MAX_KEYS));
+		}
+	}
 }
@@ -120,4 +120,62 @@ class TaskProcessingController extends OCSController {
 		}
 		return new DataResponse($result->jsonSerialize(), Http::STATUS_OK);
 	}
+
+	/**
+	 * Claim a batch of scheduled tasks for a Task Processing provider of the calling ExApp
+	 *
+	 * The oldest scheduled tasks are claimed and marked as running. Tasks are only returned while the provider is the preferred one of its task type.
+	 *
+	 * @param string $name Name of the provider
+	 * @param int $limit Maximum number of tasks to claim, capped by the `max_batch_size` of the provider
+	 *
+	 * @return DataResponse<Http::STATUS_OK, array{tasks: list<array<string, mixed>>}, array{}>|DataResponse<Http::STATUS_BAD_REQUEST|Http::STATUS_NOT_FOUND, list<empty>, array{}>
+	 *
+	 * 200: Claimed tasks returned
+	 * 400: Invalid limit
+	 * 404: Provider not found
+	 */
+	#[NoCSRFRequired]
+	#[PublicPage]
+	#[AppAPIAuth]
+	public function claimTaskBatch(string $name, int $limit = TaskProcessingService::BATCH_MAX_SIZE): DataResponse {
+		if ($limit < 1 || $limit > TaskProcessingService::BATCH_MAX_SIZE) {
+			return new DataResponse([], Http::STATUS_BAD_REQUEST);
+		}
+		$tasks = $this->taskProcessingService->claimTaskBatch(
+			$this->request->getHeader('ex-app-id'), $name, $limit
+		);
+		if ($tasks === null) {
+			return new DataResponse([], Http::STATUS_NOT_FOUND);
+		}
+		return new DataResponse(['tasks' => $tasks]);
+	}
+
+	/**
+	 * Report the results of several tasks of a Task Processing provider of the calling ExApp
+	 *
+	 * @param string $name Name of the provider
+	 * @param array<string, array{output?: ?array<string, mixed>, error_message?: ?string}> $results Results mapped by task ID: the output (files referenced by their IDs) or an error message
+	 *
+	 * @return DataResponse<Http::STATUS_OK, array<string, bool>, array{}>|DataResponse<Http::STATUS_BAD_REQUEST|Http::STATUS_NOT_FOUND, list<empty>, array{}>
+	 *
+	 * 200: Whether each result was stored, mapped by task ID
+	 * 400: No results or too many results were given
+	 * 404: Provider not found
+	 */
+	#[NoCSRFRequired]
+	#[PublicPage]
+	#[AppAPIAuth]
+	public function setTaskResults(string $name, array $results): DataResponse {
+		if (empty($results) || count($results) > TaskProcessingService::BATCH_MAX_SIZE) {
+			return new DataResponse([], Http::STATUS_BAD_REQUEST);
+		}
+		$stored = $this->taskProcessingService->setTaskResults(
+			$this->request->getHeader('ex-app-id'), $name, $results
+		);
+		if ($stored === null) {
+			return new DataResponse([], Http::STATUS_NOT_FOUND);
+		}
+		return new DataResponse($stored);
+	}
 }
@@ -10,11 +10,10 @@ declare(strict_types=1);
 namespace OCA\AppAPI\Controller;
 
 use OCA\AppAPI\AppInfo\Application;
-use OCA\AppAPI\Service\ExAppService;
 use OCA\AppAPI\Service\UI\InitialStateService;
 use OCA\AppAPI\Service\UI\ScriptsService;
 use OCA\AppAPI\Service\UI\StylesService;
-use OCA\AppAPI\Service\UI\TopMenuService;
+use OCA\AppAPI\Service\UI\UiManifestService;
 use OCP\AppFramework\Controller;
 use OCP\AppFramework\Http\Attribute\NoAdminRequired;
 use OCP\AppFramework\Http\Attribute\NoCSRFRequired;
@@ -36,11 +35,10 @@ class TopMenuController extends Controller {
 	public function __construct(
 		IRequest $request,
 		private readonly IInitialState $initialState,
-		private readonly TopMenuService $menuEntryService,
+		private readonly UiManifestService $uiManifestService,
 		private readonly InitialStateService $initialStateService,
 		private readonly ScriptsService $scriptsService,
 		private readonly StylesService $stylesService,
-		private readonly ExAppService $service,
 		private readonly ?string $userId,
 		private readonly IGroupManager $groupManager,
 	) {
@@ -53,26 +51,17 @@ class TopMenuController extends Controller {
 	#[NoAdminRequired]
 	#[NoCSRFRequired]
 	public function viewExAppPage(string $appId, string $name, string $other): TemplateResponse {
-		$exApp = $this->service->getExApp($appId);
-		if ($exApp === null) {
+		// the manifest only lists the pages of enabled ExApps that the user class may open
+		$page = $this->uiManifestService->getPage($this->userId !== null && $this->groupManager->isAdmin($this->userId), $appId, $name);
+		if ($page === null) {
 			return new NotFoundResponse();
 		}
-		if (!$exApp->getEnabled()) {
-			return new NotFoundResponse();
-		}
-		$menuEntry = $this->menuEntryService->getExAppMenuEntry($appId, $name);
-		if ($menuEntry === null) {
-			return new NotFoundResponse();
-		}
-		if (filter_var($menuEntry->getAdminRequired(), FILTER_VALIDATE_BOOLEAN) && !$this->groupManager->isAdmin($this->userId)) {
-			return new NotFoundResponse();
-		}
-		$initialStates = $this->initialStateService->getExAppInitialStates($appId, 'top_menu', $menuEntry->getName());
+		$initialStates = $this->initialStateService->getExAppInitialStates($appId, 'top_menu', $name);
 		foreach ($initialStates as $key => $value) {
 			$this->initialState->provideInitialState($key, $value);
 		}
-		$this->jsProxyMap = $this->scriptsService->applyExAppScripts($appId, 'top_menu', $menuEntry->getName());
-		$this->stylesService->applyExAppStyles($appId, 'top_menu', $menuEntry->getName());
+		$this->jsProxyMap = $this->scriptsService->addExAppScripts($appId, $page['scripts']);
+		$this->stylesService->addExAppStyles($appId, $page['styles']);
 
 		$this->postprocess = true;
 		$response = new TemplateResponse(Application::APP_ID, 'embedded');
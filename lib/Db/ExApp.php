@@ -33,6 +33,7 @@ use OCP\AppFramework\Db\Entity;
  * @method array getDeployConfig()
  * @method string getAcceptsDeployId()
  * @method array getRoutes()
+ * @method array|null getCompiledRoutes()
  * @method void setAppid(string $appid)
  * @method void setVersion(string $version)
  * @method void setName(string $name)
@@ -47,6 +48,7 @@ use OCP\AppFramework\Db\Entity;
  * @method void setDeployConfig(array $deployConfig)
  * @method void setAcceptsDeployId(string $acceptsDeployId)
  * @method void setRoutes(array $routes)
+ * @method void setCompiledRoutes(array $compiledRoutes)
  */
 class ExApp extends Entity implements JsonSerializable {
 	protected $appid;
@@ -64,6 +66,7 @@ class ExApp extends Entity implements JsonSerializable {
 	protected $deployConfig;
 	protected $acceptsDeployId;
 	protected $routes;
+	protected $compiledRoutes;
 
 	/**
 	 * @param array $params
@@ -84,6 +87,7 @@ class ExApp extends Entity implements JsonSerializable {
 		$this->addType('deployConfig', 'json');
 		$this->addType('acceptsDeployId', 'string');
 		$this->addType('routes', 'json');
+		$this->addType('compiledRoutes', 'json');
 
 		if (isset($params['id'])) {
 			$this->setId($params['id']);
@@ -130,6 +134,9 @@ class ExApp extends Entity implements JsonSerializable {
 		if (isset($params['routes'])) {
 			$this->setRoutes($params['routes']);
 		}
+		if (isset($params['compiled_routes'])) {
+			$this->setCompiledRoutes($params['compiled_routes']);
+		}
 	}
 
 	public function jsonSerialize(): array {
@@ -149,6 +156,7 @@ class ExApp extends Entity implements JsonSerializable {
 			'deploy_config' => $this->getDeployConfig(),
 			'accepts_deploy_id' => $this->getAcceptsDeployId(),
 			'routes' => $this->getRoutes(),
+			'compiled_routes' => $this->getCompiledRoutes(),
 		];
 	}
 }
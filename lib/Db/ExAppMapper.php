@@ -25,16 +25,23 @@ class ExAppMapper extends QBMapper {
 		parent::__construct($db, 'ex_apps');
 	}
 
+	/** routes are loaded with `appid IN (...)` lists of at most this many ExApps */
+	private const ROUTES_QUERY_CHUNK_SIZE = 1000;
+
 	/**
 	 * Decode a JSON-list column (`bruteforce_protection`, `headers_to_exclude`) into an array,
 	 * tolerating NULL / non-string / malformed values from legacy rows.
+	 * Routes loaded by this mapper already hold the decoded lists, which are returned as they are.
 	 */
 	public static function parseJsonList(mixed $raw): array {
+		if (is_array($raw)) {
+			return array_values($raw);
+		}
 		if (!is_string($raw)) {
 			return [];
 		}
 		$decoded = json_decode($raw, true);
-		return is_array($decoded) ? $decoded : [];
+		return is_array($decoded) ? array_values($decoded) : [];
 	}
 
 	/**
@@ -43,24 +50,8 @@ class ExAppMapper extends QBMapper {
 	 * @return ExApp[]
 	 */
 	public function findAll(?int $limit = null, ?int $offset = null): array {
-		$qb = $this->db->getQueryBuilder();
-		$qb->select(
-			'a.*',
-			'd.protocol',
-			'd.host',
-			'd.deploy_config',
-			'd.accepts_deploy_id',
-			'r.url',
-			'r.verb',
-			'r.access_level',
-			'r.headers_to_exclude',
-			'r.bruteforce_protection',
-		)
-			->from($this->tableName, 'a')
-			->leftJoin('a', 'ex_apps_daemons', 'd', $qb->expr()->eq('a.daemon_config_name', 'd.name'))
-			->leftJoin('a', 'ex_apps_routes', 'r', $qb->expr()->eq('a.appid', 'r.appid'))
+		$qb = $this->selectExAppsWithDaemon()
 			->orderBy('a.appid', 'ASC')
-			->addOrderBy('r.id', 'ASC')
 			->setMaxResults($limit)
 			->setFirstResult($offset);
 		return $this->buildExAppWithRoutes($qb->executeQuery()->fetchAll());
@@ -76,80 +67,95 @@ class ExAppMapper extends QBMapper {
 	 * @return ExApp
 	 */
 	public function findByAppId(string $appId): Entity {
+		$qb = $this->selectExAppsWithDaemon();
+		$qb->where(
+			$qb->expr()->eq('a.appid', $qb->createNamedParameter($appId))
+		);
+		$apps = $this->buildExAppWithRoutes($qb->executeQuery()->fetchAll());
+		if (count($apps) === 0) {
+			throw new DoesNotExistException('No ExApp found with appId ' . $appId);
+		}
+		if (count($apps) > 1) {
+			throw new MultipleObjectsReturnedException('Multiple ExApps found with appId ' . $appId);
+		}
+		return $apps[0];
+	}
+
+	/**
+	 * One row per ExApp with its daemon; routes are loaded separately by findRoutesByAppIds().
+	 */
+	private function selectExAppsWithDaemon(): IQueryBuilder {
 		$qb = $this->db->getQueryBuilder();
-		$qb->select(
+		return $qb->select(
 			'a.*',
 			'd.protocol',
 			'd.host',
 			'd.deploy_config',
 			'd.accepts_deploy_id',
-			'r.url',
-			'r.verb',
-			'r.access_level',
-			'r.headers_to_exclude',
-			'r.bruteforce_protection',
 		)
 			->from($this->tableName, 'a')
-			->leftJoin('a', 'ex_apps_daemons', 'd', $qb->expr()->eq('a.daemon_config_name', 'd.name'))
-			->leftJoin('a', 'ex_apps_routes', 'r', $qb->expr()->eq('a.appid', 'r.appid'))
-			->orderBy('a.appid', 'ASC')
-			->addOrderBy('r.id', 'ASC')
-			->where(
-				$qb->expr()->eq('a.appid', $qb->createNamedParameter($appId))
-			);
-		$apps = $this->buildExAppWithRoutes($qb->executeQuery()->fetchAll());
-		if (count($apps) === 0) {
-			throw new DoesNotExistException('No ExApp found with appId ' . $appId);
-		}
-		if (count($apps) > 1) {
-			throw new MultipleObjectsReturnedException('Multiple ExApps found with appId ' . $appId);
+			->leftJoin('a', 'ex_apps_daemons', 'd', $qb->expr()->eq('a.daemon_config_name', 'd.name'));
+	}
+
+	/**
+	 * Routes of the given ExApps in registration order, with their JSON-list columns decoded.
+	 * Served by the `(appid, id)` index of `ex_apps_routes`.
+	 *
+	 * @param string[] $appIds
+	 * @return array<string, list<array{url: string, verb: string, access_level: int, headers_to_exclude: array, bruteforce_protection: array}>>
+	 * @throws Exception
+	 */
+	public function findRoutesByAppIds(array $appIds): array {
+		$routes = [];
+		foreach (array_chunk($appIds, self::ROUTES_QUERY_CHUNK_SIZE) as $chunk) {
+			$qb = $this->db->getQueryBuilder();
+			$result = $qb->select('appid', 'url', 'verb', 'access_level', 'headers_to_exclude', 'bruteforce_protection')
+				->from('ex_apps_routes')
+				->where($qb->expr()->in('appid', $qb->createNamedParameter($chunk, IQueryBuilder::PARAM_STR_ARRAY)))
+				->orderBy('appid', 'ASC')
+				->addOrderBy('id', 'ASC')
+				->executeQuery();
+			while ($row = $result->fetch()) {
+				$routes[$row['appid']][] = [
+					'url' => $row['url'],
+					'verb' => $row['verb'],
+					'access_level' => (int)$row['access_level'],
+					'headers_to_exclude' => self::parseJsonList($row['headers_to_exclude']),
+					'bruteforce_protection' => self::parseJsonList($row['bruteforce_protection']),
+				];
+			}
+			$result->closeCursor();
 		}
-		return $apps[0];
+		return $routes;
 	}
 
 	/**
-	 * @param array $result fetched rows from the database
+	 * @param array $result fetched rows from the database, one per ExApp
 	 *
 	 * @return array of ExApps with composed routes
+	 * @throws Exception
 	 */
 	private function buildExAppWithRoutes(array $result): array {
+		$routes = empty($result) ? [] : $this->findRoutesByAppIds(array_column($result, 'appid'));
 		$apps = [];
-		$lastAppId = null;
-		$lastApp = null;
 		foreach ($result as $row) {
-			if ($lastAppId !== $row['appid'] || $lastAppId === null) {
-				$lastAppId = $row['appid'];
-				$lastApp = new ExApp([
-					'id' => $row['id'],
-					'appid' => $row['appid'],
-					'version' => $row['version'],
-					'name' => $row['name'],
-					'daemon_config_name' => $row['daemon_config_name'],
-					'protocol' => $row['protocol'],
-					'host' => $row['host'],
-					'port' => $row['port'],
-					'secret' => $row['secret'],
-					'status' => $row['status'],
-					'enabled' => $row['enabled'],
-					'created_time' => $row['created_time'],
-					'deploy_config' => $row['deploy_config'],
-					'accepts_deploy_id' => $row['accepts_deploy_id'],
-					'routes' => [],
-				]);
-				$apps[] = $lastApp;
-			}
-			if (isset($row['url'])) {
-				$route = [
-					'url' => $row['url'],
-					'verb' => $row['verb'],
-					'access_level' => $row['access_level'],
-					'headers_to_exclude' => $row['headers_to_exclude'],
-					'bruteforce_protection' => $row['bruteforce_protection'],
-				];
-				$lastAppRoutes = $lastApp->getRoutes();
-				$lastAppRoutes[] = $route;
-				$lastApp->setRoutes($lastAppRoutes);
-			}
+			$apps[] = new ExApp([
+				'id' => $row['id'],
+				'appid' => $row['appid'],
+				'version' => $row['version'],
+				'name' => $row['name'],
+				'daemon_config_name' => $row['daemon_config_name'],
+				'protocol' => $row['protocol'],
+				'host' => $row['host'],
+				'port' => $row['port'],
+				'secret' => $row['secret'],
+				'status' => $row['status'],
+				'enabled' => $row['enabled'],
+				'created_time' => $row['created_time'],
+				'deploy_config' => $row['deploy_config'],
+				'accepts_deploy_id' => $row['accepts_deploy_id'],
+				'routes' => $routes[$row['appid']] ?? [],
+			]);
 		}
 		return $apps;
 	}
@@ -221,8 +227,8 @@ class ExAppMapper extends QBMapper {
 					'url' => $qb->createNamedParameter($route['url']),
 					'verb' => $qb->createNamedParameter($route['verb']),
 					'access_level' => $qb->createNamedParameter($route['access_level'], IQueryBuilder::PARAM_INT),
-					'headers_to_exclude' => $qb->createNamedParameter(json_encode($route['headers_to_exclude'])),
-					'bruteforce_protection' => $qb->createNamedParameter(json_encode($route['bruteforce_protection'])),
+					'headers_to_exclude' => $qb->createNamedParameter(json_encode(self::parseJsonList($route['headers_to_exclude']))),
+					'bruteforce_protection' => $qb->createNamedParameter(json_encode(self::parseJsonList($route['bruteforce_protection']))),
 				]);
 			$count += $qb->executeStatement();
 		}
@@ -38,6 +38,39 @@ class TaskProcessingProviderMapper extends QBMapper {
 		return $result->fetchAll();
 	}
 
+	/**
+	 * @return string[] IDs of the enabled ExApps with registered providers
+	 * @throws Exception
+	 */
+	public function findEnabledAppIds(): array {
+		$qb = $this->db->getQueryBuilder();
+		$result = $qb->selectDistinct('exs.app_id')
+			->from($this->tableName, 'exs')
+			->innerJoin('exs', 'ex_apps', 'exa', $qb->expr()->eq('exa.appid', 'exs.app_id'))
+			->where(
+				$qb->expr()->eq('exa.enabled', $qb->createNamedParameter(1, IQueryBuilder::PARAM_INT))
+			)->executeQuery();
+		$appIds = [];
+		while (($appId = $result->fetchOne()) !== false) {
+			$appIds[] = (string)$appId;
+		}
+		$result->closeCursor();
+		return $appIds;
+	}
+
+	/**
+	 * @throws Exception
+	 */
+	public function findAllByAppId(string $appId): array {
+		$qb = $this->db->getQueryBuilder();
+		$result = $qb->select('*')
+			->from($this->tableName)
+			->where(
+				$qb->expr()->eq('app_id', $qb->createNamedParameter($appId, IQueryBuilder::PARAM_STR))
+			)->executeQuery();
+		return $result->fetchAll();
+	}
+
 	/**
 	 * @param string $appId
 	 * @param string $name
@@ -43,6 +43,25 @@ class ScriptMapper extends QBMapper {
 		return $result->fetchAll();
 	}
 
+	/**
+	 * Scripts of one type (e.g. "top_menu") of all enabled ExApps
+	 *
+	 * @throws Exception
+	 */
+	public function findAllEnabledByType(string $type): array {
+		$qb = $this->db->getQueryBuilder();
+		$result = $qb->select('exs.appid', 'exs.name', 'exs.path', 'exs.after_app_id')
+			->from($this->tableName, 'exs')
+			->innerJoin('exs', 'ex_apps', 'exa', $qb->expr()->eq('exa.appid', 'exs.appid'))
+			->where(
+				$qb->expr()->eq('exa.enabled', $qb->createNamedParameter(1, IQueryBuilder::PARAM_INT)),
+				$qb->expr()->eq('exs.type', $qb->createNamedParameter($type, IQueryBuilder::PARAM_STR))
+			)
+			->orderBy('exs.id')
+			->executeQuery();
+		return $result->fetchAll();
+	}
+
 	/**
 	 * @param string $appId
 	 * @param string $type
@@ -11,7 +11,12 @@ namespace OCA\AppAPI\DeployActions;
 
 use Exception;
 use GuzzleHttp\Client;
+use GuzzleHttp\Exception\ConnectException;
 use GuzzleHttp\Exception\GuzzleException;
+use GuzzleHttp\Exception\RequestException;
+use GuzzleHttp\Psr7\Request;
+use GuzzleHttp\Psr7\Response;
+use GuzzleHttp\Psr7\Stream;
 use OCA\AppAPI\AppInfo\Application;
 use OCA\AppAPI\Db\DaemonConfig;
 use OCA\AppAPI\Db\ExApp;
@@ -28,6 +33,7 @@ use OCP\IURLGenerator;
 use OCP\Security\ICrypto;
 use Phar;
 use PharData;
+use Psr\Http\Message\StreamInterface;
 use Psr\Log\LoggerInterface;
 
 class DockerActions implements IDeployActions {
@@ -35,6 +41,9 @@ class DockerActions implements IDeployActions {
 	public const EX_APP_CONTAINER_PREFIX = 'nc_app_';
 	public const APP_API_HAPROXY_USER = 'app_api_haproxy_user';
 	public const DEPLOY_ID = 'docker-install';
+	private const PULL_READ_CHUNK_SIZE = 8192;
+	private const PULL_PROGRESS_WRITE_INTERVAL = 2.0; // seconds between deploy progress writes during an image pull
+	public const LOGS_FOLLOW_IDLE_TIMEOUT = 15; // seconds without new log lines before a followed log reports being idle
 
 	private Client $guzzleClient;
 	private bool $useSocket = false;  # for `pullImage` function, to detect can be stream used or not.
@@ -709,9 +718,6 @@ class DockerActions implements IDeployActions {
 	public function pullImageInternal(
 		string $dockerUrl, ExApp $exApp, int $startPercent, int $maxPercent, string $imageId,
 	): string {
-		# docs: https://github.com/docker/compose/blob/main/pkg/compose/pull.go
-		$layerInProgress = ['preparing', 'waiting', 'pulling fs layer', 'download', 'extracting', 'verifying checksum'];
-		$layerFinished = ['already exists', 'pull complete'];
 		$disableProgressTracking = false;
 		$url = $this->buildApiUrl($dockerUrl, sprintf('images/create?fromImage=%s', urlencode($imageId)));
 		if ($this->useSocket) {
@@ -725,57 +731,44 @@ class DockerActions implements IDeployActions {
 		if ($this->useSocket) {
 			return '';
 		}
+		$progress = new ImagePullProgress();
 		$lastPercent = $startPercent;
-		$layers = [];
+		$lastProgressWrite = 0.0;
 		$buffer = '';
 		$responseBody = $response->getBody();
 		while (!$responseBody->eof()) {
-			$buffer .= $responseBody->read(1024);
-			try {
-				while (($newlinePos = strpos($buffer, "\n")) !== false) {
-					$line = substr($buffer, 0, $newlinePos);
-					$buffer = substr($buffer, $newlinePos + 1);
-					$jsonLine = json_decode(trim($line));
-					if ($jsonLine) {
-						if (isset($jsonLine->id) && isset($jsonLine->status)) {
-							$layerId = $jsonLine->id;
-							$status = strtolower($jsonLine->status);
-							foreach ($layerInProgress as $substring) {
-								if (str_contains($status, $substring)) {
-									$layers[$layerId] = false;
-									break;
-								}
-							}
-							foreach ($layerFinished as $substring) {
-								if (str_contains($status, $substring)) {
-									$layers[$layerId] = true;
-									break;
-								}
-							}
-						}
-					} else {
-						$this->logger->warning(
-							sprintf('Progress tracking of image pulling(%s) disabled, error: %d, data: %s', $exApp->getAppid(), json_last_error(), $line)
-						);
-						$disableProgressTracking = true;
-					}
+			$buffer .= $responseBody->read(self::PULL_READ_CHUNK_SIZE);
+			// lines are sliced by offset; the consumed part is dropped once per read, not once per line
+			$offset = 0;
+			while (($newlinePos = strpos($buffer, "\n", $offset)) !== false) {
+				$line = substr($buffer, $offset, $newlinePos - $offset);
+				$offset = $newlinePos + 1;
+				if ($disableProgressTracking || trim($line) === '') {
+					continue;
+				}
+				$jsonLine = json_decode($line, true);
+				if (is_array($jsonLine)) {
+					$progress->feed($jsonLine);
+				} else {
+					$this->logger->warning(
+						sprintf('Progress tracking of image pulling(%s) disabled, error: %d, data: %s', $exApp->getAppid(), json_last_error(), $line)
+					);
+					$disableProgressTracking = true;
 				}
-			} catch (Exception $e) {
-				$this->logger->warning(
-					sprintf('Progress tracking of image pulling(%s) disabled, exception: %s', $exApp->getAppid(), $e->getMessage()), ['exception' => $e]
-				);
-				$disableProgressTracking = true;
 			}
-			if (!$disableProgressTracking) {
-				$completedLayers = count(array_filter($layers));
-				$totalLayers = count($layers);
-				$newLastPercent = intval($totalLayers > 0 ? (int)($completedLayers / $totalLayers) * ($maxPercent - $startPercent) : 0);
-				if ($lastPercent != $newLastPercent) {
-					$this->exAppService->setAppDeployProgress($exApp, $newLastPercent);
-					$lastPercent = $newLastPercent;
+			$buffer = substr($buffer, $offset);
+			if (!$disableProgressTracking && (microtime(true) - $lastProgressWrite) >= self::PULL_PROGRESS_WRITE_INTERVAL) {
+				$newPercent = $startPercent + (int)($progress->getFraction() * ($maxPercent - $startPercent));
+				if ($newPercent > $lastPercent) {
+					$this->exAppService->setAppDeployProgress($exApp, $newPercent);
+					$lastPercent = $newPercent;
+					$lastProgressWrite = microtime(true);
 				}
 			}
 		}
+		if (!$disableProgressTracking && $lastPercent < $maxPercent) {
+			$this->exAppService->setAppDeployProgress($exApp, $maxPercent);
+		}
 		return '';
 	}
 
@@ -793,44 +786,85 @@ class DockerActions implements IDeployActions {
 	 * @throws GuzzleException
 	 */
 	public function getContainerLogs(string $dockerUrl, string $containerId, string $tail = 'all'): string {
-		$url = $this->buildApiUrl(
-			$dockerUrl, sprintf('containers/%s/logs?stdout=true&stderr=true&tail=%s', $containerId, $tail)
-		);
-		$response = $this->guzzleClient->get($url);
-		return array_reduce($this->processDockerLogs((string)$response->getBody()), function ($carry, $logEntry) {
-			return $carry . $logEntry['content'];
-		}, '');
+		$logs = $this->openContainerLogs($dockerUrl, $containerId, $tail);
+		$result = '';
+		while (($frame = $logs->readFrame()) !== null) {
+			$result .= $frame['content'];
+		}
+		return $result;
 	}
 
-	private function processDockerLogs($binaryData): array {
-		$offset = 0;
-		$length = strlen($binaryData);
-		$logs = [];
-
-		while ($offset < $length) {
-			if ($offset + 8 > $length) {
-				break; // Incomplete header, handle this case as needed
-			}
-
-			// Unpack the header
-			$header = unpack('C1type/C3skip/N1size', substr($binaryData, $offset, 8));
-			$offset += 8; // Move past the header
-
-			// Extract the log data based on the size from header
-			$logSize = $header['size'];
-			if ($offset + $logSize > $length) {
-				break; // Incomplete data, handle this case as needed
-			}
-
-			$logs[] = [
-				'stream_type' => $header['type'] === 1 ? 'stdout' : 'stderr',
-				'content' => substr($binaryData, $offset, $logSize)
-			];
-
-			$offset += $logSize; // Move to the next log entry
-		}
+	/**
+	 * Open the logs of a container as a stream of frames, so they can be passed on without holding them in memory.
+	 *
+	 * @param string $tail number of lines from the end of the logs, or 'all'
+	 * @param string $since only logs after this UNIX timestamp (with optional fractional seconds), '' for no limit
+	 * @param string $until only logs before this UNIX timestamp (with optional fractional seconds), '' for no limit
+	 * @param bool $timestamps prefix every line with its RFC3339Nano timestamp
+	 * @param bool $follow keep the stream open and return new lines as they are written; reads then time out
+	 *                     after LOGS_FOLLOW_IDLE_TIMEOUT seconds without data (see DockerLogDemuxer::setIdleCallback)
+	 *
+	 * @throws GuzzleException
+	 */
+	public function openContainerLogs(
+		string $dockerUrl, string $containerId, string $tail = 'all', string $since = '', string $until = '',
+		bool $timestamps = false, bool $follow = false,
+	): DockerLogDemuxer {
+		$query = ['stdout' => 'true', 'stderr' => 'true', 'tail' => $tail];
+		if ($since !== '') {
+			$query['since'] = $since;
+		}
+		if ($until !== '') {
+			$query['until'] = $until;
+		}
+		if ($timestamps) {
+			$query['timestamps'] = 'true';
+		}
+		if ($follow) {
+			$query['follow'] = 'true';
+		}
+		$url = $this->buildApiUrl($dockerUrl, sprintf('containers/%s/logs?%s', $containerId, http_build_query($query)));
+		if ($follow && $this->useSocket) {
+			return new DockerLogDemuxer($this->openSocketStream($url, self::LOGS_FOLLOW_IDLE_TIMEOUT));
+		}
+		// streaming over the unix socket is not supported (see pullImageInternal), the body is then buffered by Guzzle
+		$options = ['stream' => !$this->useSocket];
+		if ($follow) {
+			$options['read_timeout'] = self::LOGS_FOLLOW_IDLE_TIMEOUT;
+		}
+		$response = $this->guzzleClient->get($url, $options);
+		return new DockerLogDemuxer($response->getBody());
+	}
 
-		return $logs;
+	/**
+	 * GET request over the daemon unix socket whose body is read lazily from the socket.
+	 *
+	 * Guzzle streams responses only through PHP's http stream wrapper, which cannot use a unix socket,
+	 * so the request is written directly. HTTP/1.0 is used to get a body without chunked transfer encoding.
+	 *
+	 * @throws GuzzleException
+	 */
+	private function openSocketStream(string $url, int $readTimeout): StreamInterface {
+		$request = new Request('GET', $url);
+		$socket = @stream_socket_client('unix://' . $this->socketAddress, $errorCode, $errorMessage, 10);
+		if ($socket === false) {
+			throw new ConnectException(sprintf('Failed to connect to %s: %s', $this->socketAddress, $errorMessage), $request);
+		}
+		fwrite($socket, sprintf("GET %s HTTP/1.0\r\nHost: localhost\r\n\r\n", $request->getRequestTarget()));
+		$statusLine = fgets($socket);
+		if ($statusLine === false || preg_match('#^HTTP/\d(?:\.\d)? (\d{3})#', $statusLine, $matches) !== 1) {
+			fclose($socket);
+			throw new ConnectException(sprintf('Invalid response from %s', $this->socketAddress), $request);
+		}
+		while (($line = fgets($socket)) !== false && rtrim($line, "\r\n") !== '') {
+			// response headers are not needed, the log stream format is detected from its content
+		}
+		$body = new Stream($socket);
+		if ((int)$matches[1] >= 400) {
+			throw RequestException::create($request, new Response((int)$matches[1], [], $body));
+		}
+		stream_set_timeout($socket, $readTimeout);
+		return $body;
 	}
 
 	public function createVolume(string $dockerUrl, string $volume): array {
@@ -979,7 +1013,7 @@ class DockerActions implements IDeployActions {
 		}
 	}
 
-	public function waitExAppStart(string $dockerUrl, string $exAppName): bool {
+	public function waitExAppStart(string $dockerUrl, string $exAppName, int $timeout = 150): bool {
 		$instanceId = '';  // $this->config->getSystemValue('instanceid', '');
 		try {
 			$response = $this->guzzleClient->post(
@@ -989,7 +1023,7 @@ class DockerActions implements IDeployActions {
 						'name' => $exAppName,
 						'instance_id' => $instanceId,
 					],
-					'timeout' => 150,
+					'timeout' => $timeout,
 				]
 			);
 
@@ -0,0 +1,114 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\DeployActions;
+
+use Psr\Http\Message\StreamInterface;
+
+/**
+ * Reads the frames of a Docker container logs stream one by one, without buffering the whole log.
+ *
+ * Logs of containers without a TTY are multiplexed: every frame has an 8-byte header
+ * (stream type, 3 zero bytes, big-endian payload size). Logs of TTY containers are a raw stream;
+ * that is detected from the first header and such logs are returned as stdout chunks.
+ * Frames larger than MAX_FRAME_SIZE are returned in several parts, so memory use stays bounded.
+ *
+ * docs: https://docs.docker.com/reference/api/engine/version/v1.44/#tag/Container/operation/ContainerAttach
+ */
+class DockerLogDemuxer {
+	public const STREAM_STDOUT = 'stdout';
+	public const STREAM_STDERR = 'stderr';
+	private const HEADER_SIZE = 8;
+	private const RAW_CHUNK_SIZE = 8192;
+	public const MAX_FRAME_SIZE = 1048576;
+
+	private ?bool $multiplexed = null;
+	/** data read while detecting the format, returned before reading further from the stream */
+	private string $pending = '';
+	/** stream type and unread size of a frame returned in parts */
+	private string $partialStream = self::STREAM_STDOUT;
+	private int $partialRemaining = 0;
+	private ?\Closure $idleCallback = null;
+	private bool $stopped = false;
+
+	public function __construct(
+		private readonly StreamInterface $stream,
+	) {
+	}
+
+	/**
+	 * Called whenever a read returns no data before the end of the stream (a read timeout of a followed log).
+	 * Reading stops, as at the end of the stream, when the callback returns false.
+	 *
+	 * @param \Closure(): bool $callback
+	 */
+	public function setIdleCallback(\Closure $callback): void {
+		$this->idleCallback = $callback;
+	}
+
+	/**
+	 * Next frame of the log, null at the end of the stream.
+	 *
+	 * @return array{stream: string, content: string}|null
+	 */
+	public function readFrame(): ?array {
+		if ($this->multiplexed === null) {
+			$this->pending = $this->readExactly(self::HEADER_SIZE);
+			$this->multiplexed = strlen($this->pending) === self::HEADER_SIZE
+				&& in_array(ord($this->pending[0]), [0, 1, 2], true)
+				&& substr($this->pending, 1, 3) === "\0\0\0";
+		}
+		if (!$this->multiplexed) {
+			$content = $this->pending !== '' ? $this->pending : $this->readExactly(self::RAW_CHUNK_SIZE, false);
+			$this->pending = '';
+			return $content === '' ? null : ['stream' => self::STREAM_STDOUT, 'content' => $content];
+		}
+
+		if ($this->partialRemaining === 0) {
+			$header = $this->pending !== '' ? $this->pending : $this->readExactly(self::HEADER_SIZE);
+			$this->pending = '';
+			if (strlen($header) < self::HEADER_SIZE) {
+				return null; // end of the stream (or a truncated header)
+			}
+			['type' => $type, 'size' => $this->partialRemaining] = unpack('Ctype/x3/Nsize', $header);
+			$this->partialStream = $type === 2 ? self::STREAM_STDERR : self::STREAM_STDOUT;
+			if ($this->partialRemaining === 0) {
+				return ['stream' => $this->partialStream, 'content' => ''];
+			}
+		}
+		$size = min($this->partialRemaining, self::MAX_FRAME_SIZE);
+		$content = $this->readExactly($size);
+		if (strlen($content) < $size) {
+			return null; // truncated frame
+		}
+		$this->partialRemaining -= $size;
+		return ['stream' => $this->partialStream, 'content' => $content];
+	}
+
+	/**
+	 * Read `$length` bytes, fewer only at the end of the stream (or, unless `$exact`, once any data was read).
+	 */
+	private function readExactly(int $length, bool $exact = true): string {
+		$data = '';
+		while (strlen($data) < $length && !$this->stopped && !$this->stream->eof()) {
+			$chunk = $this->stream->read($length - strlen($data));
+			if ($chunk === '') {
+				if ($this->idleCallback !== null && ($this->idleCallback)() === false) {
+					$this->stopped = true;
+				}
+				continue;
+			}
+			$data .= $chunk;
+			if (!$exact) {
+				break;
+			}
+		}
+		return $data;
+	}
+}
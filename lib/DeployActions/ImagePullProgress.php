@@ -0,0 +1,88 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\DeployActions;
+
+/**
+ * Progress of a Docker image pull, computed from the `/images/create` JSON message stream.
+ *
+ * Every layer is weighted by its size (`progressDetail.total` of its download), so a multi-GB
+ * layer moves the progress accordingly instead of counting as much as a few-KB one. Layers whose
+ * size is not known yet are weighted with the average size of the known ones. Downloading a layer
+ * accounts for DOWNLOAD_SHARE of its weight, extracting it for the rest.
+ *
+ * docs: https://github.com/docker/compose/blob/main/pkg/compose/pull.go
+ */
+class ImagePullProgress {
+	private const DOWNLOAD_SHARE = 0.8;
+
+	/** @var array<string, array{total: int, downloaded: int, extracted: int, done: bool}> */
+	private array $layers = [];
+
+	/**
+	 * Account for one decoded message of the pull stream.
+	 */
+	public function feed(array $message): void {
+		if (!isset($message['id'], $message['status']) || !is_string($message['id'])) {
+			return;
+		}
+		$status = strtolower((string)$message['status']);
+		$layer = $this->layers[$message['id']] ?? ['total' => 0, 'downloaded' => 0, 'extracted' => 0, 'done' => false];
+		$current = (int)($message['progressDetail']['current'] ?? 0);
+		$total = (int)($message['progressDetail']['total'] ?? 0);
+
+		if (str_starts_with($status, 'downloading')) {
+			if ($total > 0) {
+				$layer['total'] = $total;
+			}
+			$layer['downloaded'] = $current;
+		} elseif (str_starts_with($status, 'extracting')) {
+			if ($layer['total'] === 0 && $total > 0) {
+				$layer['total'] = $total;
+			}
+			$layer['downloaded'] = $layer['total'];
+			$layer['extracted'] = $current;
+		} elseif (str_starts_with($status, 'download complete') || str_starts_with($status, 'verifying checksum')) {
+			$layer['downloaded'] = $layer['total'];
+		} elseif (str_starts_with($status, 'pull complete') || str_starts_with($status, 'already exists')) {
+			$layer['done'] = true;
+		} elseif (!str_starts_with($status, 'pulling fs layer') && !str_starts_with($status, 'waiting')
+			&& !str_starts_with($status, 'preparing')) {
+			return; // image-level messages ("Pulling from ...", "Digest: ...") share the `id` field
+		}
+		$this->layers[$message['id']] = $layer;
+	}
+
+	/**
+	 * Completed share of the pull, between 0 and 1.
+	 */
+	public function getFraction(): float {
+		if (empty($this->layers)) {
+			return 0.0;
+		}
+		$knownTotals = array_filter(array_column($this->layers, 'total'));
+		$defaultWeight = empty($knownTotals) ? 1 : array_sum($knownTotals) / count($knownTotals);
+
+		$weightSum = 0.0;
+		$completed = 0.0;
+		foreach ($this->layers as $layer) {
+			$weight = $layer['total'] > 0 ? $layer['total'] : $defaultWeight;
+			$weightSum += $weight;
+			if ($layer['done']) {
+				$completed += $weight;
+			} elseif ($layer['total'] > 0) {
+				$completed += $weight * (
+					self::DOWNLOAD_SHARE * min(1, $layer['downloaded'] / $layer['total'])
+					+ (1 - self::DOWNLOAD_SHARE) * min(1, $layer['extracted'] / $layer['total'])
+				);
+			}
+		}
+		return $completed / $weightSum;
+	}
+}
@@ -12,6 +12,8 @@ namespace OCA\AppAPI\DeployActions;
 use Exception;
 use GuzzleHttp\Client;
 use GuzzleHttp\Exception\GuzzleException;
+use GuzzleHttp\Promise\PromiseInterface;
+use GuzzleHttp\Promise\Utils;
 use OCA\AppAPI\AppInfo\Application;
 use OCA\AppAPI\Db\DaemonConfig;
 use OCA\AppAPI\Db\ExApp;
@@ -23,6 +25,7 @@ use OCP\ICertificateManager;
 use OCP\IConfig;
 use OCP\IURLGenerator;
 use OCP\Security\ICrypto;
+use Psr\Http\Message\ResponseInterface;
 use Psr\Log\LoggerInterface;
 
 /**
@@ -36,6 +39,8 @@ use Psr\Log\LoggerInterface;
 class KubernetesActions implements IDeployActions {
 	public const DEPLOY_ID = 'kubernetes-install';
 	public const APP_API_HAPROXY_USER = 'app_api_haproxy_user';
+	/** seconds HaRP may block in `wait_for_start` by default */
+	public const WAIT_FOR_START_TIMEOUT = 3700;
 
 	private Client $guzzleClient;
 
@@ -171,38 +176,42 @@ class KubernetesActions implements IDeployActions {
 
 		$this->exAppService->setAppDeployProgress($exApp, 20);
 
-		$deployedRoles = [];
-		$roleIndex = 0;
+		// All roles are created, started and waited on concurrently: the deploy takes as long as the
+		// slowest role instead of the sum of all of them.
+		$roleSuffixes = array_column($roles, 'name');
+		$this->logger->info(sprintf('Creating K8s deployments for ExApp "%s" roles: %s.', $exAppName, implode(', ', $roleSuffixes)));
+		$createPromises = [];
 		foreach ($roles as $role) {
-			$roleSuffix = $role['name'];
-			$roleEnvVar = $role['env'] ?? '';
-
 			$roleParams = $params;
-			if ($roleEnvVar !== '') {
-				$roleParams['container_params']['env'][] = $roleEnvVar;
-			}
-
-			$this->logger->info(sprintf('Creating K8s deployment for ExApp "%s" role "%s" (%d/%d).', $exAppName, $roleSuffix, $roleIndex + 1, $totalRoles));
-
-			$error = $this->createExApp($harpUrl, $exAppName, $instanceId, $roleParams, $roleSuffix);
-			if ($error) {
-				$this->rollbackDeployedRoles($harpUrl, $exAppName, $deployedRoles);
-				return $error;
-			}
-			$deployedRoles[] = $roleSuffix;
-
-			$error = $this->startExApp($harpUrl, $exAppName, roleSuffix: $roleSuffix);
-			if ($error) {
-				$this->rollbackDeployedRoles($harpUrl, $exAppName, $deployedRoles);
-				return $error;
+			if (($role['env'] ?? '') !== '') {
+				$roleParams['container_params']['env'][] = $role['env'];
 			}
+			$createPromises[$role['name']] = $this->createExAppAsync($harpUrl, $exAppName, $instanceId, $roleParams, $role['name']);
+		}
+		$createErrors = Utils::all($createPromises)->wait();
+		$deployedRoles = array_keys(array_filter($createErrors, static fn (string $error): bool => $error === ''));
+		$error = $this->firstError($createErrors);
+		if ($error) {
+			$this->rollbackDeployedRoles($harpUrl, $exAppName, $deployedRoles);
+			return $error;
+		}
+		$this->exAppService->setAppDeployProgress($exApp, 40);
 
-			$this->installCertificates($harpUrl, $exAppName, $instanceId, $roleSuffix);
-
-			$roleIndex++;
-			$currentProgress = 20 + (int)(($roleIndex * 60) / $totalRoles);
-			$this->exAppService->setAppDeployProgress($exApp, min($currentProgress, 80));
+		$startPromises = [];
+		foreach ($roleSuffixes as $roleSuffix) {
+			$startPromises[$roleSuffix] = $this->startExAppAsync($harpUrl, $exAppName, roleSuffix: $roleSuffix);
+		}
+		$error = $this->firstError(Utils::all($startPromises)->wait());
+		if ($error) {
+			$this->rollbackDeployedRoles($harpUrl, $exAppName, $deployedRoles);
+			return $error;
 		}
+		$this->exAppService->setAppDeployProgress($exApp, 60);
+
+		Utils::all(array_map(
+			fn (string $roleSuffix) => $this->installCertificatesAsync($harpUrl, $exAppName, $instanceId, $roleSuffix),
+			$roleSuffixes,
+		))->wait();
 
 		$this->exAppService->setAppDeployProgress($exApp, 80);
 
@@ -211,10 +220,23 @@ class KubernetesActions implements IDeployActions {
 		$deployOptions['k8s_service_roles'] = $roles;
 		$this->exAppDeployOptionsService->addExAppDeployOptions($exApp->getAppid(), $deployOptions);
 
-		foreach ($roles as $role) {
-			$roleSuffix = $role['name'];
-			if (!$this->waitExAppStart($harpUrl, $exAppName, $roleSuffix)) {
-				$this->rollbackDeployedRoles($harpUrl, $exAppName, array_column($roles, 'name'));
+		$readyRoles = 0;
+		$waitPromises = [];
+		foreach ($roleSuffixes as $roleSuffix) {
+			$waitPromises[$roleSuffix] = $this->waitExAppStartAsync($harpUrl, $exAppName, $roleSuffix)->then(
+				function (bool $started) use ($exApp, &$readyRoles, $totalRoles): bool {
+					if ($started) {
+						$readyRoles++;
+						// combined progress of all roles; 100 is only reported once every role is ready
+						$this->exAppService->setAppDeployProgress($exApp, min(80 + (int)(($readyRoles * 20) / $totalRoles), 99));
+					}
+					return $started;
+				}
+			);
+		}
+		foreach (Utils::all($waitPromises)->wait() as $roleSuffix => $started) {
+			if (!$started) {
+				$this->rollbackDeployedRoles($harpUrl, $exAppName, $roleSuffixes);
 				return sprintf('Kubernetes Pod startup failed for role "%s"', $roleSuffix);
 			}
 		}
@@ -223,6 +245,18 @@ class KubernetesActions implements IDeployActions {
 		return '';
 	}
 
+	/**
+	 * @param array<string, string> $errors error message per role, empty on success
+	 */
+	private function firstError(array $errors): string {
+		foreach ($errors as $error) {
+			if ($error !== '') {
+				return $error;
+			}
+		}
+		return '';
+	}
+
 	private function rollbackDeployedRoles(string $harpUrl, string $exAppName, array $roleSuffixes): void {
 		foreach ($roleSuffixes as $roleSuffix) {
 			$error = $this->removeExApp($harpUrl, $exAppName, removeData: false, roleSuffix: $roleSuffix);
@@ -343,6 +377,13 @@ class KubernetesActions implements IDeployActions {
 	}
 
 	private function createExApp(string $harpUrl, string $exAppName, string $instanceId, array $params, string $roleSuffix = ''): string {
+		return $this->createExAppAsync($harpUrl, $exAppName, $instanceId, $params, $roleSuffix)->wait();
+	}
+
+	/**
+	 * @return PromiseInterface resolves to an error message, empty on success
+	 */
+	private function createExAppAsync(string $harpUrl, string $exAppName, string $instanceId, array $params, string $roleSuffix = ''): PromiseInterface {
 		$computeDevice = 'cpu';
 		if (isset($params['container_params']['computeDevice']['id'])) {
 			$computeDevice = $params['container_params']['computeDevice']['id'];
@@ -362,69 +403,80 @@ class KubernetesActions implements IDeployActions {
 		$logPayload['environment_variables'] = '[REDACTED]';
 		$this->logger->debug(sprintf('Payload for /k8s/exapp/create for %s: %s', $logName, json_encode($logPayload)));
 
-		try {
-			$response = $this->guzzleClient->post(
-				sprintf('%s/exapp/create', $harpUrl),
-				['json' => $createPayload]
-			);
-
-			if ($response->getStatusCode() !== 201) {
-				$errorBody = (string)$response->getBody();
-				$this->logger->error(sprintf('Failed to create K8s ExApp %s. Status: %d, Body: %s', $logName, $response->getStatusCode(), $errorBody));
-				return sprintf('Failed to create K8s ExApp (status %d). Check HaRP logs. Details: %s', $response->getStatusCode(), $errorBody);
-			}
+		return $this->guzzleClient->postAsync(
+			sprintf('%s/exapp/create', $harpUrl),
+			['json' => $createPayload]
+		)->then(
+			function (ResponseInterface $response) use ($logName): string {
+				if ($response->getStatusCode() !== 201) {
+					$errorBody = (string)$response->getBody();
+					$this->logger->error(sprintf('Failed to create K8s ExApp %s. Status: %d, Body: %s', $logName, $response->getStatusCode(), $errorBody));
+					return sprintf('Failed to create K8s ExApp (status %d). Check HaRP logs. Details: %s', $response->getStatusCode(), $errorBody);
+				}
 
-			$responseData = json_decode((string)$response->getBody(), true);
-			if ($responseData === null || !isset($responseData['name'])) {
-				$this->logger->error(sprintf('Invalid JSON response from HaRP /k8s/exapp/create for %s: %s', $logName, $response->getBody()));
-				return 'Invalid response from HaRP agent after K8s deployment creation.';
-			}
+				$responseData = json_decode((string)$response->getBody(), true);
+				if ($responseData === null || !isset($responseData['name'])) {
+					$this->logger->error(sprintf('Invalid JSON response from HaRP /k8s/exapp/create for %s: %s', $logName, $response->getBody()));
+					return 'Invalid response from HaRP agent after K8s deployment creation.';
+				}
 
-			$this->logger->info(sprintf('K8s Deployment %s created successfully for ExApp %s.', $responseData['name'], $logName));
-			return '';
-		} catch (GuzzleException $e) {
-			$this->logger->error(sprintf('GuzzleException during HaRP /k8s/exapp/create for %s: %s', $logName, $e->getMessage()), ['exception' => $e]);
-			return 'Failed to communicate with HaRP agent for K8s deployment creation: ' . $e->getMessage();
-		} catch (Exception $e) {
-			$this->logger->error(sprintf('Exception during HaRP /k8s/exapp/create for %s: %s', $logName, $e->getMessage()), ['exception' => $e]);
-			return 'An unexpected error occurred while creating K8s deployment: ' . $e->getMessage();
-		}
+				$this->logger->info(sprintf('K8s Deployment %s created successfully for ExApp %s.', $responseData['name'], $logName));
+				return '';
+			},
+			function (\Throwable $e) use ($logName): string {
+				if ($e instanceof GuzzleException) {
+					$this->logger->error(sprintf('GuzzleException during HaRP /k8s/exapp/create for %s: %s', $logName, $e->getMessage()), ['exception' => $e]);
+					return 'Failed to communicate with HaRP agent for K8s deployment creation: ' . $e->getMessage();
+				}
+				$this->logger->error(sprintf('Exception during HaRP /k8s/exapp/create for %s: %s', $logName, $e->getMessage()), ['exception' => $e]);
+				return 'An unexpected error occurred while creating K8s deployment: ' . $e->getMessage();
+			},
+		);
 	}
 
 	public function startExApp(string $harpUrl, string $exAppName, bool $ignoreIfAlready = false, string $roleSuffix = ''): string {
-		try {
-			$response = $this->guzzleClient->post(
-				sprintf('%s/exapp/start', $harpUrl),
-				['json' => $this->buildNamePayload($exAppName, '', $roleSuffix)]
-			);
+		return $this->startExAppAsync($harpUrl, $exAppName, $ignoreIfAlready, $roleSuffix)->wait();
+	}
 
-			$statusCode = $response->getStatusCode();
-			$logName = $this->logName($exAppName, $roleSuffix);
-			if ($statusCode === 204) {
-				$this->logger->info(sprintf('K8s ExApp "%s" successfully started (scaled to 1 replica).', $logName));
-				return '';
-			}
-			if ($statusCode === 200) {
-				if ($ignoreIfAlready) {
-					$this->logger->info(sprintf('K8s ExApp "%s" was already running.', $logName));
+	/**
+	 * @return PromiseInterface resolves to an error message, empty on success
+	 */
+	private function startExAppAsync(string $harpUrl, string $exAppName, bool $ignoreIfAlready = false, string $roleSuffix = ''): PromiseInterface {
+		$logName = $this->logName($exAppName, $roleSuffix);
+		return $this->guzzleClient->postAsync(
+			sprintf('%s/exapp/start', $harpUrl),
+			['json' => $this->buildNamePayload($exAppName, '', $roleSuffix)]
+		)->then(
+			function (ResponseInterface $response) use ($logName, $ignoreIfAlready): string {
+				$statusCode = $response->getStatusCode();
+				if ($statusCode === 204) {
+					$this->logger->info(sprintf('K8s ExApp "%s" successfully started (scaled to 1 replica).', $logName));
 					return '';
-				} else {
-					$errorMsg = sprintf('K8s ExApp "%s" was already running.', $logName);
-					$this->logger->warning($errorMsg);
-					return $errorMsg;
 				}
-			}
+				if ($statusCode === 200) {
+					if ($ignoreIfAlready) {
+						$this->logger->info(sprintf('K8s ExApp "%s" was already running.', $logName));
+						return '';
+					} else {
+						$errorMsg = sprintf('K8s ExApp "%s" was already running.', $logName);
+						$this->logger->warning($errorMsg);
+						return $errorMsg;
+					}
+				}
 
-			$errorBody = (string)$response->getBody();
-			$this->logger->error(sprintf('Failed to start K8s ExApp "%s". Status: %d, Body: %s', $logName, $statusCode, $errorBody));
-			return sprintf('Failed to start K8s ExApp "%s" (Status: %d). Details: %s', $logName, $statusCode, $errorBody);
-		} catch (GuzzleException $e) {
-			$this->logger->error(sprintf('GuzzleException while starting K8s ExApp "%s": %s', $exAppName, $e->getMessage()), ['exception' => $e]);
-			return sprintf('Failed to communicate with HaRP to start K8s ExApp "%s": %s', $exAppName, $e->getMessage());
-		} catch (Exception $e) {
-			$this->logger->error(sprintf('Exception while starting K8s ExApp "%s": %s', $exAppName, $e->getMessage()), ['exception' => $e]);
-			return sprintf('Unexpected error while starting K8s ExApp "%s": %s', $exAppName, $e->getMessage());
-		}
+				$errorBody = (string)$response->getBody();
+				$this->logger->error(sprintf('Failed to start K8s ExApp "%s". Status: %d, Body: %s', $logName, $statusCode, $errorBody));
+				return sprintf('Failed to start K8s ExApp "%s" (Status: %d). Details: %s', $logName, $statusCode, $errorBody);
+			},
+			function (\Throwable $e) use ($exAppName): string {
+				if ($e instanceof GuzzleException) {
+					$this->logger->error(sprintf('GuzzleException while starting K8s ExApp "%s": %s', $exAppName, $e->getMessage()), ['exception' => $e]);
+					return sprintf('Failed to communicate with HaRP to start K8s ExApp "%s": %s', $exAppName, $e->getMessage());
+				}
+				$this->logger->error(sprintf('Exception while starting K8s ExApp "%s": %s', $exAppName, $e->getMessage()), ['exception' => $e]);
+				return sprintf('Unexpected error while starting K8s ExApp "%s": %s', $exAppName, $e->getMessage());
+			},
+		);
 	}
 
 	public function stopExApp(string $harpUrl, string $exAppName, bool $ignoreIfAlready = false, string $roleSuffix = ''): string {
@@ -464,89 +516,114 @@ class KubernetesActions implements IDeployActions {
 	}
 
 	private function installCertificates(string $harpUrl, string $exAppName, string $instanceId, string $roleSuffix = ''): void {
-		try {
-			$logName = $this->logName($exAppName, $roleSuffix);
-			$this->logger->info(sprintf('Starting certificate installation process for K8s ExApp "%s".', $logName));
-
-			$payload = $this->buildNamePayload($exAppName, $instanceId, $roleSuffix);
-			$payload['system_certs_bundle'] = null;
-			$payload['install_frp_certs'] = false;
-
-			$bundlePath = $this->certificateManager->getAbsoluteBundlePath();
-			if (file_exists($bundlePath) && is_readable($bundlePath)) {
-				$payload['system_certs_bundle'] = file_get_contents($bundlePath);
-				if ($payload['system_certs_bundle'] === false) {
-					$this->logger->warning(sprintf('Failed to read system CA bundle from "%s" for K8s ExApp "%s".', $bundlePath, $logName));
-					$payload['system_certs_bundle'] = null;
-				}
-			} else {
-				$this->logger->warning(sprintf('System CA bundle not found or not readable at "%s" for K8s ExApp "%s".', $bundlePath, $logName));
-			}
+		$this->installCertificatesAsync($harpUrl, $exAppName, $instanceId, $roleSuffix)->wait();
+	}
 
-			$response = $this->guzzleClient->post(
-				sprintf('%s/exapp/install_certificates', $harpUrl),
-				[
-					'json' => $payload,
-					'timeout' => 180,
-				]
-			);
+	/**
+	 * Failures are only logged: the ExApp can still start without the extra certificates.
+	 */
+	private function installCertificatesAsync(string $harpUrl, string $exAppName, string $instanceId, string $roleSuffix = ''): PromiseInterface {
+		$logName = $this->logName($exAppName, $roleSuffix);
+		$this->logger->info(sprintf('Starting certificate installation process for K8s ExApp "%s".', $logName));
 
-			$statusCode = $response->getStatusCode();
-			if ($statusCode === 204) {
-				$this->logger->info(sprintf('Certificate installation completed for K8s ExApp "%s".', $logName));
-			} else {
-				$errorBody = (string)$response->getBody();
-				$this->logger->warning(sprintf('Certificate installation for K8s ExApp "%s" returned status %d: %s', $logName, $statusCode, $errorBody));
+		$payload = $this->buildNamePayload($exAppName, $instanceId, $roleSuffix);
+		$payload['system_certs_bundle'] = null;
+		$payload['install_frp_certs'] = false;
+
+		$bundlePath = $this->certificateManager->getAbsoluteBundlePath();
+		if (file_exists($bundlePath) && is_readable($bundlePath)) {
+			$payload['system_certs_bundle'] = file_get_contents($bundlePath);
+			if ($payload['system_certs_bundle'] === false) {
+				$this->logger->warning(sprintf('Failed to read system CA bundle from "%s" for K8s ExApp "%s".', $bundlePath, $logName));
+				$payload['system_certs_bundle'] = null;
 			}
-		} catch (GuzzleException $e) {
-			$this->logger->warning(sprintf('GuzzleException during certificate installation for K8s ExApp "%s": %s', $exAppName, $e->getMessage()), ['exception' => $e]);
-		} catch (Exception $e) {
-			$this->logger->warning(sprintf('Exception during certificate installation for K8s ExApp "%s": %s', $exAppName, $e->getMessage()), ['exception' => $e]);
+		} else {
+			$this->logger->warning(sprintf('System CA bundle not found or not readable at "%s" for K8s ExApp "%s".', $bundlePath, $logName));
 		}
-	}
-
-	public function waitExAppStart(string $harpUrl, string $exAppName, string $roleSuffix = ''): bool {
-		try {
-			$response = $this->guzzleClient->post(
-				sprintf('%s/exapp/wait_for_start', $harpUrl),
-				[
-					'json' => $this->buildNamePayload($exAppName, '', $roleSuffix),
-					'timeout' => 3700,
-				]
-			);
 
-			$logName = $this->logName($exAppName, $roleSuffix);
-			$statusCode = $response->getStatusCode();
-			if ($statusCode === 200) {
-				$responseData = json_decode((string)$response->getBody(), true);
-				if ($responseData === null) {
-					$this->logger->error(sprintf('Invalid JSON response from HaRP /k8s/exapp/wait_for_start for ExApp "%s".', $logName));
-					return false;
+		return $this->guzzleClient->postAsync(
+			sprintf('%s/exapp/install_certificates', $harpUrl),
+			[
+				'json' => $payload,
+				'timeout' => 180,
+			]
+		)->then(
+			function (ResponseInterface $response) use ($logName): void {
+				$statusCode = $response->getStatusCode();
+				if ($statusCode === 204) {
+					$this->logger->info(sprintf('Certificate installation completed for K8s ExApp "%s".', $logName));
+				} else {
+					$errorBody = (string)$response->getBody();
+					$this->logger->warning(sprintf('Certificate installation for K8s ExApp "%s" returned status %d: %s', $logName, $statusCode, $errorBody));
 				}
+			},
+			function (\Throwable $e) use ($exAppName): void {
+				$this->logger->warning(sprintf('%s during certificate installation for K8s ExApp "%s": %s', $e instanceof GuzzleException ? 'GuzzleException' : 'Exception', $exAppName, $e->getMessage()), ['exception' => $e]);
+			},
+		);
+	}
 
-				$started = $responseData['started'] ?? false;
-				$status = $responseData['status'] ?? 'unknown';
-				$reason = $responseData['reason'] ?? '';
+	public function waitExAppStart(string $harpUrl, string $exAppName, string $roleSuffix = '', int $timeout = self::WAIT_FOR_START_TIMEOUT): bool {
+		return $this->waitExAppStartAsync($harpUrl, $exAppName, $roleSuffix, $timeout)->wait();
+	}
+
+	/**
+	 * Wait for the Pods of all roles at once, so that this takes as long as the slowest role.
+	 *
+	 * @param list<string> $roleSuffixes
+	 * @return bool true if every role became ready within `$timeout` seconds
+	 */
+	public function waitExAppRolesStart(string $harpUrl, string $exAppName, array $roleSuffixes, int $timeout = self::WAIT_FOR_START_TIMEOUT): bool {
+		$started = Utils::all(array_map(
+			fn (string $roleSuffix) => $this->waitExAppStartAsync($harpUrl, $exAppName, $roleSuffix, $timeout),
+			$roleSuffixes,
+		))->wait();
+		return !in_array(false, $started, true);
+	}
 
-				if ($started === true) {
-					$this->logger->info(sprintf('K8s Pod for ExApp "%s" is ready. Status: %s', $logName, $status));
-					return true;
+	/**
+	 * @return PromiseInterface resolves to true once the Pod is ready, false if it did not become ready
+	 */
+	private function waitExAppStartAsync(string $harpUrl, string $exAppName, string $roleSuffix = '', int $timeout = self::WAIT_FOR_START_TIMEOUT): PromiseInterface {
+		$logName = $this->logName($exAppName, $roleSuffix);
+		return $this->guzzleClient->postAsync(
+			sprintf('%s/exapp/wait_for_start', $harpUrl),
+			[
+				'json' => $this->buildNamePayload($exAppName, '', $roleSuffix),
+				'timeout' => $timeout,
+			]
+		)->then(
+			function (ResponseInterface $response) use ($logName): bool {
+				$statusCode = $response->getStatusCode();
+				if ($statusCode === 200) {
+					$responseData = json_decode((string)$response->getBody(), true);
+					if ($responseData === null) {
+						$this->logger->error(sprintf('Invalid JSON response from HaRP /k8s/exapp/wait_for_start for ExApp "%s".', $logName));
+						return false;
+					}
+
+					$started = $responseData['started'] ?? false;
+					$status = $responseData['status'] ?? 'unknown';
+					$reason = $responseData['reason'] ?? '';
+
+					if ($started === true) {
+						$this->logger->info(sprintf('K8s Pod for ExApp "%s" is ready. Status: %s', $logName, $status));
+						return true;
+					} else {
+						$this->logger->warning(sprintf('K8s Pod for ExApp "%s" did not become ready. Status: %s, Reason: %s', $logName, $status, $reason));
+						return false;
+					}
 				} else {
-					$this->logger->warning(sprintf('K8s Pod for ExApp "%s" did not become ready. Status: %s, Reason: %s', $logName, $status, $reason));
+					$errorBody = (string)$response->getBody();
+					$this->logger->error(sprintf('Failed to wait for K8s ExApp "%s" start. Status: %d, Body: %s', $logName, $statusCode, $errorBody));
 					return false;
 				}
-			} else {
-				$errorBody = (string)$response->getBody();
-				$this->logger->error(sprintf('Failed to wait for K8s ExApp "%s" start. Status: %d, Body: %s', $logName, $statusCode, $errorBody));
+			},
+			function (\Throwable $e) use ($exAppName): bool {
+				$this->logger->error(sprintf('%s while waiting for K8s ExApp "%s" start: %s', $e instanceof GuzzleException ? 'GuzzleException' : 'Exception', $exAppName, $e->getMessage()), ['exception' => $e]);
 				return false;
-			}
-		} catch (GuzzleException $e) {
-			$this->logger->error(sprintf('GuzzleException while waiting for K8s ExApp "%s" start: %s', $exAppName, $e->getMessage()), ['exception' => $e]);
-			return false;
-		} catch (Exception $e) {
-			$this->logger->error(sprintf('Exception while waiting for K8s ExApp "%s" start: %s', $exAppName, $e->getMessage()), ['exception' => $e]);
-			return false;
-		}
+			},
+		);
 	}
 
 	public function removeExApp(string $harpUrl, string $exAppName, bool $removeData = false, string $roleSuffix = ''): string {
@@ -9,7 +9,6 @@ declare(strict_types=1);
 
 namespace OCA\AppAPI\Listener;
 
-use JsonException;
 use OCA\AppAPI\Service\AppAPIService;
 use OCA\AppAPI\Service\ExAppService;
 use OCA\AppAPI\Service\ProvidersAI\TaskProcessingService;
@@ -40,29 +39,15 @@ readonly class GetTaskProcessingProvidersListener implements IEventListener {
 		$this->taskProcessingService->setAppAPIService($this->appAPIService);
 		$exAppsProviders = $this->taskProcessingService->getRegisteredTaskProcessingProviders();
 
+		// providers decode their definitions and build their shapes only when the TaskProcessing manager asks for them
 		foreach ($exAppsProviders as $exAppProvider) {
 			try {
-				// Decode provider data
-				$providerData = json_decode($exAppProvider->getProvider(), true, 512, JSON_THROW_ON_ERROR);
-				$providerInstance = $this->taskProcessingService->getAnonymousExAppProvider($providerData, $exAppProvider->getAppId());
-				$event->addProvider($providerInstance);
+				$event->addProvider($this->taskProcessingService->getAnonymousExAppProvider($exAppProvider));
 
-				// Decode and add custom task type if it exists
 				$customTaskTypeDataJson = $exAppProvider->getCustomTaskType();
 				if ($customTaskTypeDataJson !== null && $customTaskTypeDataJson !== '' && $customTaskTypeDataJson !== 'null') {
-					$customTaskTypeData = json_decode($customTaskTypeDataJson, true, 512, JSON_THROW_ON_ERROR);
-					$taskTypeInstance = $this->taskProcessingService->getAnonymousTaskType($customTaskTypeData);
-					$event->addTaskType($taskTypeInstance);
+					$event->addTaskType($this->taskProcessingService->getAnonymousTaskType($exAppProvider));
 				}
-			} catch (JsonException $e) {
-				$this->logger->error(
-					'Failed to decode or process ExApp TaskProcessing provider/task type during event handling',
-					[
-						'exAppId' => $exAppProvider->getAppId(),
-						'providerName' => $exAppProvider->getName(),
-						'exception' => $e->getMessage(),
-					]
-				);
 			} catch (\Throwable $e) {
 				$this->logger->error(
 					'Unexpected error processing ExApp TaskProcessing provider/task type during event handling',
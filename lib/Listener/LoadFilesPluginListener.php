@@ -10,12 +10,14 @@ declare(strict_types=1);
 namespace OCA\AppAPI\Listener;
 
 use OCA\AppAPI\AppInfo\Application;
-use OCA\AppAPI\Service\UI\FilesActionsMenuService;
+use OCA\AppAPI\Service\UI\UiManifestService;
 use OCA\Files\Event\LoadAdditionalScriptsEvent;
 use OCP\AppFramework\Services\IInitialState;
 use OCP\EventDispatcher\Event;
 use OCP\EventDispatcher\IEventListener;
 use OCP\IConfig;
+use OCP\IGroupManager;
+use OCP\IUserSession;
 use OCP\Util;
 
 /**
@@ -25,8 +27,10 @@ class LoadFilesPluginListener implements IEventListener {
 
 	public function __construct(
 		private IInitialState $initialState,
-		private FilesActionsMenuService $service,
+		private UiManifestService $uiManifestService,
 		private IConfig $config,
+		private IUserSession $userSession,
+		private IGroupManager $groupManager,
 	) {
 	}
 
@@ -35,7 +39,9 @@ class LoadFilesPluginListener implements IEventListener {
 			return;
 		}
 
-		$exFilesActions = $this->service->getRegisteredFileActions();
+		$user = $this->userSession->getUser();
+		$isAdmin = $user !== null && $this->groupManager->isAdmin($user->getUID());
+		$exFilesActions = $this->uiManifestService->getFileActions($isAdmin);
 		if (!empty($exFilesActions)) {
 			$this->initialState->provideInitialState('ex_files_actions_menu', [
 				'fileActions' => $exFilesActions,
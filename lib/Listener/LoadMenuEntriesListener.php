@@ -10,16 +10,14 @@ declare(strict_types=1);
 namespace OCA\AppAPI\Listener;
 
 use OCA\AppAPI\AppInfo\Application;
-use OCA\AppAPI\Service\UI\TopMenuService;
+use OCA\AppAPI\Service\UI\UiManifestService;
 use OCP\EventDispatcher\Event;
 use OCP\EventDispatcher\IEventListener;
 use OCP\IGroupManager;
 use OCP\INavigationManager;
-use OCP\IURLGenerator;
 use OCP\IUserSession;
 use OCP\L10N\IFactory;
 use OCP\Navigation\Events\LoadAdditionalEntriesEvent;
-use OCP\Server;
 
 /**
  * @template-extends IEventListener<LoadMenuEntriesListener>
@@ -27,7 +25,11 @@ use OCP\Server;
 readonly class LoadMenuEntriesListener implements IEventListener {
 
 	public function __construct(
-		private TopMenuService $topMenuService,
+		private UiManifestService $uiManifestService,
+		private IUserSession $userSession,
+		private IGroupManager $groupManager,
+		private INavigationManager $navigationManager,
+		private IFactory $l10nFactory,
 	) {
 	}
 
@@ -36,47 +38,25 @@ readonly class LoadMenuEntriesListener implements IEventListener {
 			return;
 		}
 
-		$menuEntries = $this->topMenuService->getExAppMenuEntries();
-		if (empty($menuEntries)) {
-			return;
-		}
-
-		$user = Server::get(IUserSession::class)->getUser();
+		$user = $this->userSession->getUser();
 		if (!$user) {
 			return;
 		}
-		$isUserAdmin = Server::get(IGroupManager::class)->isAdmin($user->getUID());
-
-		/** @var INavigationManager $navigationManager */
-		$navigationManager = Server::get(INavigationManager::class);
-
-		foreach ($menuEntries as $menuEntry) {
-			if ($menuEntry->getAdminRequired() === 1 && !$isUserAdmin) {
-				continue; // Skip this entry if the user is not an admin and the entry requires admin privileges
-			}
-			if ($menuEntry->getDisplayName() === '') {
+		foreach ($this->uiManifestService->getMenuEntries($this->groupManager->isAdmin($user->getUID())) as $menuEntry) {
+			if ($menuEntry['display_name'] === '') {
 				// An entry without a label is not renderable, and translating an empty string
 				// throws since the L10N strict types refactoring.
 				continue;
 			}
-			$navigationManager->add(static function () use ($menuEntry) {
-				$appId = $menuEntry->getAppid();
-				$entryName = $menuEntry->getName();
-				$icon = $menuEntry->getIcon();
-				$urlGenerator = Server::get(IURLGenerator::class);
+			$l10nFactory = $this->l10nFactory;
+			$this->navigationManager->add(static function () use ($menuEntry, $l10nFactory) {
 				return [
-					'id' => Application::APP_ID . '_' . $appId . '_' . $entryName,
+					'id' => $menuEntry['id'],
 					'type' => 'link',
 					'app' => Application::APP_ID,
-					'href' => $urlGenerator->linkToRoute(
-						'app_api.TopMenu.viewExAppPage', ['appId' => $appId, 'name' => $entryName]
-					),
-					'icon' => $icon === ''
-						? $urlGenerator->imagePath('app_api', 'app.svg')
-						: $urlGenerator->linkToRoute(
-							'app_api.ExAppProxy.ExAppGet', ['appId' => $appId, 'other' => $icon]
-						),
-					'name' => Server::get(IFactory::class)->get($appId)->t($menuEntry->getDisplayName()),
+					'href' => $menuEntry['href'],
+					'icon' => $menuEntry['icon'],
+					'name' => $l10nFactory->get($menuEntry['appid'])->t($menuEntry['display_name']),
 				];
 			});
 		}
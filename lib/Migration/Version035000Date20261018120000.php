@@ -0,0 +1,86 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Migration;
+
+use Closure;
+use OCA\AppAPI\Db\ExAppMapper;
+use OCP\DB\ISchemaWrapper;
+use OCP\IDBConnection;
+use OCP\Migration\Attributes\AddIndex;
+use OCP\Migration\Attributes\DropIndex;
+use OCP\Migration\Attributes\IndexType;
+use OCP\Migration\IOutput;
+use OCP\Migration\SimpleMigrationStep;
+
+/**
+ * Routes are loaded with a separate `appid IN (...) ORDER BY appid, id` query instead of being joined
+ * to every ExApp row, so `ex_apps_routes(appid)` is replaced by `(appid, id)`, which serves both
+ * the lookup and the ordering.
+ *
+ * The JSON-list columns of existing routes are rewritten in their normalized form (a JSON list,
+ * `[]` instead of NULL or malformed values), as written on registration since this version.
+ */
+#[DropIndex(table: 'ex_apps_routes', type: IndexType::INDEX, description: 'replaced by ex_apps_routes_appid_id')]
+#[AddIndex(table: 'ex_apps_routes', type: IndexType::INDEX, description: 'routes of ExApps in registration order')]
+class Version035000Date20261018120000 extends SimpleMigrationStep {
+
+	public function __construct(
+		private IDBConnection $connection,
+	) {
+	}
+
+	public function changeSchema(IOutput $output, Closure $schemaClosure, array $options): ?ISchemaWrapper {
+		/** @var ISchemaWrapper $schema */
+		$schema = $schemaClosure();
+		if (!$schema->hasTable('ex_apps_routes')) {
+			return null;
+		}
+
+		$table = $schema->getTable('ex_apps_routes');
+		if ($table->hasIndex('ex_apps_routes_appid_id')) {
+			return null;
+		}
+		if ($table->hasIndex('ex_apps_routes_appid')) {
+			$table->dropIndex('ex_apps_routes_appid');
+		}
+		$table->addIndex(['appid', 'id'], 'ex_apps_routes_appid_id');
+		return $schema;
+	}
+
+	public function postSchemaChange(IOutput $output, Closure $schemaClosure, array $options): ?ISchemaWrapper {
+		$qbSelect = $this->connection->getQueryBuilder();
+		$qbSelect->select('id', 'headers_to_exclude', 'bruteforce_protection')
+			->from('ex_apps_routes');
+		$req = $qbSelect->executeQuery();
+
+		$normalized = 0;
+		while ($row = $req->fetch()) {
+			$headersToExclude = json_encode(ExAppMapper::parseJsonList($row['headers_to_exclude']));
+			$bruteforceProtection = json_encode(ExAppMapper::parseJsonList($row['bruteforce_protection']));
+			if ($headersToExclude === $row['headers_to_exclude'] && $bruteforceProtection === $row['bruteforce_protection']) {
+				continue;
+			}
+			$qbUpdate = $this->connection->getQueryBuilder();
+			$qbUpdate->update('ex_apps_routes')
+				->set('headers_to_exclude', $qbUpdate->createNamedParameter($headersToExclude))
+				->set('bruteforce_protection', $qbUpdate->createNamedParameter($bruteforceProtection))
+				->where(
+					$qbUpdate->expr()->eq('id', $qbUpdate->createNamedParameter($row['id']))
+				);
+			$qbUpdate->executeStatement();
+			$normalized++;
+		}
+		$req->closeCursor();
+		if ($normalized > 0) {
+			$output->info(sprintf('Normalized the JSON lists of %d ExApp route(s).', $normalized));
+		}
+		return null;
+	}
+}
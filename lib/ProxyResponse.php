@@ -16,7 +16,12 @@ use OCP\AppFramework\Http\Response;
 
 /** @template-extends Response<HttpAlias::STATUS_*, array<string, mixed>> */
 class ProxyResponse extends Response implements ICallbackResponse {
+	/** Size of the buffer used to pass stream bodies through, so memory use does not depend on the body size */
+	public const CHUNK_SIZE = 8192;
+	private const SCRIPT_TAG = '<script';
+
 	private mixed $data;
+	private ?string $scriptNonce = null;
 
 	public function __construct(int $status = HttpAlias::STATUS_OK,
 		array $headers = [], mixed $data = null, int $lastModified = 0) {
@@ -31,13 +36,66 @@ class ProxyResponse extends Response implements ICallbackResponse {
 		}
 	}
 
+	/**
+	 * Add the CSP nonce to every `<script` tag of the body while it is being sent.
+	 */
+	public function setScriptNonce(string $nonce): void {
+		$this->scriptNonce = $nonce;
+	}
+
 	public function callback(IOutput $output): void {
 		if ($output->getHttpResponseCode() !== HttpAlias::STATUS_NOT_MODIFIED) {
 			if (is_resource($this->data)) {
-				fpassthru($this->data);
+				$this->passthru($this->data);
+			} elseif ($this->scriptNonce !== null) {
+				print $this->injectScriptNonce((string)$this->data);
 			} else {
 				print $this->data;
 			}
 		}
 	}
+
+	/**
+	 * @param resource $stream
+	 */
+	private function passthru($stream): void {
+		$pending = '';
+		while (!feof($stream)) {
+			$chunk = fread($stream, self::CHUNK_SIZE);
+			if ($chunk === false) {
+				break;
+			}
+			if ($this->scriptNonce !== null) {
+				// Hold back a trailing partial `<script` so that a tag split across chunks is still rewritten.
+				$chunk = $pending . $chunk;
+				$held = $this->partialScriptTagLength($chunk);
+				$pending = substr($chunk, strlen($chunk) - $held);
+				$chunk = $this->injectScriptNonce(substr($chunk, 0, strlen($chunk) - $held));
+			}
+			if ($chunk !== '') {
+				print $chunk;
+				flush();
+			}
+		}
+		if ($pending !== '') {
+			print $pending;
+		}
+		fclose($stream);
+	}
+
+	private function injectScriptNonce(string $content): string {
+		return str_replace(self::SCRIPT_TAG, '<script nonce="' . $this->scriptNonce . '"', $content);
+	}
+
+	/**
+	 * Length of the longest suffix of $chunk that is a proper prefix of `<script`.
+	 */
+	private function partialScriptTagLength(string $chunk): int {
+		for ($length = strlen(self::SCRIPT_TAG) - 1; $length > 0; $length--) {
+			if (str_ends_with($chunk, substr(self::SCRIPT_TAG, 0, $length))) {
+				return $length;
+			}
+		}
+		return 0;
+	}
 }
@@ -42,6 +42,11 @@ namespace OCA\AppAPI;
  *     configvalue: string,
  * }
  *
+ * @psalm-type AppAPIExAppConfigEntry = array{
+ *     configvalue: string,
+ *     sensitive: int,
+ * }
+ *
  * @psalm-type AppAPIExAppPreference = array{
  *     id: int,
  *     user_id: string,
@@ -17,10 +17,9 @@ use OCA\AppAPI\DeployActions\KubernetesActions;
 use OCA\AppAPI\DeployActions\ManualActions;
 use OCP\AppFramework\Http;
 use OCP\DB\Exception;
-use OCP\Http\Client\IClient;
-use OCP\Http\Client\IClientService;
 use OCP\Http\Client\IPromise;
 use OCP\Http\Client\IResponse;
+use OCP\IAppConfig;
 use OCP\IConfig;
 use OCP\IRequest;
 use OCP\ISession;
@@ -32,15 +31,20 @@ use OCP\Security\Bruteforce\IThrottler;
 use Psr\Log\LoggerInterface;
 
 class AppAPIService {
-
-	private IClient $client;
+	public const HEARTBEAT_HARP_WAIT_KEY = 'heartbeat_harp_wait_for_start';
+	public const HEARTBEAT_INITIAL_DELAY_KEY = 'heartbeat_initial_delay';
+	private const HEARTBEAT_TIMEOUT = 600; // seconds for container initialization
+	private const HEARTBEAT_TEST_DEPLOY_TIMEOUT = 60;
+	private const HEARTBEAT_REQUEST_TIMEOUT = 30;
+	private const HEARTBEAT_INITIAL_DELAY = 0.5;
+	private const HEARTBEAT_MAX_DELAY = 10.0;
 
 	public function __construct(
 		private readonly LoggerInterface $logger,
 		private readonly ILogFactory $logFactory,
 		private readonly IThrottler $throttler,
 		private readonly IConfig $config,
-		IClientService $clientService,
+		private readonly ExAppClientPool $clientPool,
 		private readonly IUserSession $userSession,
 		private readonly ISession $session,
 		private readonly IUserManager $userManager,
@@ -53,8 +57,8 @@ class AppAPIService {
 		private readonly DaemonConfigService $daemonConfigService,
 		private readonly ExAppDeployOptionsService $exAppDeployOptionsService,
 		private readonly HarpService $harpService,
+		private readonly IAppConfig $appConfig,
 	) {
-		$this->client = $clientService->newClient();
 		$this->exAppService->setAppAPIService($this);
 	}
 
@@ -98,12 +102,14 @@ class AppAPIService {
 		#[\SensitiveParameter]
 		array $options,
 	): array|IResponse {
+		$client = $this->clientPool->getClient($exApp);
+		$options = $this->clientPool->prepareOptions($exApp, $options);
 		try {
 			return match ($method) {
-				'GET' => $this->client->get($uri, $options),
-				'POST' => $this->client->post($uri, $options),
-				'PUT' => $this->client->put($uri, $options),
-				'DELETE' => $this->client->delete($uri, $options),
+				'GET' => $client->get($uri, $options),
+				'POST' => $client->post($uri, $options),
+				'PUT' => $client->put($uri, $options),
+				'DELETE' => $client->delete($uri, $options),
 				default => ['error' => 'Bad HTTP method'],
 			};
 		} catch (\Exception $e) {
@@ -138,11 +144,13 @@ class AppAPIService {
 		#[\SensitiveParameter]
 		array $options,
 	): IPromise {
+		$client = $this->clientPool->getAsyncClient();
+		$options = $this->clientPool->prepareOptions($exApp, $options);
 		$promise = match ($method) {
-			'GET' => $this->client->getAsync($uri, $options),
-			'POST' => $this->client->postAsync($uri, $options),
-			'PUT' => $this->client->putAsync($uri, $options),
-			'DELETE' => $this->client->deleteAsync($uri, $options),
+			'GET' => $client->getAsync($uri, $options),
+			'POST' => $client->postAsync($uri, $options),
+			'PUT' => $client->putAsync($uri, $options),
+			'DELETE' => $client->deleteAsync($uri, $options),
 			default => throw new \Exception('Bad HTTP method'),
 		};
 		$promise->then(onRejected: function (\Exception $exception) use ($exApp) {
@@ -438,7 +446,7 @@ class AppAPIService {
 			return;
 		}
 		try {
-			$this->client->post($initUrl, $options);
+			$this->clientPool->getClient($exApp)->post($initUrl, $this->clientPool->prepareOptions($exApp, $options));
 		} catch (\Exception $e) {
 			$statusCode = $e->getCode();
 			if (($statusCode === Http::STATUS_NOT_IMPLEMENTED) || ($statusCode === Http::STATUS_NOT_FOUND)) {
@@ -498,19 +506,26 @@ class AppAPIService {
 		return true;
 	}
 
+	/**
+	 * Wait until the ExApp answers `/heartbeat` with `{"status": "ok"}`.
+	 *
+	 * Attempts are spaced with jittered exponential backoff (the `heartbeat_initial_delay` app config,
+	 * HEARTBEAT_INITIAL_DELAY seconds by default, doubling up to HEARTBEAT_MAX_DELAY) and stop at the
+	 * heartbeat deadline (1 minute for the test deploy app, 10 minutes otherwise). The failed attempts
+	 * are added to `status.heartbeat_count` once, at the end.
+	 *
+	 * With the `heartbeat_harp_wait_for_start` app config set to `1`, ExApps deployed through HaRP first
+	 * block on HaRP's `wait_for_start` (bounded by the same deadline) instead of being polled while their
+	 * container is starting. Polling stops as soon as the ExApp is unregistered.
+	 */
 	public function heartbeatExApp(
 		string $exAppUrl,
 		#[\SensitiveParameter]
 		array $auth,
 		string $appId,
 	): bool {
-		$heartbeatAttempts = 0;
-		$delay = 1;
-		if ($appId === Application::TEST_DEPLOY_APPID) {
-			$maxHeartbeatAttempts = 60 * $delay; // 1 minute for test deploy app
-		} else {
-			$maxHeartbeatAttempts = 60 * 10 * $delay; // minutes for container initialization
-		}
+		$timeout = $appId === Application::TEST_DEPLOY_APPID ? self::HEARTBEAT_TEST_DEPLOY_TIMEOUT : self::HEARTBEAT_TIMEOUT;
+		$deadline = microtime(true) + $timeout;
 
 		$options = [
 			'headers' => [
@@ -532,52 +547,116 @@ class AppAPIService {
 			return false;
 		}
 		if (boolval($exApp->getDeployConfig()['harp'] ?? false)) {
-			$exApp = $this->exAppService->getExApp($appId);
 			$options['headers'] = array_merge(
 				$options['headers'],
 				$this->commonService->buildAppAPIAuthHeaders(null, null, $exApp),
 			);
+			if ($this->isHeartbeatHarpWaitEnabled() && !$this->waitHarpExAppStart($exApp, $deadline)) {
+				$this->logger->error(sprintf('HaRP reported that ExApp %s did not start, skipping heartbeat.', $appId));
+				return false;
+			}
 		}
 
 		$failedHeartbeatCount = 0;
-		while ($heartbeatAttempts < $maxHeartbeatAttempts) {
-			$heartbeatAttempts++;
+		$lastFailure = '';
+		$delay = $this->getHeartbeatInitialDelay();
+		$success = false;
+		while (true) {
 			$errorMsg = '';
 			$statusCode = 0;
-			$exApp = $this->exAppService->getExApp($appId);
-			if ($exApp === null) {
+			if (!$this->exAppService->isExAppRegistered($appId)) {
+				$this->logger->info(sprintf('ExApp %s was unregistered, stopping heartbeat.', $appId));
 				return false;
 			}
 			try {
-				$heartbeatResult = $this->client->get($exAppUrl . '/heartbeat', $options);
+				$options['timeout'] = max(1, (int)ceil(min(self::HEARTBEAT_REQUEST_TIMEOUT, $deadline - microtime(true))));
+				$heartbeatResult = $this->clientPool->getClient($exApp)->get($exAppUrl . '/heartbeat', $this->clientPool->prepareOptions($exApp, $options));
 				$statusCode = $heartbeatResult->getStatusCode();
 				if ($statusCode === 200) {
 					$result = json_decode($heartbeatResult->getBody(), true);
 					if (isset($result['status']) && $result['status'] === 'ok') {
 						$this->logger->info(sprintf('Successful heartbeat on: %s', $exAppUrl . '/heartbeat'));
-						return true;
+						$success = true;
+						break;
 					}
 				}
 			} catch (\Exception $e) {
 				$errorMsg = $e->getMessage();
 			}
-			$failedHeartbeatCount++;  // Log every 10th failed heartbeat
-			if ($failedHeartbeatCount % 10 == 0) {
-				$this->logger->warning(
-					sprintf('Failed heartbeat on %s for %d times. Most recent status=%d, error: %s', $exAppUrl, $failedHeartbeatCount, $statusCode, $errorMsg)
-				);
-				$status = $exApp->getStatus();
-				if (isset($status['heartbeat_count'])) {
-					$status['heartbeat_count'] += $failedHeartbeatCount;
-				} else {
-					$status['heartbeat_count'] = $failedHeartbeatCount;
-				}
-				$exApp->setStatus($status);
-				$this->exAppService->updateExApp($exApp, ['status']);
+			$failedHeartbeatCount++;
+			$failure = sprintf('status=%d, error: %s', $statusCode, $errorMsg);
+			if ($failure !== $lastFailure) {  // Log only when the kind of failure changes
+				$this->logger->warning(sprintf('Failed heartbeat on %s (attempt %d): %s', $exAppUrl, $failedHeartbeatCount, $failure));
+				$lastFailure = $failure;
 			}
-			sleep($delay);
+			$remaining = $deadline - microtime(true);
+			if ($remaining <= 0) {
+				break;
+			}
+			// "equal jitter": sleep between half and the full backoff delay, never past the deadline
+			$sleep = min($remaining, $delay * (0.5 + mt_rand() / mt_getrandmax() / 2));
+			usleep((int)($sleep * 1000000));
+			$delay = min(self::HEARTBEAT_MAX_DELAY, $delay * 2);
 		}
-		return false;
+
+		if (!$success) {
+			$this->logger->warning(sprintf('Heartbeat on %s failed %d times within %d seconds. Most recent %s', $exAppUrl, $failedHeartbeatCount, $timeout, $lastFailure));
+		}
+		if ($failedHeartbeatCount > 0) {
+			$this->addHeartbeatFailures($appId, $failedHeartbeatCount);
+		}
+		return $success;
+	}
+
+	private function getHeartbeatInitialDelay(): float {
+		return max(0.0, (float)$this->appConfig->getValueString(
+			Application::APP_ID, self::HEARTBEAT_INITIAL_DELAY_KEY, (string)self::HEARTBEAT_INITIAL_DELAY, lazy: true
+		));
+	}
+
+	private function isHeartbeatHarpWaitEnabled(): bool {
+		return $this->appConfig->getValueString(Application::APP_ID, self::HEARTBEAT_HARP_WAIT_KEY, '0', lazy: true) === '1';
+	}
+
+	/**
+	 * Block on HaRP's `wait_for_start` until the heartbeat deadline (all roles at once for multi-role
+	 * K8s deployments). Returns true when HaRP is not applicable, so that the heartbeat polling takes over.
+	 */
+	private function waitHarpExAppStart(ExApp $exApp, float $deadline): bool {
+		$daemonConfig = $this->daemonConfigService->getDaemonConfigByName($exApp->getDaemonConfigName());
+		if ($daemonConfig === null) {
+			return true;
+		}
+		$timeout = max(1, (int)ceil($deadline - microtime(true)));
+		if ($exApp->getAcceptsDeployId() === $this->dockerActions->getAcceptsDeployId()) {
+			$this->dockerActions->initGuzzleClient($daemonConfig);
+			return $this->dockerActions->waitExAppStart($this->dockerActions->buildDockerUrl($daemonConfig), $exApp->getAppid(), $timeout);
+		}
+		if ($exApp->getAcceptsDeployId() === $this->kubernetesActions->getAcceptsDeployId()) {
+			$this->kubernetesActions->initGuzzleClient($daemonConfig);
+			$harpK8sUrl = $this->kubernetesActions->buildHarpK8sUrl($daemonConfig);
+			$rolesOption = $this->exAppDeployOptionsService->getDeployOption($exApp->getAppid(), 'k8s_service_roles');
+			$roles = ($rolesOption !== null) ? $rolesOption->getValue() : [];
+			if (empty($roles)) {
+				return $this->kubernetesActions->waitExAppStart($harpK8sUrl, $exApp->getAppid(), timeout: $timeout);
+			}
+			return $this->kubernetesActions->waitExAppRolesStart($harpK8sUrl, $exApp->getAppid(), array_column($roles, 'name'), $timeout);
+		}
+		return true;
+	}
+
+	/**
+	 * Single status write for all the failed attempts of one heartbeat run.
+	 */
+	private function addHeartbeatFailures(string $appId, int $failedHeartbeatCount): void {
+		$exApp = $this->exAppService->getExApp($appId);
+		if ($exApp === null) {
+			return;
+		}
+		$status = $exApp->getStatus();
+		$status['heartbeat_count'] = ($status['heartbeat_count'] ?? 0) + $failedHeartbeatCount;
+		$exApp->setStatus($status);
+		$this->exAppService->updateExApp($exApp, ['status']);
 	}
 
 	/**
@@ -0,0 +1,157 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Service;
+
+use GuzzleHttp\RequestOptions;
+use GuzzleHttp\TransferStats;
+use OCA\AppAPI\AppInfo\Application;
+use OCA\AppAPI\Db\ExApp;
+use OCP\Http\Client\IClient;
+use OCP\Http\Client\IClientService;
+use OCP\IAppConfig;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Keep-alive HTTP clients for requests from AppAPI to ExApps, one per daemon (DaemonConfig).
+ *
+ * Every daemon (Docker/HaRP/manual host) gets its own IClient, so its curl handles — and the
+ * keep-alive connections cached on them — are not evicted by traffic to other daemons.
+ * Asynchronous requests all go through one IClient instead: each IClient has its own curl multi
+ * handle, and waiting on a promise only drives the transfers of its own multi handle. The
+ * connection cache size (`exapp_client_pool_size`, 0 disables pooling) and the maximum idle
+ * time of a cached connection (`exapp_client_idle_timeout`, seconds) are configurable.
+ *
+ * Connections are reused for all requests made during one PHP process (a request, an OCC command,
+ * a background job). On PHP 8.5+ a persistent curl share handle additionally keeps them open
+ * across requests served by the same PHP-FPM worker.
+ */
+class ExAppClientPool {
+	public const POOL_SIZE_KEY = 'exapp_client_pool_size';
+	public const IDLE_TIMEOUT_KEY = 'exapp_client_idle_timeout';
+	private const DEFAULT_POOL_SIZE = 8;
+	private const DEFAULT_IDLE_TIMEOUT = 60;
+
+	private ?int $poolSize = null;
+	private ?IClient $sharedClient = null;
+	/** @var array<string, IClient> */
+	private array $clients = [];
+	/** @var array<string, array{new: int, reused: int}> */
+	private array $stats = [];
+	/** @var array<string, true> connections (remote ip:port + local port) seen by this process */
+	private array $knownConnections = [];
+	private ?array $curlOptions = null;
+
+	public function __construct(
+		private readonly IClientService $clientService,
+		private readonly IAppConfig $appConfig,
+		private readonly LoggerInterface $logger,
+	) {
+	}
+
+	public function getClient(ExApp $exApp): IClient {
+		if (!$this->isEnabled()) {
+			return $this->sharedClient ??= $this->clientService->newClient();
+		}
+		return $this->clients[$exApp->getDaemonConfigName()] ??= $this->clientService->newClient();
+	}
+
+	/**
+	 * Client for asynchronous requests to ExApps of any daemon, so that waiting on one of its promises
+	 * also drives every other pending request.
+	 */
+	public function getAsyncClient(): IClient {
+		return $this->sharedClient ??= $this->clientService->newClient();
+	}
+
+	/**
+	 * Add the keep-alive curl options and the connection reuse accounting to request options.
+	 */
+	public function prepareOptions(ExApp $exApp, #[\SensitiveParameter] array $options): array {
+		if (!$this->isEnabled()) {
+			return $options;
+		}
+		$options['curl'] = ($options['curl'] ?? []) + $this->getCurlOptions();
+		$daemonConfigName = $exApp->getDaemonConfigName();
+		$onStats = $options[RequestOptions::ON_STATS] ?? null;
+		$options[RequestOptions::ON_STATS] = function (TransferStats $transferStats) use ($daemonConfigName, $onStats) {
+			$this->recordTransfer($daemonConfigName, $transferStats);
+			if (is_callable($onStats)) {
+				$onStats($transferStats);
+			}
+		};
+		return $options;
+	}
+
+	/**
+	 * Counters of new versus reused connections per daemon name, for the current process.
+	 *
+	 * @return array<string, array{new: int, reused: int}>
+	 */
+	public function getConnectionStats(): array {
+		return $this->stats;
+	}
+
+	private function isEnabled(): bool {
+		return $this->getPoolSize() > 0;
+	}
+
+	/**
+	 * Read once per process: every proxied request checks it, and lazy app config values are not
+	 * part of the preloaded config.
+	 */
+	private function getPoolSize(): int {
+		return $this->poolSize ??= max(0, (int)$this->appConfig->getValueString(
+			Application::APP_ID, self::POOL_SIZE_KEY, (string)self::DEFAULT_POOL_SIZE, lazy: true
+		));
+	}
+
+	/**
+	 * @psalm-suppress UndefinedFunction curl_share_init_persistent() is available since PHP 8.5
+	 */
+	private function getCurlOptions(): array {
+		if ($this->curlOptions !== null) {
+			return $this->curlOptions;
+		}
+		$idleTimeout = max(1, (int)$this->appConfig->getValueString(
+			Application::APP_ID, self::IDLE_TIMEOUT_KEY, (string)self::DEFAULT_IDLE_TIMEOUT, lazy: true
+		));
+		$this->curlOptions = [
+			CURLOPT_MAXCONNECTS => $this->getPoolSize(),
+			CURLOPT_TCP_KEEPALIVE => 1,
+			CURLOPT_TCP_KEEPIDLE => $idleTimeout,
+		];
+		if (defined('CURLOPT_MAXAGE_CONN')) {
+			$this->curlOptions[CURLOPT_MAXAGE_CONN] = $idleTimeout;
+		}
+		if (function_exists('curl_share_init_persistent')) {
+			$this->curlOptions[CURLOPT_SHARE] = curl_share_init_persistent([CURL_LOCK_DATA_CONNECT, CURL_LOCK_DATA_DNS]);
+		}
+		return $this->curlOptions;
+	}
+
+	private function recordTransfer(string $daemonConfigName, TransferStats $transferStats): void {
+		$localPort = $transferStats->getHandlerStat('local_port');
+		if (empty($localPort)) {
+			return; // no connection was established
+		}
+		$connection = sprintf('%s:%s:%s', $transferStats->getHandlerStat('primary_ip'), $transferStats->getHandlerStat('primary_port'), $localPort);
+		$this->stats[$daemonConfigName] ??= ['new' => 0, 'reused' => 0];
+		if (isset($this->knownConnections[$connection])) {
+			$this->stats[$daemonConfigName]['reused']++;
+			return;
+		}
+		$this->knownConnections[$connection] = true;
+		$this->stats[$daemonConfigName]['new']++;
+		$this->logger->debug(sprintf(
+			'New connection to ExApp daemon "%s" (%d new, %d reused in this process)',
+			$daemonConfigName, $this->stats[$daemonConfigName]['new'], $this->stats[$daemonConfigName]['reused']
+		));
+	}
+}
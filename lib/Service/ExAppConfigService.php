@@ -22,6 +22,8 @@ use Psr\Log\LoggerInterface;
  * values are stored as lazy strings; sensitive values are encrypted by the server.
  */
 readonly class ExAppConfigService {
+	/** Maximum number of keys of one bulk get, set or delete */
+	public const BULK_MAX_KEYS = 1000;
 
 	public function __construct(
 		private IAppConfig $appConfig,
@@ -36,25 +38,41 @@ readonly class ExAppConfigService {
 	 * returned decrypted (the server handles decryption transparently).
 	 */
 	public function getAppConfigValues(string $appId, array $configKeys): ?array {
+		$values = [];
+		foreach ($this->getAppConfigMap($appId, $configKeys) as $configKey => $configValue) {
+			$values[] = [
+				'configkey' => (string)$configKey,
+				'configvalue' => $configValue,
+			];
+		}
+		return $values;
+	}
+
+	/**
+	 * Return the values of the requested keys that actually exist as a `configkey => configvalue` map,
+	 * in the order of the request. Sensitive values are returned decrypted.
+	 *
+	 * The keys of the app are loaded with a single query, the values are then read from the server's
+	 * in-request cache, so the cost does not grow with a database round trip per key.
+	 *
+	 * @return array<string, string>
+	 */
+	public function getAppConfigMap(string $appId, array $configKeys): array {
 		try {
+			$existingKeys = array_flip($this->appConfig->getKeys($appId));
 			$values = [];
-			// array_unique: a single SQL `IN (...)` used to dedupe; preserve that so duplicate
-			// request keys don't yield duplicate result rows.
-			foreach (array_unique(array_map('strval', $configKeys)) as $configKey) {
-				// `null` lazy matches keys regardless of their lazy flag.
-				if (!$this->appConfig->hasKey($appId, $configKey, null)) {
+			foreach (array_map('strval', $configKeys) as $configKey) {
+				if (!isset($existingKeys[$configKey]) || array_key_exists($configKey, $values)) {
 					continue;
 				}
 				try {
-					$configValue = $this->buildConfigValue($appId, $configKey)->getConfigvalue();
+					$values[$configKey] = $this->appConfig->getValueString(
+						$appId, $configKey, '', lazy: $this->appConfig->isLazy($appId, $configKey)
+					);
 				} catch (\Throwable $e) {
 					$this->logger->warning(sprintf('Failed to read value for app %s, config key %s', $appId, $configKey), ['exception' => $e]);
-					$configValue = '';
+					$values[$configKey] = '';
 				}
-				$values[] = [
-					'configkey' => $configKey,
-					'configvalue' => $configValue,
-				];
 			}
 			return $values;
 		} catch (\Throwable $e) {
@@ -72,21 +90,11 @@ readonly class ExAppConfigService {
 	public function setAppConfigValue(string $appId, string $configKey, mixed $configValue, ?int $sensitive = null): ?ExAppConfig {
 		try {
 			$value = (string)($configValue ?? '');
-			$currentSensitive = $this->appConfig->hasKey($appId, $configKey, null)
-				&& $this->appConfig->isSensitive($appId, $configKey, null);
-			$targetSensitive = $sensitive !== null ? (bool)$sensitive : $currentSensitive;
-
-			if ($currentSensitive && !$targetSensitive) {
-				$this->downgradeToPlain($appId, $configKey, $value);
-			} else {
-				$this->appConfig->setValueString($appId, $configKey, $value, lazy: true, sensitive: $targetSensitive);
-			}
-
 			return new ExAppConfig([
 				'appid' => $appId,
 				'configkey' => $configKey,
 				'configvalue' => $value,
-				'sensitive' => $targetSensitive ? 1 : 0,
+				'sensitive' => $this->writeValue($appId, $configKey, $value, $sensitive) ? 1 : 0,
 			]);
 		} catch (\Throwable $e) {
 			$this->logger->error(sprintf('Failed to set app config value for app %s, config key %s. Error: %s', $appId, $configKey, $e->getMessage()), ['exception' => $e]);
@@ -94,23 +102,65 @@ readonly class ExAppConfigService {
 		}
 	}
 
+	/**
+	 * Create or update several ExApp config values at once, with the same semantics as setAppConfigValue().
+	 *
+	 * All values are written in one transaction: either all of them are set or, on error, none (null is returned).
+	 *
+	 * @param array<string, mixed> $configValues `configkey => configvalue`
+	 * @return array<string, array{configvalue: string, sensitive: int}>|null
+	 */
+	public function setAppConfigMap(string $appId, array $configValues, ?int $sensitive = null): ?array {
+		$this->connection->beginTransaction();
+		try {
+			$result = [];
+			foreach ($configValues as $configKey => $configValue) {
+				$value = (string)($configValue ?? '');
+				$result[$configKey] = [
+					'configvalue' => $value,
+					'sensitive' => $this->writeValue($appId, (string)$configKey, $value, $sensitive) ? 1 : 0,
+				];
+			}
+			$this->connection->commit();
+			return $result;
+		} catch (\Throwable $e) {
+			$this->rollBack();
+			$this->logger->error(sprintf('Failed to set app config values for app %s. Error: %s', $appId, $e->getMessage()), ['exception' => $e]);
+			return null;
+		}
+	}
+
 	/**
 	 * Delete the requested keys that exist; returns the number deleted, or -1 on error.
 	 */
 	public function deleteAppConfigValues(array $configKeys, string $appId): int {
+		$deleted = $this->deleteAppConfigMap($appId, $configKeys);
+		return $deleted === null ? -1 : count(array_filter($deleted));
+	}
+
+	/**
+	 * Delete the requested keys that exist, in one transaction.
+	 *
+	 * @return array<string, bool>|null whether each requested key existed and was deleted, null on error
+	 */
+	public function deleteAppConfigMap(string $appId, array $configKeys): ?array {
+		$this->connection->beginTransaction();
 		try {
-			$deleted = 0;
-			foreach ($configKeys as $configKey) {
-				$configKey = (string)$configKey;
-				if ($this->appConfig->hasKey($appId, $configKey, null)) {
+			$existingKeys = array_flip($this->appConfig->getKeys($appId));
+			$deleted = [];
+			foreach (array_map('strval', $configKeys) as $configKey) {
+				$deleted[$configKey] = isset($existingKeys[$configKey]);
+				if ($deleted[$configKey]) {
 					$this->appConfig->deleteKey($appId, $configKey);
-					$deleted++;
+					unset($existingKeys[$configKey]);
 				}
 			}
+			$this->connection->commit();
 			return $deleted;
 		} catch (\Throwable $e) {
+			$this->rollBack();
 			$this->logger->error(sprintf('Failed to delete app config values for app %s. Error: %s', $appId, $e->getMessage()), ['exception' => $e]);
-			return -1;
+			return null;
 		}
 	}
 
@@ -171,6 +221,22 @@ readonly class ExAppConfigService {
 		}
 	}
 
+	/**
+	 * Write a value, keeping the current sensitivity when `$sensitive` is null; returns whether it is sensitive.
+	 */
+	private function writeValue(string $appId, string $configKey, string $value, ?int $sensitive): bool {
+		$currentSensitive = $this->appConfig->hasKey($appId, $configKey, null)
+			&& $this->appConfig->isSensitive($appId, $configKey, null);
+		$targetSensitive = $sensitive !== null ? (bool)$sensitive : $currentSensitive;
+
+		if ($currentSensitive && !$targetSensitive) {
+			$this->downgradeToPlain($appId, $configKey, $value);
+		} else {
+			$this->appConfig->setValueString($appId, $configKey, $value, lazy: true, sensitive: $targetSensitive);
+		}
+		return $targetSensitive;
+	}
+
 	/**
 	 * Turn a currently-sensitive key into a plain value with the new content.
 	 *
@@ -186,15 +252,24 @@ readonly class ExAppConfigService {
 			$this->appConfig->setValueString($appId, $configKey, $value, lazy: true, sensitive: false);
 			$this->connection->commit();
 		} catch (\Throwable $e) {
-			try {
-				$this->connection->rollBack();
-			} catch (\Throwable) {
-				// rollBack on an already-aborted transaction is not actionable here.
-			}
+			$this->rollBack();
 			throw $e;
 		}
 	}
 
+	/**
+	 * Roll back the open transaction and drop the in-memory config cache,
+	 * which still holds the values written before the failure.
+	 */
+	private function rollBack(): void {
+		try {
+			$this->connection->rollBack();
+		} catch (\Throwable) {
+			// rollBack on an already-aborted transaction is not actionable here.
+		}
+		$this->appConfig->clearCache();
+	}
+
 	/**
 	 * Build the value object for an existing key, reading it with its actual lazy flag
 	 * so values created outside AppAPI (e.g. `occ config:app:set`) are handled too.
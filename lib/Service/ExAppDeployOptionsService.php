@@ -14,7 +14,6 @@ use OCA\AppAPI\Db\ExAppDeployOption;
 use OCA\AppAPI\Db\ExAppDeployOptionsMapper;
 use OCP\DB\Exception;
 use OCP\ICache;
-use OCP\ICacheFactory;
 use Psr\Log\LoggerInterface;
 
 class ExAppDeployOptionsService {
@@ -24,7 +23,7 @@ class ExAppDeployOptionsService {
 	public function __construct(
 		private readonly LoggerInterface $logger,
 		private readonly ExAppDeployOptionsMapper $mapper,
-		ICacheFactory $cacheFactory,
+		RegistryCacheFactory $cacheFactory,
 	) {
 		if ($cacheFactory->isAvailable()) {
 			$this->cache = $cacheFactory->createDistributed(Application::APP_ID . '/ex_deploy_options');
@@ -16,7 +16,6 @@ use OCA\AppAPI\PublicFunctions;
 use OCP\AppFramework\Http;
 use OCP\DB\Exception;
 use OCP\ICache;
-use OCP\ICacheFactory;
 use Psr\Container\ContainerInterface;
 use Psr\Log\LoggerInterface;
 use Symfony\Component\Console\Command\Command;
@@ -32,7 +31,7 @@ class ExAppOccService {
 	public function __construct(
 		private readonly LoggerInterface $logger,
 		private readonly ExAppOccCommandMapper $mapper,
-		ICacheFactory $cacheFactory,
+		RegistryCacheFactory $cacheFactory,
 	) {
 		if ($cacheFactory->isAvailable()) {
 			$this->cache = $cacheFactory->createDistributed(Application::APP_ID . '/ex_occ_commands');
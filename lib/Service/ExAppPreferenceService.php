@@ -11,6 +11,7 @@ namespace OCA\AppAPI\Service;
 
 use OCA\AppAPI\Db\ExAppPreference;
 use OCP\Config\IUserConfig;
+use OCP\DB\QueryBuilder\IQueryBuilder;
 use OCP\IDBConnection;
 use Psr\Log\LoggerInterface;
 
@@ -21,6 +22,12 @@ use Psr\Log\LoggerInterface;
  * per user; sensitive values are encrypted by the server via the `FLAG_SENSITIVE` flag.
  */
 readonly class ExAppPreferenceService {
+	/** Maximum number of keys of one bulk get, set or delete */
+	public const BULK_MAX_KEYS = 1000;
+	/** Maximum number of users of one multi-user read, so it cannot be used to scan the whole table */
+	public const USERS_PAGE_MAX = 500;
+	/** Maximum number of keys of one multi-user read */
+	public const USERS_KEYS_MAX = 50;
 
 	public function __construct(
 		private IUserConfig $userConfig,
@@ -38,26 +45,12 @@ readonly class ExAppPreferenceService {
 	public function setUserConfigValue(string $userId, string $appId, string $configKey, mixed $configValue, ?int $sensitive = null): ?ExAppPreference {
 		try {
 			$value = (string)($configValue ?? '');
-			$currentSensitive = $this->userConfig->hasKey($userId, $appId, $configKey, null)
-				&& $this->userConfig->isSensitive($userId, $appId, $configKey, null);
-			$targetSensitive = $sensitive !== null ? (bool)$sensitive : $currentSensitive;
-
-			if ($currentSensitive && !$targetSensitive) {
-				$this->downgradeToPlain($userId, $appId, $configKey, $value);
-			} else {
-				$this->userConfig->setValueString(
-					$userId, $appId, $configKey, $value,
-					lazy: true,
-					flags: $targetSensitive ? IUserConfig::FLAG_SENSITIVE : 0,
-				);
-			}
-
 			return new ExAppPreference([
 				'userid' => $userId,
 				'appid' => $appId,
 				'configkey' => $configKey,
 				'configvalue' => $value,
-				'sensitive' => $targetSensitive ? 1 : 0,
+				'sensitive' => $this->writeValue($userId, $appId, $configKey, $value, $sensitive) ? 1 : 0,
 			]);
 		} catch (\Throwable $e) {
 			$this->logger->error(sprintf('Failed to set user config value for user %s, app %s, config key %s. Error: %s', $userId, $appId, $configKey, $e->getMessage()), ['exception' => $e]);
@@ -65,32 +58,76 @@ readonly class ExAppPreferenceService {
 		}
 	}
 
+	/**
+	 * Create or update several preference values at once, with the same semantics as setUserConfigValue().
+	 *
+	 * All values are written in one transaction: either all of them are set or, on error, none (null is returned).
+	 *
+	 * @param array<string, mixed> $configValues `configkey => configvalue`
+	 * @return array<string, array{configvalue: string, sensitive: int}>|null
+	 */
+	public function setUserConfigMap(string $userId, string $appId, array $configValues, ?int $sensitive = null): ?array {
+		$this->connection->beginTransaction();
+		try {
+			$result = [];
+			foreach ($configValues as $configKey => $configValue) {
+				$value = (string)($configValue ?? '');
+				$result[$configKey] = [
+					'configvalue' => $value,
+					'sensitive' => $this->writeValue($userId, $appId, (string)$configKey, $value, $sensitive) ? 1 : 0,
+				];
+			}
+			$this->connection->commit();
+			return $result;
+		} catch (\Throwable $e) {
+			$this->rollBack($userId);
+			$this->logger->error(sprintf('Failed to set user config values for user %s, app %s. Error: %s', $userId, $appId, $e->getMessage()), ['exception' => $e]);
+			return null;
+		}
+	}
+
 	/**
 	 * Return the values of the requested keys that actually exist, in the shape
 	 * `[['configkey' => ..., 'configvalue' => ...], ...]`. Sensitive values are returned decrypted.
 	 */
 	public function getUserConfigValues(string $userId, string $appId, array $configKeys): ?array {
+		$values = [];
+		foreach ($this->getUserConfigMap($userId, $appId, $configKeys) as $configKey => $configValue) {
+			$values[] = [
+				'configkey' => (string)$configKey,
+				'configvalue' => $configValue,
+			];
+		}
+		return $values;
+	}
+
+	/**
+	 * Return the values of the requested keys that actually exist as a `configkey => configvalue` map,
+	 * in the order of the request. Sensitive values are returned decrypted.
+	 *
+	 * The keys of the user are loaded with a single query, the values are then read from the server's
+	 * in-request cache, so the cost does not grow with a database round trip per key.
+	 *
+	 * @return array<string, string>
+	 */
+	public function getUserConfigMap(string $userId, string $appId, array $configKeys): array {
 		try {
+			$existingKeys = array_flip($this->userConfig->getKeys($userId, $appId));
 			$values = [];
-			// array_unique: a single SQL `IN (...)` used to dedupe; preserve that so duplicate
-			// request keys don't yield duplicate result rows.
-			foreach (array_unique(array_map('strval', $configKeys)) as $configKey) {
-				// `null` lazy matches keys regardless of their lazy flag (e.g. eager values written
-				// through the server-native provisioning_api user-config endpoint).
-				if (!$this->userConfig->hasKey($userId, $appId, $configKey, null)) {
+			foreach (array_map('strval', $configKeys) as $configKey) {
+				if (!isset($existingKeys[$configKey]) || array_key_exists($configKey, $values)) {
 					continue;
 				}
 				try {
-					$lazy = $this->userConfig->isLazy($userId, $appId, $configKey);
-					$configValue = $this->userConfig->getValueString($userId, $appId, $configKey, '', lazy: $lazy);
+					// read with the actual lazy flag, for eager values written through the server-native
+					// provisioning_api user-config endpoint
+					$values[$configKey] = $this->userConfig->getValueString(
+						$userId, $appId, $configKey, '', lazy: $this->userConfig->isLazy($userId, $appId, $configKey)
+					);
 				} catch (\Throwable $e) {
 					$this->logger->warning(sprintf('Failed to read value for user %s, app %s, config key %s', $userId, $appId, $configKey), ['exception' => $e]);
-					$configValue = '';
+					$values[$configKey] = '';
 				}
-				$values[] = [
-					'configkey' => $configKey,
-					'configvalue' => $configValue,
-				];
 			}
 			return $values;
 		} catch (\Throwable $e) {
@@ -99,26 +136,145 @@ readonly class ExAppPreferenceService {
 		}
 	}
 
+	/**
+	 * Return the values of the requested keys for several users, as a `userId => [configkey => configvalue]` map.
+	 * Users without any of the keys are left out. Sensitive values are returned decrypted.
+	 *
+	 * Without `$userIds`, a page of at most `$limit` users that have one of the keys is returned, ordered by
+	 * user ID and starting after `$cursor`; `next_cursor` is then the cursor of the next page, null on the last.
+	 * The values of a page are read with one query; only sensitive values go through IUserConfig to be decrypted.
+	 *
+	 * @param list<string> $userIds at most USERS_PAGE_MAX users
+	 * @return array{values: array<string, array<string, string>>, next_cursor: ?string}|null null on error
+	 */
+	public function getUsersConfigMap(string $appId, array $configKeys, array $userIds = [], string $cursor = '', int $limit = self::USERS_PAGE_MAX): ?array {
+		$configKeys = array_values(array_unique(array_map('strval', $configKeys)));
+		$limit = max(1, min($limit, self::USERS_PAGE_MAX));
+		try {
+			$nextCursor = null;
+			if (empty($userIds)) {
+				$userIds = $this->getUsersWithKeys($appId, $configKeys, $cursor, $limit + 1);
+				if (count($userIds) > $limit) {
+					$userIds = array_slice($userIds, 0, $limit);
+					$nextCursor = end($userIds);
+				}
+			}
+			$userIds = array_values(array_unique(array_map('strval', $userIds)));
+			if (empty($userIds) || empty($configKeys)) {
+				return ['values' => [], 'next_cursor' => $nextCursor];
+			}
+
+			$qb = $this->connection->getQueryBuilder();
+			$qb->select('userid', 'configkey', 'configvalue', 'flags')
+				->from('preferences')
+				->where($qb->expr()->eq('appid', $qb->createNamedParameter($appId, IQueryBuilder::PARAM_STR)))
+				->andWhere($qb->expr()->in('userid', $qb->createNamedParameter($userIds, IQueryBuilder::PARAM_STR_ARRAY)))
+				->andWhere($qb->expr()->in('configkey', $qb->createNamedParameter($configKeys, IQueryBuilder::PARAM_STR_ARRAY)));
+			$result = $qb->executeQuery();
+			$byUser = [];
+			while ($row = $result->fetch()) {
+				$value = (string)$row['configvalue'];
+				if (((int)$row['flags'] & IUserConfig::FLAG_SENSITIVE) !== 0) {
+					// stored encrypted; IUserConfig decrypts it
+					$value = $this->userConfig->getValueString(
+						$row['userid'], $appId, $row['configkey'], '',
+						lazy: $this->userConfig->isLazy($row['userid'], $appId, $row['configkey'])
+					);
+				}
+				$byUser[$row['userid']][$row['configkey']] = $value;
+			}
+			$result->closeCursor();
+
+			$values = [];
+			foreach ($userIds as $userId) {
+				if (isset($byUser[$userId])) {
+					$values[$userId] = $byUser[$userId];
+				}
+			}
+			return ['values' => $values, 'next_cursor' => $nextCursor];
+		} catch (\Throwable $e) {
+			$this->logger->error(sprintf('Failed to get user config values of several users for app %s. Error: %s', $appId, $e->getMessage()), ['exception' => $e]);
+			return null;
+		}
+	}
+
+	/**
+	 * @return list<string> IDs of users that have one of the keys set, after `$cursor` in user ID order
+	 */
+	private function getUsersWithKeys(string $appId, array $configKeys, string $cursor, int $limit): array {
+		$qb = $this->connection->getQueryBuilder();
+		$qb->selectDistinct('userid')
+			->from('preferences')
+			->where($qb->expr()->eq('appid', $qb->createNamedParameter($appId, IQueryBuilder::PARAM_STR)))
+			->andWhere($qb->expr()->in('configkey', $qb->createNamedParameter($configKeys, IQueryBuilder::PARAM_STR_ARRAY)))
+			->orderBy('userid')
+			->setMaxResults($limit);
+		if ($cursor !== '') {
+			$qb->andWhere($qb->expr()->gt('userid', $qb->createNamedParameter($cursor, IQueryBuilder::PARAM_STR)));
+		}
+		$result = $qb->executeQuery();
+		$userIds = [];
+		while (($userId = $result->fetchOne()) !== false) {
+			$userIds[] = (string)$userId;
+		}
+		$result->closeCursor();
+		return $userIds;
+	}
+
 	/**
 	 * Delete the requested keys that exist; returns the number deleted, or -1 on error.
 	 */
 	public function deleteUserConfigValues(array $configKeys, string $userId, string $appId): int {
+		$deleted = $this->deleteUserConfigMap($userId, $appId, $configKeys);
+		return $deleted === null ? -1 : count(array_filter($deleted));
+	}
+
+	/**
+	 * Delete the requested keys that exist, in one transaction.
+	 *
+	 * @return array<string, bool>|null whether each requested key existed and was deleted, null on error
+	 */
+	public function deleteUserConfigMap(string $userId, string $appId, array $configKeys): ?array {
+		$this->connection->beginTransaction();
 		try {
-			$deleted = 0;
-			foreach ($configKeys as $configKey) {
-				$configKey = (string)$configKey;
-				if ($this->userConfig->hasKey($userId, $appId, $configKey, null)) {
+			$existingKeys = array_flip($this->userConfig->getKeys($userId, $appId));
+			$deleted = [];
+			foreach (array_map('strval', $configKeys) as $configKey) {
+				$deleted[$configKey] = isset($existingKeys[$configKey]);
+				if ($deleted[$configKey]) {
 					$this->userConfig->deleteUserConfig($userId, $appId, $configKey);
-					$deleted++;
+					unset($existingKeys[$configKey]);
 				}
 			}
+			$this->connection->commit();
 			return $deleted;
 		} catch (\Throwable $e) {
+			$this->rollBack($userId);
 			$this->logger->error(sprintf('Failed to delete user config values for user %s, app %s. Error: %s', $userId, $appId, $e->getMessage()), ['exception' => $e]);
-			return -1;
+			return null;
 		}
 	}
 
+	/**
+	 * Write a value, keeping the current sensitivity when `$sensitive` is null; returns whether it is sensitive.
+	 */
+	private function writeValue(string $userId, string $appId, string $configKey, string $value, ?int $sensitive): bool {
+		$currentSensitive = $this->userConfig->hasKey($userId, $appId, $configKey, null)
+			&& $this->userConfig->isSensitive($userId, $appId, $configKey, null);
+		$targetSensitive = $sensitive !== null ? (bool)$sensitive : $currentSensitive;
+
+		if ($currentSensitive && !$targetSensitive) {
+			$this->downgradeToPlain($userId, $appId, $configKey, $value);
+		} else {
+			$this->userConfig->setValueString(
+				$userId, $appId, $configKey, $value,
+				lazy: true,
+				flags: $targetSensitive ? IUserConfig::FLAG_SENSITIVE : 0,
+			);
+		}
+		return $targetSensitive;
+	}
+
 	/**
 	 * Turn a currently-sensitive key into a plain value with the new content.
 	 *
@@ -134,12 +290,21 @@ readonly class ExAppPreferenceService {
 			$this->userConfig->setValueString($userId, $appId, $configKey, $value, lazy: true, flags: 0);
 			$this->connection->commit();
 		} catch (\Throwable $e) {
-			try {
-				$this->connection->rollBack();
-			} catch (\Throwable) {
-				// rollBack on an already-aborted transaction is not actionable here.
-			}
+			$this->rollBack($userId);
 			throw $e;
 		}
 	}
+
+	/**
+	 * Roll back the open transaction and drop the user's in-memory config cache,
+	 * which still holds the values written before the failure.
+	 */
+	private function rollBack(string $userId): void {
+		try {
+			$this->connection->rollBack();
+		} catch (\Throwable) {
+			// rollBack on an already-aborted transaction is not actionable here.
+		}
+		$this->userConfig->clearCache($userId);
+	}
 }
@@ -0,0 +1,168 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Service;
+
+use OCA\AppAPI\AppInfo\Application;
+use OCA\AppAPI\Db\ExApp;
+use OCP\Http\Client\IResponse;
+use OCP\IAppConfig;
+use OCP\ICache;
+use OCP\ICacheFactory;
+use OCP\IRequest;
+
+/**
+ * Conditional-request (ETag / Last-Modified) handling for GET requests proxied to ExApps.
+ *
+ * Validators sent by the browser are always forwarded to the ExApp and a `304 Not Modified` answer is
+ * passed back without a body. Optionally (`proxy_validator_cache` app config set to `1`), the validators
+ * of cacheable responses are remembered per (appId, ExApp version, user, path), for as long as the response
+ * is fresh (`s-maxage`, else `max-age`, at most MAX_TTL), so that a revalidation matching them is answered
+ * with `304` by Nextcloud without contacting the ExApp at all. Responses without a freshness lifetime or
+ * with a `Vary` header are never remembered. An ExApp update changes the version and therefore never
+ * serves validators of the previous release.
+ */
+class ExAppProxyValidatorService {
+	public const CONFIG_KEY = 'proxy_validator_cache';
+	private const MAX_TTL = 3600;
+	/** Response headers replayed on a cache-served `304`, as required by RFC 9110 section 15.4.5 */
+	private const REPLAYED_HEADERS = ['ETag', 'Last-Modified', 'Cache-Control', 'Expires'];
+
+	private ?ICache $cache = null;
+
+	public function __construct(
+		private readonly IAppConfig $appConfig,
+		ICacheFactory $cacheFactory,
+	) {
+		if ($cacheFactory->isAvailable()) {
+			$this->cache = $cacheFactory->createDistributed(Application::APP_ID . '/proxy_validators');
+		}
+	}
+
+	public function isCacheEnabled(): bool {
+		return $this->cache !== null
+			&& $this->appConfig->getValueString(Application::APP_ID, self::CONFIG_KEY, '0', lazy: true) === '1';
+	}
+
+	/**
+	 * Headers for a `304` answer if the request revalidates a response whose validators are cached,
+	 * null if the request has to be proxied to the ExApp.
+	 */
+	public function getNotModifiedHeaders(ExApp $exApp, ?string $userId, string $path, array $queryParams, IRequest $request): ?array {
+		if (!$this->isCacheEnabled()) {
+			return null;
+		}
+		$ifNoneMatch = $request->getHeader('If-None-Match');
+		$ifModifiedSince = $request->getHeader('If-Modified-Since');
+		if ($ifNoneMatch === '' && $ifModifiedSince === '') {
+			return null;
+		}
+		$cached = $this->cache->get($this->buildCacheKey($exApp, $userId, $path, $queryParams));
+		if (!is_array($cached)) {
+			return null;
+		}
+		if (!self::isNotModified($ifNoneMatch, $ifModifiedSince, $cached['ETag'] ?? '', $cached['Last-Modified'] ?? '')) {
+			return null;
+		}
+		return $cached;
+	}
+
+	/**
+	 * Remember the validators of a successful, shareable response for its freshness lifetime.
+	 */
+	public function storeValidators(ExApp $exApp, ?string $userId, string $path, array $queryParams, IResponse $response): void {
+		if (!$this->isCacheEnabled() || $response->getStatusCode() !== 200) {
+			return;
+		}
+		if ($response->getHeader('ETag') === '' && $response->getHeader('Last-Modified') === '') {
+			return;
+		}
+		$cacheControl = strtolower($response->getHeader('Cache-Control'));
+		// a response varying on request headers would need their values in the key
+		if ($response->getHeader('Set-Cookie') !== ''
+			|| $response->getHeader('Vary') !== ''
+			|| str_contains($cacheControl, 'no-store')
+			|| str_contains($cacheControl, 'no-cache')
+			|| str_contains($cacheControl, 'private')) {
+			return;
+		}
+		$ttl = min(self::getFreshnessLifetime($cacheControl), self::MAX_TTL);
+		if ($ttl <= 0) {
+			return;
+		}
+		$headers = [];
+		foreach (self::REPLAYED_HEADERS as $name) {
+			$value = $response->getHeader($name);
+			if ($value !== '') {
+				$headers[$name] = $value;
+			}
+		}
+		$this->cache->set($this->buildCacheKey($exApp, $userId, $path, $queryParams), $headers, $ttl);
+	}
+
+	/**
+	 * Seconds a response stays fresh for a shared cache: `s-maxage`, else `max-age`, 0 without either.
+	 */
+	private static function getFreshnessLifetime(string $cacheControl): int {
+		$maxAge = null;
+		foreach (explode(',', $cacheControl) as $directive) {
+			[$name, $value] = array_pad(explode('=', trim($directive), 2), 2, '');
+			$value = trim($value, " \t\"");
+			if (!ctype_digit($value)) {
+				continue;
+			}
+			if ($name === 's-maxage') {
+				return (int)$value;
+			}
+			if ($name === 'max-age') {
+				$maxAge = (int)$value;
+			}
+		}
+		return $maxAge ?? 0;
+	}
+
+	/**
+	 * Evaluate `If-None-Match` / `If-Modified-Since` against stored validators (RFC 9110 section 13.2.2):
+	 * `If-None-Match` takes precedence and uses weak comparison; `If-Modified-Since` is only
+	 * evaluated when `If-None-Match` is absent.
+	 */
+	public static function isNotModified(string $ifNoneMatch, string $ifModifiedSince, string $etag, string $lastModified): bool {
+		if ($ifNoneMatch !== '') {
+			if ($etag === '') {
+				return false;
+			}
+			if (trim($ifNoneMatch) === '*') {
+				return true;
+			}
+			$opaqueTag = self::weakOpaqueTag($etag);
+			foreach (explode(',', $ifNoneMatch) as $candidate) {
+				if (self::weakOpaqueTag($candidate) === $opaqueTag) {
+					return true;
+				}
+			}
+			return false;
+		}
+		if ($ifModifiedSince === '' || $lastModified === '') {
+			return false;
+		}
+		$since = strtotime($ifModifiedSince);
+		$modified = strtotime($lastModified);
+		return $since !== false && $modified !== false && $modified <= $since;
+	}
+
+	private static function weakOpaqueTag(string $etag): string {
+		$etag = trim($etag);
+		return str_starts_with($etag, 'W/') ? substr($etag, 2) : $etag;
+	}
+
+	private function buildCacheKey(ExApp $exApp, ?string $userId, string $path, array $queryParams): string {
+		ksort($queryParams);
+		return sprintf('%s/%s/%s', $exApp->getAppid(), $exApp->getVersion(), md5(($userId ?? '') . '/' . $path . '?' . http_build_query($queryParams)));
+	}
+}
@@ -0,0 +1,120 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Service;
+
+/**
+ * Precompiled route table used by the ExApp proxy to find the route for a request path.
+ *
+ * Instead of building and running one PCRE pattern per route on every proxied request, all routes
+ * accepting a given HTTP method are combined into a single anchored alternation. Each alternative is
+ * tagged with `(*MARK:<index>)`, so one `preg_match` call returns the index of the first route (in
+ * registration order) whose URL regex matches — the same "first match by path+verb wins" semantics
+ * as matching the routes one by one.
+ *
+ * The compiled table is a plain array of strings, so it is stored on the ExApp entity next to its
+ * routes and survives the distributed cache round-trip without being rebuilt.
+ */
+class ExAppRouteMatcher {
+	/** HTTP methods served by ExAppProxyController; other methods fall back to per-route matching */
+	public const METHODS = ['GET', 'POST', 'PUT', 'DELETE'];
+
+	/**
+	 * @param array $routes routes in registration order, as returned by ExAppMapper
+	 * @return array<string, string|null> combined pattern per HTTP method; '' when no route accepts
+	 *                                     the method, null when the combined pattern does not compile
+	 */
+	public static function compile(array $routes): array {
+		$compiled = [];
+		// Backreferences are numbered per pattern, so they cannot be combined into one alternation.
+		$combinable = empty(array_filter($routes, static fn (array $route) => preg_match('/\\\\(?:[1-9]|g|k)/', $route['url']) === 1));
+		foreach (self::METHODS as $method) {
+			$alternatives = [];
+			foreach (array_values($routes) as $index => $route) {
+				if (str_contains(strtolower($route['verb']), strtolower($method))) {
+					$alternatives[] = '(?:' . self::escapeDelimiter($route['url']) . ')(*MARK:' . $index . ')';
+				}
+			}
+			if (empty($alternatives)) {
+				$compiled[$method] = '';
+				continue;
+			}
+			if (!$combinable) {
+				$compiled[$method] = null;
+				continue;
+			}
+			$pattern = '~^(?:' . implode('|', $alternatives) . ')~i';
+			// A single broken route regex (or duplicate named groups across routes) invalidates the whole
+			// alternation, in which case the caller falls back to matching route by route.
+			$compiled[$method] = @preg_match($pattern, '') === false ? null : $pattern;
+		}
+		return $compiled;
+	}
+
+	/**
+	 * Find the first route matching the request path for the given method.
+	 *
+	 * Route URLs are matched against the path with its leading slash first. The legacy bare-path
+	 * subject is tried as well and wins only if it matches an earlier route than the canonical one.
+	 *
+	 * @param array $compiled table built by compile() for the same $routes
+	 * @param array $routes routes in registration order
+	 * @return array{route: array, legacy: bool}|null matching route and whether it matched only via the
+	 *                                                 legacy bare-path fallback; null if no route matched
+	 */
+	public static function match(array $compiled, array $routes, string $method, string $path): ?array {
+		$method = strtoupper($method);
+		$routes = array_values($routes);
+		if (!array_key_exists($method, $compiled) || $compiled[$method] === null) {
+			return self::matchEach($routes, $method, $path);
+		}
+		if ($compiled[$method] === '') {
+			return null;
+		}
+		$canonical = self::firstMatchIndex($compiled[$method], '/' . $path);
+		$legacy = $canonical === 0 ? null : self::firstMatchIndex($compiled[$method], $path);
+		if ($canonical === null && $legacy === null) {
+			return null;
+		}
+		if ($legacy !== null && ($canonical === null || $legacy < $canonical)) {
+			return ['route' => $routes[$legacy], 'legacy' => true];
+		}
+		return ['route' => $routes[$canonical], 'legacy' => false];
+	}
+
+	/**
+	 * Route-by-route matching, used when no usable combined pattern exists for the method.
+	 */
+	private static function matchEach(array $routes, string $method, string $path): ?array {
+		foreach ($routes as $route) {
+			if (!str_contains(strtolower($route['verb']), strtolower($method))) {
+				continue;
+			}
+			$pattern = '~^(?:' . self::escapeDelimiter($route['url']) . ')~i';
+			if (@preg_match($pattern, '/' . $path) === 1) {
+				return ['route' => $route, 'legacy' => false];
+			}
+			if (@preg_match($pattern, $path) === 1) {
+				return ['route' => $route, 'legacy' => true];
+			}
+		}
+		return null;
+	}
+
+	private static function firstMatchIndex(string $pattern, string $subject): ?int {
+		if (preg_match($pattern, $subject, $matches) !== 1 || !isset($matches['MARK'])) {
+			return null;
+		}
+		return (int)$matches['MARK'];
+	}
+
+	private static function escapeDelimiter(string $url): string {
+		return str_replace('~', '\\~', $url);
+	}
+}
@@ -26,8 +26,6 @@ use OCP\AppFramework\Db\DoesNotExistException;
 use OCP\AppFramework\Db\MultipleObjectsReturnedException;
 use OCP\DB\Exception;
 use OCP\ICache;
-use OCP\ICacheFactory;
-use OCP\IConfig;
 use OCP\IUser;
 use OCP\IUserManager;
 use Psr\Container\ContainerExceptionInterface;
@@ -36,12 +34,21 @@ use Psr\Log\LoggerInterface;
 use SimpleXMLElement;
 
 class ExAppService {
+	private const STATUS_CACHE_TTL = 3600;
+	/** seconds an unknown appid is answered from the cache, as the proxy and AppAPIAuth take any appid */
+	private const MISSING_EXAPP_CACHE_TTL = 300;
+	private const INIT_WAIT_MIN_INTERVAL = 0.1; // seconds
+	private const INIT_WAIT_MAX_INTERVAL = 2.0; // seconds, when the status is published in the distributed cache
+	private const INIT_WAIT_MAX_DB_INTERVAL = 5.0; // seconds, when the status has to be read from the database
+
 	private ?ICache $cache = null;
 	private AppAPIService $appAPIService;
+	/** @var array<string, ExApp> per-request lookup map, keyed by appid */
+	private array $exAppsByAppId = [];
 
 	public function __construct(
 		private readonly LoggerInterface $logger,
-		ICacheFactory $cacheFactory,
+		private readonly RegistryCacheFactory $cacheFactory,
 		private readonly IUserManager $userManager,
 		private readonly ExAppFetcher $exAppFetcher,
 		private readonly ExAppArchiveFetcher $exAppArchiveFetcher,
@@ -57,29 +64,76 @@ class ExAppService {
 		private readonly ExAppOccService $occService,
 		private readonly ExAppDeployOptionsService $deployOptionsService,
 		private readonly ExAppSetupCheckService $setupCheckService,
-		private readonly IConfig $config,
 	) {
 		if ($cacheFactory->isAvailable()) {
-			$distributedCacheClass = ltrim($config->getSystemValueString('memcache.distributed', ''), '\\');
-			$localCacheClass = ltrim($config->getSystemValueString('memcache.local', ''), '\\');
-			if (
-				($distributedCacheClass === '' && $localCacheClass !== \OC\Memcache\APCu::class)
-				|| ($distributedCacheClass !== '' && $distributedCacheClass !== \OC\Memcache\APCu::class)
-			) {
-				$this->cache = $cacheFactory->createDistributed(Application::APP_ID . '/service');
-			}
+			$this->cache = $cacheFactory->createDistributed(Application::APP_ID . '/service');
 		}
 		$this->taskProcessingService->setExAppService($this);
 	}
 
+	/**
+	 * Get registered ExApp by appid.
+	 *
+	 * Lookups are served from a per-request map first, then from the per-appid distributed cache entry,
+	 * and only then from the database, so the cost does not depend on the number of registered ExApps.
+	 * Unknown appids are cached too, for MISSING_EXAPP_CACHE_TTL seconds.
+	 * A copy is returned each time, so callers can modify it without affecting subsequent lookups.
+	 */
 	public function getExApp(string $appId): ?ExApp {
-		foreach ($this->getExApps() as $exApp) {
-			if ($exApp->getAppid() === $appId) {
-				return $exApp;
+		if (!isset($this->exAppsByAppId[$appId])) {
+			$exApp = $this->loadExApp($appId);
+			if ($exApp === null) {
+				$this->logger->debug(sprintf('ExApp "%s" not found.', $appId));
+				return null;
 			}
+			$this->exAppsByAppId[$appId] = $exApp;
 		}
-		$this->logger->debug(sprintf('ExApp "%s" not found.', $appId));
-		return null;
+		return clone $this->exAppsByAppId[$appId];
+	}
+
+	/**
+	 * Whether the ExApp is still registered, bypassing the per-request map: for long-running loops
+	 * (e.g. the heartbeat) while the ExApp may be unregistered by another process.
+	 */
+	public function isExAppRegistered(string $appId): bool {
+		return $this->loadExApp($appId) !== null;
+	}
+
+	private function loadExApp(string $appId): ?ExApp {
+		$cacheKey = '/ex_app/' . $appId;
+		$record = $this->cache?->get($cacheKey);
+		if ($record === false) {
+			return null;
+		}
+		if ($record !== null) {
+			return $record instanceof ExApp ? $record : new ExApp($record);
+		}
+		try {
+			$exApp = $this->exAppMapper->findByAppId($appId);
+		} catch (DoesNotExistException) {
+			// registerExApp() removes the marker through invalidateExAppCache()
+			$this->cache?->set($cacheKey, false, self::MISSING_EXAPP_CACHE_TTL);
+			return null;
+		} catch (Exception|MultipleObjectsReturnedException $e) {
+			$this->logger->error(sprintf('Error while getting ExApp %s: %s', $appId, $e->getMessage()), ['exception' => $e]);
+			return null;
+		}
+		// compiled once per cache fill and shared through the cache entry, not on every request
+		$exApp->setCompiledRoutes(ExAppRouteMatcher::compile($exApp->getRoutes()));
+		$this->cache?->set($cacheKey, $exApp);
+		return $exApp;
+	}
+
+	/**
+	 * Drop the ExApps list and the given ExApp entries from the distributed cache and the per-request map.
+	 */
+	private function invalidateExAppCache(string $appId): void {
+		unset($this->exAppsByAppId[$appId]);
+		$this->cacheFactory->batch(function () use ($appId) {
+			$this->cache?->remove('/ex_app/' . $appId);
+			$this->cache?->remove('/ex_app_status/' . $appId);
+			$this->cache?->remove('/ex_apps');
+		});
 	}
 
 	public function registerExApp(array $appInfo): ?ExApp {
@@ -96,9 +150,11 @@ class ExAppService {
 		try {
 			$this->exAppMapper->insert($exApp);
 			$exApp = $this->exAppMapper->findByAppId($appInfo['id']);
-			$this->cache?->remove('/ex_apps');
+			$this->invalidateExAppCache($appInfo['id']);
 			if (isset($appInfo['external-app']['routes'])) {
-				$exApp->setRoutes($this->registerExAppRoutes($exApp, $appInfo['external-app']['routes'])->getRoutes() ?? []);
+				$exAppWithRoutes = $this->registerExAppRoutes($exApp, $appInfo['external-app']['routes']);
+				$exApp->setRoutes($exAppWithRoutes?->getRoutes() ?? []);
+				$exApp->setCompiledRoutes($exAppWithRoutes?->getCompiledRoutes() ?? ExAppRouteMatcher::compile([]));
 			}
 			return $exApp;
 		} catch (Exception|MultipleObjectsReturnedException|DoesNotExistException $e) {
@@ -133,7 +189,7 @@ class ExAppService {
 		if ($rmRoutes === null) {
 			$this->logger->error(sprintf('Error while unregistering %s ExApp routes from the database.', $appId));
 		}
-		$this->cache?->remove('/ex_apps');
+		$this->invalidateExAppCache($appId);
 		return $r === 1 && $rmRoutes !== null;
 	}
 
@@ -214,14 +270,18 @@ class ExAppService {
 	public function updateExApp(ExApp $exApp, array $fields = ['version', 'name', 'port', 'status', 'enabled']): bool {
 		try {
 			$this->exAppMapper->updateExApp($exApp, $fields);
-			$this->cache?->remove('/ex_apps');
+			$this->invalidateExAppCache($exApp->getAppid());
+			if (in_array('status', $fields)) {
+				// published for waitInitStepFinish, which then does not need to load the whole ExApp
+				$this->cache?->set('/ex_app_status/' . $exApp->getAppid(), $exApp->getStatus(), self::STATUS_CACHE_TTL);
+			}
 			if (in_array('enabled', $fields) || in_array('version', $fields)) {
 				$this->resetCaches();
 			}
 			return true;
 		} catch (Exception $e) {
 			$this->logger->error(sprintf('Failed to update "%s" ExApp info.', $exApp->getAppid()), ['exception' => $e]);
-			$this->cache?->remove('/ex_apps');
+			$this->invalidateExAppCache($exApp->getAppid());
 			$this->resetCaches();
 		}
 		return false;
@@ -244,11 +304,14 @@ class ExAppService {
 	}
 
 	private function resetCaches(): void {
-		$this->topMenuService->resetCacheEnabled();
-		$this->filesActionsMenuService->resetCacheEnabled();
-		$this->settingsService->resetCacheEnabled();
-		$this->occService->resetCacheEnabled();
-		$this->deployOptionsService->resetCache();
+		$this->cacheFactory->batch(function () {
+			$this->topMenuService->resetCacheEnabled();
+			$this->filesActionsMenuService->resetCacheEnabled();
+			$this->settingsService->resetCacheEnabled();
+			$this->occService->resetCacheEnabled();
+			$this->taskProcessingService->resetCacheEnabled();
+			$this->deployOptionsService->resetCache();
+		});
 	}
 
 	public function getAppInfo(string $appId, ?string $infoXml, ?string $jsonInfo, ?array $deployOptions = null): array {
@@ -370,16 +433,46 @@ class ExAppService {
 		$this->updateExApp($exApp, ['status']);
 	}
 
-	public function waitInitStepFinish(string $appId): string {
-		do {
-			$exApp = $this->getExApp($appId);
-			$status = $exApp->getStatus();
+	/**
+	 * Wait until the ExApp reports its initialization step as finished, returning an error message if it failed.
+	 *
+	 * Every status update of an ExApp is published to the distributed cache (see updateExApp), so waiting reads
+	 * one small cache entry instead of the ExApp; without a distributed cache the ExApp is read from the database.
+	 * The status is checked again soon after it changed and then less and less often while it stays the same.
+	 *
+	 * @param (\Closure(int): void)|null $onProgress called with the init progress whenever it changed
+	 */
+	public function waitInitStepFinish(string $appId, ?\Closure $onProgress = null): string {
+		$maxInterval = $this->cache !== null ? self::INIT_WAIT_MAX_INTERVAL : self::INIT_WAIT_MAX_DB_INTERVAL;
+		$interval = self::INIT_WAIT_MIN_INTERVAL;
+		$lastProgress = null;
+		while (true) {
+			// init progress is written by the ExApp in another request, so do not rely on the per-request map
+			$status = $this->cache?->get('/ex_app_status/' . $appId);
+			if (!is_array($status)) {
+				$status = $this->loadExApp($appId)?->getStatus();
+				if ($status === null) {
+					return sprintf('ExApp %s initialization step failed. Error: ExApp not found', $appId);
+				}
+			}
 			if (isset($status['error']) && $status['error'] !== '') {
 				return sprintf('ExApp %s initialization step failed. Error: %s', $appId, $status['error']);
 			}
-			usleep(100000); // 0.1s
-		} while ($status['init'] !== 100);
-		return '';
+			$progress = (int)($status['init'] ?? 0);
+			if ($progress !== $lastProgress) {
+				if ($onProgress !== null) {
+					$onProgress($progress);
+				}
+				$lastProgress = $progress;
+				$interval = self::INIT_WAIT_MIN_INTERVAL;
+			} else {
+				$interval = min($interval * 1.5, $maxInterval);
+			}
+			if ($progress === 100) {
+				return '';
+			}
+			usleep((int)($interval * 1000000));
+		}
 	}
 
 	public function setStatusError(ExApp $exApp, string $error): void {
@@ -414,7 +507,10 @@ class ExAppService {
 	public function registerExAppRoutes(ExApp $exApp, array $routes): ?ExApp {
 		try {
 			$this->exAppMapper->registerExAppRoutes($exApp, $routes);
-			return $this->exAppMapper->findByAppId($exApp->getAppid());
+			$this->invalidateExAppCache($exApp->getAppid());
+			$exApp = $this->exAppMapper->findByAppId($exApp->getAppid());
+			$exApp->setCompiledRoutes(ExAppRouteMatcher::compile($exApp->getRoutes()));
+			return $exApp;
 		} catch (Exception|MultipleObjectsReturnedException|DoesNotExistException $e) {
 			$this->logger->error(sprintf('Error while registering ExApp %s routes: %s. Routes: %s', $exApp->getAppid(), $e->getMessage(), json_encode($routes)));
 			return null;
@@ -424,7 +520,9 @@ class ExAppService {
 	public function removeExAppRoutes(ExApp $exApp): ?ExApp {
 		try {
 			$this->exAppMapper->removeExAppRoutes($exApp);
+			$this->invalidateExAppCache($exApp->getAppid());
 			$exApp->setRoutes([]);
+			$exApp->setCompiledRoutes(ExAppRouteMatcher::compile([]));
 			return $exApp;
 		} catch (Exception) {
 			return null;
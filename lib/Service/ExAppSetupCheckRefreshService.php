@@ -9,8 +9,11 @@ declare(strict_types=1);
 
 namespace OCA\AppAPI\Service;
 
+use OCA\AppAPI\AppInfo\Application;
 use OCA\AppAPI\Db\ExApp;
+use OCP\Http\Client\IPromise;
 use OCP\Http\Client\IResponse;
+use OCP\IAppConfig;
 use OCP\IL10N;
 use Psr\Log\LoggerInterface;
 
@@ -21,6 +24,9 @@ use Psr\Log\LoggerInterface;
  * admin opens the page), so a slow/down/errored ExApp can never slow the page - it only costs time
  * here. It catches all its own errors and never throws.
  *
+ * Probes are sent concurrently (up to `setup_check_concurrency` at a time), so a sweep takes roughly as
+ * long as the slowest ExApp instead of the sum of all of them.
+ *
  * Text produced here is in the server-default language (there is no viewer in a background job);
  * ExApp-provided text is monolingual either way. All ExApp-provided values are length-capped and the
  * link URL is validated; HTML-escaping happens at render time in the SetupCheck.
@@ -30,6 +36,8 @@ class ExAppSetupCheckRefreshService {
 	private const MAX_RESPONSE_BYTES = 262144; // 256 KiB
 	private const MAX_RESPONSE_ENTRIES = 1000;
 	private const MAX_TEXT_LENGTH = 4096;
+	public const CONCURRENCY_KEY = 'setup_check_concurrency';
+	private const DEFAULT_CONCURRENCY = 10;
 
 	public function __construct(
 		private readonly IL10N $l10n,
@@ -37,6 +45,7 @@ class ExAppSetupCheckRefreshService {
 		private readonly ExAppSetupCheckService $setupCheckService,
 		private readonly ExAppService $exAppService,
 		private readonly AppAPIService $appAPIService,
+		private readonly IAppConfig $appConfig,
 		// wall-clock budget for the whole sweep; injectable so tests can force a partial sweep
 		private readonly float $totalBudgetSeconds = 120.0,
 	) {
@@ -47,7 +56,11 @@ class ExAppSetupCheckRefreshService {
 			// Carry-over source: a partial sweep (time budget) must NOT clear the issues of apps it did
 			// not reach this run, or the admin Overview would briefly flip them to healthy.
 			$previous = $this->setupCheckService->getState()['apps'];
-			$appsState = [];
+			$concurrency = $this->getConcurrency();
+			/** @var array<string, list<array<string, string>>> $results issues per app id, in opted-in order */
+			$results = [];
+			/** @var array<string, array{0: ExApp, 1: IPromise|null}> $inFlight */
+			$inFlight = [];
 			$start = microtime(true);
 			$budgetHit = false;
 			foreach ($this->setupCheckService->getOptedInAppIds() as $appId) {
@@ -55,38 +68,52 @@ class ExAppSetupCheckRefreshService {
 				if ($exApp === null || $exApp->getEnabled() !== 1 || $this->isInitializing($exApp)) {
 					continue; // disabled / deploying -> dropped (down-ness shown on the management page)
 				}
+				while (!$budgetHit && count($inFlight) >= $concurrency) {
+					$this->settle($inFlight, $results);
+				}
 				if ($budgetHit || (microtime(true) - $start) > $this->totalBudgetSeconds) {
 					if (!$budgetHit) {
 						$this->logger->info('ExApp setup-check refresh budget exceeded; unvisited apps keep their previous results this run');
 						$budgetHit = true;
 					}
 					if (isset($previous[$appId]) && is_array($previous[$appId])) {
-						$appsState[$appId] = $previous[$appId]; // stale-but-present beats vanishing
+						$results[$appId] = $previous[$appId]; // stale-but-present beats vanishing
 					}
 					continue;
 				}
-				$issues = $this->probe($exApp);
-				if ($issues !== []) {
-					$appsState[$appId] = $issues;
-				}
+				$results[$appId] = [];
+				$inFlight[$appId] = [$exApp, $this->startProbe($exApp)];
+			}
+			// probes already sent are bounded by PER_APP_TIMEOUT_SECONDS, so they are always awaited
+			while ($inFlight !== []) {
+				$this->settle($inFlight, $results);
 			}
-			$this->setupCheckService->storeState($appsState);
+			$this->setupCheckService->storeState(array_filter($results, static fn (array $issues): bool => $issues !== []));
 		} catch (\Throwable $e) {
 			$this->logger->error('ExApp setup-check refresh failed', ['exception' => $e]);
 		}
 	}
 
+	/**
+	 * Number of `/setup_checks` probes sent at the same time (`setup_check_concurrency`, at least 1).
+	 */
+	private function getConcurrency(): int {
+		return max(1, (int)$this->appConfig->getValueString(
+			Application::APP_ID, self::CONCURRENCY_KEY, (string)self::DEFAULT_CONCURRENCY, lazy: true
+		));
+	}
+
 	private function isInitializing(ExApp $exApp): bool {
 		$status = $exApp->getStatus();
 		return ((int)($status['init'] ?? 100)) < 100 || (($status['action'] ?? '') === 'init');
 	}
 
 	/**
-	 * @return list<array{severity: string, appName: string, text: string, linkUrl: string, linkLabel: string}>
+	 * @return IPromise|null null if the request could not even be started (reported as not responding)
 	 */
-	private function probe(ExApp $exApp): array {
+	private function startProbe(ExApp $exApp): ?IPromise {
 		try {
-			$result = $this->appAPIService->requestToExApp(
+			return $this->appAPIService->requestToExAppAsync(
 				$exApp,
 				'/setup_checks',
 				null,
@@ -96,13 +123,53 @@ class ExAppSetupCheckRefreshService {
 			);
 		} catch (\Throwable $e) {
 			$this->logger->warning('ExApp setup-check: error probing ExApp ' . $exApp->getAppid(), ['exception' => $e]);
-			return [$this->notRespondingIssue($exApp)];
+			return null;
+		}
+	}
+
+	/**
+	 * Wait for the oldest in-flight probe, then collect every other probe that completed meanwhile.
+	 * All probes share one curl multi handle (ExAppClientPool::getAsyncClient), whatever the daemon of
+	 * their ExApp, so waiting on one of them drives the others too.
+	 *
+	 * @param array<string, array{0: ExApp, 1: IPromise|null}> $inFlight
+	 * @param array<string, list<array<string, string>>> $results
+	 */
+	private function settle(array &$inFlight, array &$results): void {
+		$oldest = array_key_first($inFlight);
+		$results[$oldest] = $this->collect(...$inFlight[$oldest]);
+		unset($inFlight[$oldest]);
+		foreach ($inFlight as $appId => [$exApp, $promise]) {
+			if ($promise === null || $promise->getState() !== IPromise::STATE_PENDING) {
+				$results[$appId] = $this->collect($exApp, $promise);
+				unset($inFlight[$appId]);
+			}
 		}
+	}
 
-		if (is_array($result)) {
-			return [$this->notRespondingIssue($exApp)]; // transport error -> ['error' => ...]
+	/**
+	 * @return list<array{severity: string, appName: string, text: string, linkUrl: string, linkLabel: string}>
+	 */
+	private function collect(ExApp $exApp, ?IPromise $promise): array {
+		if ($promise === null) {
+			return [$this->notRespondingIssue($exApp)];
+		}
+		try {
+			$result = $promise->wait();
+		} catch (\Throwable $e) {
+			// transport error / timeout (already logged by requestToExAppAsync)
+			return [$this->notRespondingIssue($exApp)];
+		}
+		if (!$result instanceof IResponse) {
+			return [$this->notRespondingIssue($exApp)];
 		}
-		/** @var IResponse $result */
+		return $this->evaluateResponse($exApp, $result);
+	}
+
+	/**
+	 * @return list<array{severity: string, appName: string, text: string, linkUrl: string, linkLabel: string}>
+	 */
+	private function evaluateResponse(ExApp $exApp, IResponse $result): array {
 		$status = $result->getStatusCode();
 		if ($status < 200 || $status >= 300) {
 			return [$this->notRespondingIssue($exApp)];
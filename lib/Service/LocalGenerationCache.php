@@ -0,0 +1,65 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Service;
+
+use OCP\ICache;
+
+/**
+ * Local (APCu) cache whose entries are keyed with the generation of its prefix in RegistryCacheFactory.
+ *
+ * Removing or clearing entries drops them from the local cache and replaces the generation of the prefix,
+ * so the entries of other processes become unreachable and expire with their TTL. A process that read
+ * the generation before it was replaced can only store entries under the old generation, so it cannot
+ * bring back stale values.
+ */
+class LocalGenerationCache implements ICache {
+	/** entries of old generations are never read again, they should not stay in APCu forever */
+	private const MAX_TTL = 86400;
+
+	public function __construct(
+		private readonly ICache $cache,
+		private readonly RegistryCacheFactory $registryCacheFactory,
+		private readonly string $cachePrefix,
+	) {
+	}
+
+	public function get($key) {
+		return $this->cache->get($this->prefix($key));
+	}
+
+	public function set($key, $value, $ttl = 0) {
+		$ttl = $ttl > 0 ? min($ttl, self::MAX_TTL) : self::MAX_TTL;
+		return $this->cache->set($this->prefix($key), $value, $ttl);
+	}
+
+	public function hasKey($key) {
+		return $this->cache->hasKey($this->prefix($key));
+	}
+
+	public function remove($key) {
+		$this->cache->remove($this->prefix($key));
+		$this->registryCacheFactory->bumpGeneration($this->cachePrefix);
+		return true;
+	}
+
+	public function clear($prefix = '') {
+		$this->cache->clear();
+		$this->registryCacheFactory->bumpGeneration($this->cachePrefix);
+		return true;
+	}
+
+	public static function isAvailable(): bool {
+		return true;
+	}
+
+	private function prefix(string $key): string {
+		return $this->registryCacheFactory->getGeneration($this->cachePrefix) . '/' . $key;
+	}
+}
@@ -9,28 +9,38 @@ declare(strict_types=1);
 
 namespace OCA\AppAPI\Service\ProvidersAI;
 
-use JsonException;
 use OCA\AppAPI\AppInfo\Application;
 use OCA\AppAPI\Db\TaskProcessing\TaskProcessingProvider;
 use OCA\AppAPI\Db\TaskProcessing\TaskProcessingProviderMapper;
 use OCA\AppAPI\Service\AppAPIService;
 use OCA\AppAPI\Service\ExAppService;
+use OCA\AppAPI\Service\RegistryCacheFactory;
 use OCP\AppFramework\Bootstrap\IRegistrationContext;
 use OCP\AppFramework\Db\DoesNotExistException;
 use OCP\AppFramework\Db\MultipleObjectsReturnedException;
 use OCP\DB\Exception;
 use OCP\ICache;
-use OCP\ICacheFactory;
+use OCP\IMemcache;
 use OCP\IServerContainer;
 use OCP\TaskProcessing\EShapeType;
+use OCP\TaskProcessing\Exception\Exception as TaskProcessingException;
+use OCP\TaskProcessing\Exception\NotFoundException;
+use OCP\TaskProcessing\IManager;
 use OCP\TaskProcessing\IProvider;
 use OCP\TaskProcessing\ITaskType;
 use OCP\TaskProcessing\ITriggerableProvider;
 use OCP\TaskProcessing\ShapeDescriptor;
 use OCP\TaskProcessing\ShapeEnumValue;
+use OCP\TaskProcessing\Task;
 use Psr\Log\LoggerInterface;
 
 class TaskProcessingService {
+	private const CACHE_TTL = 86400;
+	/** upper limit of a provider's `max_batch_size` and of the tasks claimed or reported in one request */
+	public const BATCH_MAX_SIZE = 100;
+	/** seconds during which further triggers of a batch provider are coalesced into the first one */
+	public const BATCH_TRIGGER_WINDOW = 2;
+
 	private ?ICache $cache = null;
 	private ?array $registeredProviders = null;
 
@@ -38,9 +48,10 @@ class TaskProcessingService {
 	private ExAppService $exAppService;
 
 	public function __construct(
-		ICacheFactory $cacheFactory,
+		RegistryCacheFactory $cacheFactory,
 		private readonly TaskProcessingProviderMapper $mapper,
 		private readonly LoggerInterface $logger,
+		private readonly IManager $taskProcessingManager,
 	) {
 		if ($cacheFactory->isAvailable()) {
 			$this->cache = $cacheFactory->createDistributed(Application::APP_ID . '/ex_task_processing_providers');
@@ -65,12 +76,7 @@ class TaskProcessingService {
 			if ($this->registeredProviders !== null) {
 				return $this->registeredProviders;
 			}
-			$cacheKey = '/ex_task_processing_providers';
-			$records = $this->cache?->get($cacheKey);
-			if ($records === null) {
-				$records = $this->mapper->findAllEnabled();
-				$this->cache?->set($cacheKey, $records);
-			}
+			$records = $this->cache === null ? $this->mapper->findAllEnabled() : $this->getEnabledProviderRecords();
 
 			return $this->registeredProviders = array_map(static function ($record) {
 				return new TaskProcessingProvider($record);
@@ -81,16 +87,87 @@ class TaskProcessingService {
 	}
 
 	public function getExAppTaskProcessingProvider(string $appId, string $name): ?TaskProcessingProvider {
-		foreach ($this->getRegisteredTaskProcessingProviders() as $provider) {
-			if (($provider->getAppId() === $appId) && ($provider->getName() === $name)) {
-				return $provider;
+		try {
+			foreach ($this->getAppProviderRecords($appId) as $record) {
+				if ($record['name'] === $name) {
+					return new TaskProcessingProvider($record);
+				}
 			}
+		} catch (Exception $e) {
+			$this->logger->error(sprintf('Failed to load TaskProcessing providers of ExApp %s: %s', $appId, $e->getMessage()), ['exception' => $e]);
 		}
-		try {
-			return $this->mapper->findByAppIdName($appId, $name);
-		} catch (DoesNotExistException|MultipleObjectsReturnedException|Exception) {
-			return null;
+		return null;
+	}
+
+	/**
+	 * Providers of all enabled ExApps as database rows, assembled from the per-ExApp entries.
+	 *
+	 * The assembled list shares the version of the enabled ExApps list, which every provider change
+	 * replaces too (see resetCacheForApp), so that a warm listing reads two cache entries only.
+	 *
+	 * @throws Exception
+	 */
+	private function getEnabledProviderRecords(): array {
+		$version = $this->getCacheVersion('/apps');
+		$records = $this->cache?->get('/enabled/' . $version);
+		if ($records === null) {
+			$records = [];
+			foreach ($this->getEnabledAppIds($version) as $appId) {
+				array_push($records, ...$this->getAppProviderRecords($appId));
+			}
+			$this->cache?->set('/enabled/' . $version, $records, self::CACHE_TTL);
+		}
+		return $records;
+	}
+
+	/**
+	 * IDs of the enabled ExApps that registered TaskProcessing providers.
+	 *
+	 * @return string[]
+	 * @throws Exception
+	 */
+	private function getEnabledAppIds(string $version): array {
+		$appIds = $this->cache?->get('/apps/' . $version);
+		if ($appIds === null) {
+			$appIds = $this->mapper->findEnabledAppIds();
+			$this->cache?->set('/apps/' . $version, $appIds, self::CACHE_TTL);
+		}
+		return $appIds;
+	}
+
+	/**
+	 * Providers of one ExApp (enabled or not) as database rows.
+	 *
+	 * @throws Exception
+	 */
+	private function getAppProviderRecords(string $appId): array {
+		$cacheKey = '/app/' . $appId . '/' . $this->getCacheVersion('/app/' . $appId);
+		$records = $this->cache?->get($cacheKey);
+		if ($records === null) {
+			$records = $this->mapper->findAllByAppId($appId);
+			$this->cache?->set($cacheKey, $records, self::CACHE_TTL);
+		}
+		return $records;
+	}
+
+	/**
+	 * Cache entries are keyed with a version that is replaced on invalidation, instead of being removed:
+	 * a request that read the database before a change can then only store its result under the old
+	 * version, which is never read again, rather than bring back stale providers.
+	 * The version is removed rather than overwritten, so that the local registry cache used without
+	 * a distributed cache (see RegistryCacheFactory) invalidates it in all processes.
+	 */
+	private function getCacheVersion(string $name): string {
+		$version = $this->cache?->get('/version' . $name);
+		if ($version === null) {
+			$version = bin2hex(random_bytes(8));
+			$this->cache?->set('/version' . $name, $version);
 		}
+		return $version;
+	}
+
+	private function bumpCacheVersion(string $name): void {
+		$this->cache?->remove('/version' . $name);
 	}
 
 	private function everyElementHasKeys(?array $array, array $keys): bool {
@@ -169,6 +246,10 @@ class TaskProcessingService {
 		if (!$this->everyElementHasKeys($provider['optional_output_shape_enum_values'], ['name', 'value'])) {
 			throw new Exception('"optional_output_shape_enum_values" should be an array and must have "name" and "value" keys');
 		}
+		if (isset($provider['max_batch_size'])
+			&& (!is_int($provider['max_batch_size']) || $provider['max_batch_size'] < 1 || $provider['max_batch_size'] > self::BATCH_MAX_SIZE)) {
+			throw new Exception(sprintf('"max_batch_size" key must be an integer between 1 and %d', self::BATCH_MAX_SIZE));
+		}
 	}
 
 	public function registerTaskProcessingProvider(
@@ -216,7 +297,7 @@ class TaskProcessingService {
 			}
 
 			$taskProcessingProvider = $this->mapper->insertOrUpdate($newTaskProcessingProvider);
-			$this->resetCacheEnabled();
+			$this->resetCacheForApp($appId);
 		} catch (Exception $e) {
 			$this->logger->error(
 				sprintf('Failed to register ExApp "%s" TaskProcessingProvider "%s". Error: %s', $appId, $name, $e->getMessage()), ['exception' => $e]
@@ -231,7 +312,7 @@ class TaskProcessingService {
 			$taskProcessingProvider = $this->getExAppTaskProcessingProvider($appId, $name);
 			if ($taskProcessingProvider !== null) {
 				$this->mapper->delete($taskProcessingProvider);
-				$this->resetCacheEnabled();
+				$this->resetCacheForApp($appId);
 				return $taskProcessingProvider;
 			}
 		} catch (Exception $e) {
@@ -240,8 +321,115 @@ class TaskProcessingService {
 		return null;
 	}
 
+	/**
+	 * Notify the ExApp that tasks are scheduled for its provider.
+	 *
+	 * A provider with a `max_batch_size` above 1 is triggered once per BATCH_TRIGGER_WINDOW; it claims the
+	 * scheduled tasks with claimTaskBatch() and is expected to keep claiming batches until none is left,
+	 * which picks up the tasks whose triggers were coalesced.
+	 */
+	public function triggerExAppProvider(TaskProcessingProvider $exAppProvider, int $maxBatchSize): void {
+		$exApp = $this->exAppService->getExApp($exAppProvider->getAppId());
+		if ($exApp === null) {
+			return;
+		}
+		if ($maxBatchSize > 1 && !$this->startTriggerWindow($exAppProvider)) {
+			return;
+		}
+		$this->appAPIService->requestToExApp($exApp, '/trigger?' . http_build_query(['providerId' => $exAppProvider->getName()]));
+	}
+
+	/**
+	 * True for the first trigger of the provider within the window.
+	 */
+	private function startTriggerWindow(TaskProcessingProvider $exAppProvider): bool {
+		$cacheKey = '/trigger/' . $exAppProvider->getAppId() . '/' . $exAppProvider->getName();
+		if ($this->cache instanceof IMemcache) {
+			return $this->cache->add($cacheKey, 1, self::BATCH_TRIGGER_WINDOW);
+		}
+		if ($this->cache?->get($cacheKey) !== null) {
+			return false;
+		}
+		$this->cache?->set($cacheKey, 1, self::BATCH_TRIGGER_WINDOW);
+		return true;
+	}
+
+	/**
+	 * Claim up to `$limit` of the oldest scheduled tasks for an ExApp provider, marking them as running.
+	 * Tasks are only handed out while the provider is the preferred one of its task type. The tasks are
+	 * read with one query; another one is only needed to replace tasks claimed meanwhile by another request.
+	 *
+	 * @return list<array<string, mixed>>|null serialized tasks, null if the provider does not exist
+	 */
+	public function claimTaskBatch(string $appId, string $name, int $limit): ?array {
+		$exAppProvider = $this->getExAppTaskProcessingProvider($appId, $name);
+		if ($exAppProvider === null) {
+			return null;
+		}
+		$taskTypeId = $exAppProvider->getTaskType();
+		$maxBatchSize = json_decode($exAppProvider->getProvider(), true)['max_batch_size'] ?? 1;
+		$limit = min($limit, $maxBatchSize);
+		$tasks = [];
+		try {
+			if ($this->taskProcessingManager->getPreferredProvider($taskTypeId)->getId() !== $name) {
+				return [];
+			}
+			$seenTaskIds = [];
+			while (count($tasks) < $limit) {
+				$wanted = $limit - count($tasks);
+				$scheduledTasks = $this->taskProcessingManager->getNextScheduledTasks([$taskTypeId], $seenTaskIds, $wanted);
+				foreach ($scheduledTasks as $task) {
+					$seenTaskIds[] = $task->getId();
+					if ($this->taskProcessingManager->lockTask($task)) {
+						$tasks[] = $task;
+					}
+				}
+				if (count($scheduledTasks) < $wanted) {
+					break; // no more scheduled tasks
+				}
+			}
+		} catch (TaskProcessingException $e) {
+			$this->logger->error(sprintf('Failed to claim tasks for ExApp "%s" TaskProcessing provider "%s"', $appId, $name), ['exception' => $e]);
+		}
+		return array_map(static fn (Task $task) => $task->jsonSerialize(), $tasks);
+	}
+
+	/**
+	 * Report the results of several tasks of an ExApp provider at once.
+	 * Every result is `{output?: array, error_message?: string}`, outputs reference files by their IDs
+	 * as with the single-task endpoint of the server.
+	 *
+	 * @param array<int, array{output?: ?array, error_message?: ?string}> $results results by task ID
+	 * @return array<int, bool>|null whether each result was stored, null if the provider does not exist
+	 */
+	public function setTaskResults(string $appId, string $name, array $results): ?array {
+		$exAppProvider = $this->getExAppTaskProcessingProvider($appId, $name);
+		if ($exAppProvider === null) {
+			return null;
+		}
+		$stored = [];
+		foreach ($results as $taskId => $result) {
+			$taskId = (int)$taskId;
+			try {
+				$task = $this->taskProcessingManager->getTask($taskId);
+				if ($task->getTaskTypeId() !== $exAppProvider->getTaskType() || $task->getStatus() !== Task::STATUS_RUNNING) {
+					$stored[$taskId] = false;
+					continue;
+				}
+				$errorMessage = $result['error_message'] ?? null;
+				$this->taskProcessingManager->setTaskResult($taskId, $errorMessage, $errorMessage === null ? ($result['output'] ?? null) : null, true);
+				$stored[$taskId] = true;
+			} catch (NotFoundException|TaskProcessingException $e) {
+				$this->logger->warning(sprintf('Failed to set the result of task %d for ExApp "%s" TaskProcessing provider "%s"', $taskId, $appId, $name), ['exception' => $e]);
+				$stored[$taskId] = false;
+			}
+		}
+		return $stored;
+	}
+
 	/**
 	 * Register dynamically ExApps TaskProcessing providers with ID using anonymous classes.
+	 * Only the class names are registered here, a provider is created when it is first resolved.
 	 *
 	 * @param IRegistrationContext $context
 	 * @param IServerContainer $serverContainer
@@ -254,106 +442,98 @@ class TaskProcessingService {
 			/** @var class-string<IProvider> $className */
 			$className = '\\OCA\\AppAPI\\' . $exAppProvider->getAppId() . '\\' . $exAppProvider->getName();
 
-			try {
-				$provider = $this->getAnonymousExAppProvider(json_decode($exAppProvider->getProvider(), true, flags: JSON_THROW_ON_ERROR), $exAppProvider->getAppId());
-			} catch (JsonException $e) {
-				$this->logger->debug('Failed to register ExApp TaskProcessing provider', ['exAppId' => $exAppProvider->getAppId(), 'taskType' => $exAppProvider->getName(), 'exception' => $e]);
-				continue;
-			} catch (\Throwable) {
-				continue;
-			}
-
-			$context->registerService($className, function () use ($provider) {
-				return $provider;
+			$context->registerService($className, function () use ($exAppProvider) {
+				return $this->getAnonymousExAppProvider($exAppProvider);
 			});
 			$context->registerTaskProcessingProvider($className);
 		}
 	}
 
 	/**
+	 * Provider backed by the stored definition. ID, name and task type come from the table columns;
+	 * the JSON definition is decoded, and the shapes are built, only when they are first asked for.
+	 *
 	 * @psalm-suppress UndefinedClass, MissingDependency, InvalidReturnStatement, InvalidReturnType
 	 */
 	public function getAnonymousExAppProvider(
-		array $provider,
-		string $appId,
+		TaskProcessingProvider $exAppProvider,
 	): IProvider {
-		return new class($provider, $appId, $this->exAppService, $this->appAPIService) implements IProvider, ITriggerableProvider {
+		return new class($exAppProvider, $this) implements IProvider, ITriggerableProvider {
+			private ?array $provider = null;
+			private array $materialized = [];
+
 			public function __construct(
-				private readonly array $provider,
-				private readonly string $appId,
-				private readonly ExAppService $exAppService,
-				private readonly AppAPiService $appAPIService,
+				private readonly TaskProcessingProvider $exAppProvider,
+				private readonly TaskProcessingService $taskProcessingService,
 			) {
 			}
 
 			public function getId(): string {
-				return $this->provider['id'];
+				return $this->exAppProvider->getName();
 			}
 
 			public function getName(): string {
-				return $this->provider['name'];
+				return $this->exAppProvider->getDisplayName();
 			}
 
 			public function getTaskTypeId(): string {
-				return $this->provider['task_type'];
+				return $this->exAppProvider->getTaskType();
 			}
 
 			public function trigger(): void {
-				$exApp = $this->exAppService->getExApp($this->appId);
-				if ($exApp === null) {
-					return;
-				}
-				$this->appAPIService->requestToExApp($exApp, '/trigger?' . http_build_query(['providerId' => $this->provider['id']]));
+				$this->taskProcessingService->triggerExAppProvider($this->exAppProvider, $this->definition()['max_batch_size'] ?? 1);
 			}
 
 			public function getExpectedRuntime(): int {
-				return $this->provider['expected_runtime'];
+				return $this->definition()['expected_runtime'] ?? 0;
 			}
 
 			public function getOptionalInputShape(): array {
-				return array_reduce($this->provider['optional_input_shape'], function (array $input, array $shape) {
-					$input[$shape['name']] = new ShapeDescriptor(
-						$shape['name'],
-						$shape['description'],
-						EShapeType::from($shape['shape_type']),
-					);
-					return $input;
-				}, []);
+				return $this->materialized['optional_input_shape'] ??= $this->toShapeDescriptors($this->definition()['optional_input_shape'] ?? []);
 			}
 
 			public function getOptionalOutputShape(): array {
-				return array_reduce($this->provider['optional_output_shape'], function (array $input, array $shape) {
-					$input[$shape['name']] = new ShapeDescriptor(
-						$shape['name'],
-						$shape['description'],
-						EShapeType::from($shape['shape_type']),
-					);
-					return $input;
-				}, []);
+				return $this->materialized['optional_output_shape'] ??= $this->toShapeDescriptors($this->definition()['optional_output_shape'] ?? []);
 			}
 
 			public function getInputShapeEnumValues(): array {
-				return $this->arrayToTaskProcessingEnumValues($this->provider['input_shape_enum_values']);
+				return $this->materialized['input_shape_enum_values'] ??= $this->arrayToTaskProcessingEnumValues($this->definition()['input_shape_enum_values'] ?? []);
 			}
 
 			public function getInputShapeDefaults(): array {
-				return $this->provider['input_shape_defaults'];
+				return $this->definition()['input_shape_defaults'] ?? [];
 			}
 
 			public function getOptionalInputShapeEnumValues(): array {
-				return $this->arrayToTaskProcessingEnumValues($this->provider['optional_input_shape_enum_values']);
+				return $this->materialized['optional_input_shape_enum_values'] ??= $this->arrayToTaskProcessingEnumValues($this->definition()['optional_input_shape_enum_values'] ?? []);
 			}
 
 			public function getOptionalInputShapeDefaults(): array {
-				return $this->provider['optional_input_shape_defaults'];
+				return $this->definition()['optional_input_shape_defaults'] ?? [];
 			}
 
 			public function getOutputShapeEnumValues(): array {
-				return $this->arrayToTaskProcessingEnumValues($this->provider['output_shape_enum_values']);
+				return $this->materialized['output_shape_enum_values'] ??= $this->arrayToTaskProcessingEnumValues($this->definition()['output_shape_enum_values'] ?? []);
 			}
 
 			public function getOptionalOutputShapeEnumValues(): array {
-				return $this->arrayToTaskProcessingEnumValues($this->provider['optional_output_shape_enum_values']);
+				return $this->materialized['optional_output_shape_enum_values'] ??= $this->arrayToTaskProcessingEnumValues($this->definition()['optional_output_shape_enum_values'] ?? []);
+			}
+
+			private function definition(): array {
+				// validated and encoded with JSON_THROW_ON_ERROR on registration
+				return $this->provider ??= json_decode($this->exAppProvider->getProvider(), true) ?: [];
+			}
+
+			private function toShapeDescriptors(array $shapes): array {
+				return array_reduce($shapes, function (array $input, array $shape) {
+					$input[$shape['name']] = new ShapeDescriptor(
+						$shape['name'],
+						$shape['description'],
+						EShapeType::from($shape['shape_type']),
+					);
+					return $input;
+				}, []);
 			}
 
 			private function arrayToTaskProcessingEnumValues(array $enumValues): array {
@@ -366,8 +546,21 @@ class TaskProcessingService {
 		};
 	}
 
+	/**
+	 * Invalidate the list of ExApps with providers and the assembled provider list, e.g. when an ExApp
+	 * is enabled or disabled.
+	 */
 	public function resetCacheEnabled(): void {
-		$this->cache?->remove('/ex_task_processing_providers');
+		$this->bumpCacheVersion('/apps');
+		$this->registeredProviders = null;
+	}
+
+	/**
+	 * Invalidate the providers of one ExApp; cached providers of other ExApps stay valid.
+	 */
+	public function resetCacheForApp(string $appId): void {
+		$this->bumpCacheVersion('/app/' . $appId);
+		$this->resetCacheEnabled();
 	}
 
 	public function unregisterExAppTaskProcessingProviders(string $appId): int {
@@ -376,44 +569,52 @@ class TaskProcessingService {
 		} catch (Exception) {
 			$result = -1;
 		}
-		$this->resetCacheEnabled();
+		$this->resetCacheForApp($appId);
 		return $result;
 	}
 
+	/**
+	 * Custom task type of a provider, decoded and with its shapes built only when they are first asked for.
+	 */
 	public function getAnonymousTaskType(
-		array $customTaskType,
+		TaskProcessingProvider $exAppProvider,
 	): ITaskType {
-		return new class($customTaskType) implements ITaskType {
+		return new class($exAppProvider) implements ITaskType {
+			private ?array $customTaskType = null;
+			private array $materialized = [];
+
 			public function __construct(
-				private readonly array $customTaskType,
+				private readonly TaskProcessingProvider $exAppProvider,
 			) {
 			}
 
 			public function getId(): string {
-				return $this->customTaskType['id'];
+				// equal to the custom task type ID, that is checked on registration
+				return $this->exAppProvider->getTaskType();
 			}
 
 			public function getName(): string {
-				return $this->customTaskType['name'];
+				return $this->definition()['name'] ?? '';
 			}
 
 			public function getDescription(): string {
-				return $this->customTaskType['description'];
+				return $this->definition()['description'] ?? '';
 			}
 
 			public function getInputShape(): array {
-				return array_reduce($this->customTaskType['input_shape'], static function (array $input, array $shape) {
-					$input[$shape['name']] = new ShapeDescriptor(
-						$shape['name'],
-						$shape['description'],
-						EShapeType::from($shape['shape_type']),
-					);
-					return $input;
-				}, []);
+				return $this->materialized['input_shape'] ??= $this->toShapeDescriptors($this->definition()['input_shape'] ?? []);
 			}
 
 			public function getOutputShape(): array {
-				return array_reduce($this->customTaskType['output_shape'], static function (array $output, array $shape) {
+				return $this->materialized['output_shape'] ??= $this->toShapeDescriptors($this->definition()['output_shape'] ?? []);
+			}
+
+			private function definition(): array {
+				return $this->customTaskType ??= json_decode((string)$this->exAppProvider->getCustomTaskType(), true) ?: [];
+			}
+
+			private function toShapeDescriptors(array $shapes): array {
+				return array_reduce($shapes, static function (array $output, array $shape) {
 					$output[$shape['name']] = new ShapeDescriptor(
 						$shape['name'],
 						$shape['description'],
@@ -0,0 +1,177 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Service;
+
+use OCA\AppAPI\AppInfo\Application;
+use OCP\DB\Exception;
+use OCP\IAppConfig;
+use OCP\ICache;
+use OCP\ICacheFactory;
+use OCP\IConfig;
+use OCP\IDBConnection;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Caches of the AppAPI registries (ExApps and their routes, OCC commands, deploy options, providers, UI elements).
+ *
+ * With a distributed cache (Redis, Memcached) the registries use it directly. When APCu is the only
+ * memcache, its entries are not shared with other servers nor with `occ` (APCu is per process in the CLI),
+ * so removing an entry would not invalidate it everywhere. The registries then use a LocalGenerationCache:
+ * entries are kept in APCu under a generation of their registry (cache prefix) that is stored in the
+ * database, and removing an entry replaces the generation of that registry only, which invalidates its
+ * entries in every process. The generations of all registries are read from the database with one query,
+ * at most once per request (once per GENERATION_CHECK_INTERVAL in long-running processes).
+ * Where APCu is off (usually `occ` and cron), the LocalGenerationCache wraps the null cache of the server,
+ * so nothing is cached there but the removals still replace the generations.
+ *
+ * Removals that belong to one change should run in batch(), so that every registry they touch
+ * gets a new generation once instead of once per removed entry.
+ */
+class RegistryCacheFactory {
+	/** appconfig key of a registry generation is this followed by the cache prefix without the app ID */
+	public const GENERATION_CONFIG_KEY_PREFIX = 'registry_cache_generation/';
+	/** seconds a generation read from the database is trusted, for requests and commands that run longer */
+	public const GENERATION_CHECK_INTERVAL = 1.0;
+
+	private ?bool $distributed = null;
+	/** @var array<string, string>|null generation by appconfig key */
+	private ?array $generations = null;
+	private float $generationsCheckedAt = 0.0;
+	private int $batchDepth = 0;
+	/** @var array<string, true> appconfig keys of the generations to replace when the batch ends */
+	private array $pendingBumps = [];
+
+	public function __construct(
+		private readonly ICacheFactory $cacheFactory,
+		private readonly IConfig $config,
+		private readonly IAppConfig $appConfig,
+		private readonly IDBConnection $db,
+		private readonly LoggerInterface $logger,
+	) {
+	}
+
+	/**
+	 * With APCu as the only memcache this is true even where APCu is off (`occ` and cron with
+	 * `apc.enable_cli=0`, where the server hands out a null cache): reads then always miss,
+	 * but removals still replace the generations and so invalidate the entries of the web processes.
+	 */
+	public function isAvailable(): bool {
+		if ($this->hasDistributedCache()) {
+			return $this->cacheFactory->isAvailable();
+		}
+		return true;
+	}
+
+	public function createDistributed(string $prefix = ''): ICache {
+		if ($this->hasDistributedCache()) {
+			return $this->cacheFactory->createDistributed($prefix);
+		}
+		return new LocalGenerationCache($this->cacheFactory->createLocal($prefix), $this, $prefix);
+	}
+
+	/**
+	 * Whether the configured distributed cache is shared by all processes: not APCu,
+	 * which is also what the server falls back to when only a local cache is configured.
+	 */
+	private function hasDistributedCache(): bool {
+		if ($this->distributed === null) {
+			$distributedCacheClass = ltrim($this->config->getSystemValueString('memcache.distributed', ''), '\\');
+			$localCacheClass = ltrim($this->config->getSystemValueString('memcache.local', ''), '\\');
+			$this->distributed = ($distributedCacheClass === '' && $localCacheClass !== \OC\Memcache\APCu::class)
+				|| ($distributedCacheClass !== '' && $distributedCacheClass !== \OC\Memcache\APCu::class);
+		}
+		return $this->distributed;
+	}
+
+	/**
+	 * Run the cache removals of one change, replacing the generation of every touched registry only once.
+	 * Batches may be nested, generations are replaced when the outermost batch ends.
+	 */
+	public function batch(callable $removals): void {
+		$this->batchDepth++;
+		try {
+			$removals();
+		} finally {
+			if (--$this->batchDepth === 0) {
+				$pendingBumps = array_keys($this->pendingBumps);
+				$this->pendingBumps = [];
+				foreach ($pendingBumps as $configKey) {
+					$this->writeGeneration($configKey);
+				}
+			}
+		}
+	}
+
+	/**
+	 * Current generation of the local cache with the given prefix, empty if it cannot be read.
+	 */
+	public function getGeneration(string $prefix): string {
+		$now = microtime(true);
+		if ($this->generations === null || $now - $this->generationsCheckedAt >= self::GENERATION_CHECK_INTERVAL) {
+			$this->generations = $this->readGenerations();
+			$this->generationsCheckedAt = $now;
+		}
+		return $this->generations[$this->getGenerationConfigKey($prefix)] ?? '';
+	}
+
+	/**
+	 * Invalidate the entries of the local cache with the given prefix in all processes.
+	 */
+	public function bumpGeneration(string $prefix): void {
+		$configKey = $this->getGenerationConfigKey($prefix);
+		if ($this->batchDepth > 0) {
+			$this->pendingBumps[$configKey] = true;
+			return;
+		}
+		$this->writeGeneration($configKey);
+	}
+
+	private function writeGeneration(string $configKey): void {
+		$generation = bin2hex(random_bytes(8));
+		$this->appConfig->setValueString(Application::APP_ID, $configKey, $generation, lazy: true);
+		if ($this->generations !== null) {
+			$this->generations[$configKey] = $generation;
+		}
+	}
+
+	private function getGenerationConfigKey(string $prefix): string {
+		$appPrefix = Application::APP_ID . '/';
+		if (str_starts_with($prefix, $appPrefix)) {
+			$prefix = substr($prefix, strlen($appPrefix));
+		}
+		return self::GENERATION_CONFIG_KEY_PREFIX . $prefix;
+	}
+
+	/**
+	 * Read from the database rather than through IAppConfig, which may serve values cached by the server.
+	 *
+	 * @return array<string, string>
+	 */
+	private function readGenerations(): array {
+		try {
+			$qb = $this->db->getQueryBuilder();
+			$result = $qb->select('configkey', 'configvalue')
+				->from('appconfig')
+				->where(
+					$qb->expr()->eq('appid', $qb->createNamedParameter(Application::APP_ID)),
+					$qb->expr()->like('configkey', $qb->createNamedParameter($this->db->escapeLikeParameter(self::GENERATION_CONFIG_KEY_PREFIX) . '%'))
+				)->executeQuery();
+			$generations = [];
+			while ($row = $result->fetch()) {
+				$generations[$row['configkey']] = (string)$row['configvalue'];
+			}
+			$result->closeCursor();
+			return $generations;
+		} catch (Exception $e) {
+			$this->logger->error('Failed to read the generations of the AppAPI registry caches', ['exception' => $e]);
+			return [];
+		}
+	}
+}
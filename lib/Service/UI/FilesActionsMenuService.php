@@ -12,20 +12,21 @@ namespace OCA\AppAPI\Service\UI;
 use OCA\AppAPI\AppInfo\Application;
 use OCA\AppAPI\Db\UI\FilesActionsMenu;
 use OCA\AppAPI\Db\UI\FilesActionsMenuMapper;
+use OCA\AppAPI\Service\RegistryCacheFactory;
 use OCP\AppFramework\Db\DoesNotExistException;
 use OCP\AppFramework\Db\MultipleObjectsReturnedException;
 use OCP\DB\Exception;
 use OCP\ICache;
-use OCP\ICacheFactory;
 use Psr\Log\LoggerInterface;
 
 class FilesActionsMenuService {
 	private ?ICache $cache = null;
 
 	public function __construct(
-		ICacheFactory $cacheFactory,
+		RegistryCacheFactory $cacheFactory,
 		private readonly FilesActionsMenuMapper $mapper,
 		private readonly LoggerInterface $logger,
+		private readonly UiManifestService $uiManifestService,
 	) {
 		if ($cacheFactory->isAvailable()) {
 			$this->cache = $cacheFactory->createDistributed(Application::APP_ID . '/ex_ui_files_actions');
@@ -138,5 +139,6 @@ class FilesActionsMenuService {
 
 	public function resetCacheEnabled(): void {
 		$this->cache?->remove('/ex_ui_files_actions');
+		$this->uiManifestService->resetCache();
 	}
 }
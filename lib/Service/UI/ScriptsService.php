@@ -26,6 +26,7 @@ readonly class ScriptsService {
 	public function __construct(
 		private ScriptMapper $mapper,
 		private LoggerInterface $logger,
+		private UiManifestService $uiManifestService,
 	) {
 	}
 
@@ -43,6 +44,7 @@ readonly class ScriptsService {
 				$newScript->setId($script->getId());
 			}
 			$script = $this->mapper->insertOrUpdate($newScript);
+			$this->uiManifestService->resetCache();
 		} catch (Exception $e) {
 			$this->logger->error(
 				sprintf('Failed to set ExApp %s script %s. Error: %s', $appId, $name, $e->getMessage()), ['exception' => $e]
@@ -53,7 +55,9 @@ readonly class ScriptsService {
 	}
 
 	public function deleteExAppScript(string $appId, string $type, string $name, string $path): bool {
-		return $this->mapper->removeByNameTypePath($appId, $type, $name, ltrim($path, '/'));
+		$result = $this->mapper->removeByNameTypePath($appId, $type, $name, ltrim($path, '/'));
+		$this->uiManifestService->resetCache();
+		return $result;
 	}
 
 	public function getExAppScript(string $appId, string $type, string $name, string $path): ?Script {
@@ -70,6 +74,7 @@ readonly class ScriptsService {
 		} catch (Exception) {
 			$result = -1;
 		}
+		$this->uiManifestService->resetCache();
 		return $result;
 	}
 
@@ -79,6 +84,7 @@ readonly class ScriptsService {
 		} catch (Exception) {
 			$result = -1;
 		}
+		$this->uiManifestService->resetCache();
 		return $result;
 	}
 
@@ -86,8 +92,17 @@ readonly class ScriptsService {
 	 * @throws Exception
 	 */
 	public function applyExAppScripts(string $appId, string $type, string $name): array {
+		return $this->addExAppScripts($appId, $this->mapper->findByAppIdTypeName($appId, $type, $name));
+	}
+
+	/**
+	 * Add scripts of an ExApp page, as listed in the UI manifest, to the page being rendered.
+	 *
+	 * @param array<array{path: string, after_app_id: ?string}> $scripts
+	 * @return array<int, string> proxied script paths by index of the "proxy_js" file that loads them
+	 */
+	public function addExAppScripts(string $appId, array $scripts): array {
 		$mapResult = [];
-		$scripts = $this->mapper->findByAppIdTypeName($appId, $type, $name);
 		if (count($scripts) > self::MAX_JS_FILES) {
 			throw new LengthException('More than' . (string)self::MAX_JS_FILES . 'JS files on one page are not supported.');
 		}
@@ -12,18 +12,18 @@ namespace OCA\AppAPI\Service\UI;
 use OCA\AppAPI\AppInfo\Application;
 use OCA\AppAPI\Db\UI\SettingsForm;
 use OCA\AppAPI\Db\UI\SettingsFormMapper;
+use OCA\AppAPI\Service\RegistryCacheFactory;
 use OCP\AppFramework\Db\DoesNotExistException;
 use OCP\AppFramework\Db\MultipleObjectsReturnedException;
 use OCP\DB\Exception;
 use OCP\ICache;
-use OCP\ICacheFactory;
 use Psr\Log\LoggerInterface;
 
 class SettingsService {
 	private ?ICache $cache = null;
 
 	public function __construct(
-		ICacheFactory $cacheFactory,
+		RegistryCacheFactory $cacheFactory,
 		private readonly SettingsFormMapper $mapper,
 		private readonly LoggerInterface $logger,
 	) {
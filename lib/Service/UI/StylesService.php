@@ -23,6 +23,7 @@ readonly class StylesService {
 	public function __construct(
 		private StyleMapper $mapper,
 		private LoggerInterface $logger,
+		private UiManifestService $uiManifestService,
 	) {
 	}
 
@@ -39,6 +40,7 @@ readonly class StylesService {
 				$newStyle->setId($style->getId());
 			}
 			$style = $this->mapper->insertOrUpdate($newStyle);
+			$this->uiManifestService->resetCache();
 		} catch (Exception $e) {
 			$this->logger->error(
 				sprintf('Failed to set ExApp %s script %s. Error: %s', $appId, $name, $e->getMessage()), ['exception' => $e]
@@ -49,7 +51,9 @@ readonly class StylesService {
 	}
 
 	public function deleteExAppStyle(string $appId, string $type, string $name, string $path): bool {
-		return $this->mapper->removeByNameTypePath($appId, $type, $name, ltrim($path, '/'));
+		$result = $this->mapper->removeByNameTypePath($appId, $type, $name, ltrim($path, '/'));
+		$this->uiManifestService->resetCache();
+		return $result;
 	}
 
 	public function getExAppStyle(string $appId, string $type, string $name, string $path): ?Style {
@@ -66,6 +70,7 @@ readonly class StylesService {
 		} catch (Exception) {
 			$result = -1;
 		}
+		$this->uiManifestService->resetCache();
 		return $result;
 	}
 
@@ -75,6 +80,7 @@ readonly class StylesService {
 		} catch (Exception) {
 			$result = -1;
 		}
+		$this->uiManifestService->resetCache();
 		return $result;
 	}
 
@@ -82,10 +88,17 @@ readonly class StylesService {
 	 * @throws Exception
 	 */
 	public function applyExAppStyles(string $appId, string $type, string $name): void {
-		$styles = $this->mapper->findByAppIdTypeName($appId, $type, $name);
-		foreach ($styles as $value) {
-			$path = 'proxy/' . $appId . '/' . $value['path'];
-			Util::addStyle(Application::APP_ID, $path);
+		$this->addExAppStyles($appId, array_column($this->mapper->findByAppIdTypeName($appId, $type, $name), 'path'));
+	}
+
+	/**
+	 * Add styles of an ExApp page, as listed in the UI manifest, to the page being rendered.
+	 *
+	 * @param string[] $paths
+	 */
+	public function addExAppStyles(string $appId, array $paths): void {
+		foreach ($paths as $path) {
+			Util::addStyle(Application::APP_ID, 'proxy/' . $appId . '/' . $path);
 		}
 	}
 }
@@ -12,11 +12,11 @@ namespace OCA\AppAPI\Service\UI;
 use OCA\AppAPI\AppInfo\Application;
 use OCA\AppAPI\Db\UI\TopMenu;
 use OCA\AppAPI\Db\UI\TopMenuMapper;
+use OCA\AppAPI\Service\RegistryCacheFactory;
 use OCP\AppFramework\Db\DoesNotExistException;
 use OCP\AppFramework\Db\MultipleObjectsReturnedException;
 use OCP\DB\Exception;
 use OCP\ICache;
-use OCP\ICacheFactory;
 use Psr\Log\LoggerInterface;
 
 class TopMenuService {
@@ -28,7 +28,8 @@ class TopMenuService {
 		private readonly InitialStateService $initialStateService,
 		private readonly ScriptsService $scriptsService,
 		private readonly StylesService $stylesService,
-		ICacheFactory $cacheFactory,
+		private readonly UiManifestService $uiManifestService,
+		RegistryCacheFactory $cacheFactory,
 	) {
 		if ($cacheFactory->isAvailable()) {
 			$this->cache = $cacheFactory->createDistributed(Application::APP_ID . '/ex_top_menus');
@@ -118,5 +119,6 @@ class TopMenuService {
 
 	public function resetCacheEnabled(): void {
 		$this->cache?->remove('/ex_top_menus');
+		$this->uiManifestService->resetCache();
 	}
 }
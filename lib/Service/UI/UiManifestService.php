@@ -0,0 +1,248 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Service\UI;
+
+use OCA\AppAPI\AppInfo\Application;
+use OCA\AppAPI\Db\UI\FilesActionsMenu;
+use OCA\AppAPI\Db\UI\FilesActionsMenuMapper;
+use OCA\AppAPI\Db\UI\ScriptMapper;
+use OCA\AppAPI\Db\UI\StyleMapper;
+use OCA\AppAPI\Db\UI\TopMenuMapper;
+use OCA\AppAPI\Service\RegistryCacheFactory;
+use OCP\DB\Exception;
+use OCP\ICache;
+use OCP\IURLGenerator;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Everything AppAPI adds to rendered pages, precomputed per user class (admins and other users)
+ * so that a page render reads one cache entry instead of querying every UI registry.
+ *
+ * The manifest is built on the first read after a registry changed (top menu entries, file actions,
+ * scripts, styles or an ExApp was enabled/disabled) and holds, for enabled ExApps only:
+ *  - `menu_entries`: navigation entries with their links and icons resolved,
+ *  - `file_actions`: the serialized Files actions,
+ *  - `pages`: scripts and styles of every top menu page, by ExApp ID and page name.
+ * Without a cache there is nothing to precompute into: every accessor then runs only the queries
+ * of the part it returns, as the UI registries did before the manifest.
+ *
+ * @psalm-type UiManifestMenuEntry = array{id: string, appid: string, href: string, icon: string, display_name: string}
+ * @psalm-type UiManifestPage = array{scripts: list<array{path: string, after_app_id: ?string}>, styles: list<string>}
+ * @psalm-type UiManifest = array{menu_entries: list<UiManifestMenuEntry>, file_actions: list<array>, pages: array<string, array<string, UiManifestPage>>}
+ */
+class UiManifestService {
+	public const USER_CLASS_ADMIN = 'admin';
+	public const USER_CLASS_USER = 'user';
+
+	private ?ICache $cache = null;
+	/** @var array<string, UiManifest> */
+	private array $manifests = [];
+
+	public function __construct(
+		RegistryCacheFactory $cacheFactory,
+		private readonly TopMenuMapper $topMenuMapper,
+		private readonly FilesActionsMenuMapper $filesActionsMenuMapper,
+		private readonly ScriptMapper $scriptMapper,
+		private readonly StyleMapper $styleMapper,
+		private readonly IURLGenerator $urlGenerator,
+		private readonly LoggerInterface $logger,
+	) {
+		if ($cacheFactory->isAvailable()) {
+			$this->cache = $cacheFactory->createDistributed(Application::APP_ID . '/ex_ui_manifest');
+		}
+	}
+
+	/**
+	 * @return list<UiManifestMenuEntry>
+	 */
+	public function getMenuEntries(bool $isAdmin): array {
+		if ($this->cache !== null) {
+			return $this->getManifest($isAdmin)['menu_entries'];
+		}
+		try {
+			return $this->buildMenuEntries($this->topMenuMapper->findAllEnabled(), $isAdmin);
+		} catch (Exception $e) {
+			$this->logger->error('Failed to load the ExApps menu entries', ['exception' => $e]);
+			return [];
+		}
+	}
+
+	/**
+	 * @return list<array>
+	 */
+	public function getFileActions(bool $isAdmin): array {
+		if ($this->cache !== null) {
+			return $this->getManifest($isAdmin)['file_actions'];
+		}
+		try {
+			return $this->buildFileActions($this->filesActionsMenuMapper->findAllEnabled());
+		} catch (Exception $e) {
+			$this->logger->error('Failed to load the ExApps Files actions', ['exception' => $e]);
+			return [];
+		}
+	}
+
+	/**
+	 * Scripts and styles of a top menu page the user class may open, null if there is no such page.
+	 *
+	 * @return UiManifestPage|null
+	 */
+	public function getPage(bool $isAdmin, string $appId, string $name): ?array {
+		if ($this->cache !== null) {
+			return $this->getManifest($isAdmin)['pages'][$appId][$name] ?? null;
+		}
+		try {
+			$menuRecords = array_filter(
+				$this->topMenuMapper->findAllEnabled(),
+				static fn (array $menuRecord) => $menuRecord['appid'] === $appId && $menuRecord['name'] === $name
+					&& self::isVisible($menuRecord, $isAdmin),
+			);
+			if (empty($menuRecords)) {
+				return null;
+			}
+			$scripts = $this->scriptMapper->findByAppIdTypeName($appId, 'top_menu', $name);
+			$styles = $this->styleMapper->findByAppIdTypeName($appId, 'top_menu', $name);
+			return [
+				'scripts' => array_map(static fn (array $script) => [
+					'path' => $script['path'],
+					'after_app_id' => $script['after_app_id'] ?: null,
+				], $scripts),
+				'styles' => array_column($styles, 'path'),
+			];
+		} catch (Exception $e) {
+			$this->logger->error(sprintf('Failed to load the ExApp %s page %s', $appId, $name), ['exception' => $e]);
+			return null;
+		}
+	}
+
+	/**
+	 * Manifests are stored under a version that is replaced on every registry change, instead of being
+	 * removed: a request that read the registries before a change can then only store its manifests
+	 * under the old version, which is never read again, rather than bring back a stale manifest.
+	 */
+	public function resetCache(): void {
+		$this->cache?->remove('/version');
+		$this->manifests = [];
+	}
+
+	/**
+	 * Manifest of the user class, read from (or built into) the cache.
+	 *
+	 * @return UiManifest
+	 */
+	private function getManifest(bool $isAdmin): array {
+		$userClass = $isAdmin ? self::USER_CLASS_ADMIN : self::USER_CLASS_USER;
+		if (isset($this->manifests[$userClass])) {
+			return $this->manifests[$userClass];
+		}
+		$version = $this->cache->get('/version');
+		if ($version === null) {
+			$version = bin2hex(random_bytes(8));
+			$this->cache->set('/version', $version);
+		}
+		$manifest = $this->cache->get('/manifest/' . $version . '/' . $userClass);
+		if ($manifest === null) {
+			$manifests = $this->buildManifests();
+			if ($manifests === null) {
+				return ['menu_entries' => [], 'file_actions' => [], 'pages' => []];
+			}
+			foreach ($manifests as $class => $classManifest) {
+				$this->cache->set('/manifest/' . $version . '/' . $class, $classManifest);
+			}
+			$this->manifests = $manifests;
+			$manifest = $manifests[$userClass];
+		}
+		return $this->manifests[$userClass] = $manifest;
+	}
+
+	/**
+	 * @return array<string, UiManifest>|null
+	 */
+	private function buildManifests(): ?array {
+		try {
+			$menuRecords = $this->topMenuMapper->findAllEnabled();
+			$fileActions = $this->buildFileActions($this->filesActionsMenuMapper->findAllEnabled());
+			$pages = $this->buildPages(
+				$this->scriptMapper->findAllEnabledByType('top_menu'),
+				$this->styleMapper->findAllEnabledByType('top_menu'),
+			);
+		} catch (Exception $e) {
+			$this->logger->error('Failed to build the ExApps UI manifest', ['exception' => $e]);
+			return null;
+		}
+
+		$manifests = [];
+		foreach ([self::USER_CLASS_ADMIN, self::USER_CLASS_USER] as $userClass) {
+			$isAdmin = $userClass === self::USER_CLASS_ADMIN;
+			$manifest = ['menu_entries' => $this->buildMenuEntries($menuRecords, $isAdmin), 'file_actions' => $fileActions, 'pages' => []];
+			foreach ($menuRecords as $menuRecord) {
+				if (self::isVisible($menuRecord, $isAdmin)) {
+					$appId = $menuRecord['appid'];
+					$name = $menuRecord['name'];
+					$manifest['pages'][$appId][$name] = [
+						'scripts' => $pages[$appId][$name]['scripts'] ?? [],
+						'styles' => $pages[$appId][$name]['styles'] ?? [],
+					];
+				}
+			}
+			$manifests[$userClass] = $manifest;
+		}
+		return $manifests;
+	}
+
+	private static function isVisible(array $menuRecord, bool $isAdmin): bool {
+		return $isAdmin || (int)$menuRecord['admin_required'] !== 1;
+	}
+
+	/**
+	 * @return list<UiManifestMenuEntry>
+	 */
+	private function buildMenuEntries(array $menuRecords, bool $isAdmin): array {
+		$menuEntries = [];
+		foreach ($menuRecords as $menuEntry) {
+			if (!self::isVisible($menuEntry, $isAdmin)) {
+				continue;
+			}
+			$appId = $menuEntry['appid'];
+			$name = $menuEntry['name'];
+			$menuEntries[] = [
+				'id' => Application::APP_ID . '_' . $appId . '_' . $name,
+				'appid' => $appId,
+				'href' => $this->urlGenerator->linkToRoute('app_api.TopMenu.viewExAppPage', ['appId' => $appId, 'name' => $name]),
+				'icon' => $menuEntry['icon'] === ''
+					? $this->urlGenerator->imagePath('app_api', 'app.svg')
+					: $this->urlGenerator->linkToRoute('app_api.ExAppProxy.ExAppGet', ['appId' => $appId, 'other' => $menuEntry['icon']]),
+				'display_name' => $menuEntry['display_name'],
+			];
+		}
+		return $menuEntries;
+	}
+
+	private function buildFileActions(array $records): array {
+		return array_map(static fn (array $record) => (new FilesActionsMenu($record))->jsonSerialize(), $records);
+	}
+
+	/**
+	 * @return array<string, array<string, array{scripts?: list<array{path: string, after_app_id: ?string}>, styles?: list<string>}>>
+	 */
+	private function buildPages(array $scripts, array $styles): array {
+		$pages = [];
+		foreach ($scripts as $script) {
+			$pages[$script['appid']][$script['name']]['scripts'][] = [
+				'path' => $script['path'],
+				'after_app_id' => $script['after_app_id'] ?: null,
+			];
+		}
+		foreach ($styles as $style) {
+			$pages[$style['appid']][$style['name']]['styles'][] = $style['path'];
+		}
+		return $pages;
+	}
+}
@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Seconds AppAPI spends deploying and removing an ExApp through DockerActions, offline.
+
+Starts `fake_docker.py` on a unix socket (every started container runs
+`tests/install_no_init.py`, so heartbeat and enable reach a real ExApp),
+registers a `docker-install` daemon for it and, BENCH_ITERATIONS times:
+  - registers the ExApp with `--wait-finish` (pull, volume, create, certificates,
+    start, heartbeat, init, enable),
+  - unregisters it with `--rm-data` (disable, container and volume removal).
+Wall time of both commands, and the Docker API calls they made (count and seconds
+per endpoint, from the fake's `/fake/stats`), are printed as JSON.
+
+Nextcloud has to run on this host (the daemon is a local socket) and the
+Python deps of `requirements.txt` have to be installed. Set BENCH_PROFILE=1 to
+run the register command under Xdebug's profiler (`XDEBUG_MODE=profile`).
+
+Usage:
+    python tests/deploy_bench/bench_docker_deploy.py
+Optional env: OCC_CMD (default "php occ"), NEXTCLOUD_URL (default "http://localhost:8080"),
+              FAKE_DOCKER_SOCKET, BENCH_ITERATIONS (default 5), BENCH_IMAGE_SIZE_MB (default 200),
+              BENCH_LAYERS (default 5), BENCH_PULL_RATE_MB (default 0, no limit),
+              APP_ID (default "bench_fake_docker"), APP_PORT (default 23100), BENCH_PROFILE.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from http.client import HTTPConnection
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parents[1]
+OCC = os.environ.get("OCC_CMD", "php occ").split()
+NEXTCLOUD_URL = os.environ.get("NEXTCLOUD_URL", "http://localhost:8080")
+SOCKET = os.environ.get("FAKE_DOCKER_SOCKET", "/tmp/appapi-fake-docker.sock")
+ITERATIONS = int(os.environ.get("BENCH_ITERATIONS", "5"))
+APP_ID = os.environ.get("APP_ID", "bench_fake_docker")
+APP_PORT = int(os.environ.get("APP_PORT", "23100"))
+DAEMON = "bench_fake_docker"
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, path: str) -> None:
+        super().__init__("localhost")
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self._path)
+
+
+def _fake(method: str, path: str) -> dict:
+    conn = _UnixHTTPConnection(SOCKET)
+    try:
+        conn.request(method, path)
+        body = conn.getresponse().read()
+        return json.loads(body) if body else {}
+    finally:
+        conn.close()
+
+
+def _occ(*args: str, env: dict[str, str] | None = None) -> float:
+    start = time.perf_counter()
+    r = subprocess.run(OCC + list(args), capture_output=True, text=True, env=env)
+    elapsed = time.perf_counter() - start
+    if r.returncode != 0:
+        raise RuntimeError(f"occ {' '.join(args)} failed:\n{r.stdout}\n{r.stderr}")
+    return elapsed
+
+
+def _start_fake_docker() -> subprocess.Popen:
+    process = subprocess.Popen([
+        sys.executable, str(Path(__file__).with_name("fake_docker.py")),
+        "--socket", SOCKET,
+        "--image-size-mb", os.environ.get("BENCH_IMAGE_SIZE_MB", "200"),
+        "--layers", os.environ.get("BENCH_LAYERS", "5"),
+        "--pull-rate-mb", os.environ.get("BENCH_PULL_RATE_MB", "0"),
+        "--exapp-command", f"{sys.executable} install_no_init.py",
+        "--exapp-cwd", str(TESTS_DIR),
+    ])
+    for _ in range(100):
+        if os.path.exists(SOCKET):
+            try:
+                _fake("GET", "/_ping")
+                return process
+            except OSError:
+                pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("fake_docker.py did not start")
+
+
+def main() -> None:
+    json_info = json.dumps({
+        "id": APP_ID, "name": APP_ID, "version": "1.0.0", "secret": secrets.token_hex(32), "port": APP_PORT,
+        "docker-install": {"registry": "ghcr.io", "image": "nextcloud/bench-fake-exapp", "image-tag": "latest"},
+    })
+    register_env = dict(os.environ)
+    if os.environ.get("BENCH_PROFILE"):
+        register_env.update({"XDEBUG_MODE": "profile", "XDEBUG_CONFIG": "profiler_output_name=cachegrind.out.register.%t"})
+
+    fake_docker = _start_fake_docker()
+    results = []
+    try:
+        _occ("app_api:daemon:register", DAEMON, "Fake Docker", "docker-install", "http", SOCKET, NEXTCLOUD_URL, "--net", "host")
+        for i in range(ITERATIONS):
+            _fake("POST", "/fake/reset")
+            register = _occ("app_api:app:register", APP_ID, DAEMON, "--json-info", json_info, "--wait-finish", env=register_env)
+            register_calls = _fake("GET", "/fake/stats")["endpoints"]
+            _fake("POST", "/fake/reset")
+            unregister = _occ("app_api:app:unregister", APP_ID, "--rm-data")
+            results.append({
+                "iteration": i + 1,
+                # the first iteration pulls the image, the next ones find all layers present
+                "register_seconds": round(register, 3),
+                "unregister_seconds": round(unregister, 3),
+                "register_docker_calls": register_calls,
+                "unregister_docker_calls": _fake("GET", "/fake/stats")["endpoints"],
+            })
+    finally:
+        subprocess.run(OCC + ["app_api:app:unregister", APP_ID, "--rm-data", "--silent", "--force"], capture_output=True)
+        subprocess.run(OCC + ["app_api:daemon:unregister", DAEMON], capture_output=True)
+        fake_docker.terminate()
+        fake_docker.wait(timeout=30)
+
+    print(json.dumps({
+        "image_size_mb": float(os.environ.get("BENCH_IMAGE_SIZE_MB", "200")),
+        "layers": int(os.environ.get("BENCH_LAYERS", "5")),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Seconds and HaRP calls AppAPI spends per ExApp lifecycle operation, without a cluster.
+
+Starts `fake_harp.py`, registers a `kubernetes-install` daemon for it (the simulator
+is also the daemon's `nextcloud_url`, so it answers the ExApp's heartbeat, init and
+enable) and measures, BENCH_ITERATIONS times per scenario:
+  - k8s_single:  one Deployment;
+  - k8s_multi:   one Deployment per role of BENCH_ROLES (the first one exposed);
+  - docker_harp: a `docker-install` daemon with `--harp` (DockerActions::deployExAppHarp),
+                 only with BENCH_DOCKER=1;
+the wall time and the HaRP calls (count and seconds per endpoint) of
+`app:register --wait-finish`, `app:disable`, `app:enable` and `app:unregister --rm-data`.
+
+Rollback cost is measured on the multi-role ExApp: `wait_for_start` of the last role
+is made to fail, and the failed registration is reported with the `remove` calls
+it issued to roll back the other roles.
+
+Every HaRP call takes BENCH_LATENCY seconds and every Deployment becomes ready
+BENCH_READY_DELAY seconds after its start. Results are printed as JSON.
+
+Usage:
+    python tests/deploy_bench/bench_harp_deploy.py
+Optional env: OCC_CMD (default "php occ"), FAKE_HARP_PORT (default 8781),
+              BENCH_ITERATIONS (default 3), BENCH_ROLES (default "api,worker,scheduler"),
+              BENCH_LATENCY (default 0.05), BENCH_READY_DELAY (default 2), BENCH_DOCKER.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+OCC = os.environ.get("OCC_CMD", "php occ").split() + ["--no-warnings"]
+PORT = int(os.environ.get("FAKE_HARP_PORT", "8781"))
+ITERATIONS = int(os.environ.get("BENCH_ITERATIONS", "3"))
+ROLES = [r for r in os.environ.get("BENCH_ROLES", "api,worker,scheduler").split(",") if r]
+LATENCY = os.environ.get("BENCH_LATENCY", "0.05")
+READY_DELAY = os.environ.get("BENCH_READY_DELAY", "2")
+SHARED_KEY = "bench_key"
+HARP_URL = f"http://127.0.0.1:{PORT}"
+K8S_DAEMON = "bench_harp_k8s"
+DOCKER_DAEMON = "bench_harp_docker"
+APP_ID = "bench-harp-exapp"
+
+
+def _sim(method: str, path: str, payload: dict | None = None) -> dict:
+    request = urllib.request.Request(
+        HARP_URL + path, method=method,
+        data=json.dumps(payload).encode() if payload is not None else None,
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as r:
+        body = r.read()
+    return json.loads(body) if body else {}
+
+
+def _occ(*args: str, check: bool = True) -> float:
+    start = time.perf_counter()
+    r = subprocess.run(OCC + list(args), capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if check and r.returncode != 0:
+        raise RuntimeError(f"occ {' '.join(args)} failed:\n{r.stdout}\n{r.stderr}")
+    return elapsed
+
+
+def _measured(*args: str, check: bool = True) -> dict:
+    """Run an occ command on a clean stats slate, return its wall time and HaRP calls."""
+    _sim("POST", "/sim/reset")
+    seconds = _occ(*args, check=check)
+    return {"seconds": round(seconds, 3), "harp_calls": _sim("GET", "/sim/stats")["endpoints"]}
+
+
+def _calls(result: dict, suffix: str) -> int:
+    return sum(v["calls"] for k, v in result["harp_calls"].items() if k.endswith(suffix))
+
+
+def _start_simulator() -> subprocess.Popen:
+    process = subprocess.Popen([
+        sys.executable, str(Path(__file__).with_name("fake_harp.py")),
+        "--port", str(PORT), "--shared-key", SHARED_KEY,
+        "--latency", f"*={LATENCY}", "--ready-delay", READY_DELAY,
+        "--image-size-mb", "20", "--layers", "2",
+    ], cwd=Path(__file__).parent)
+    for _ in range(100):
+        try:
+            _sim("GET", "/sim/config")
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("fake_harp.py did not start")
+
+
+def _json_info(roles: list[str]) -> str:
+    info = {
+        "id": APP_ID, "name": APP_ID, "version": "1.0.0", "secret": secrets.token_hex(32), "port": 23000,
+        "docker-install": {"registry": "ghcr.io", "image": "nextcloud/bench-fake-exapp", "image-tag": "latest"},
+    }
+    if roles:
+        info["k8s-service-roles"] = [
+            {"name": role, "env": f"SERVICE_ROLE={role}", "expose": i == 0} for i, role in enumerate(roles)
+        ]
+    return json.dumps(info)
+
+
+def _lifecycle(daemon: str, roles: list[str]) -> list[dict]:
+    json_info = _json_info(roles)
+    results = []
+    for i in range(ITERATIONS):
+        results.append({
+            "iteration": i + 1,
+            "register": _measured("app_api:app:register", APP_ID, daemon, "--json-info", json_info, "--wait-finish"),
+            "disable": _measured("app_api:app:disable", APP_ID),
+            "enable": _measured("app_api:app:enable", APP_ID),
+            "unregister": _measured("app_api:app:unregister", APP_ID, "--rm-data"),
+        })
+    return results
+
+
+def _rollback(daemon: str, roles: list[str]) -> list[dict]:
+    _sim("PUT", "/sim/config", {
+        "latency": {"*": float(LATENCY)}, "ready_delay": float(READY_DELAY),
+        "failure_rate": {f"wait_for_start/{roles[-1]}": 1.0},
+    })
+    json_info = _json_info(roles)
+    results = []
+    try:
+        for i in range(ITERATIONS):
+            register = _measured("app_api:app:register", APP_ID, daemon, "--json-info", json_info, "--wait-finish", check=False)
+            results.append({
+                "iteration": i + 1,
+                "failed_register": register,
+                "rollback_removes": _calls(register, "/remove"),
+                "left_deployments": _sim("GET", "/sim/stats")["deployments"],
+            })
+            _occ("app_api:app:unregister", APP_ID, "--rm-data", "--silent", "--force", check=False)
+            _sim("POST", "/sim/reset?state=true")
+    finally:
+        _sim("PUT", "/sim/config", {"latency": {"*": float(LATENCY)}, "ready_delay": float(READY_DELAY)})
+    return results
+
+
+def main() -> None:
+    simulator = _start_simulator()
+    report = {"latency": float(LATENCY), "ready_delay": float(READY_DELAY), "roles": ROLES, "scenarios": {}}
+    daemons = [K8S_DAEMON]
+    try:
+        _occ(
+            "app_api:daemon:register", K8S_DAEMON, "HaRP simulator (k8s)", "kubernetes-install", "http",
+            f"127.0.0.1:{PORT}", HARP_URL, "--harp", "--harp_shared_key", SHARED_KEY, "--k8s",
+        )
+        report["scenarios"]["k8s_single"] = _lifecycle(K8S_DAEMON, [])
+        report["scenarios"]["k8s_multi"] = _lifecycle(K8S_DAEMON, ROLES)
+        report["scenarios"]["k8s_multi_rollback"] = _rollback(K8S_DAEMON, ROLES)
+        if os.environ.get("BENCH_DOCKER"):
+            daemons.append(DOCKER_DAEMON)
+            _occ(
+                "app_api:daemon:register", DOCKER_DAEMON, "HaRP simulator (docker)", "docker-install", "http",
+                f"127.0.0.1:{PORT}", HARP_URL, "--harp", "--harp_shared_key", SHARED_KEY,
+            )
+            report["scenarios"]["docker_harp"] = _lifecycle(DOCKER_DAEMON, [])
+    finally:
+        _occ("app_api:app:unregister", APP_ID, "--rm-data", "--silent", "--force", check=False)
+        for daemon in daemons:
+            _occ("app_api:daemon:unregister", daemon, check=False)
+        simulator.terminate()
+        simulator.wait(timeout=30)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
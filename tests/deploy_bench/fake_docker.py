@@ -0,0 +1,406 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Stand-in for the subset of the Docker Engine API that AppAPI's DockerActions uses.
+
+Serves, over a unix socket (`--socket`) or TCP (`--port`), with or without the
+`/v1.xx` API version prefix:
+  - `_ping` (GET/HEAD), `version`;
+  - `images/create` (a synthetic pull of `--image-size-mb` split into `--layers`
+    layers, streamed as JSON lines like dockerd does, at `--pull-rate-mb` MB/s),
+    `images/<name>/json`;
+  - `containers/create|<id>/start|<id>/stop|<id>/json|<id>/logs|<id>/exec|<id>/archive`,
+    `DELETE containers/<id>` and `exec/<id>/start`;
+  - `volumes/create`, `volumes/<name>` (GET/DELETE).
+Nothing is pulled or run, except that with `--exapp-command` every started
+container runs that command (with the container's Env, e.g. `install_no_init.py`),
+so that AppAPI's heartbeat and init calls reach a real ExApp. The daemon then
+has to be registered with `--net host`.
+
+`GET /fake/stats` returns the number of calls and seconds spent per endpoint,
+`POST /fake/reset` clears them (images, containers and volumes are kept).
+
+Usage:
+    python tests/deploy_bench/fake_docker.py --socket /tmp/appapi-fake-docker.sock
+    php occ app_api:daemon:register fake_docker "Fake Docker" docker-install http \
+        /tmp/appapi-fake-docker.sock http://localhost:8080 --net host
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shlex
+import struct
+import subprocess
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+API_VERSION = "1.44"
+OS_RELEASE = 'PRETTY_NAME="Debian GNU/Linux 12 (bookworm)"\nNAME="Debian GNU/Linux"\nID=debian\n'
+_VERSION_PREFIX = re.compile(r"^/v\d+\.\d+(?=/)")
+
+
+@dataclass
+class Settings:
+    image_size_mb: float = 200.0
+    layers: int = 5
+    pull_rate_mb: float = 0.0  # MB/s, 0 streams the pull as fast as it is read
+    progress_step_kb: int = 512  # bytes of "Downloading"/"Extracting" progress per message
+    start_delay: float = 0.0  # seconds a started container stays in "created" before "running"
+    exapp_command: str = ""
+    exapp_cwd: str = ""
+
+
+@dataclass
+class Container:
+    id: str
+    name: str
+    image: str
+    config: dict
+    created: str
+    status: str = "created"
+    started_at: float = 0.0
+    process: subprocess.Popen | None = None
+    log_path: Path | None = None
+    logs: list[tuple[str, int, str]] = field(default_factory=list)  # (RFC 3339 time, stream, line)
+
+    def running(self, settings: Settings) -> bool:
+        return self.status == "running" and time.time() - self.started_at >= settings.start_delay
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+def _frame(stream: int, data: bytes) -> bytes:
+    """One frame of Docker's multiplexed stdout/stderr stream."""
+    return struct.pack(">BxxxL", stream, len(data)) + data
+
+
+def _not_found(what: str) -> JSONResponse:
+    return JSONResponse({"message": f"No such {what}"}, status_code=404)
+
+
+def create_app(settings: Settings) -> FastAPI:
+    app = FastAPI()
+    images: dict[str, dict] = {}
+    containers: dict[str, Container] = {}
+    volumes: dict[str, dict] = {}
+    execs: dict[str, list[str]] = {}
+    stats: dict[str, dict[str, float]] = defaultdict(lambda: {"calls": 0, "seconds": 0.0})
+
+    def find_container(ref: str) -> Container | None:
+        ref = ref.lstrip("/")
+        if ref in containers:
+            return containers[ref]
+        return next((c for c in containers.values() if c.id.startswith(ref)), None)
+
+    def stop_process(container: Container) -> None:
+        if container.process is not None and container.process.poll() is None:
+            container.process.terminate()
+            try:
+                container.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                container.process.kill()
+        container.process = None
+
+    @app.middleware("http")
+    async def strip_version_and_measure(request: Request, call_next):
+        # when mounted (HaRP's Docker Engine API proxy), the path includes the mount prefix in `root_path`
+        root_path = request.scope.get("root_path", "")
+        full_path = request.scope["path"]
+        if not root_path or not full_path.startswith(root_path):
+            root_path = ""
+        path = _VERSION_PREFIX.sub("", full_path[len(root_path):])
+        request.scope["path"] = root_path + path
+        start = time.perf_counter()
+        response = await call_next(request)
+        if not path.startswith("/fake/"):
+            # ids and names are replaced, so that the stats are per endpoint
+            route = request.scope.get("route")
+            key = f"{request.method} {route.path if route is not None else path}"
+            stats[key]["calls"] += 1
+            stats[key]["seconds"] += time.perf_counter() - start
+        return response
+
+    @app.api_route("/_ping", methods=["GET", "HEAD"])
+    async def ping():
+        return PlainTextResponse("OK", headers={"Api-Version": API_VERSION, "Server": "Docker/27.0.0 (linux)"})
+
+    @app.get("/version")
+    async def version():
+        return {"Version": "27.0.0", "ApiVersion": API_VERSION, "Os": "linux", "Platform": {"Name": "Docker Engine - Fake"}}
+
+    @app.post("/images/create")
+    async def pull_image(fromImage: str, tag: str = ""):
+        image = f"{fromImage}:{tag}" if tag and ":" not in fromImage.rsplit("/", 1)[-1] else fromImage
+        return StreamingResponse(_pull_stream(image), media_type="application/json")
+
+    async def _pull_stream(image: str):
+        def line(message: dict) -> bytes:
+            return (json.dumps(message) + "\r\n").encode()
+
+        yield line({"status": f"Pulling from {image.rsplit(':', 1)[0]}", "id": image.rsplit(":", 1)[-1]})
+        layer_size = max(1, int(settings.image_size_mb * 1024 * 1024 / max(1, settings.layers)))
+        layer_ids = [hashlib.sha256(f"{image}/{i}".encode()).hexdigest()[:12] for i in range(settings.layers)]
+        if image in images:
+            for layer_id in layer_ids:
+                yield line({"status": "Already exists", "progressDetail": {}, "id": layer_id})
+        else:
+            step = settings.progress_step_kb * 1024
+            delay = step / (settings.pull_rate_mb * 1024 * 1024) if settings.pull_rate_mb > 0 else 0.0
+            for layer_id in layer_ids:
+                yield line({"status": "Pulling fs layer", "progressDetail": {}, "id": layer_id})
+            for layer_id in layer_ids:
+                for phase in ("Downloading", "Extracting"):
+                    for current in range(step, layer_size + step, step):
+                        current = min(current, layer_size)
+                        yield line({
+                            "status": phase, "progressDetail": {"current": current, "total": layer_size},
+                            "progress": f"[{'=' * (50 * current // layer_size):<50}] {current}/{layer_size}", "id": layer_id,
+                        })
+                        if delay and phase == "Downloading":
+                            await asyncio.sleep(delay)
+                    if phase == "Downloading":
+                        yield line({"status": "Download complete", "progressDetail": {}, "id": layer_id})
+                yield line({"status": "Pull complete", "progressDetail": {}, "id": layer_id})
+        digest = hashlib.sha256(image.encode()).hexdigest()
+        yield line({"status": f"Digest: sha256:{digest}"})
+        yield line({"status": f"Status: Downloaded newer image for {image}"})
+        images[image] = {"Id": f"sha256:{digest}", "RepoTags": [image], "Size": int(settings.image_size_mb * 1024 * 1024)}
+
+    @app.get("/images/{name:path}/json")
+    async def inspect_image(name: str):
+        return images[name] if name in images else _not_found(f"image: {name}")
+
+    @app.post("/containers/create", status_code=201)
+    async def create_container(name: str, request: Request):
+        config = await request.json()
+        if name in containers:
+            return JSONResponse({"message": f'Conflict. The container name "/{name}" is already in use'}, status_code=409)
+        if config.get("Image") not in images:
+            return _not_found(f"image: {config.get('Image')}")
+        for mount in config.get("HostConfig", {}).get("Mounts", []):
+            if mount.get("Type") == "volume" and mount["Source"] not in volumes:
+                volumes[mount["Source"]] = _volume(mount["Source"])
+        containers[name] = Container(id=uuid.uuid4().hex + uuid.uuid4().hex, name=name, image=config["Image"], config=config, created=_now())
+        return {"Id": containers[name].id, "Warnings": []}
+
+    @app.post("/containers/{ref}/start")
+    async def start_container(ref: str):
+        container = find_container(ref)
+        if container is None:
+            return _not_found(f"container: {ref}")
+        if container.status == "running":
+            return Response(status_code=304)
+        container.status = "running"
+        container.started_at = time.time()
+        container.logs.append((_now(), 1, f"fake container {container.name} started"))
+        if settings.exapp_command:
+            env = dict(os.environ)
+            env.update(entry.split("=", 1) for entry in container.config.get("Env") or [] if "=" in entry)
+            container.log_path = Path(tempfile.gettempdir()) / f"fake_docker_{container.name}.log"
+            with container.log_path.open("ab") as log:
+                container.process = subprocess.Popen(
+                    shlex.split(settings.exapp_command), env=env, cwd=settings.exapp_cwd or None,
+                    stdout=log, stderr=subprocess.STDOUT,
+                )
+        return Response(status_code=204)
+
+    @app.post("/containers/{ref}/stop")
+    async def stop_container(ref: str):
+        container = find_container(ref)
+        if container is None:
+            return _not_found(f"container: {ref}")
+        if container.status != "running":
+            return Response(status_code=304)
+        stop_process(container)
+        container.status = "exited"
+        container.logs.append((_now(), 1, f"fake container {container.name} stopped"))
+        return Response(status_code=204)
+
+    @app.delete("/containers/{ref}")
+    async def remove_container(ref: str, force: bool = False):
+        container = find_container(ref)
+        if container is None:
+            return _not_found(f"container: {ref}")
+        if container.status == "running" and not force:
+            return JSONResponse({"message": "You cannot remove a running container. Stop the container before attempting removal or force remove"}, status_code=409)
+        stop_process(container)
+        del containers[container.name]
+        return Response(status_code=204)
+
+    @app.get("/containers/{ref}/json")
+    async def inspect_container(ref: str):
+        container = find_container(ref)
+        if container is None:
+            return _not_found(f"container: {ref}")
+        running = container.running(settings)
+        return {
+            "Id": container.id,
+            "Name": f"/{container.name}",
+            "Created": container.created,
+            "Image": images.get(container.image, {}).get("Id", container.image),
+            "Config": {"Image": container.image, "Hostname": container.config.get("Hostname", ""), "Env": container.config.get("Env") or []},
+            "HostConfig": container.config.get("HostConfig", {}),
+            "Mounts": container.config.get("HostConfig", {}).get("Mounts", []),
+            "State": {
+                "Status": "running" if running else ("created" if container.status == "running" else container.status),
+                "Running": running,
+                "ExitCode": 0,
+            },
+        }
+
+    @app.get("/containers/{ref}/logs")
+    async def container_logs(
+        ref: str, stdout: bool = False, stderr: bool = False, tail: str = "all",
+        timestamps: bool = False, follow: bool = False,
+    ):
+        container = find_container(ref)
+        if container is None:
+            return _not_found(f"container: {ref}")
+
+        def read_lines(start: int) -> tuple[list[tuple[str, int, str]], int]:
+            lines = list(container.logs)
+            if container.log_path is not None and container.log_path.exists():
+                output = container.log_path.read_text(errors="replace").splitlines()
+                lines += [(_now(), 1, text) for text in output]
+            return lines[start:], len(lines)
+
+        def encode(lines: list[tuple[str, int, str]]) -> bytes:
+            return b"".join(
+                _frame(stream, ((f"{ts} " if timestamps else "") + text + "\n").encode())
+                for ts, stream, text in lines
+                if (stream == 1 and stdout) or (stream == 2 and stderr)
+            )
+
+        lines, seen = read_lines(0)
+        if tail != "all":
+            lines = lines[-int(tail):] if int(tail) > 0 else []
+
+        async def stream():
+            nonlocal seen
+            yield encode(lines)
+            while follow and container.name in containers and container.status == "running":
+                await asyncio.sleep(0.5)
+                new_lines, seen = read_lines(seen)
+                if new_lines:
+                    yield encode(new_lines)
+
+        return StreamingResponse(stream(), media_type="application/vnd.docker.multiplexed-stream")
+
+    @app.post("/containers/{ref}/exec", status_code=201)
+    async def create_exec(ref: str, request: Request):
+        container = find_container(ref)
+        if container is None:
+            return _not_found(f"container: {ref}")
+        exec_id = uuid.uuid4().hex
+        execs[exec_id] = (await request.json()).get("Cmd") or []
+        return {"Id": exec_id}
+
+    @app.post("/exec/{exec_id}/start")
+    async def start_exec(exec_id: str):
+        command = execs.pop(exec_id, None)
+        if command is None:
+            return _not_found(f"exec instance: {exec_id}")
+        output = OS_RELEASE if command[-1:] == ["/etc/os-release"] else ""
+        return Response(_frame(1, output.encode()) if output else b"", media_type="application/vnd.docker.raw-stream")
+
+    @app.put("/containers/{ref}/archive")
+    async def put_archive(ref: str, request: Request):
+        if find_container(ref) is None:
+            return _not_found(f"container: {ref}")
+        await request.body()
+        return Response(status_code=200)
+
+    def _volume(name: str) -> dict:
+        return {"Name": name, "Driver": "local", "Mountpoint": f"/var/lib/docker/volumes/{name}/_data", "CreatedAt": _now(), "Scope": "local"}
+
+    @app.post("/volumes/create", status_code=201)
+    async def create_volume(request: Request):
+        body = await request.json()
+        name = body.get("Name") or body.get("name") or uuid.uuid4().hex  # AppAPI sends "name", dockerd accepts both
+        volumes.setdefault(name, _volume(name))
+        return volumes[name]
+
+    @app.get("/volumes/{name}")
+    async def inspect_volume(name: str):
+        return volumes[name] if name in volumes else _not_found(f"volume: {name}")
+
+    @app.delete("/volumes/{name}")
+    async def remove_volume(name: str):
+        if name not in volumes:
+            return _not_found(f"volume: {name}")
+        in_use = any(
+            mount.get("Source") == name
+            for container in containers.values()
+            for mount in container.config.get("HostConfig", {}).get("Mounts", [])
+        )
+        if in_use:
+            return JSONResponse({"message": f"remove {name}: volume is in use"}, status_code=409)
+        del volumes[name]
+        return Response(status_code=204)
+
+    @app.get("/fake/stats")
+    async def get_stats():
+        return {
+            "endpoints": {key: {"calls": int(v["calls"]), "seconds": round(v["seconds"], 4)} for key, v in sorted(stats.items())},
+            "images": len(images),
+            "containers": len(containers),
+            "volumes": len(volumes),
+        }
+
+    @app.post("/fake/reset", status_code=204)
+    async def reset_stats():
+        stats.clear()
+
+    @app.on_event("shutdown")
+    def stop_all() -> None:
+        for container in containers.values():
+            stop_process(container)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--socket", help="unix socket path to listen on")
+    target.add_argument("--port", type=int, help="TCP port to listen on (127.0.0.1)")
+    parser.add_argument("--image-size-mb", type=float, default=Settings.image_size_mb)
+    parser.add_argument("--layers", type=int, default=Settings.layers)
+    parser.add_argument("--pull-rate-mb", type=float, default=Settings.pull_rate_mb, help="MB/s, 0 for no limit")
+    parser.add_argument("--progress-step-kb", type=int, default=Settings.progress_step_kb)
+    parser.add_argument("--start-delay", type=float, default=Settings.start_delay)
+    parser.add_argument("--exapp-command", default="", help="command started for every started container")
+    parser.add_argument("--exapp-cwd", default="", help="working directory of --exapp-command")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    settings = Settings(
+        image_size_mb=args.image_size_mb, layers=args.layers, pull_rate_mb=args.pull_rate_mb,
+        progress_step_kb=args.progress_step_kb, start_delay=args.start_delay,
+        exapp_command=args.exapp_command, exapp_cwd=args.exapp_cwd,
+    )
+    if args.socket:
+        Path(args.socket).unlink(missing_ok=True)
+        uvicorn.run(create_app(settings), uds=args.socket, log_level="warning")
+    else:
+        uvicorn.run(create_app(settings), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Stand-in for HaRP, with injected latency, failures and readiness delays.
+
+Serves what AppAPI calls on HaRP (`--port`, default 8780):
+  - `/exapps/app_api/k8s/exapp/{exists,create,start,stop,wait_for_start,install_certificates,expose,remove}`
+    (KubernetesActions, one deployment per ExApp role);
+  - `/exapps/app_api/docker/exapp/{exists,create,start,stop,wait_for_start,install_certificates,remove}`
+    (DockerActions::deployExAppHarp) and the Docker Engine API under `/exapps/app_api/v1.xx/`
+    (image pulls, served by `fake_docker.py`);
+  - `/exapps/app_api/info` and `/exapps/app_api/exapp_storage/<appid>`;
+  - `/exapps/<appid>/...`: a synthetic ExApp (heartbeat once its deployments are ready,
+    501 on `/init`, `/enabled` accepted), reached when the daemon is registered with this
+    server as its `nextcloud_url`.
+
+Behaviour (also replaceable at runtime with `PUT /sim/config`, same keys as JSON):
+  - `latency`: seconds per operation (`create`, `start`, ..., `*` for all others);
+  - `failure_rate`: 0..1 per operation, or per operation and role as `<op>/<role>`
+    (failed calls answer HTTP 500 after their latency);
+  - `ready_delay`: seconds from start until `wait_for_start` reports the deployment ready,
+    per role in `ready_delay_roles`; `wait_timeout` bounds how long `wait_for_start` waits;
+  - `seed`: seed of the failure draws, so that runs are repeatable.
+`GET /sim/stats` returns calls, failures and seconds per endpoint (per operation for the ExApp
+operations); `POST /sim/reset` clears them (and the deployments with `?state=true`).
+
+Usage:
+    python tests/deploy_bench/fake_harp.py --port 8780 --latency create=0.5 --ready-delay 3
+    php occ app_api:daemon:register harp_sim "HaRP simulator" kubernetes-install http \
+        127.0.0.1:8780 http://127.0.0.1:8780 --harp --harp_shared_key sim_key --k8s
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import secrets
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from fake_docker import Settings as DockerSettings
+from fake_docker import create_app as create_docker_app
+
+HARP_VERSION = "0.3.2"
+
+
+@dataclass
+class Behaviour:
+    latency: dict[str, float] = field(default_factory=dict)
+    failure_rate: dict[str, float] = field(default_factory=dict)
+    ready_delay: float = 2.0
+    ready_delay_roles: dict[str, float] = field(default_factory=dict)
+    wait_timeout: float = 120.0
+    seed: int = 0
+
+
+@dataclass
+class Deployment:
+    image: str
+    env: list[str]
+    running: bool = False
+    started_at: float = 0.0
+    exposed: dict | None = None
+
+
+def create_app(behaviour: Behaviour, shared_key: str = "", docker_settings: DockerSettings | None = None) -> FastAPI:
+    app = FastAPI()
+    state = {"behaviour": behaviour, "rng": random.Random(behaviour.seed)}
+    deployments: dict[tuple[str, str, str], Deployment] = {}
+    storage: dict[str, dict] = {}
+    stats: dict[str, dict[str, float]] = defaultdict(lambda: {"calls": 0, "failures": 0, "seconds": 0.0})
+
+    @app.middleware("http")
+    async def check_key_and_measure(request: Request, call_next):
+        path = request.scope["path"]
+        is_sim = path.startswith("/sim/")
+        if shared_key and path.startswith("/exapps/app_api/") and request.headers.get("harp-shared-key") != shared_key:
+            return JSONResponse({"error": "invalid harp-shared-key"}, status_code=401)
+        start = time.perf_counter()
+        response = await call_next(request)
+        if not is_sim:
+            route = request.scope.get("route")
+            label = route.path if route is not None else path
+            if "op" in request.path_params:
+                label = path  # one entry per ExApp operation (create, wait_for_start, ...)
+            key = f"{request.method} {label}"
+            stats[key]["calls"] += 1
+            stats[key]["failures"] += int(response.status_code >= 500)
+            stats[key]["seconds"] += time.perf_counter() - start
+        return response
+
+    async def simulate(op: str, role: str = "") -> JSONResponse | None:
+        """Apply the latency of `op`, then return the error response if the call is drawn to fail."""
+        current: Behaviour = state["behaviour"]
+        delay = current.latency.get(op, current.latency.get("*", 0.0))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        rate = current.failure_rate.get(f"{op}/{role}", current.failure_rate.get(op, 0.0))
+        if rate > 0 and state["rng"].random() < rate:
+            return JSONResponse({"error": f"simulated failure of {op}"}, status_code=500)
+        return None
+
+    def key(backend: str, payload: dict) -> tuple[str, str, str]:
+        return backend, payload["name"], payload.get("role_suffix", "") if backend == "k8s" else ""
+
+    def deployment_name(backend: str, payload: dict) -> str:
+        role = payload.get("role_suffix", "")
+        prefix = "nc-app-" if backend == "k8s" else "nc_app_"
+        return f"{prefix}{payload['name']}" + (f"-{role}" if role else "")
+
+    def ready_at(deployment: Deployment, role: str) -> float:
+        current: Behaviour = state["behaviour"]
+        return deployment.started_at + current.ready_delay_roles.get(role, current.ready_delay)
+
+    @app.get("/exapps/app_api/info")
+    async def info():
+        return {
+            "version": HARP_VERSION,
+            "kubernetes": {"enabled": True, "reachable": True, "api_server": "simulator"},
+        }
+
+    @app.post("/exapps/app_api/exapp_storage/{app_id}")
+    async def add_exapp(app_id: str, request: Request):
+        storage[app_id] = await request.json()
+        return Response(status_code=200)
+
+    @app.delete("/exapps/app_api/exapp_storage/{app_id}")
+    async def remove_exapp(app_id: str):
+        if storage.pop(app_id, None) is None:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        return Response(status_code=204)
+
+    @app.post("/exapps/app_api/{backend}/exapp/{op}")
+    async def exapp_operation(backend: str, op: str, request: Request):
+        if backend not in ("k8s", "docker"):
+            return JSONResponse({"error": f"unknown backend {backend}"}, status_code=404)
+        payload = await request.json()
+        role = payload.get("role_suffix", "")
+        error = await simulate(op, role)
+        if error is not None:
+            return error
+        k = key(backend, payload)
+        deployment = deployments.get(k)
+
+        if op == "exists":
+            return {"exists": deployment is not None}
+        if op == "create":
+            if deployment is not None:
+                return JSONResponse({"error": f"{deployment_name(backend, payload)} already exists"}, status_code=409)
+            deployment = deployments[k] = Deployment(
+                image=payload.get("image") or payload.get("image_id", ""),
+                env=list(payload.get("environment_variables") or []),
+            )
+            if payload.get("start_container"):
+                deployment.running, deployment.started_at = True, time.time()
+            result = {"name": deployment_name(backend, payload)}
+            if backend == "docker":
+                result["id"] = secrets.token_hex(32)
+            return JSONResponse(result, status_code=201)
+        if deployment is None:
+            return JSONResponse({"error": f"{deployment_name(backend, payload)} does not exist"}, status_code=404)
+        if op == "start":
+            if deployment.running:
+                return Response(status_code=200)
+            deployment.running, deployment.started_at = True, time.time()
+            return Response(status_code=204)
+        if op == "stop":
+            if not deployment.running:
+                return Response(status_code=200)
+            deployment.running = False
+            return Response(status_code=204)
+        if op == "install_certificates":
+            return Response(status_code=204)
+        if op == "wait_for_start":
+            if not deployment.running:
+                return {"started": False, "status": "stopped", "health": None, "reason": "not started"}
+            current: Behaviour = state["behaviour"]
+            remaining = ready_at(deployment, role) - time.time()
+            if remaining > current.wait_timeout:
+                await asyncio.sleep(current.wait_timeout)
+                return {"started": False, "status": "starting", "health": "starting", "reason": "timed out waiting for readiness"}
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            return {"started": True, "status": "running", "health": "healthy", "reason": ""}
+        if op == "expose" and backend == "k8s":
+            deployment.exposed = {"host": f"{deployment_name(backend, payload)}.simulator", "port": payload.get("port", 0)}
+            return deployment.exposed
+        if op == "remove":
+            del deployments[k]
+            return Response(status_code=204)
+        return JSONResponse({"error": f"{op} is not a {backend} operation"}, status_code=404)
+
+    if docker_settings is not None:
+        # image pulls of docker-install daemons go through HaRP's Docker Engine API proxy
+        app.mount("/exapps/app_api", create_docker_app(docker_settings))
+
+    @app.api_route("/exapps/{app_id}/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+    async def exapp(app_id: str, path: str):
+        ready = [
+            d for (_, name, role), d in deployments.items()
+            if name == app_id and d.running and time.time() >= ready_at(d, role)
+        ]
+        if not ready:
+            return JSONResponse({"error": f"{app_id} is not running"}, status_code=503)
+        if path == "heartbeat":
+            return {"status": "ok"}
+        if path == "init":
+            return JSONResponse({"error": "init is not implemented"}, status_code=501)
+        if path == "enabled":
+            return {"error": ""}
+        return {}
+
+    @app.put("/sim/config")
+    async def set_config(request: Request):
+        new = Behaviour(**await request.json())
+        state["behaviour"], state["rng"] = new, random.Random(new.seed)
+        return asdict(new)
+
+    @app.get("/sim/config")
+    async def get_config():
+        return asdict(state["behaviour"])
+
+    @app.get("/sim/stats")
+    async def get_stats():
+        return {
+            "endpoints": {
+                k: {"calls": int(v["calls"]), "failures": int(v["failures"]), "seconds": round(v["seconds"], 4)}
+                for k, v in sorted(stats.items())
+            },
+            "deployments": ["/".join(filter(None, k)) for k in deployments],
+        }
+
+    @app.post("/sim/reset", status_code=204)
+    async def reset(request: Request):
+        stats.clear()
+        if request.query_params.get("state") == "true":
+            deployments.clear()
+            storage.clear()
+
+    return app
+
+
+def _pairs(values: list[str]) -> dict[str, float]:
+    result = {}
+    for value in values:
+        name, _, number = value.partition("=")
+        result[name] = float(number)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--shared-key", default="", help="require this harp-shared-key header")
+    parser.add_argument("--latency", action="append", default=[], metavar="OP=SECONDS")
+    parser.add_argument("--failure-rate", action="append", default=[], metavar="OP[/ROLE]=RATE")
+    parser.add_argument("--ready-delay", type=float, default=Behaviour.ready_delay)
+    parser.add_argument("--ready-delay-role", action="append", default=[], metavar="ROLE=SECONDS")
+    parser.add_argument("--wait-timeout", type=float, default=Behaviour.wait_timeout)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--image-size-mb", type=float, default=DockerSettings.image_size_mb)
+    parser.add_argument("--layers", type=int, default=DockerSettings.layers)
+    parser.add_argument("--pull-rate-mb", type=float, default=DockerSettings.pull_rate_mb)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    behaviour = Behaviour(
+        latency=_pairs(args.latency), failure_rate=_pairs(args.failure_rate), ready_delay=args.ready_delay,
+        ready_delay_roles=_pairs(args.ready_delay_role), wait_timeout=args.wait_timeout, seed=args.seed,
+    )
+    docker_settings = DockerSettings(image_size_mb=args.image_size_mb, layers=args.layers, pull_rate_mb=args.pull_rate_mb)
+    uvicorn.run(create_app(behaviour, args.shared_key, docker_settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
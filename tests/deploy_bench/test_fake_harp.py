@@ -0,0 +1,50 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Smoke test of the HaRP simulator: requests are routed like AppAPI sends them (no server needed)."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fake_docker import API_VERSION
+from fake_docker import Settings as DockerSettings
+from fake_harp import Behaviour, create_app
+
+SHARED_KEY = "test_key"
+IMAGE = "ghcr.io/nextcloud/app-skeleton-python"
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = create_app(Behaviour(ready_delay=0.0), SHARED_KEY, DockerSettings(image_size_mb=1.0, layers=2))
+    return TestClient(app, headers={"harp-shared-key": SHARED_KEY})
+
+
+def test_versioned_docker_api_through_harp_mount(client):
+    """DockerActions::buildApiUrl prefixes every Docker Engine API call with `/exapps/app_api/v<version>`."""
+    r = client.post(f"/exapps/app_api/v{API_VERSION}/images/create", params={"fromImage": IMAGE, "tag": "latest"})
+    assert r.status_code == 200, r.text
+    messages = [json.loads(line) for line in r.text.splitlines() if line.strip()]
+    assert messages[-1]["status"] == f"Status: Downloaded newer image for {IMAGE}:latest"
+
+    r = client.get(f"/exapps/app_api/v{API_VERSION}/images/{IMAGE}:latest/json")
+    assert r.status_code == 200, r.text
+    assert r.json()["RepoTags"] == [f"{IMAGE}:latest"]
+
+
+def test_harp_routes_are_not_shadowed_by_the_docker_mount(client):
+    r = client.get("/exapps/app_api/info")
+    assert r.status_code == 200, r.text
+    assert r.json()["kubernetes"]["enabled"] is True
+
+    r = client.post("/exapps/app_api/k8s/exapp/exists", json={"name": "smoke", "instance_id": ""})
+    assert r.status_code == 200, r.text
+    assert r.json() == {"exists": False}
+
+
+def test_shared_key_is_required(client):
+    r = client.get(f"/exapps/app_api/v{API_VERSION}/_ping", headers={"harp-shared-key": "wrong"})
+    assert r.status_code == 401
@@ -3,7 +3,8 @@
 """Tiny HTTP client wrapping AppAPI's auth contract.
 
 Replaces the parts of nc_py_api that the integration tests actually used:
-the AppAPI auth headers and a `requests`-style call.
+the AppAPI auth headers and a `requests`-style call. `AsyncAppAPIClient` is the
+pooled asyncio variant used by the load benchmarks (`bench/load.py`).
 
 No HMAC / request signing — AppAPI accepts the simple base64 auth header for
 ExApp -> Nextcloud calls. See `tests/install_no_init.py` (the existing in-tree
@@ -16,6 +17,7 @@ from base64 import b64encode
 from dataclasses import dataclass, field
 from typing import Any
 
+import httpx
 import requests
 
 
@@ -50,11 +52,59 @@ class AppAPIClient:
         Caller-supplied `headers` win over the defaults. Pass `headers={"X": None}`
         to drop a default header (used in negative-auth tests).
         """
-        headers = self.auth_headers()
-        for k, v in (kwargs.pop("headers", None) or {}).items():
-            if v is None:
-                headers.pop(k, None)
-            else:
-                headers[k] = v
+        headers = _merge_headers(self.auth_headers(), kwargs.pop("headers", None))
         kwargs.setdefault("timeout", self.timeout)
         return requests.request(method, f"{self.base_url}{path}", headers=headers, **kwargs)
+
+
+@dataclass
+class AsyncAppAPIClient(AppAPIClient):
+    """`AppAPIClient` over one pooled `httpx.AsyncClient` (keep-alive connections).
+
+    Use as `async with AsyncAppAPIClient(...) as client:`; `max_connections`
+    bounds the connections open to Nextcloud, so it should be at least the
+    number of concurrent requests.
+    """
+
+    max_connections: int = 32
+    _http: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+
+    async def __aenter__(self) -> AsyncAppAPIClient:
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def as_user(self, user: str) -> AsyncAppAPIClient:
+        """Same connection pool, requests sent with `AA-USER-ID: <user>`."""
+        other = AsyncAppAPIClient(
+            base_url=self.base_url, app_id=self.app_id, app_secret=self.app_secret,
+            app_version=self.app_version, user=user, extra_headers=dict(self.extra_headers),
+            timeout=self.timeout, max_connections=self.max_connections,
+        )
+        other._http = self._http
+        return other
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:  # type: ignore[override]
+        """Async `AppAPIClient.request`; same header semantics."""
+        if self._http is None:
+            raise RuntimeError("AsyncAppAPIClient must be used as an async context manager")
+        headers = _merge_headers(self.auth_headers(), kwargs.pop("headers", None))
+        return await self._http.request(method, path, headers=headers, **kwargs)
+
+
+def _merge_headers(defaults: dict[str, str], overrides: dict[str, str | None] | None) -> dict[str, str]:
+    headers = dict(defaults)
+    for k, v in (overrides or {}).items():
+        if v is None:
+            headers.pop(k, None)
+        else:
+            headers[k] = v
+    return headers
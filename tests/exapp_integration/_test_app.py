@@ -11,19 +11,55 @@ We deliberately do not register a `/init` route: AppAPI's
 needed" and marks init progress = 100. This lets `app_api:app:register
 --wait-finish` complete promptly without the test app having to call back to
 `/ex-app/status` itself.
+
+It doubles as a load target for AppAPI's proxy and request paths (the `/load/*`
+routes are public, `register_test_exapp.sh` registers them as PUBLIC ExApp routes):
+  - `GET /load/payload?size=&delay=`: `size` bytes after `delay` seconds;
+  - `POST /load/echo?delay=`: the request body back;
+  - `GET /load/chunked?chunks=&chunk_size=&interval=`: a chunked body (no Content-Length);
+  - `GET /load/sse?events=&interval=`: a `text/event-stream` of `events` events;
+  - `GET /load/download?size_mb=`: a large download with a Content-Length, sent in 64 KiB blocks;
+  - `GET /load/outbound?calls=&user=`: `calls` concurrent OCS requests back to Nextcloud
+    (through one pooled client per worker, at most OUTBOUND_MAX_CONNECTIONS connections).
+`/setup_checks` answers AppAPI's setup-check probe (reachability of Nextcloud from the
+ExApp, after SETUP_CHECKS_DELAY seconds); set SETUP_CHECKS=1 to opt in on enable.
+Run with APP_WORKERS > 1 for a multi-process uvicorn.
 """
 
+import asyncio
 import os
-from base64 import b64decode
+import time
+from base64 import b64decode, b64encode
+from contextlib import asynccontextmanager
 
+import httpx
 from fastapi import FastAPI, HTTPException, Request as FastAPIRequest
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 APP_ID = os.environ["APP_ID"]
 APP_SECRET = os.environ["APP_SECRET"]
 APP_VERSION = os.environ.get("APP_VERSION", "1.0.0")
+NEXTCLOUD_URL = os.environ.get("NEXTCLOUD_URL", "http://nextcloud.appapi").rstrip("/")
+OUTBOUND_MAX_CONNECTIONS = int(os.environ.get("OUTBOUND_MAX_CONNECTIONS", "32"))
+SETUP_CHECKS = os.environ.get("SETUP_CHECKS", "") == "1"
+SETUP_CHECKS_DELAY = float(os.environ.get("SETUP_CHECKS_DELAY", "0"))
+
+BLOCK = b"x" * 65536
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one pool per worker process, shared by every handler calling Nextcloud
+    async with httpx.AsyncClient(
+        base_url=NEXTCLOUD_URL,
+        timeout=30,
+        limits=httpx.Limits(max_connections=OUTBOUND_MAX_CONNECTIONS, max_keepalive_connections=OUTBOUND_MAX_CONNECTIONS),
+    ) as client:
+        app.state.nextcloud = client
+        yield
+
 
-APP = FastAPI()
+APP = FastAPI(lifespan=lifespan)
 
 
 def verify_auth(request: FastAPIRequest) -> str:
@@ -46,9 +82,26 @@ def verify_auth(request: FastAPIRequest) -> str:
     return username
 
 
+def app_api_headers(username: str = "") -> dict[str, str]:
+    """AppAPI auth headers of a request from this ExApp to Nextcloud, as `username`."""
+    return {
+        "OCS-APIRequest": "true",
+        "EX-APP-ID": APP_ID,
+        "EX-APP-VERSION": APP_VERSION,
+        "AA-VERSION": "2.0.0",
+        "AUTHORIZATION-APP-API": b64encode(f"{username}:{APP_SECRET}".encode("UTF-8")).decode("ASCII"),
+    }
+
+
 @APP.put("/enabled")
 async def enabled_callback(enabled: bool, request: FastAPIRequest):
     verify_auth(request)
+    if enabled and SETUP_CHECKS:
+        r = await request.app.state.nextcloud.post(
+            "/ocs/v1.php/apps/app_api/api/v1/setup_check", headers=app_api_headers(),
+        )
+        if r.status_code != 200:
+            return JSONResponse(content={"error": f"setup check opt-in failed: HTTP {r.status_code}"}, status_code=200)
     return JSONResponse(content={"error": ""}, status_code=200)
 
 
@@ -68,11 +121,104 @@ async def cfg_echo(request: FastAPIRequest):
     }
 
 
+@APP.get("/setup_checks")
+async def setup_checks(request: FastAPIRequest):
+    verify_auth(request)
+    if SETUP_CHECKS_DELAY > 0:
+        await asyncio.sleep(SETUP_CHECKS_DELAY)
+    try:
+        r = await request.app.state.nextcloud.get("/status.php")
+        reachable = r.status_code == 200
+    except httpx.HTTPError:
+        reachable = False
+    return {
+        "nextcloud_reachable": {
+            "status": "success" if reachable else "error",
+            "text": "" if reachable else f"Nextcloud is not reachable from {APP_ID} at {NEXTCLOUD_URL}",
+        },
+    }
+
+
+@APP.get("/load/payload")
+async def load_payload(size: int = 1024, delay: float = 0.0):
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return Response(content=b"x" * size, media_type="application/octet-stream")
+
+
+@APP.post("/load/echo")
+async def load_echo(request: FastAPIRequest, delay: float = 0.0):
+    body = await request.body()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return Response(content=body, media_type=request.headers.get("Content-Type", "application/octet-stream"))
+
+
+@APP.get("/load/chunked")
+async def load_chunked(chunks: int = 16, chunk_size: int = 4096, interval: float = 0.0):
+    async def body():
+        chunk = b"x" * chunk_size
+        for i in range(chunks):
+            if i and interval > 0:
+                await asyncio.sleep(interval)
+            yield chunk
+
+    return StreamingResponse(body(), media_type="application/octet-stream")
+
+
+@APP.get("/load/sse")
+async def load_sse(events: int = 10, interval: float = 0.1):
+    async def body():
+        for i in range(events):
+            if i and interval > 0:
+                await asyncio.sleep(interval)
+            yield f"id: {i}\nevent: tick\ndata: {time.time()}\n\n"
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@APP.get("/load/download")
+async def load_download(size_mb: float = 100.0):
+    size = int(size_mb * 1024 * 1024)
+
+    async def body():
+        sent = 0
+        while sent < size:
+            block = BLOCK[:size - sent]
+            sent += len(block)
+            yield block
+
+    return StreamingResponse(body(), media_type="application/octet-stream", headers={
+        "Content-Length": str(size),
+        "Content-Disposition": 'attachment; filename="load.bin"',
+    })
+
+
+@APP.get("/load/outbound")
+async def load_outbound(request: FastAPIRequest, calls: int = 1, user: str = ""):
+    client: httpx.AsyncClient = request.app.state.nextcloud
+
+    async def call() -> int:
+        try:
+            return (await client.get("/ocs/v1.php/cloud/capabilities", headers=app_api_headers(user))).status_code
+        except httpx.HTTPError:
+            return 0
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(call() for _ in range(calls)))
+    return {
+        "calls": calls,
+        "failures": sum(1 for status in statuses if not 200 <= status < 300),
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "_test_app:APP",
         host=os.environ.get("APP_HOST", "0.0.0.0"),
         port=int(os.environ.get("APP_PORT", "9009")),
+        workers=int(os.environ.get("APP_WORKERS", "1")),
         log_level="info",
     )
@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Seconds to sync N ExApp config keys (or user preferences) per key vs. with the bulk endpoints.
+
+For every key count the same key set is written, read back and deleted twice:
+  - per key: one `POST /ex-app/<kind>` per key, then the list-based get-values and delete;
+  - bulk:    one `POST /ex-app/<kind>/bulk`, `POST /ex-app/<kind>/bulk/get-values`
+             and `DELETE /ex-app/<kind>/bulk` each.
+Every fifth key is written as sensitive, so the encryption path is part of the run.
+Results are printed as JSON.
+
+Usage:
+    APP_ID=test_appapi APP_SECRET=... python tests/exapp_integration/bench/config_bulk.py
+Optional env: NEXTCLOUD_URL, APP_VERSION, BENCH_KEY_COUNTS (default "1,10,100,1000"),
+              BENCH_KIND ("config" or "preference", default "config").
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from _client import AppAPIClient  # noqa: E402
+
+NEXTCLOUD_URL = os.environ.get("NEXTCLOUD_URL", "http://nextcloud.appapi")
+KEY_COUNTS = [int(i) for i in os.environ.get("BENCH_KEY_COUNTS", "1,10,100,1000").split(",")]
+KIND = os.environ.get("BENCH_KIND", "config")
+BASE = f"/ocs/v1.php/apps/app_api/api/v1/ex-app/{KIND}"
+
+
+def _keys(count: int) -> dict[str, str]:
+    return {f"bench_key_{i}": f"value_{i}" for i in range(count)}
+
+
+def _per_key(client: AppAPIClient, values: dict[str, str]) -> float:
+    start = time.perf_counter()
+    for i, (key, value) in enumerate(values.items()):
+        client.request(
+            "POST", BASE, json={"configKey": key, "configValue": value, "sensitive": int(i % 5 == 0)},
+        ).raise_for_status()
+    r = client.request("POST", f"{BASE}/get-values", json={"configKeys": list(values)})
+    r.raise_for_status()
+    assert len(r.json()["ocs"]["data"]) == len(values)
+    client.request("DELETE", BASE, json={"configKeys": list(values)}).raise_for_status()
+    return time.perf_counter() - start
+
+
+def _bulk(client: AppAPIClient, values: dict[str, str]) -> float:
+    sensitive = {k: v for i, (k, v) in enumerate(values.items()) if i % 5 == 0}
+    plain = {k: v for k, v in values.items() if k not in sensitive}
+    start = time.perf_counter()
+    for part, flag in ((sensitive, 1), (plain, 0)):
+        if part:
+            client.request("POST", f"{BASE}/bulk", json={"configValues": part, "sensitive": flag}).raise_for_status()
+    r = client.request("POST", f"{BASE}/bulk/get-values", json={"configKeys": list(values)})
+    r.raise_for_status()
+    assert r.json()["ocs"]["data"] == values
+    client.request("DELETE", f"{BASE}/bulk", json={"configKeys": list(values)}).raise_for_status()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    client = AppAPIClient(
+        base_url=NEXTCLOUD_URL,
+        app_id=os.environ.get("APP_ID", "test_appapi"),
+        app_secret=os.environ["APP_SECRET"],
+        app_version=os.environ.get("APP_VERSION", "1.0.0"),
+    )
+    results = []
+    for count in KEY_COUNTS:
+        values = _keys(count)
+        per_key = _per_key(client, values)
+        bulk = _bulk(client, values)
+        results.append({
+            "keys": count,
+            "per_key_seconds": round(per_key, 3),
+            "bulk_seconds": round(bulk, 3),
+            "speedup": round(per_key / bulk, 1),
+        })
+    print(json.dumps({"kind": KIND, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
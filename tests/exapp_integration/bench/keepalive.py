@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Requests/sec of AppAPI -> ExApp calls with and without the keep-alive client pool.
+
+Every request goes through the ExApp proxy (`/apps/app_api/proxy/<APP_ID>/heartbeat`),
+so each one makes AppAPIService open (or reuse) a connection to the test ExApp
+(`_test_app.py`, registered with a PUBLIC `^/heartbeat$` route by
+register_test_exapp.sh). The run is repeated with `exapp_client_pool_size=0`
+(pooling disabled, the previous behaviour) and with pooling enabled, and the
+results are printed as JSON.
+
+Connections are reused across proxied requests only when the PHP-FPM worker
+can keep them (PHP 8.5+ persistent curl share handles); on older PHP the
+difference shows up in multi-request operations (OCC commands, background
+jobs) rather than in this benchmark, and the output says so: both runs are
+then expected to be on par, which shows the pool's own overhead.
+
+Usage:
+    APP_ID=test_appapi python tests/exapp_integration/bench/keepalive.py
+Optional env: NEXTCLOUD_URL, OCC_CMD, BENCH_REQUESTS (default 2000),
+              BENCH_CONCURRENCY (default 8), BENCH_POOL_SIZE (default 8).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+NEXTCLOUD_URL = os.environ.get("NEXTCLOUD_URL", "http://nextcloud.appapi")
+APP_ID = os.environ.get("APP_ID", "test_appapi")
+OCC = os.environ.get(
+    "OCC_CMD",
+    "docker exec appapi-nextcloud-1 sudo -u www-data php occ",
+).split()
+REQUESTS = int(os.environ.get("BENCH_REQUESTS", "2000"))
+CONCURRENCY = int(os.environ.get("BENCH_CONCURRENCY", "8"))
+POOL_SIZE = int(os.environ.get("BENCH_POOL_SIZE", "8"))
+
+
+def _set_pool_size(size: int | None) -> None:
+    if size is None:
+        subprocess.run(OCC + ["config:app:delete", "app_api", "exapp_client_pool_size"], check=False, capture_output=True)
+        return
+    subprocess.run(
+        OCC + ["config:app:set", "app_api", "exapp_client_pool_size", f"--value={size}", "--lazy"],
+        check=True, capture_output=True,
+    )
+
+
+def _php_version_id() -> int | None:
+    """PHP_VERSION_ID of the PHP that runs OCC, None if OCC_CMD does not end with `php occ`."""
+    if OCC[-2:] != ["php", "occ"]:
+        return None
+    r = subprocess.run(OCC[:-1] + ["-r", "echo PHP_VERSION_ID;"], check=False, capture_output=True, text=True)
+    return int(r.stdout) if r.returncode == 0 and r.stdout.strip().isdigit() else None
+
+
+def _run(label: str) -> dict:
+    url = f"{NEXTCLOUD_URL}/index.php/apps/app_api/proxy/{APP_ID}/heartbeat"
+    per_thread = REQUESTS // CONCURRENCY
+
+    def worker() -> int:
+        failures = 0
+        with requests.Session() as session:
+            for _ in range(per_thread):
+                if session.get(url, timeout=30).status_code != 200:
+                    failures += 1
+        return failures
+
+    requests.get(url, timeout=30).raise_for_status()  # warm-up, also fails fast on a misconfigured setup
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        failures = sum(pool.map(lambda _: worker(), range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+    total = per_thread * CONCURRENCY
+    return {
+        "mode": label,
+        "requests": total,
+        "failures": failures,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+    }
+
+
+def main() -> None:
+    results = []
+    try:
+        _set_pool_size(0)
+        results.append(_run("pool disabled"))
+        _set_pool_size(POOL_SIZE)
+        results.append(_run(f"pool size {POOL_SIZE}"))
+    finally:
+        _set_pool_size(None)
+    report = {"concurrency": CONCURRENCY, "php_version_id": _php_version_id(), "results": results}
+    if report["php_version_id"] is not None and report["php_version_id"] < 80500:
+        report["note"] = "PHP < 8.5 cannot keep connections across requests: no gain is expected in this benchmark"
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
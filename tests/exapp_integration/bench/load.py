@@ -0,0 +1,234 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Latency percentiles and throughput of AppAPI under a mixed ExApp workload.
+
+BENCH_CONCURRENCY workers share one pooled `AsyncAppAPIClient` and, for
+BENCH_DURATION seconds, each pick a scenario from the weighted mix and run it:
+  - config_get: `POST /ex-app/config/get-values` for the seeded keys;
+  - config_set: `POST /ex-app/config` of one of the seeded keys;
+  - whoami:     `GET /cloud/user` with `AA-USER-ID` set to BENCH_USER;
+  - proxy:      `GET /apps/app_api/proxy/<APP_ID>/heartbeat` (public route of `_test_app.py`);
+  - propfind:   `PROPFIND /remote.php/dav/files/admin/` (Depth: 1) with AppAPI auth;
+  - proxy_payload: `GET /apps/app_api/proxy/<APP_ID>/load/payload`, BENCH_PAYLOAD_SIZE bytes
+                   after BENCH_EXAPP_DELAY seconds in the ExApp;
+  - proxy_stream:  `GET /apps/app_api/proxy/<APP_ID>/load/chunked`, 16 chunks of BENCH_PAYLOAD_SIZE
+                   bytes streamed through the proxy.
+p50/p95/p99 latency (ms), throughput (requests/s) and failures are reported per
+scenario and in total, as JSON on stdout (and in BENCH_OUTPUT if set).
+
+To compare releases, run once per AppAPI version and pass the previous result
+as BENCH_BASELINE: every scenario then gets its p95 change in percent, and the
+exit code is 1 if one of them regressed by more than BENCH_MAX_REGRESSION percent.
+
+Usage:
+    APP_ID=test_appapi APP_SECRET=... python tests/exapp_integration/bench/load.py
+Optional env: NEXTCLOUD_URL, APP_VERSION, BENCH_DURATION (seconds, default 30),
+              BENCH_WARMUP (seconds, default 3), BENCH_CONCURRENCY (default 16),
+              BENCH_MIX (default "config_get=4,config_set=1,whoami=3,proxy=3,propfind=1"),
+              BENCH_USER (default "admin"), BENCH_PAYLOAD_SIZE (default 65536),
+              BENCH_EXAPP_DELAY (default 0), BENCH_LABEL, BENCH_OUTPUT,
+              BENCH_BASELINE, BENCH_MAX_REGRESSION (default 20).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from _client import AsyncAppAPIClient  # noqa: E402
+
+NEXTCLOUD_URL = os.environ.get("NEXTCLOUD_URL", "http://nextcloud.appapi")
+APP_ID = os.environ.get("APP_ID", "test_appapi")
+DURATION = float(os.environ.get("BENCH_DURATION", "30"))
+WARMUP = float(os.environ.get("BENCH_WARMUP", "3"))
+CONCURRENCY = int(os.environ.get("BENCH_CONCURRENCY", "16"))
+MIX = os.environ.get("BENCH_MIX", "config_get=4,config_set=1,whoami=3,proxy=3,propfind=1")
+USER = os.environ.get("BENCH_USER", "admin")
+MAX_REGRESSION = float(os.environ.get("BENCH_MAX_REGRESSION", "20"))
+PAYLOAD_SIZE = int(os.environ.get("BENCH_PAYLOAD_SIZE", "65536"))
+EXAPP_DELAY = float(os.environ.get("BENCH_EXAPP_DELAY", "0"))
+
+CONFIG_URL = "/ocs/v1.php/apps/app_api/api/v1/ex-app/config"
+CONFIG_KEYS = [f"bench_load_{i}" for i in range(20)]
+# the proxy is called like a browser would, without the ExApp's credentials
+NO_APP_API_AUTH = {"EX-APP-ID": None, "EX-APP-VERSION": None, "AUTHORIZATION-APP-API": None, "AA-VERSION": None}
+
+Scenario = Callable[[AsyncAppAPIClient], Awaitable[int]]
+
+
+async def _config_get(client: AsyncAppAPIClient) -> int:
+    r = await client.request("POST", f"{CONFIG_URL}/get-values", json={"configKeys": CONFIG_KEYS})
+    return r.status_code
+
+
+async def _config_set(client: AsyncAppAPIClient) -> int:
+    r = await client.request(
+        "POST", CONFIG_URL, json={"configKey": random.choice(CONFIG_KEYS), "configValue": str(time.time())},
+    )
+    return r.status_code
+
+
+async def _whoami(client: AsyncAppAPIClient) -> int:
+    r = await client.as_user(USER).request("GET", "/ocs/v1.php/cloud/user")
+    return r.status_code
+
+
+async def _proxy(client: AsyncAppAPIClient) -> int:
+    r = await client.request("GET", f"/index.php/apps/app_api/proxy/{APP_ID}/heartbeat", headers=NO_APP_API_AUTH)
+    return r.status_code
+
+
+async def _proxy_payload(client: AsyncAppAPIClient) -> int:
+    r = await client.request(
+        "GET", f"/index.php/apps/app_api/proxy/{APP_ID}/load/payload",
+        params={"size": PAYLOAD_SIZE, "delay": EXAPP_DELAY}, headers=NO_APP_API_AUTH,
+    )
+    return r.status_code
+
+
+async def _proxy_stream(client: AsyncAppAPIClient) -> int:
+    r = await client.request(
+        "GET", f"/index.php/apps/app_api/proxy/{APP_ID}/load/chunked",
+        params={"chunk_size": PAYLOAD_SIZE}, headers=NO_APP_API_AUTH,
+    )
+    return r.status_code
+
+
+async def _propfind(client: AsyncAppAPIClient) -> int:
+    r = await client.request("PROPFIND", "/remote.php/dav/files/admin/", headers={"Depth": "1"})
+    return r.status_code
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "config_get": _config_get,
+    "config_set": _config_set,
+    "whoami": _whoami,
+    "proxy": _proxy,
+    "propfind": _propfind,
+    "proxy_payload": _proxy_payload,
+    "proxy_stream": _proxy_stream,
+}
+
+
+def _parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}' in BENCH_MIX, expected one of: {', '.join(SCENARIOS)}")
+        weights[name] = int(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * percent / 100))
+    return sorted_values[rank - 1]
+
+
+def _summary(latencies: list[float], failures: int, seconds: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "failures": failures,
+        "requests_per_second": round(len(values) / seconds, 1),
+        "p50_ms": round(_percentile(values, 50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 95) * 1000, 2),
+        "p99_ms": round(_percentile(values, 99) * 1000, 2),
+    }
+
+
+async def _run(client: AsyncAppAPIClient, weights: dict[str, int], seconds: float) -> dict:
+    names = list(weights)
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    failures = dict.fromkeys(names, 0)
+    deadline = time.perf_counter() + seconds
+
+    async def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights=[weights[n] for n in names])[0]
+            start = time.perf_counter()
+            try:
+                status = await SCENARIOS[name](client)
+            except Exception:  # noqa: BLE001 - a timeout or reset is a failed request, not a failed run
+                status = 0
+            latencies[name].append(time.perf_counter() - start)
+            if not 200 <= status < 300:
+                failures[name] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "total": _summary([v for n in names for v in latencies[n]], sum(failures.values()), elapsed),
+        "scenarios": {name: _summary(latencies[name], failures[name], elapsed) for name in names},
+    }
+
+
+def _compare(result: dict, baseline: dict) -> bool:
+    """Add the p95 change against the baseline to every scenario, return False on a regression."""
+    ok = True
+    for name, current in result["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not previous["p95_ms"]:
+            continue
+        change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+        current["p95_change_percent"] = round(change, 1)
+        if change > MAX_REGRESSION:
+            ok = False
+    return ok
+
+
+async def _main() -> int:
+    weights = _parse_mix(MIX)
+    async with AsyncAppAPIClient(
+        base_url=NEXTCLOUD_URL,
+        app_id=APP_ID,
+        app_secret=os.environ["APP_SECRET"],
+        app_version=os.environ.get("APP_VERSION", "1.0.0"),
+        max_connections=CONCURRENCY,
+    ) as client:
+        for key in CONFIG_KEYS:
+            (await client.request("POST", CONFIG_URL, json={"configKey": key, "configValue": "seed"})).raise_for_status()
+        # fails fast on a misconfigured setup (ExApp not running, wrong secret, ...)
+        for name in weights:
+            status = await SCENARIOS[name](client)
+            if not 200 <= status < 300:
+                raise SystemExit(f"Scenario '{name}' failed with HTTP {status} before the run")
+        if WARMUP > 0:
+            await _run(client, weights, WARMUP)
+        result = await _run(client, weights, DURATION)
+        await client.request("DELETE", CONFIG_URL, json={"configKeys": CONFIG_KEYS})
+
+    report = {
+        "label": os.environ.get("BENCH_LABEL", ""),
+        "concurrency": CONCURRENCY,
+        "mix": weights,
+        **result,
+    }
+    ok = True
+    if baseline_path := os.environ.get("BENCH_BASELINE"):
+        ok = _compare(report, json.loads(Path(baseline_path).read_text()))
+        report["max_regression_percent"] = MAX_REGRESSION
+        report["regressed"] = not ok
+    output = json.dumps(report, indent=2)
+    if output_path := os.environ.get("BENCH_OUTPUT"):
+        Path(output_path).write_text(output + "\n")
+    print(output)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
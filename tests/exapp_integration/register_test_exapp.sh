@@ -47,7 +47,7 @@ docker exec "$NEXTCLOUD_CONTAINER" curl -fs "http://$APP_HOST:$APP_PORT/heartbea
 "${OCC[@]}" app_api:app:unregister "$APP_ID" --silent 2>/dev/null || true
 
 JSON=$(cat <<EOF
-{"id":"$APP_ID","name":"AppAPI Integration Test ExApp","version":"$APP_VERSION","secret":"$APP_SECRET","port":$APP_PORT,"host":"$APP_HOST","protocol":"http"}
+{"id":"$APP_ID","name":"AppAPI Integration Test ExApp","version":"$APP_VERSION","secret":"$APP_SECRET","port":$APP_PORT,"host":"$APP_HOST","protocol":"http","routes":[{"url":"^/heartbeat$","verb":"GET","access_level":"PUBLIC"},{"url":"^/load/","verb":"GET,POST","access_level":"PUBLIC"}]}
 EOF
 )
 "${OCC[@]}" app_api:app:register "$APP_ID" "$DAEMON_NAME" --json-info="$JSON" --silent --wait-finish
@@ -9,6 +9,7 @@ itself would fail). The init callback is not exercised here because the test
 ExApp deliberately does not implement /init (see _test_app.py).
 """
 
+import json
 import os
 import subprocess
 
@@ -42,3 +43,27 @@ def test_disable_then_reenable_calls_callbacks(app_id: str) -> None:
         # Make sure we leave the fixture enabled even on test failure.
         if not _is_enabled(app_id):
             subprocess.run(OCC + ["app_api:app:enable", app_id], check=False)
+
+
+def test_bulk_update_reports_per_app_results(app_id: str) -> None:
+    """`app_api:app:update --apps ... --parallel N --json` runs one update process per
+    app and reports every app, in the requested order, with its own outcome."""
+    r = subprocess.run(
+        OCC + ["app_api:app:update", "--apps", f"{app_id},not_registered_app", "--parallel", "2", "--json"],
+        capture_output=True, text=True,
+    )
+    assert r.returncode == 1, f"failed updates must fail the run: stdout={r.stdout!r} stderr={r.stderr!r}"
+    results = json.loads(r.stdout)
+    assert [result["appid"] for result in results] == [app_id, "not_registered_app"]
+    # the test ExApp is not published on the App Store, so its update stops before touching it
+    assert results[0]["result"] == "failed"
+    assert "Appstore" in results[0]["message"]
+    assert results[1] == {
+        "appid": "not_registered_app",
+        "version": "",
+        "result": "failed",
+        "exit_code": 1,
+        "duration": 0,
+        "message": "ExApp not_registered_app not found.",
+    }
+    assert _is_enabled(app_id)
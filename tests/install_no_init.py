@@ -2,11 +2,11 @@
 # SPDX-FileCopyrightText: 2023 Nextcloud GmbH and Nextcloud contributors
 # SPDX-License-Identifier: AGPL-3.0-or-later
 
-import json
 import os
 from base64 import b64decode, b64encode
-from urllib.request import Request, urlopen
+from contextlib import asynccontextmanager
 
+import httpx
 from fastapi import FastAPI, HTTPException, Request as FastAPIRequest
 from fastapi.responses import JSONResponse
 
@@ -15,7 +15,16 @@ APP_SECRET = os.environ["APP_SECRET"]
 APP_VERSION = os.environ.get("APP_VERSION", "1.0.0")
 NEXTCLOUD_URL = os.environ.get("NEXTCLOUD_URL", "http://localhost:8080").rstrip("/")
 
-APP = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # calls to Nextcloud reuse pooled connections and never block the event loop
+    async with httpx.AsyncClient(base_url=NEXTCLOUD_URL, timeout=30) as client:
+        app.state.nextcloud = client
+        yield
+
+
+APP = FastAPI(lifespan=lifespan)
 
 
 def verify_auth(request: FastAPIRequest) -> str:
@@ -47,21 +56,18 @@ def verify_auth(request: FastAPIRequest) -> str:
     return username
 
 
-def log_to_nextcloud(username: str, level: int, message: str) -> None:
+async def log_to_nextcloud(client: httpx.AsyncClient, username: str, level: int, message: str) -> None:
     """Send a log entry to Nextcloud via OCS API."""
-    url = f"{NEXTCLOUD_URL}/ocs/v1.php/apps/app_api/api/v1/log"
-    data = json.dumps({"level": level, "message": message}).encode("UTF-8")
     auth_header = b64encode(f"{username}:{APP_SECRET}".encode("UTF-8")).decode("ASCII")
-    req = Request(url, data=data, method="POST", headers={
-        "Content-Type": "application/json",
-        "OCS-APIRequest": "true",
-        "EX-APP-ID": APP_ID,
-        "EX-APP-VERSION": APP_VERSION,
-        "AA-VERSION": "2.0.0",
-        "AUTHORIZATION-APP-API": auth_header,
-    })
     try:
-        urlopen(req)
+        r = await client.post("/ocs/v1.php/apps/app_api/api/v1/log", json={"level": level, "message": message}, headers={
+            "OCS-APIRequest": "true",
+            "EX-APP-ID": APP_ID,
+            "EX-APP-VERSION": APP_VERSION,
+            "AA-VERSION": "2.0.0",
+            "AUTHORIZATION-APP-API": auth_header,
+        })
+        r.raise_for_status()
     except Exception as e:
         print(f"[test-app] Failed to log to Nextcloud: {e}")
 
@@ -69,10 +75,11 @@ def log_to_nextcloud(username: str, level: int, message: str) -> None:
 @APP.put("/enabled")
 async def enabled_callback(enabled: bool, request: FastAPIRequest):
     username = verify_auth(request)
+    client = request.app.state.nextcloud
     if enabled:
-        log_to_nextcloud(username, 2, f"Hello from {APP_ID} :)")
+        await log_to_nextcloud(client, username, 2, f"Hello from {APP_ID} :)")
     else:
-        log_to_nextcloud(username, 2, f"Bye bye from {APP_ID} :(")
+        await log_to_nextcloud(client, username, 2, f"Bye bye from {APP_ID} :(")
     return JSONResponse(content={"error": ""}, status_code=200)
 
 
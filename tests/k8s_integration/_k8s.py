@@ -0,0 +1,232 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""OCC / kubectl helpers shared by the K8s integration test modules.
+
+Every module deploys its own ExApp id through its own daemon, so that modules can
+run in parallel (`pytest -n auto --dist loadfile`): kubectl lookups and cleanups are
+always scoped to the module's ExApp id instead of the whole namespace.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from ipaddress import ip_address
+from subprocess import DEVNULL, PIPE, CompletedProcess, run
+from typing import TypeVar
+
+T = TypeVar("T")
+
+K8S_NAMESPACE = os.environ.get("K8S_NAMESPACE", "nextcloud-exapps")
+NODE_IP = os.environ.get("NODE_IP", "127.0.0.1")
+HARP_HOST = os.environ.get("K8S_HARP_HOST", f"{NODE_IP}:8780")
+NEXTCLOUD_URL = os.environ.get("K8S_NEXTCLOUD_URL", f"http://{NODE_IP}")
+HARP_SHARED_KEY = os.environ.get("HP_SHARED_KEY", "test_key")
+
+# Expose-type awareness: set K8S_EXPOSE_TYPE in CI to select the expose type under test.
+EXPOSE_TYPE = os.environ.get("K8S_EXPOSE_TYPE", "nodeport")
+IS_MANUAL = EXPOSE_TYPE == "manual"
+# First fixed ClusterIP of the operator-created Services in manual tests, one per module from there.
+MANUAL_CLUSTER_IP = os.environ.get("MANUAL_CLUSTER_IP", "10.43.200.200")
+
+# Expected K8s Service type per expose type (manual creates no HaRP-managed Service).
+EXPECTED_SVC_TYPE = {
+    "nodeport": "NodePort",
+    "clusterip": "ClusterIP",
+    "loadbalancer": "LoadBalancer",
+}
+
+OCC = ["php", "occ", "--no-warnings"]
+EXAPP_PORT = 23000
+
+
+def occ(cmd_str: str, check: bool = True, capture: bool = True, timeout: float | None = None) -> CompletedProcess:
+    """Run an OCC command. cmd_str is appended to 'php occ --no-warnings'."""
+    return run(
+        OCC + cmd_str.split(),
+        stdout=PIPE if capture else DEVNULL,
+        stderr=PIPE if capture else DEVNULL,
+        check=check,
+        timeout=timeout,
+    )
+
+
+def occ_output(cmd_str: str, **kwargs) -> str:
+    """Run OCC command and return stdout as string."""
+    return occ(cmd_str, **kwargs).stdout.decode("UTF-8")
+
+
+def list_line(what: str, name: str) -> str:
+    """The line of `name` in `app_api:<what>:list` (`app` or `daemon`), empty if it is not listed."""
+    output = occ_output(f"app_api:{what}:list", check=False)
+    return next((line for line in output.splitlines() if f" {name} " in f" {line} "), "")
+
+
+def kubectl(cmd_str: str, check: bool = True) -> CompletedProcess:
+    """Run a kubectl command against the test namespace."""
+    return run(["kubectl", "-n", K8S_NAMESPACE] + cmd_str.split(), stdout=PIPE, stderr=PIPE, check=check)
+
+
+def kubectl_output(cmd_str: str, **kwargs) -> str:
+    """Run kubectl and return stdout as string."""
+    return kubectl(cmd_str, **kwargs).stdout.decode("UTF-8")
+
+
+def app_items(kind: str, app_id: str, label: str = "") -> list[dict]:
+    """Resources of `kind` (deploy, svc, pvc) belonging to `app_id`, as kubectl JSON items."""
+    selector = f" -l {label}" if label else ""
+    data = json.loads(kubectl_output(f"get {kind}{selector} -o json", check=False) or "{}")
+    return [item for item in data.get("items", []) if app_id in item["metadata"]["name"]]
+
+
+def app_names(kind: str, app_id: str) -> list[str]:
+    return [item["metadata"]["name"] for item in app_items(kind, app_id)]
+
+
+def delete_app_resources(kind: str, app_id: str, wait: bool = True) -> None:
+    names = app_names(kind, app_id)
+    if names:
+        kubectl(f"delete {kind} {' '.join(names)} --wait={str(wait).lower()}", check=False)
+
+
+def wait_until(
+    condition: Callable[[], T],
+    timeout: float,
+    what: str,
+    interval: float = 0.5,
+    max_interval: float = 5.0,
+) -> T:
+    """Return the first truthy result of `condition`, polling with exponential backoff.
+
+    Fails the test with the last (falsy) result once `timeout` seconds have passed.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        result = condition()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise AssertionError(f"Timed out after {timeout}s waiting for {what}; last result: {result!r}")
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, max_interval)
+
+
+def wait_replicas(app_id: str, expected: int, count: int = 1, timeout: float = 90) -> list[dict]:
+    """Wait until the `count` Deployments of `app_id` all have `expected` replicas."""
+    def reached() -> list[dict]:
+        items = app_items("deploy", app_id, "app.kubernetes.io/component=exapp")
+        if len(items) >= count and all(item["spec"].get("replicas", -1) == expected for item in items):
+            return items
+        return []
+
+    return wait_until(reached, timeout, f"{count} deployment(s) of {app_id} with replicas={expected}")
+
+
+def register_daemon(name: str, extra_opts: list[str] | None = None) -> CompletedProcess:
+    """Register a K8s daemon with the HaRP of the test environment."""
+    args = OCC + [
+        "app_api:daemon:register", name, f"K8s Test ({name})", "kubernetes-install", "http",
+        HARP_HOST, NEXTCLOUD_URL, "--harp", "--harp_shared_key", HARP_SHARED_KEY,
+        "--k8s", f"--k8s_expose_type={EXPOSE_TYPE}",
+    ]
+    return run(args + (extra_opts or []), stdout=PIPE, stderr=PIPE)
+
+
+def unregister_daemon(name: str) -> None:
+    run(OCC + ["app_api:daemon:unregister", name], stdout=DEVNULL, stderr=DEVNULL)
+
+
+def manual_cluster_ip(offset: int) -> str:
+    return str(ip_address(MANUAL_CLUSTER_IP) + offset)
+
+
+@contextmanager
+def module_daemon(name: str, app_id: str, manual_ip_offset: int = 0) -> Iterator[str]:
+    """A daemon of its own for one test module; its ExApp is force-removed on exit."""
+    extra_opts = [f"--k8s_upstream_host={manual_cluster_ip(manual_ip_offset)}"] if IS_MANUAL else []
+    unregister_daemon(name)
+    r = register_daemon(name, extra_opts)
+    assert r.returncode == 0, f"Daemon {name} registration failed: {r.stdout.decode()}"
+    try:
+        yield name
+    finally:
+        occ(f"app_api:app:unregister {app_id} --rm-data --force --silent", check=False, timeout=120)
+        for kind in ("deploy", "svc", "pvc"):
+            delete_app_resources(kind, app_id, wait=False)
+        unregister_daemon(name)
+
+
+def exapp_json(app_id: str, version: str = "1.0.0", roles: list[str] | None = None, image: str = "nextcloud/app-skeleton-python", tag: str = "latest") -> str:
+    """JSON info of an app-skeleton-python deployment under `app_id` (first role exposed)."""
+    info = {
+        "id": app_id,
+        "name": f"K8s test {app_id}",
+        "version": version,
+        "port": EXAPP_PORT,
+        "docker-install": {"registry": "ghcr.io", "image": image, "image-tag": tag},
+    }
+    if roles:
+        info["k8s-service-roles"] = [
+            {"name": role, "env": f"SERVICE_ROLE={role}", "expose": i == 0} for i, role in enumerate(roles)
+        ]
+    return json.dumps(info)
+
+
+def register_exapp(app_id: str, daemon: str, json_info: str, timeout: float = 600) -> CompletedProcess:
+    return run(
+        OCC + ["app_api:app:register", app_id, daemon, "--json-info", json_info, "--wait-finish"],
+        stdout=PIPE, stderr=PIPE, timeout=timeout,
+    )
+
+
+def update_exapp(app_id: str, json_info: str, wait_finish: bool = True, timeout: float = 600) -> CompletedProcess:
+    args = OCC + ["app_api:app:update", app_id, "--json-info", json_info]
+    return run(args + (["--wait-finish"] if wait_finish else []), stdout=PIPE, stderr=PIPE, timeout=timeout)
+
+
+def ensure_manual_service(app_id: str, manual_ip_offset: int = 0) -> None:
+    """Pre-create a ClusterIP Service for manual expose type testing.
+
+    For manual expose, HaRP does not create a K8s Service — the operator
+    manages networking.  This simulates the operator creating a Service
+    before deploying the ExApp.  Uses a fixed ClusterIP per module so it survives
+    delete/re-create cycles with the same daemon upstream_host.
+    """
+    if not IS_MANUAL:
+        return
+    svc_name = f"nc-app-{app_id}"
+    manifest = json.dumps({
+        "apiVersion": "v1",
+        "kind": "Service",
+        "metadata": {"name": svc_name, "namespace": K8S_NAMESPACE},
+        "spec": {
+            "clusterIP": manual_cluster_ip(manual_ip_offset),
+            "selector": {"app": svc_name},
+            "ports": [{"name": "http", "port": EXAPP_PORT, "targetPort": EXAPP_PORT}],
+        },
+    })
+    r = run(
+        ["kubectl", "-n", K8S_NAMESPACE, "apply", "-f", "-"],
+        input=manifest.encode(), stdout=PIPE, stderr=PIPE,
+    )
+    assert r.returncode == 0, f"Failed to create operator Service {svc_name}: {r.stderr.decode()}"
+
+
+def assert_service_type(app_id: str, managed_by_harp: bool = True) -> None:
+    """The exposed Service of `app_id` has the type of the expose type under test (and is HaRP-managed)."""
+    expected_type = EXPECTED_SVC_TYPE.get(EXPOSE_TYPE)
+    if not expected_type:
+        return
+    items = app_items("svc", app_id, "app.kubernetes.io/component=exapp")
+    assert items, f"Service of {app_id} not found via label selector app.kubernetes.io/component=exapp"
+    item = items[0]
+    actual_type = item["spec"].get("type", "ClusterIP")
+    assert actual_type == expected_type, f"Service type mismatch: expected {expected_type}, got {actual_type}"
+    if not managed_by_harp:
+        return
+    managed_by = item["metadata"].get("labels", {}).get("app.kubernetes.io/managed-by")
+    assert managed_by == "harp", f"Service missing managed-by=harp label, got: {managed_by}"
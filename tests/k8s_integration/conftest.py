@@ -0,0 +1,63 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Pytest setup of the AppAPI Kubernetes integration tests.
+
+Requires: Nextcloud with AppAPI enabled, k3s, HaRP with K8s backend, nginx proxy.
+See .github/workflows/tests-deploy-k8s.yml for CI setup.
+
+Tests inside a module depend on each other (deploy, then enable/disable, update,
+unregister), while modules are independent of each other: run them in parallel with
+`python3 -m pytest -n auto --dist loadfile tests/k8s_integration`.
+
+The wall time of every test (setup, call and teardown) is appended as one JSON line
+to K8S_TEST_TIMINGS (default `k8s-test-timings.jsonl`), so that slow lifecycle steps
+can be followed across runs.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import defaultdict
+
+import pytest
+
+from ._k8s import EXPOSE_TYPE
+
+TIMINGS_PATH = os.environ.get("K8S_TEST_TIMINGS", "k8s-test-timings.jsonl")
+
+_reports: dict[str, list[pytest.TestReport]] = defaultdict(list)
+_write_timings = True
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    global _write_timings
+    # under xdist the controller receives the reports of all workers and is the only writer
+    _write_timings = not hasattr(config, "workerinput")
+
+
+def pytest_runtest_logreport(report: pytest.TestReport) -> None:
+    if not _write_timings:
+        return
+    _reports[report.nodeid].append(report)
+    if report.when != "teardown":
+        return
+    reports = _reports.pop(report.nodeid)
+    if any(r.failed for r in reports):
+        outcome = "failed"
+    elif any(r.skipped for r in reports):
+        outcome = "skipped"
+    else:
+        outcome = "passed"
+    line = {
+        "test": report.nodeid,
+        "expose_type": EXPOSE_TYPE,
+        "outcome": outcome,
+        "seconds": round(sum(r.duration for r in reports), 3),
+        **{f"{r.when}_seconds": round(r.duration, 3) for r in reports},
+        "worker": getattr(report, "worker_id", ""),
+        "finished_at": round(time.time(), 3),
+    }
+    with open(TIMINGS_PATH, "a", encoding="UTF-8") as f:
+        f.write(json.dumps(line) + "\n")
@@ -0,0 +1,141 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""K8s daemon registration validation (no k3s/HaRP needed)."""
+
+from __future__ import annotations
+
+from subprocess import PIPE, CompletedProcess, run
+
+import pytest
+
+from ._k8s import OCC, list_line, unregister_daemon
+
+K8S_VALIDATION_DAEMON = "k8s_validation"
+
+# Base args for registering a K8s daemon (used in validation tests)
+K8S_DAEMON_BASE = OCC + [
+    "app_api:daemon:register",
+    K8S_VALIDATION_DAEMON, "K8s Validation", "kubernetes-install", "http",
+    "127.0.0.1:8780", "http://127.0.0.1",
+]
+K8S_HARP_OPTS = [
+    "--harp", "--harp_shared_key", "test_key",
+]
+
+
+def register_k8s_daemon(extra_opts: list[str] | None = None) -> CompletedProcess:
+    """Register the validation K8s daemon with standard HaRP options."""
+    return run(K8S_DAEMON_BASE + ["--k8s"] + K8S_HARP_OPTS + (extra_opts or []), stdout=PIPE, stderr=PIPE)
+
+
+@pytest.fixture(autouse=True)
+def _clean_validation_daemon():
+    """Ensure no leftover validation daemon before and after every test."""
+    unregister_daemon(K8S_VALIDATION_DAEMON)
+    yield
+    unregister_daemon(K8S_VALIDATION_DAEMON)
+
+
+def test_k8s_daemon_requires_harp():
+    """--k8s without --harp must fail."""
+    r = run(K8S_DAEMON_BASE + ["--k8s"], stdout=PIPE, stderr=PIPE)
+    assert r.returncode == 1, f"Expected exit 1, got {r.returncode}"
+    output = r.stdout.decode("UTF-8")
+    assert "requires --harp flag" in output, f"Expected error about --harp, got: {output}"
+
+
+def test_k8s_daemon_basic_register():
+    """Basic K8s daemon registration and unregistration."""
+    r = register_k8s_daemon()
+    assert r.returncode == 0, f"Registration failed: {r.stdout.decode()}"
+
+    # Verify daemon shows up in list with kubernetes-install
+    line = list_line("daemon", K8S_VALIDATION_DAEMON)
+    assert "kubernetes-install" in line, f"Expected kubernetes-install in daemon list: {line!r}"
+
+
+def test_k8s_daemon_deploy_id_override():
+    """--k8s with wrong deploy-id should auto-override to kubernetes-install."""
+    # Pass docker-install as deploy id, but with --k8s flag
+    args = OCC + [
+        "app_api:daemon:register",
+        K8S_VALIDATION_DAEMON, "K8s Validation", "docker-install", "http",
+        "127.0.0.1:8780", "http://127.0.0.1",
+        "--k8s",
+    ] + K8S_HARP_OPTS
+    r = run(args, stdout=PIPE, stderr=PIPE)
+    assert r.returncode == 0, f"Registration failed: {r.stdout.decode()}"
+    output = r.stdout.decode("UTF-8")
+    assert "Overriding accepts-deploy-id" in output, f"Expected override message, got: {output}"
+
+    line = list_line("daemon", K8S_VALIDATION_DAEMON)
+    assert "kubernetes-install" in line, f"Expected kubernetes-install in list: {line!r}"
+
+
+def test_k8s_expose_type_invalid():
+    """Invalid expose type must fail."""
+    r = register_k8s_daemon(["--k8s_expose_type=invalid"])
+    assert r.returncode == 1, f"Expected exit 1, got {r.returncode}"
+    output = r.stdout.decode("UTF-8")
+    assert "Invalid k8s_expose_type" in output, f"Expected validation error, got: {output}"
+
+
+@pytest.mark.parametrize(("expose_type", "extra_opts"), [
+    ("clusterip", []),
+    ("nodeport", []),
+    ("loadbalancer", []),
+    ("manual", ["--k8s_upstream_host=1.2.3.4"]),
+])
+def test_k8s_expose_type_all_valid(expose_type, extra_opts):
+    """All valid expose types should register successfully."""
+    r = register_k8s_daemon([f"--k8s_expose_type={expose_type}"] + extra_opts)
+    assert r.returncode == 0, f"Registration failed for {expose_type}: {r.stdout.decode()}"
+
+
+@pytest.mark.parametrize(("extra_opts", "error"), [
+    (["--k8s_expose_type=nodeport", "--k8s_node_port=29999"], "must be between 30000 and 32767"),
+    (["--k8s_expose_type=nodeport", "--k8s_node_port=32768"], "must be between 30000 and 32767"),
+    (["--k8s_expose_type=clusterip", "--k8s_node_port=31000"], "only valid with"),
+], ids=["below-range", "above-range", "wrong-expose-type"])
+def test_k8s_node_port_invalid(extra_opts, error):
+    """NodePort range and expose type validation."""
+    r = register_k8s_daemon(extra_opts)
+    assert r.returncode == 1, f"Expected exit 1 for {extra_opts}"
+    assert error in r.stdout.decode()
+
+
+def test_k8s_node_port_valid():
+    r = register_k8s_daemon(["--k8s_expose_type=nodeport", "--k8s_node_port=31000"])
+    assert r.returncode == 0, f"Valid nodeport registration failed: {r.stdout.decode()}"
+
+
+def test_k8s_manual_requires_upstream():
+    """Manual expose type requires --k8s_upstream_host."""
+    r = register_k8s_daemon(["--k8s_expose_type=manual"])
+    assert r.returncode == 1, "Expected exit 1 without upstream_host"
+    assert "required for" in r.stdout.decode().lower() or "k8s_upstream_host" in r.stdout.decode()
+
+    unregister_daemon(K8S_VALIDATION_DAEMON)
+    r = register_k8s_daemon(["--k8s_expose_type=manual", "--k8s_upstream_host=1.2.3.4"])
+    assert r.returncode == 0, f"Manual with upstream_host failed: {r.stdout.decode()}"
+
+
+def test_k8s_lb_ip_wrong_type():
+    """--k8s_load_balancer_ip only valid with loadbalancer type."""
+    r = register_k8s_daemon(["--k8s_expose_type=nodeport", "--k8s_load_balancer_ip=1.2.3.4"])
+    assert r.returncode == 1, "Expected exit 1 for lb_ip with nodeport"
+    assert "only valid with" in r.stdout.decode()
+
+
+def test_k8s_external_traffic_policy_invalid():
+    """Invalid external traffic policy must fail."""
+    r = register_k8s_daemon(["--k8s_external_traffic_policy=Invalid"])
+    assert r.returncode == 1, "Expected exit 1 for invalid policy"
+    assert "k8s_external_traffic_policy" in r.stdout.decode()
+
+
+def test_k8s_node_address_type_invalid():
+    """Invalid node address type must fail."""
+    r = register_k8s_daemon(["--k8s_node_address_type=BadType"])
+    assert r.returncode == 1, "Expected exit 1 for invalid address type"
+    assert "k8s_node_address_type" in r.stdout.decode()
@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Failure & edge cases of K8s deployments (needs k3s + HaRP)."""
+
+from __future__ import annotations
+
+from subprocess import TimeoutExpired
+
+import pytest
+
+from ._k8s import (
+    IS_MANUAL,
+    app_names,
+    delete_app_resources,
+    ensure_manual_service,
+    exapp_json,
+    list_line,
+    module_daemon,
+    occ,
+    register_exapp,
+)
+
+DAEMON = "k8s_failures"
+APP_ID = "k8s-force"
+BAD_IMAGE_APP_ID = "k8s-bad-image"
+MANUAL_IP_OFFSET = 2
+
+
+@pytest.fixture(scope="module", autouse=True)
+def daemon():
+    with module_daemon(DAEMON, APP_ID, MANUAL_IP_OFFSET) as name:
+        yield name
+
+
+def test_k8s_deploy_bad_image(daemon):
+    """Deploy with nonexistent image — should fail and clean up."""
+    bad_json = exapp_json(BAD_IMAGE_APP_ID, image="nextcloud/does-not-exist", tag="v999")
+    try:
+        r = register_exapp(BAD_IMAGE_APP_ID, daemon, bad_json, timeout=300)
+        assert r.returncode != 0, f"Expected failure for bad image, got exit 0: {r.stdout.decode()}"
+    except TimeoutExpired:
+        # If it times out, that's also acceptable
+        pass
+
+    try:
+        deployments = app_names("deploy", BAD_IMAGE_APP_ID)
+        assert not deployments, f"Leftover deployment found: {deployments}"
+        if not IS_MANUAL:
+            services = app_names("svc", BAD_IMAGE_APP_ID)
+            assert not services, f"Leftover service found: {services}"
+    finally:
+        # a leftover PVC or registration is not an error, but must not leak into later runs
+        delete_app_resources("pvc", BAD_IMAGE_APP_ID)
+        if list_line("app", BAD_IMAGE_APP_ID):
+            occ(f"app_api:app:unregister {BAD_IMAGE_APP_ID} --force", check=False, timeout=30)
+
+
+def test_k8s_unregister_force(daemon):
+    """--force unregister works even when K8s resources are already gone."""
+    ensure_manual_service(APP_ID, MANUAL_IP_OFFSET)
+
+    r = register_exapp(APP_ID, daemon, exapp_json(APP_ID))
+    assert r.returncode == 0, f"Deploy failed: {r.stdout.decode()}"
+
+    # Manually delete the K8s deployment and service
+    delete_app_resources("deploy", APP_ID)
+    delete_app_resources("svc", APP_ID)
+
+    # Normal unregister might fail or succeed (removeExApp checks exists first)
+    r = occ(f"app_api:app:unregister {APP_ID}", check=False, timeout=120)
+    if r.returncode != 0:
+        # --force should always work
+        r = occ(f"app_api:app:unregister {APP_ID} --force", check=False, timeout=120)
+        assert r.returncode == 0, f"--force unregister failed: {r.stdout.decode()}"
+
+    assert not list_line("app", APP_ID), f"{APP_ID} still in app list"
+    delete_app_resources("pvc", APP_ID)
+
+
+def test_k8s_unregister_nonexistent_silent():
+    """--silent unregister of nonexistent app should succeed silently."""
+    r = occ("app_api:app:unregister nonexistent-k8s-app --silent", check=False)
+    assert r.returncode == 0, f"Expected exit 0 with --silent, got {r.returncode}"
+    output = r.stdout.decode("UTF-8")
+    assert not output.strip(), f"Output should be empty with --silent: {output}"
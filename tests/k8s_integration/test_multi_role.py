@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Multi-role deploy lifecycle (needs k3s + HaRP). Tests run in order on one ExApp."""
+
+from __future__ import annotations
+
+import pytest
+
+from ._k8s import (
+    IS_MANUAL,
+    app_names,
+    assert_service_type,
+    exapp_json,
+    list_line,
+    module_daemon,
+    occ,
+    register_exapp,
+    update_exapp,
+    wait_replicas,
+)
+
+pytestmark = pytest.mark.skipif(IS_MANUAL, reason="multi-role + manual not supported yet")
+
+DAEMON = "k8s_multi"
+APP_ID = "k8s-multi"
+MANUAL_IP_OFFSET = 1
+ROLES = ["api", "worker"]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def daemon():
+    with module_daemon(DAEMON, APP_ID, MANUAL_IP_OFFSET) as name:
+        yield name
+
+
+def test_k8s_multi_deploy(daemon):
+    """Deploy a multi-role ExApp."""
+    r = register_exapp(APP_ID, daemon, exapp_json(APP_ID, roles=ROLES))
+    assert r.returncode == 0, f"Multi-role deploy failed (exit {r.returncode}): {r.stdout.decode()}"
+
+    deployments = app_names("deploy", APP_ID)
+    assert len(deployments) >= len(ROLES), f"Expected {len(ROLES)} deployments, got {deployments}"
+
+    # Only the api role (expose=true) gets a Service
+    services = app_names("svc", APP_ID)
+    assert len(services) == 1, f"Expected 1 service (exposed role only), got {services}"
+    assert_service_type(APP_ID, managed_by_harp=False)
+
+    assert list_line("app", APP_ID), f"{APP_ID} not in app list"
+
+
+def test_k8s_multi_enable_disable():
+    """Disable and re-enable a multi-role ExApp."""
+    r = occ(f"app_api:app:disable {APP_ID}", check=False, timeout=120)
+    assert r.returncode == 0, f"Disable failed: {r.stdout.decode()}"
+    wait_replicas(APP_ID, 0, count=len(ROLES))
+    line = list_line("app", APP_ID)
+    assert "disabled" in line, f"Expected 'disabled' in app list after disable: {line!r}"
+
+    r = occ(f"app_api:app:enable {APP_ID}", check=False, timeout=300)
+    assert r.returncode == 0, f"Enable failed: {r.stdout.decode()}"
+    wait_replicas(APP_ID, 1, count=len(ROLES))
+
+
+def test_k8s_multi_update():
+    """Update a multi-role K8s ExApp to a new version."""
+    r = update_exapp(APP_ID, exapp_json(APP_ID, version="2.0.0", roles=ROLES))
+    assert r.returncode == 0, f"Multi-role update failed (exit {r.returncode}): {r.stdout.decode()}"
+
+    line = list_line("app", APP_ID)
+    assert "2.0.0" in line, f"Expected version 2.0.0 in app list: {line!r}"
+    deployments = app_names("deploy", APP_ID)
+    assert len(deployments) >= len(ROLES), f"Expected {len(ROLES)} deployments after update, got {deployments}"
+    assert "enabled" in line, f"App not enabled after update: {line!r}"
+
+
+def test_k8s_multi_unregister():
+    """Unregister multi-role ExApp — both deployments and service removed."""
+    r = occ(f"app_api:app:unregister {APP_ID} --rm-data", check=False, timeout=120)
+    assert r.returncode == 0, f"Unregister failed: {r.stdout.decode()}"
+
+    deployments = app_names("deploy", APP_ID)
+    assert not deployments, f"Deployments still exist: {deployments}"
+    services = app_names("svc", APP_ID)
+    assert not services, f"Service still exists: {services}"
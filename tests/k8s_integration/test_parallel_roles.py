@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Multi-role deploy against the HaRP simulator of tests/deploy_bench (no k3s/HaRP needed)."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from subprocess import PIPE, run
+
+import httpx
+import pytest
+import uvicorn
+
+from ._k8s import OCC, exapp_json, list_line, register_exapp, unregister_daemon
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "deploy_bench"))
+from fake_harp import Behaviour, create_app  # noqa: E402
+
+DAEMON = "k8s_harp_sim"
+APP_ID = "k8s-parallel-roles"
+SHARED_KEY = "sim_key"
+ROLES = ["api", "worker", "scheduler"]
+READY_DELAY = 5.0
+
+
+@pytest.fixture(scope="module")
+def harp() -> Iterator[httpx.Client]:
+    """The HaRP simulator on a free local port: every role is ready READY_DELAY seconds after its start,
+    `expose` always fails, so that the registration stops right after the deploy phase."""
+    behaviour = Behaviour(ready_delay=READY_DELAY, failure_rate={"expose": 1.0})
+    server = uvicorn.Server(uvicorn.Config(create_app(behaviour, SHARED_KEY), host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline, "HaRP simulator did not start"
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            yield client
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+@pytest.fixture
+def daemon(harp: httpx.Client) -> Iterator[str]:
+    unregister_daemon(DAEMON)
+    r = run(
+        OCC + [
+            "app_api:daemon:register", DAEMON, "HaRP simulator", "kubernetes-install", "http",
+            f"{harp.base_url.host}:{harp.base_url.port}", "http://127.0.0.1",
+            "--harp", "--harp_shared_key", SHARED_KEY, "--k8s",
+        ],
+        stdout=PIPE, stderr=PIPE,
+    )
+    assert r.returncode == 0, f"Daemon {DAEMON} registration failed: {r.stdout.decode()}"
+    try:
+        yield DAEMON
+    finally:
+        run(OCC + ["app_api:app:unregister", APP_ID, "--force", "--silent"], stdout=PIPE, stderr=PIPE)
+        unregister_daemon(DAEMON)
+
+
+def test_k8s_multi_deploy_waits_roles_in_parallel(harp, daemon):
+    """All roles are waited on concurrently: the deploy takes one readiness delay, not one per role."""
+    harp.post("/sim/reset", params={"state": "true"}).raise_for_status()
+
+    start = time.monotonic()
+    r = register_exapp(APP_ID, daemon, exapp_json(APP_ID, roles=ROLES), timeout=120)
+    seconds = time.monotonic() - start
+
+    output = r.stdout.decode()
+    assert r.returncode == 1, f"Expected the registration to fail at expose (exit {r.returncode}): {output}"
+    assert f"ExApp {APP_ID} K8s expose failed" in output, f"Unexpected failure: {output}"
+    assert "simulated failure of expose" in output, f"Unexpected failure reason: {output}"
+    assert not list_line("app", APP_ID), f"{APP_ID} still registered after the failed deploy"
+
+    stats = harp.get("/sim/stats").json()
+    endpoints = stats["endpoints"]
+    waits = endpoints["POST /exapps/app_api/k8s/exapp/wait_for_start"]
+    assert waits["calls"] == len(ROLES), f"Unexpected HaRP calls: {endpoints}"
+    assert endpoints["POST /exapps/app_api/k8s/exapp/expose"]["failures"] == 1, f"Unexpected HaRP calls: {endpoints}"
+    assert not stats["deployments"], f"Deployments left after the failed deploy: {stats['deployments']}"
+    # every role waited for its whole readiness delay, yet the deploy took less than two of them
+    assert waits["seconds"] > (len(ROLES) - 0.5) * READY_DELAY, f"Roles did not each wait for readiness: {waits}"
+    assert seconds < 2 * READY_DELAY, (
+        f"Multi-role deploy took {seconds:.1f}s for {len(ROLES)} roles with a {READY_DELAY}s readiness "
+        "delay each; roles are not waited on in parallel"
+    )
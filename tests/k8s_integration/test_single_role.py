@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+"""Single-role deploy lifecycle (needs k3s + HaRP). Tests run in order on one ExApp."""
+
+from __future__ import annotations
+
+import pytest
+
+from ._k8s import (
+    IS_MANUAL,
+    app_items,
+    app_names,
+    assert_service_type,
+    delete_app_resources,
+    ensure_manual_service,
+    exapp_json,
+    list_line,
+    module_daemon,
+    occ,
+    register_exapp,
+    update_exapp,
+    wait_replicas,
+    wait_until,
+)
+
+DAEMON = "k8s_single"
+APP_ID = "k8s-single"
+MANUAL_IP_OFFSET = 0
+
+
+@pytest.fixture(scope="module", autouse=True)
+def daemon():
+    with module_daemon(DAEMON, APP_ID, MANUAL_IP_OFFSET) as name:
+        yield name
+
+
+def test_k8s_single_deploy(daemon):
+    """Deploy a single-role ExApp via K8s."""
+    ensure_manual_service(APP_ID, MANUAL_IP_OFFSET)
+
+    r = register_exapp(APP_ID, daemon, exapp_json(APP_ID))
+    assert r.returncode == 0, f"Deploy failed (exit {r.returncode}): {r.stdout.decode()}"
+
+    # Verify K8s resources
+    assert app_names("deploy", APP_ID), "No deployment found"
+    if not IS_MANUAL:
+        assert app_names("svc", APP_ID), "No service found"
+        assert_service_type(APP_ID)
+    assert app_names("pvc", APP_ID), "No PVC found"
+
+    # Verify in AppAPI
+    assert list_line("app", APP_ID), f"{APP_ID} not in app list"
+
+
+def test_k8s_single_enable_disable():
+    """Disable and re-enable a K8s ExApp (scale replicas)."""
+    r = occ(f"app_api:app:disable {APP_ID}", check=False, timeout=120)
+    assert r.returncode == 0, f"Disable failed: {r.stdout.decode()}"
+    wait_replicas(APP_ID, 0)
+    line = list_line("app", APP_ID)
+    assert "disabled" in line, f"Expected 'disabled' in app list after disable: {line!r}"
+
+    r = occ(f"app_api:app:enable {APP_ID}", check=False, timeout=300)
+    assert r.returncode == 0, f"Enable failed: {r.stdout.decode()}"
+    wait_replicas(APP_ID, 1)
+    line = list_line("app", APP_ID)
+    assert "enabled" in line, f"Expected 'enabled' in app list after enable: {line!r}"
+
+
+def test_k8s_single_update():
+    """Update a single-role K8s ExApp to a new version."""
+    assert list_line("app", APP_ID), f"{APP_ID} not in app list before update"
+
+    # Same image, bumped version
+    r = update_exapp(APP_ID, exapp_json(APP_ID, version="99.0.0"))
+    assert r.returncode == 0, f"Update failed (exit {r.returncode}): {r.stdout.decode()}"
+
+    line = list_line("app", APP_ID)
+    assert "99.0.0" in line, f"Expected version 99.0.0 in app list: {line!r}"
+    assert app_names("deploy", APP_ID), "No deployment after update"
+    if not IS_MANUAL:
+        assert app_names("svc", APP_ID), "No service after update"
+    assert "enabled" in line, f"App not enabled after update: {line!r}"
+
+
+def test_k8s_single_update_same_version():
+    """Update with the same version should be a no-op."""
+    r = update_exapp(APP_ID, exapp_json(APP_ID, version="99.0.0"), wait_finish=False, timeout=60)
+    assert r.returncode == 0, f"Same-version update failed: {r.stdout.decode()}"
+    output = r.stdout.decode()
+    assert "already updated" in output, f"Expected 'already updated' message, got: {output}"
+
+
+def test_k8s_single_unregister_keep_data():
+    """Unregister K8s ExApp — default keeps PVC."""
+    r = occ(f"app_api:app:unregister {APP_ID}", check=False, timeout=120)
+    assert r.returncode == 0, f"Unregister failed: {r.stdout.decode()}"
+
+    deployments = app_names("deploy", APP_ID)
+    assert not deployments, f"Deployment still exists: {deployments}"
+    services = app_names("svc", APP_ID)
+    if IS_MANUAL:
+        # Operator-managed Service must be preserved (HaRP only deletes managed-by=harp Services)
+        assert services, "Operator-managed Service was deleted during unregister"
+    else:
+        assert not services, f"Service still exists: {services}"
+
+    # PVC should still exist (default keeps data)
+    assert app_names("pvc", APP_ID), "PVC should still exist"
+
+    # Clean up PVC for next test
+    delete_app_resources("pvc", APP_ID)
+    wait_until(lambda: not app_names("pvc", APP_ID), 120, f"PVC of {APP_ID} to be deleted")
+
+
+def test_k8s_single_deploy_rm_data(daemon):
+    """Deploy then unregister with --rm-data removes PVC too."""
+    ensure_manual_service(APP_ID, MANUAL_IP_OFFSET)
+
+    r = register_exapp(APP_ID, daemon, exapp_json(APP_ID))
+    assert r.returncode == 0, f"Deploy failed: {r.stdout.decode()}"
+
+    r = occ(f"app_api:app:unregister {APP_ID} --rm-data", check=False, timeout=120)
+    assert r.returncode == 0, f"Unregister --rm-data failed: {r.stdout.decode()}"
+
+    # PVC removal is requested via remove_data=true in the payload to HaRP.
+    # K8s pvc-protection finalizer may delay actual deletion until pod terminates,
+    # so the PVC has to be either gone or marked for deletion.
+    wait_until(
+        lambda: all(item["metadata"].get("deletionTimestamp") for item in app_items("pvc", APP_ID)),
+        30, f"PVC of {APP_ID} to be deleted or terminating (--rm-data)",
+    )
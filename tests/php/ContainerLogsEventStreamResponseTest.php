@@ -0,0 +1,109 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php;
+
+use GuzzleHttp\Psr7\StreamDecoratorTrait;
+use GuzzleHttp\Psr7\Utils;
+use OCA\AppAPI\ContainerLogsEventStreamResponse;
+use OCA\AppAPI\DeployActions\DockerLogDemuxer;
+use OCP\AppFramework\Http\IOutput;
+use PHPUnit\Framework\TestCase;
+use Psr\Http\Message\StreamInterface;
+
+class ContainerLogsEventStreamResponseTest extends TestCase {
+
+	/**
+	 * Logs stream returning the given reads one by one; an empty read is a read timeout of the followed log.
+	 */
+	private static function logs(array $reads): DockerLogDemuxer {
+		return new DockerLogDemuxer(new class($reads) implements StreamInterface {
+			use StreamDecoratorTrait;
+
+			private StreamInterface $stream;
+
+			public function __construct(
+				private array $reads,
+			) {
+				$this->stream = Utils::streamFor('');
+			}
+
+			public function read($length): string {
+				$next = array_shift($this->reads) ?? '';
+				if (strlen($next) > $length) {
+					array_unshift($this->reads, substr($next, $length));
+				}
+				return substr($next, 0, $length);
+			}
+
+			public function eof(): bool {
+				return empty($this->reads);
+			}
+		});
+	}
+
+	private static function frame(int $type, string $content): string {
+		return pack('Cx3N', $type, strlen($content)) . $content;
+	}
+
+	private function render(ContainerLogsEventStreamResponse $response): string {
+		ob_start();
+		$response->callback($this->createMock(IOutput::class));
+		return ob_get_clean();
+	}
+
+	public function testLinesAreSentAsEventsUntilTheContainerStops(): void {
+		$response = new ContainerLogsEventStreamResponse(self::logs([
+			self::frame(1, "2026-10-18T08:15:30.5Z starting\n"),
+			'',
+			self::frame(2, "2026-10-18T08:15:31Z no GPU found\n"),
+		]));
+
+		self::assertSame(
+			"retry: 3000\n\n"
+			. "id: 1792311330.500000000\nevent: stdout\ndata: starting\n\n"
+			. ": keep-alive\n\n"
+			. "id: 1792311331.000000000\nevent: stderr\ndata: no GPU found\n\n"
+			. "event: end\ndata: stopped\n\n",
+			$this->render($response)
+		);
+		self::assertSame('text/event-stream', $response->getHeaders()['Content-Type']);
+	}
+
+	public function testTtyChunksAreSplitIntoLines(): void {
+		$response = new ContainerLogsEventStreamResponse(self::logs([
+			"2026-10-18T08:15:30Z first line\n2026-10-18T08:15:31Z sec",
+			"ond line\n",
+		]));
+
+		self::assertStringContainsString(
+			"id: 1792311330.000000000\nevent: stdout\ndata: first line\n\n"
+			. "id: 1792311331.000000000\nevent: stdout\ndata: second line\n\n",
+			$this->render($response)
+		);
+	}
+
+	public function testResumedStreamSkipsTheLineOfTheCursor(): void {
+		$response = new ContainerLogsEventStreamResponse(self::logs([
+			self::frame(1, "2026-10-18T08:15:30Z already received\n"),
+			self::frame(1, "2026-10-18T08:15:32Z new\n"),
+		]), '1792311330.000000000');
+
+		$events = $this->render($response);
+
+		self::assertStringNotContainsString('already received', $events);
+		self::assertStringContainsString("data: new\n\n", $events);
+	}
+
+	public function testStreamEndsAfterMaximumDuration(): void {
+		$response = new ContainerLogsEventStreamResponse(self::logs(array_fill(0, 100, '')), '', 0);
+
+		self::assertSame("retry: 3000\n\nevent: end\ndata: timeout\n\n", $this->render($response));
+	}
+}
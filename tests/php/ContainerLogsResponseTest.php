@@ -0,0 +1,57 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php;
+
+use GuzzleHttp\Psr7\Utils;
+use OCA\AppAPI\ContainerLogsResponse;
+use OCA\AppAPI\DeployActions\DockerLogDemuxer;
+use OCP\AppFramework\Http\IOutput;
+use PHPUnit\Framework\TestCase;
+
+class ContainerLogsResponseTest extends TestCase {
+
+	private static function logs(array $frames): DockerLogDemuxer {
+		$data = '';
+		foreach ($frames as [$type, $content]) {
+			$data .= pack('Cx3N', $type, strlen($content)) . $content;
+		}
+		return new DockerLogDemuxer(Utils::streamFor($data));
+	}
+
+	private function render(ContainerLogsResponse $response): string {
+		ob_start();
+		$response->callback($this->createMock(IOutput::class));
+		return ob_get_clean();
+	}
+
+	public function testTextLogsArePassedThrough(): void {
+		$response = new ContainerLogsResponse(self::logs([[1, "one\n"], [2, "two\n"]]), 'nc_app_test_logs.txt');
+
+		self::assertSame("one\ntwo\n", $this->render($response));
+		self::assertSame('text/plain', $response->getHeaders()['Content-Type']);
+	}
+
+	public function testJsonLinesCarryStreamTimestampAndCursor(): void {
+		$response = new ContainerLogsResponse(self::logs([
+			[1, "2026-10-18T08:15:30.123456789Z server started\n"],
+			[2, "2026-10-18T08:15:31Z disk almost full\n"],
+			[1, "no timestamp\n"],
+		]), 'nc_app_test_logs.jsonl', true);
+
+		$lines = array_map(fn (string $line) => json_decode($line, true), explode("\n", trim($this->render($response))));
+
+		self::assertSame([
+			['stream' => 'stdout', 'timestamp' => '2026-10-18T08:15:30.123456789Z', 'cursor' => '1792311330.123456789', 'message' => 'server started'],
+			['stream' => 'stderr', 'timestamp' => '2026-10-18T08:15:31Z', 'cursor' => '1792311331.000000000', 'message' => 'disk almost full'],
+			['stream' => 'stdout', 'timestamp' => '', 'cursor' => '', 'message' => 'no timestamp'],
+		], $lines);
+		self::assertSame('application/x-ndjson', $response->getHeaders()['Content-Type']);
+	}
+}
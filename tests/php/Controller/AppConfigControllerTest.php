@@ -141,4 +141,29 @@ class AppConfigControllerTest extends TestCase {
 			}
 		}
 	}
+
+	public function testBulkSetKeepsSensitivityAndGetReturnsMap(): void {
+		$this->controller->setAppConfigValue(self::KEY_SECRET, 'orig', sensitive: 1);
+
+		$set = $this->controller->setAppConfigMap([self::KEY_PLAIN => 'a', self::KEY_SECRET => 'b'])->getData();
+		self::assertSame(['configvalue' => 'a', 'sensitive' => 0], $set[self::KEY_PLAIN]);
+		self::assertSame(['configvalue' => 'b', 'sensitive' => 1], $set[self::KEY_SECRET], 'existing sensitive flag must be kept');
+
+		$values = $this->controller->getAppConfigMap([self::KEY_SECRET, 'no_such_key_phpunit_xyz', self::KEY_PLAIN])->getData();
+		self::assertSame([self::KEY_SECRET => 'b', self::KEY_PLAIN => 'a'], $values);
+	}
+
+	public function testBulkDeleteReportsEveryKey(): void {
+		$this->controller->setAppConfigMap([self::KEY_PLAIN => 'a']);
+
+		$deleted = $this->controller->deleteAppConfigMap([self::KEY_PLAIN, self::KEY_SECRET])->getData();
+
+		self::assertSame([self::KEY_PLAIN => true, self::KEY_SECRET => false], $deleted);
+		self::assertEquals(new \stdClass(), $this->controller->getAppConfigMap([self::KEY_PLAIN])->getData(), 'an empty map must serialize as a JSON object');
+	}
+
+	public function testBulkRejectsTooManyKeys(): void {
+		$this->expectException(OCSBadRequestException::class);
+		$this->controller->getAppConfigMap(array_map(fn (int $i) => 'key_' . $i, range(0, ExAppConfigService::BULK_MAX_KEYS)));
+	}
 }
@@ -30,6 +30,7 @@ use PHPUnit\Framework\TestCase;
 class PreferencesControllerTest extends TestCase {
 	private const TEST_APP_ID = 'phpunit_pref_test';
 	private const TEST_USER_ID = 'phpunit_pref_user';
+	private const OTHER_USER_ID = 'phpunit_pref_user_2';
 	private const KEY_PLAIN = 'phpunit_plain_key';
 	private const KEY_SECRET = 'phpunit_secret_key';
 
@@ -61,6 +62,7 @@ class PreferencesControllerTest extends TestCase {
 
 	private function cleanup(): void {
 		$this->service->deleteUserConfigValues([self::KEY_PLAIN, self::KEY_SECRET], self::TEST_USER_ID, self::TEST_APP_ID);
+		$this->service->deleteUserConfigValues([self::KEY_PLAIN, self::KEY_SECRET], self::OTHER_USER_ID, self::TEST_APP_ID);
 	}
 
 	public function testSensitiveFlagPersistsOnSet(): void {
@@ -115,4 +117,51 @@ class PreferencesControllerTest extends TestCase {
 		$this->expectException(OCSNotFoundException::class);
 		$this->controller->deleteUserConfigValues(['no_such_key_phpunit_xyz']);
 	}
+
+	public function testBulkSetKeepsSensitivityAndGetReturnsMap(): void {
+		$this->controller->setUserConfigValue(self::KEY_SECRET, 'orig', sensitive: 1);
+
+		$set = $this->controller->setUserConfigMap([self::KEY_PLAIN => 'a', self::KEY_SECRET => 'b'])->getData();
+		self::assertSame(['configvalue' => 'a', 'sensitive' => 0], $set[self::KEY_PLAIN]);
+		self::assertSame(['configvalue' => 'b', 'sensitive' => 1], $set[self::KEY_SECRET], 'existing sensitive flag must be kept');
+
+		$values = $this->controller->getUserConfigMap([self::KEY_SECRET, 'no_such_key_phpunit_xyz', self::KEY_PLAIN])->getData();
+		self::assertSame([self::KEY_SECRET => 'b', self::KEY_PLAIN => 'a'], $values);
+	}
+
+	public function testBulkDeleteReportsEveryKey(): void {
+		$this->controller->setUserConfigMap([self::KEY_PLAIN => 'a']);
+
+		$deleted = $this->controller->deleteUserConfigMap([self::KEY_PLAIN, self::KEY_SECRET])->getData();
+
+		self::assertSame([self::KEY_PLAIN => true, self::KEY_SECRET => false], $deleted);
+		self::assertEquals(new \stdClass(), $this->controller->getUserConfigMap([self::KEY_PLAIN])->getData(), 'an empty map must serialize as a JSON object');
+	}
+
+	public function testUsersConfigMapPagesOverUsersWithTheKeys(): void {
+		$this->service->setUserConfigValue(self::TEST_USER_ID, self::TEST_APP_ID, self::KEY_PLAIN, 'a');
+		$this->service->setUserConfigValue(self::TEST_USER_ID, self::TEST_APP_ID, self::KEY_SECRET, 's1', 1);
+		$this->service->setUserConfigValue(self::OTHER_USER_ID, self::TEST_APP_ID, self::KEY_SECRET, 's2', 1);
+
+		$first = $this->controller->getUsersConfigMap([self::KEY_PLAIN, self::KEY_SECRET], limit: 1)->getData();
+		self::assertSame([self::TEST_USER_ID => [self::KEY_PLAIN => 'a', self::KEY_SECRET => 's1']], $first['values']);
+		self::assertSame(self::TEST_USER_ID, $first['next_cursor']);
+
+		$second = $this->controller->getUsersConfigMap([self::KEY_PLAIN, self::KEY_SECRET], cursor: $first['next_cursor'], limit: 1)->getData();
+		self::assertSame([self::OTHER_USER_ID => [self::KEY_SECRET => 's2']], $second['values'], 'sensitive values must be decrypted');
+		self::assertNull($second['next_cursor']);
+	}
+
+	public function testUsersConfigMapForGivenUsers(): void {
+		$this->service->setUserConfigValue(self::OTHER_USER_ID, self::TEST_APP_ID, self::KEY_PLAIN, 'b');
+
+		$data = $this->controller->getUsersConfigMap([self::KEY_PLAIN], [self::TEST_USER_ID, self::OTHER_USER_ID])->getData();
+
+		self::assertSame(['values' => [self::OTHER_USER_ID => [self::KEY_PLAIN => 'b']], 'next_cursor' => null], $data);
+	}
+
+	public function testUsersConfigMapPageSizeIsCapped(): void {
+		$this->expectException(OCSBadRequestException::class);
+		$this->controller->getUsersConfigMap([self::KEY_PLAIN], limit: ExAppPreferenceService::USERS_PAGE_MAX + 1);
+	}
 }
@@ -115,4 +115,38 @@ class TaskProcessingControllerTest extends TestCase {
 		$response = $this->controller->registerProvider($this->buildProvider(), $customType);
 		self::assertSame(Http::STATUS_BAD_REQUEST, $response->getStatus());
 	}
+
+	public function testRegisterRejectsInvalidMaxBatchSize(): void {
+		$provider = $this->buildProvider();
+		$provider['max_batch_size'] = TaskProcessingService::BATCH_MAX_SIZE + 1;
+		self::assertSame(Http::STATUS_BAD_REQUEST, $this->controller->registerProvider($provider, null)->getStatus());
+	}
+
+	public function testClaimTaskBatch(): void {
+		$provider = $this->buildProvider();
+		$provider['max_batch_size'] = 10;
+		self::assertSame(Http::STATUS_OK, $this->controller->registerProvider($provider, null)->getStatus());
+
+		// no ExApp is installed for the provider, so it is not the preferred one of its task type and gets no tasks
+		$response = $this->controller->claimTaskBatch(self::PROVIDER_ID, 5);
+		self::assertSame(Http::STATUS_OK, $response->getStatus());
+		self::assertSame(['tasks' => []], $response->getData());
+
+		self::assertSame(Http::STATUS_BAD_REQUEST, $this->controller->claimTaskBatch(self::PROVIDER_ID, 0)->getStatus());
+		self::assertSame(Http::STATUS_NOT_FOUND, $this->controller->claimTaskBatch('does_not_exist')->getStatus());
+	}
+
+	public function testSetTaskResults(): void {
+		self::assertSame(Http::STATUS_OK, $this->controller->registerProvider($this->buildProvider(), null)->getStatus());
+
+		$response = $this->controller->setTaskResults(self::PROVIDER_ID, ['999999999' => ['error_message' => 'failed']]);
+		self::assertSame(Http::STATUS_OK, $response->getStatus());
+		self::assertSame([999999999 => false], $response->getData());
+
+		self::assertSame(Http::STATUS_BAD_REQUEST, $this->controller->setTaskResults(self::PROVIDER_ID, [])->getStatus());
+		self::assertSame(
+			Http::STATUS_NOT_FOUND,
+			$this->controller->setTaskResults('does_not_exist', ['1' => ['output' => []]])->getStatus()
+		);
+	}
 }
@@ -0,0 +1,142 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\Db;
+
+use OCA\AppAPI\Db\ExApp;
+use OCA\AppAPI\Db\ExAppMapper;
+use OCP\IDBConnection;
+use OCP\Server;
+use PHPUnit\Framework\Attributes\Group;
+use PHPUnit\Framework\TestCase;
+
+/**
+ * ExApps are loaded with one row per ExApp and their routes with a second query keyed by appid.
+ * The benchmark group seeds 200 ExApps with 50 routes each and prints how long loading them takes.
+ */
+#[Group('DB')]
+class ExAppMapperRoutesTest extends TestCase {
+	private const APP_ID_PREFIX = 'phpunit_routes_';
+	private const APPS_COUNT = 5;
+	private const ROUTES_PER_APP = 3;
+	private const BENCHMARK_APPS_COUNT = 200;
+	private const BENCHMARK_ROUTES_PER_APP = 50;
+	private const FIRST_PORT = 41000;
+
+	private ExAppMapper $mapper;
+	private IDBConnection $db;
+
+	protected function setUp(): void {
+		parent::setUp();
+		$this->mapper = Server::get(ExAppMapper::class);
+		$this->db = Server::get(IDBConnection::class);
+		$this->cleanUp();
+	}
+
+	protected function tearDown(): void {
+		$this->cleanUp();
+		parent::tearDown();
+	}
+
+	private function cleanUp(): void {
+		foreach (['ex_apps', 'ex_apps_routes'] as $table) {
+			$qb = $this->db->getQueryBuilder();
+			$qb->delete($table)
+				->where($qb->expr()->like('appid', $qb->createNamedParameter(self::APP_ID_PREFIX . '%')))
+				->executeStatement();
+		}
+	}
+
+	private function seed(int $appsCount = self::APPS_COUNT, int $routesPerApp = self::ROUTES_PER_APP): void {
+		$this->db->beginTransaction();
+		for ($i = 0; $i < $appsCount; $i++) {
+			$exApp = new ExApp();
+			$exApp->setAppid(self::APP_ID_PREFIX . $i);
+			$exApp->setVersion('1.0.0');
+			$exApp->setName('PHPUnit routes ExApp');
+			$exApp->setDaemonConfigName('manual_install');
+			$exApp->setPort(self::FIRST_PORT + $i);
+			$exApp->setSecret(str_repeat('a', 64));
+			$exApp->setStatus(['deploy' => 100, 'init' => 100, 'action' => '', 'type' => '', 'error' => '']);
+			$exApp->setEnabled(1);
+			$exApp->setCreatedTime(time());
+			$this->mapper->insert($exApp);
+
+			$routes = [];
+			for ($j = 0; $j < $routesPerApp; $j++) {
+				$routes[] = [
+					'url' => '^/route_' . $j . '/.*$',
+					'verb' => 'GET,POST',
+					'access_level' => $j % 3,
+					'headers_to_exclude' => $j === 0 ? ['Cookie'] : [],
+					'bruteforce_protection' => $j === 0 ? [401] : [],
+				];
+			}
+			$this->mapper->registerExAppRoutes($exApp, $routes);
+		}
+		$this->db->commit();
+	}
+
+	public function testRoutesAreLoadedInOrderAndDecoded(): void {
+		$this->seed();
+
+		$exApp = $this->mapper->findByAppId(self::APP_ID_PREFIX . '3');
+
+		$routes = $exApp->getRoutes();
+		self::assertCount(self::ROUTES_PER_APP, $routes);
+		self::assertSame('^/route_0/.*$', $routes[0]['url']);
+		self::assertSame('^/route_2/.*$', $routes[2]['url']);
+		self::assertSame(['Cookie'], $routes[0]['headers_to_exclude']);
+		self::assertSame([401], $routes[0]['bruteforce_protection']);
+		self::assertSame([], $routes[1]['bruteforce_protection']);
+		self::assertSame(2, $routes[2]['access_level']);
+		self::assertNull($exApp->getCompiledRoutes(), 'routes are compiled by ExAppService, not on every load');
+
+		$exApps = $this->findSeededExApps();
+		self::assertCount(self::APPS_COUNT, $exApps);
+		foreach ($exApps as $exApp) {
+			self::assertCount(self::ROUTES_PER_APP, $exApp->getRoutes());
+		}
+	}
+
+	#[Group('benchmark')]
+	public function testBenchmarkLoading(): void {
+		$this->seed(self::BENCHMARK_APPS_COUNT, self::BENCHMARK_ROUTES_PER_APP);
+
+		$start = hrtime(true);
+		$this->mapper->findByAppId(self::APP_ID_PREFIX . '7');
+		$findByAppIdNs = hrtime(true) - $start;
+		$start = hrtime(true);
+		$exApps = $this->findSeededExApps();
+		$findAllNs = hrtime(true) - $start;
+
+		self::assertCount(self::BENCHMARK_APPS_COUNT, $exApps);
+		fwrite(STDERR, sprintf(
+			"\n%d ExApps x %d routes: findByAppId %.3f ms, findAll %.3f ms",
+			self::BENCHMARK_APPS_COUNT, self::BENCHMARK_ROUTES_PER_APP, $findByAppIdNs / 1e6, $findAllNs / 1e6,
+		));
+	}
+
+	/**
+	 * @return ExApp[]
+	 */
+	private function findSeededExApps(): array {
+		return array_filter(
+			$this->mapper->findAll(),
+			static fn (ExApp $exApp) => str_starts_with($exApp->getAppid(), self::APP_ID_PREFIX),
+		);
+	}
+
+	public function testLimitAppliesToExAppsNotRoutes(): void {
+		$this->seed();
+
+		$exApps = $this->mapper->findAll(3);
+		self::assertCount(3, $exApps);
+	}
+}
@@ -19,7 +19,7 @@ class ExAppMapperTest extends TestCase {
 	 * `parseJsonList` is used by the proxy controller and HaRP route serializer to read the
 	 * nullable `bruteforce_protection` / `headers_to_exclude` columns. The matrix below covers
 	 * every row shape we have seen or can construct: legacy NULLs, malformed JSON, non-string
-	 * inputs, and well-formed payloads.
+	 * inputs, well-formed payloads, and the lists already decoded by the mapper.
 	 */
 	#[DataProvider('jsonListProvider')]
 	public function testParseJsonList(mixed $raw, array $expected): void {
@@ -37,7 +37,8 @@ class ExAppMapperTest extends TestCase {
 			'json literal "null"'      => ['null', []],
 			'json scalar string'       => ['"foo"', []],
 			'json scalar int'          => ['42', []],
-			'non-string input (array)' => [['Cookie'], []],
+			'decoded list'             => [['Cookie'], ['Cookie']],
+			'decoded map'              => [['a' => 401], [401]],
 			'non-string input (int)'   => [42, []],
 			'non-string input (bool)'  => [false, []],
 		];
@@ -9,7 +9,12 @@ declare(strict_types=1);
 
 namespace OCA\AppAPI\Tests\php\DeployActions;
 
+use GuzzleHttp\Client;
+use GuzzleHttp\Handler\MockHandler;
+use GuzzleHttp\Psr7\Response;
+use GuzzleHttp\Psr7\Utils;
 use OCA\AppAPI\AppInfo\Application;
+use OCA\AppAPI\Db\ExApp;
 use OCA\AppAPI\DeployActions\DockerActions;
 use OCA\AppAPI\Service\AppAPICommonService;
 use OCA\AppAPI\Service\ExAppDeployOptionsService;
@@ -28,11 +33,13 @@ use Psr\Log\LoggerInterface;
 class DockerActionsTest extends TestCase {
 	private DockerActions $dockerActions;
 	private IAppConfig&MockObject $appConfig;
+	private ExAppService&MockObject $exAppService;
 
 	protected function setUp(): void {
 		parent::setUp();
 
 		$this->appConfig = $this->createMock(IAppConfig::class);
+		$this->exAppService = $this->createMock(ExAppService::class);
 
 		$this->dockerActions = new DockerActions(
 			$this->createMock(LoggerInterface::class),
@@ -42,7 +49,7 @@ class DockerActionsTest extends TestCase {
 			$this->createMock(IAppManager::class),
 			$this->createMock(IURLGenerator::class),
 			$this->createMock(AppAPICommonService::class),
-			$this->createMock(ExAppService::class),
+			$this->exAppService,
 			$this->createMock(ITempManager::class),
 			$this->createMock(ICrypto::class),
 			$this->createMock(ExAppDeployOptionsService::class),
@@ -99,4 +106,37 @@ class DockerActionsTest extends TestCase {
 
 		self::assertSame('http://localhost:8780/v1.41/containers/nc_app_test/json', $url);
 	}
+
+	public function testPullImageProgressIsParsedAcrossChunksAndThrottled(): void {
+		$lines = [json_encode(['status' => 'Pulling from nextcloud/app', 'id' => 'latest'])];
+		foreach (['layer1', 'layer2'] as $layerId) {
+			$lines[] = json_encode(['status' => 'Pulling fs layer', 'progressDetail' => [], 'id' => $layerId]);
+		}
+		// thousands of messages, so lines straddle the read chunks
+		foreach (['layer1', 'layer2'] as $layerId) {
+			for ($current = 0; $current <= 5000000; $current += 2500) {
+				$lines[] = json_encode(['status' => 'Downloading', 'progressDetail' => ['current' => $current, 'total' => 5000000], 'progress' => str_repeat('=', 20), 'id' => $layerId]);
+			}
+			$lines[] = json_encode(['status' => 'Pull complete', 'progressDetail' => [], 'id' => $layerId]);
+		}
+		$body = implode("\n", $lines) . "\n";
+		(new \ReflectionProperty($this->dockerActions, 'guzzleClient'))->setValue(
+			$this->dockerActions,
+			new Client(['handler' => new MockHandler([new Response(200, [], Utils::streamFor($body))])]),
+		);
+		$written = [];
+		$this->exAppService->method('setAppDeployProgress')->willReturnCallback(function (ExApp $exApp, int $percent) use (&$written) {
+			$written[] = $percent;
+		});
+
+		$result = $this->dockerActions->pullImageInternal('http://localhost', new ExApp(['appid' => 'app']), 10, 90, 'nextcloud/app:latest');
+
+		self::assertSame('', $result);
+		self::assertNotEmpty($written);
+		self::assertLessThan(count($lines) / 100, count($written), 'progress writes must be throttled');
+		$increasing = array_values(array_unique($written));
+		sort($increasing);
+		self::assertSame($increasing, $written, 'progress must only move forward');
+		self::assertSame(90, end($written));
+	}
 }
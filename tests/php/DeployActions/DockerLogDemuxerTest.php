@@ -0,0 +1,87 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\DeployActions;
+
+use GuzzleHttp\Psr7\PumpStream;
+use GuzzleHttp\Psr7\Utils;
+use OCA\AppAPI\DeployActions\DockerLogDemuxer;
+use PHPUnit\Framework\TestCase;
+use Psr\Http\Message\StreamInterface;
+
+class DockerLogDemuxerTest extends TestCase {
+
+	private static function frame(int $type, string $content): string {
+		return pack('Cx3N', $type, strlen($content)) . $content;
+	}
+
+	/**
+	 * A stream returning at most 3 bytes per read, like a slow network connection.
+	 */
+	private static function trickle(string $data): StreamInterface {
+		$offset = 0;
+		return new PumpStream(function () use ($data, &$offset) {
+			if ($offset >= strlen($data)) {
+				return false;
+			}
+			$chunk = substr($data, $offset, 3);
+			$offset += 3;
+			return $chunk;
+		});
+	}
+
+	private static function readAll(DockerLogDemuxer $demuxer): array {
+		$frames = [];
+		while (($frame = $demuxer->readFrame()) !== null) {
+			$frames[] = $frame;
+		}
+		return $frames;
+	}
+
+	public function testMultiplexedFramesAreSplitAcrossPartialReads(): void {
+		$data = self::frame(1, "started\n") . self::frame(2, "warning: slow\n") . self::frame(1, str_repeat('x', 20000) . "\n");
+
+		$frames = self::readAll(new DockerLogDemuxer(self::trickle($data)));
+
+		self::assertSame([
+			['stream' => 'stdout', 'content' => "started\n"],
+			['stream' => 'stderr', 'content' => "warning: slow\n"],
+			['stream' => 'stdout', 'content' => str_repeat('x', 20000) . "\n"],
+		], $frames);
+	}
+
+	public function testTruncatedFrameEndsTheStream(): void {
+		$data = self::frame(1, "complete\n") . substr(self::frame(1, "cut off\n"), 0, 11);
+
+		self::assertSame([['stream' => 'stdout', 'content' => "complete\n"]], self::readAll(new DockerLogDemuxer(Utils::streamFor($data))));
+	}
+
+	public function testLargeFrameIsReturnedInParts(): void {
+		$content = str_repeat('y', DockerLogDemuxer::MAX_FRAME_SIZE + 10);
+		$data = self::frame(2, $content) . self::frame(1, "next\n");
+
+		$frames = self::readAll(new DockerLogDemuxer(Utils::streamFor($data)));
+
+		self::assertSame([DockerLogDemuxer::MAX_FRAME_SIZE, 10, 5], array_map(fn (array $frame) => strlen($frame['content']), $frames));
+		self::assertSame(['stderr', 'stderr', 'stdout'], array_column($frames, 'stream'));
+	}
+
+	public function testTtyLogsAreReturnedRaw(): void {
+		$data = "plain log line from a TTY container\nsecond line\n";
+
+		$frames = self::readAll(new DockerLogDemuxer(self::trickle($data)));
+
+		self::assertSame($data, implode('', array_column($frames, 'content')));
+		self::assertSame(['stdout'], array_values(array_unique(array_column($frames, 'stream'))));
+	}
+
+	public function testEmptyLogs(): void {
+		self::assertSame([], self::readAll(new DockerLogDemuxer(Utils::streamFor(''))));
+	}
+}
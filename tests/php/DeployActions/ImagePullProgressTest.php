@@ -0,0 +1,63 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\DeployActions;
+
+use OCA\AppAPI\DeployActions\ImagePullProgress;
+use PHPUnit\Framework\TestCase;
+
+class ImagePullProgressTest extends TestCase {
+
+	private function downloading(string $id, int $current, int $total): array {
+		return ['id' => $id, 'status' => 'Downloading', 'progressDetail' => ['current' => $current, 'total' => $total]];
+	}
+
+	public function testNoLayersIsZero(): void {
+		$progress = new ImagePullProgress();
+		$progress->feed(['status' => 'Pulling from nextcloud/app', 'id' => 'latest']);
+
+		self::assertSame(0.0, $progress->getFraction());
+	}
+
+	public function testLayersAreWeightedByTheirSize(): void {
+		$progress = new ImagePullProgress();
+		$progress->feed(['id' => 'small', 'status' => 'Pulling fs layer', 'progressDetail' => []]);
+		$progress->feed(['id' => 'big', 'status' => 'Pulling fs layer', 'progressDetail' => []]);
+		$progress->feed($this->downloading('small', 1000, 1000));
+		$progress->feed(['id' => 'small', 'status' => 'Pull complete', 'progressDetail' => []]);
+		$progress->feed($this->downloading('big', 0, 99000));
+
+		// the finished layer is 1% of the image bytes, not half of its layers
+		self::assertEqualsWithDelta(0.01, $progress->getFraction(), 0.0001);
+
+		$progress->feed($this->downloading('big', 99000, 99000));
+		self::assertEqualsWithDelta(0.01 + 0.99 * 0.8, $progress->getFraction(), 0.0001);
+
+		$progress->feed(['id' => 'big', 'status' => 'Extracting', 'progressDetail' => ['current' => 49500, 'total' => 99000]]);
+		self::assertEqualsWithDelta(0.01 + 0.99 * 0.9, $progress->getFraction(), 0.0001);
+
+		$progress->feed(['id' => 'big', 'status' => 'Pull complete', 'progressDetail' => []]);
+		self::assertEqualsWithDelta(1.0, $progress->getFraction(), 0.0001);
+	}
+
+	public function testLayersOfUnknownSizeUseTheAverageSize(): void {
+		$progress = new ImagePullProgress();
+		$progress->feed($this->downloading('a', 100, 100));
+		$progress->feed(['id' => 'b', 'status' => 'Waiting', 'progressDetail' => []]);
+
+		self::assertEqualsWithDelta(0.4, $progress->getFraction(), 0.0001);
+	}
+
+	public function testExistingLayersCountAsDone(): void {
+		$progress = new ImagePullProgress();
+		$progress->feed(['id' => 'a', 'status' => 'Already exists', 'progressDetail' => []]);
+
+		self::assertSame(1.0, $progress->getFraction());
+	}
+}
@@ -0,0 +1,144 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php;
+
+use OCA\AppAPI\ProxyResponse;
+use OCP\AppFramework\Http;
+use OCP\AppFramework\Http\IOutput;
+use PHPUnit\Framework\Attributes\DataProvider;
+use PHPUnit\Framework\Attributes\Group;
+use PHPUnit\Framework\TestCase;
+
+class ProxyResponseTest extends TestCase {
+
+	private function createOutput(int $status = Http::STATUS_OK): IOutput {
+		$output = $this->createMock(IOutput::class);
+		$output->method('getHttpResponseCode')->willReturn($status);
+		return $output;
+	}
+
+	/**
+	 * @return resource
+	 */
+	private function createStream(string $content) {
+		$stream = fopen('php://temp', 'w+');
+		fwrite($stream, $content);
+		rewind($stream);
+		return $stream;
+	}
+
+	private function render(ProxyResponse $response): string {
+		ob_start();
+		$response->callback($this->createOutput());
+		return ob_get_clean();
+	}
+
+	/**
+	 * `<script` tags are rewritten wherever the chunk boundary falls, including in the middle of the tag.
+	 */
+	#[DataProvider('splitOffsetProvider')]
+	public function testScriptNonceIsInjectedAcrossChunkBoundaries(int $offset): void {
+		$prefix = str_repeat('a', ProxyResponse::CHUNK_SIZE - $offset);
+		$html = $prefix . '<script src="app.js"></script><p>text</p><script>run()</script><scrip';
+
+		$response = new ProxyResponse(Http::STATUS_OK, [], $this->createStream($html));
+		$response->setScriptNonce('n0nce');
+
+		self::assertSame(
+			$prefix . '<script nonce="n0nce" src="app.js"></script><p>text</p><script nonce="n0nce">run()</script><scrip',
+			$this->render($response)
+		);
+	}
+
+	public static function splitOffsetProvider(): array {
+		return [
+			'tag starts at boundary' => [0],
+			'split after <' => [1],
+			'split inside tag name' => [4],
+			'split before last char' => [6],
+			'tag fully inside first chunk' => [64],
+		];
+	}
+
+	public function testStringBodyGetsNonce(): void {
+		$response = new ProxyResponse(Http::STATUS_OK, [], '<html><script></script></html>');
+		$response->setScriptNonce('n0nce');
+
+		self::assertSame('<html><script nonce="n0nce"></script></html>', $this->render($response));
+	}
+
+	public function testStreamWithoutNonceIsPassedThroughUnchanged(): void {
+		$body = random_bytes(3 * ProxyResponse::CHUNK_SIZE + 17);
+		$response = new ProxyResponse(Http::STATUS_OK, [], $this->createStream($body));
+
+		self::assertSame($body, $this->render($response));
+	}
+
+	public function testNotModifiedSendsNoBody(): void {
+		$response = new ProxyResponse(Http::STATUS_NOT_MODIFIED, [], 'body');
+
+		ob_start();
+		$response->callback($this->createOutput(Http::STATUS_NOT_MODIFIED));
+		self::assertSame('', ob_get_clean());
+	}
+
+	/**
+	 * Proxy a body of `$sizeMb` MB from a file-backed stream.
+	 *
+	 * @return array{int, int, int} sent bytes, peak memory growth in bytes, elapsed nanoseconds
+	 */
+	private function proxyLargeBody(int $sizeMb): array {
+		$stream = fopen('php://temp/maxmemory:0', 'w+');
+		$block = str_repeat('x', 1024 * 1024);
+		for ($i = 0; $i < $sizeMb; $i++) {
+			fwrite($stream, $block);
+		}
+		rewind($stream);
+		unset($block);
+
+		$response = new ProxyResponse(Http::STATUS_OK, [], $stream);
+		$sent = 0;
+		ob_start(static function (string $buffer) use (&$sent) {
+			$sent += strlen($buffer);
+			return '';
+		}, ProxyResponse::CHUNK_SIZE);
+
+		memory_reset_peak_usage();
+		$before = memory_get_usage();
+		$start = hrtime(true);
+		$response->callback($this->createOutput());
+		$elapsedNs = hrtime(true) - $start;
+		$peakGrowth = memory_get_peak_usage() - $before;
+		ob_end_clean();
+		return [$sent, $peakGrowth, $elapsedNs];
+	}
+
+	/**
+	 * Peak memory while proxying a large body must not grow with the body size.
+	 */
+	public function testPeakMemoryIsFlatForLargeBodies(): void {
+		[$sent, $peakGrowth] = $this->proxyLargeBody(8);
+
+		self::assertSame(8 * 1024 * 1024, $sent);
+		self::assertLessThan(1024 * 1024, $peakGrowth, 'Proxying must not buffer the body in memory');
+	}
+
+	/**
+	 * Set APP_API_BENCH_PROXY_BODY_MB=1024 to reproduce the 1 GB case.
+	 */
+	#[Group('benchmark')]
+	public function testBenchmarkLargeBody(): void {
+		$sizeMb = (int)(getenv('APP_API_BENCH_PROXY_BODY_MB') ?: 64);
+		[$sent, $peakGrowth, $elapsedNs] = $this->proxyLargeBody($sizeMb);
+
+		self::assertSame($sizeMb * 1024 * 1024, $sent);
+		fwrite(STDERR, sprintf("\nproxied %d MB: %.1f ms, peak memory growth %d bytes", $sizeMb, $elapsedNs / 1e6, $peakGrowth));
+	}
+}
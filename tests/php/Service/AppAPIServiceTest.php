@@ -9,18 +9,23 @@ declare(strict_types=1);
 
 namespace OCA\AppAPI\Tests\php\Service;
 
+use OCA\AppAPI\Db\DaemonConfig;
 use OCA\AppAPI\Db\ExApp;
+use OCA\AppAPI\Db\ExAppDeployOption;
 use OCA\AppAPI\DeployActions\DockerActions;
 use OCA\AppAPI\DeployActions\KubernetesActions;
 use OCA\AppAPI\DeployActions\ManualActions;
 use OCA\AppAPI\Service\AppAPICommonService;
 use OCA\AppAPI\Service\AppAPIService;
 use OCA\AppAPI\Service\DaemonConfigService;
+use OCA\AppAPI\Service\ExAppClientPool;
 use OCA\AppAPI\Service\ExAppDeployOptionsService;
 use OCA\AppAPI\Service\ExAppService;
 use OCA\AppAPI\Service\HarpService;
 use OCP\Http\Client\IClient;
 use OCP\Http\Client\IClientService;
+use OCP\Http\Client\IResponse;
+use OCP\IAppConfig;
 use OCP\IConfig;
 use OCP\ISession;
 use OCP\IUserManager;
@@ -48,6 +53,9 @@ class AppAPIServiceTest extends TestCase {
 	private IUserSession&MockObject $userSession;
 	private ISession&MockObject $session;
 	private IUserManager&MockObject $userManager;
+	private DaemonConfigService&MockObject $daemonConfigService;
+	private IAppConfig&MockObject $appConfig;
+	private ExAppDeployOptionsService&MockObject $exAppDeployOptionsService;
 
 	protected function setUp(): void {
 		parent::setUp();
@@ -68,8 +76,10 @@ class AppAPIServiceTest extends TestCase {
 		$this->kubernetesActions = $this->createMock(KubernetesActions::class);
 		$this->manualActions = $this->createMock(ManualActions::class);
 		$this->commonService = $this->createMock(AppAPICommonService::class);
-		$daemonConfigService = $this->createMock(DaemonConfigService::class);
-		$exAppDeployOptionsService = $this->createMock(ExAppDeployOptionsService::class);
+		$this->daemonConfigService = $this->createMock(DaemonConfigService::class);
+		// unless set with setAppConfigValues(), app config reads return '': no heartbeat backoff delay
+		$this->appConfig = $this->createMock(IAppConfig::class);
+		$this->exAppDeployOptionsService = $this->createMock(ExAppDeployOptionsService::class);
 		$harpService = $this->createMock(HarpService::class);
 
 		$this->service = new AppAPIService(
@@ -77,7 +87,7 @@ class AppAPIServiceTest extends TestCase {
 			$logFactory,
 			$this->throttler,
 			$this->config,
-			$clientService,
+			new ExAppClientPool($clientService, $this->createMock(IAppConfig::class), $this->logger),
 			$this->userSession,
 			$this->session,
 			$this->userManager,
@@ -87,9 +97,20 @@ class AppAPIServiceTest extends TestCase {
 			$this->kubernetesActions,
 			$this->manualActions,
 			$this->commonService,
-			$daemonConfigService,
-			$exAppDeployOptionsService,
+			$this->daemonConfigService,
+			$this->exAppDeployOptionsService,
 			$harpService,
+			$this->appConfig,
+		);
+	}
+
+	/**
+	 * Unset keys read as their default, except the heartbeat backoff delay, so that tests do not sleep.
+	 */
+	private function setAppConfigValues(array $values): void {
+		$values += [AppAPIService::HEARTBEAT_INITIAL_DELAY_KEY => '0'];
+		$this->appConfig->method('getValueString')->willReturnCallback(
+			fn (string $app, string $key, string $default) => $values[$key] ?? $default
 		);
 	}
 
@@ -300,4 +321,81 @@ class AppAPIServiceTest extends TestCase {
 
 		self::assertFalse($this->service->validateExAppRequestToNC($request));
 	}
+
+	private function heartbeatResponse(string $status): IResponse {
+		$response = $this->createMock(IResponse::class);
+		$response->method('getStatusCode')->willReturn(200);
+		$response->method('getBody')->willReturn(json_encode(['status' => $status]));
+		return $response;
+	}
+
+	public function testHeartbeatWritesFailuresOnceAtTheEnd(): void {
+		$exApp = $this->createExApp();
+		$this->exAppService->method('getExApp')->with('test_app')->willReturn($exApp);
+		$this->exAppService->method('isExAppRegistered')->with('test_app')->willReturn(true);
+		$this->client->expects(self::exactly(3))->method('get')->willReturnOnConsecutiveCalls(
+			self::throwException(new \Exception('Connection refused')),
+			$this->heartbeatResponse('starting'),
+			$this->heartbeatResponse('ok'),
+		);
+		$this->exAppService->expects(self::once())->method('updateExApp')
+			->with(self::callback(fn (ExApp $updated) => $updated->getStatus()['heartbeat_count'] === 2), ['status'])
+			->willReturn(true);
+
+		self::assertTrue($this->service->heartbeatExApp('http://localhost:23000', [], 'test_app'));
+	}
+
+	public function testHeartbeatSuccessDoesNotWriteStatus(): void {
+		$this->exAppService->method('getExApp')->with('test_app')->willReturn($this->createExApp());
+		$this->exAppService->method('isExAppRegistered')->with('test_app')->willReturn(true);
+		$this->client->expects(self::once())->method('get')->willReturn($this->heartbeatResponse('ok'));
+		$this->exAppService->expects(self::never())->method('updateExApp');
+
+		self::assertTrue($this->service->heartbeatExApp('http://localhost:23000', [], 'test_app'));
+	}
+
+	public function testHeartbeatFailsFastWhenHarpReportsStartFailure(): void {
+		$exApp = $this->createExApp();
+		$exApp->setAcceptsDeployId('docker-install');
+		$exApp->setDeployConfig(['harp' => ['exapp_direct' => false]]);
+		$this->setupExAppUrlMocks();
+		$this->exAppService->method('getExApp')->with('test_app')->willReturn($exApp);
+		$this->setAppConfigValues([AppAPIService::HEARTBEAT_HARP_WAIT_KEY => '1']);
+		$this->daemonConfigService->method('getDaemonConfigByName')->willReturn(new DaemonConfig(['name' => 'test_daemon']));
+		$this->dockerActions->expects(self::once())->method('waitExAppStart')->willReturn(false);
+		$this->client->expects(self::never())->method('get');
+
+		self::assertFalse($this->service->heartbeatExApp('http://localhost:23000', [], 'test_app'));
+	}
+
+	public function testHeartbeatStopsOnceTheExAppIsUnregistered(): void {
+		$this->exAppService->method('getExApp')->with('test_app')->willReturn($this->createExApp());
+		$this->exAppService->method('isExAppRegistered')->with('test_app')->willReturnOnConsecutiveCalls(true, false);
+		$this->client->expects(self::once())->method('get')->willReturn($this->heartbeatResponse('starting'));
+		$this->exAppService->expects(self::never())->method('updateExApp');
+
+		self::assertFalse($this->service->heartbeatExApp('http://localhost:23000', [], 'test_app'));
+	}
+
+	public function testHeartbeatWaitsOnAllK8sRolesWithinTheDeadline(): void {
+		$exApp = $this->createExApp();
+		$exApp->setAcceptsDeployId('kubernetes-install');
+		$exApp->setDeployConfig(['harp' => ['exapp_direct' => false]]);
+		$this->exAppService->method('getExApp')->with('test_app')->willReturn($exApp);
+		$this->exAppService->method('isExAppRegistered')->willReturn(true);
+		$this->setAppConfigValues([AppAPIService::HEARTBEAT_HARP_WAIT_KEY => '1']);
+		$this->daemonConfigService->method('getDaemonConfigByName')->willReturn(new DaemonConfig(['name' => 'test_daemon']));
+		$this->dockerActions->method('getAcceptsDeployId')->willReturn('docker-install');
+		$this->kubernetesActions->method('getAcceptsDeployId')->willReturn('kubernetes-install');
+		$this->exAppDeployOptionsService->method('getDeployOption')->willReturn(
+			new ExAppDeployOption(['value' => [['name' => 'api'], ['name' => 'worker']]])
+		);
+		$this->kubernetesActions->expects(self::never())->method('waitExAppStart');
+		$this->kubernetesActions->expects(self::once())->method('waitExAppRolesStart')
+			->with(self::anything(), 'test_app', ['api', 'worker'], self::logicalAnd(self::greaterThan(0), self::lessThanOrEqual(600)))
+			->willReturn(true);
+		$this->client->expects(self::once())->method('get')->willReturn($this->heartbeatResponse('ok'));
+
+		self::assertTrue($this->service->heartbeatExApp('http://localhost:23000', [], 'test_app'));
+	}
 }
@@ -0,0 +1,114 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\Service;
+
+use GuzzleHttp\Psr7\Request;
+use GuzzleHttp\RequestOptions;
+use GuzzleHttp\TransferStats;
+use OCA\AppAPI\Db\ExApp;
+use OCA\AppAPI\Service\ExAppClientPool;
+use OCP\Http\Client\IClient;
+use OCP\Http\Client\IClientService;
+use OCP\IAppConfig;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\LoggerInterface;
+
+class ExAppClientPoolTest extends TestCase {
+
+	private int $poolSizeReads = 0;
+
+	private function createPool(string $poolSize): ExAppClientPool {
+		$clientService = $this->createMock(IClientService::class);
+		$clientService->method('newClient')->willReturnCallback(fn () => $this->createMock(IClient::class));
+		$appConfig = $this->createMock(IAppConfig::class);
+		$appConfig->method('getValueString')->willReturnCallback(
+			function (string $app, string $key, string $default) use ($poolSize) {
+				if ($key !== ExAppClientPool::POOL_SIZE_KEY) {
+					return $default;
+				}
+				$this->poolSizeReads++;
+				return $poolSize;
+			}
+		);
+		return new ExAppClientPool($clientService, $appConfig, $this->createMock(LoggerInterface::class));
+	}
+
+	private function createExApp(string $daemonConfigName): ExApp {
+		return new ExApp(['appid' => 'app_' . $daemonConfigName, 'daemon_config_name' => $daemonConfigName]);
+	}
+
+	private function transfer(array $options, int $localPort): void {
+		$options[RequestOptions::ON_STATS](new TransferStats(
+			new Request('GET', 'http://exapp/heartbeat'), null, 0.001, null,
+			['primary_ip' => '10.0.0.2', 'primary_port' => 23000, 'local_port' => $localPort],
+		));
+	}
+
+	public function testClientsAreScopedPerDaemon(): void {
+		$pool = $this->createPool('8');
+
+		$docker = $pool->getClient($this->createExApp('docker'));
+		self::assertSame($docker, $pool->getClient($this->createExApp('docker')));
+		self::assertNotSame($docker, $pool->getClient($this->createExApp('harp')));
+	}
+
+	public function testPoolSizeIsReadOncePerProcess(): void {
+		$pool = $this->createPool('8');
+
+		for ($i = 0; $i < 3; $i++) {
+			$exApp = $this->createExApp('docker');
+			$pool->prepareOptions($exApp, []);
+			$pool->getClient($exApp);
+		}
+		self::assertSame(1, $this->poolSizeReads);
+	}
+
+	public function testAsyncRequestsShareOneClient(): void {
+		$pool = $this->createPool('8');
+
+		$asyncClient = $pool->getAsyncClient();
+		self::assertSame($asyncClient, $pool->getAsyncClient());
+		self::assertNotSame($asyncClient, $pool->getClient($this->createExApp('docker')));
+	}
+
+	public function testDisabledPoolUsesSingleClientAndKeepsOptions(): void {
+		$pool = $this->createPool('0');
+
+		self::assertSame($pool->getClient($this->createExApp('docker')), $pool->getClient($this->createExApp('harp')));
+		self::assertSame(['timeout' => 3], $pool->prepareOptions($this->createExApp('docker'), ['timeout' => 3]));
+	}
+
+	public function testPrepareOptionsAddsKeepAliveCurlOptions(): void {
+		$options = $this->createPool('4')->prepareOptions($this->createExApp('docker'), ['curl' => [CURLOPT_VERBOSE => 1]]);
+
+		self::assertSame(1, $options['curl'][CURLOPT_VERBOSE]);
+		self::assertSame(4, $options['curl'][CURLOPT_MAXCONNECTS]);
+		self::assertSame(1, $options['curl'][CURLOPT_TCP_KEEPALIVE]);
+		self::assertIsCallable($options[RequestOptions::ON_STATS]);
+	}
+
+	public function testConnectionReuseIsCounted(): void {
+		$pool = $this->createPool('8');
+		$callerStats = 0;
+		$options = $pool->prepareOptions($this->createExApp('docker'), [
+			RequestOptions::ON_STATS => function () use (&$callerStats) {
+				$callerStats++;
+			},
+		]);
+
+		$this->transfer($options, 40001);
+		$this->transfer($options, 40001);
+		$this->transfer($options, 40001);
+		$this->transfer($options, 40002);
+
+		self::assertSame(['docker' => ['new' => 2, 'reused' => 2]], $pool->getConnectionStats());
+		self::assertSame(4, $callerStats, 'caller supplied on_stats must still be invoked');
+	}
+}
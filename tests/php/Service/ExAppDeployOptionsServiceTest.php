@@ -11,7 +11,7 @@ namespace OCA\AppAPI\Tests\php\Service;
 
 use OCA\AppAPI\Db\ExAppDeployOptionsMapper;
 use OCA\AppAPI\Service\ExAppDeployOptionsService;
-use OCP\ICacheFactory;
+use OCA\AppAPI\Service\RegistryCacheFactory;
 use PHPUnit\Framework\MockObject\MockObject;
 use PHPUnit\Framework\TestCase;
 use Psr\Log\LoggerInterface;
@@ -24,7 +24,7 @@ class ExAppDeployOptionsServiceTest extends TestCase {
 		parent::setUp();
 
 		$this->mapper = $this->createMock(ExAppDeployOptionsMapper::class);
-		$cacheFactory = $this->createMock(ICacheFactory::class);
+		$cacheFactory = $this->createMock(RegistryCacheFactory::class);
 		$cacheFactory->method('isAvailable')->willReturn(false);
 
 		$this->service = new ExAppDeployOptionsService(
@@ -0,0 +1,147 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\Service;
+
+use OCA\AppAPI\Db\ExApp;
+use OCA\AppAPI\Service\ExAppProxyValidatorService;
+use OCP\Http\Client\IResponse;
+use OCP\IAppConfig;
+use OCP\ICache;
+use OCP\ICacheFactory;
+use OCP\IRequest;
+use PHPUnit\Framework\Attributes\DataProvider;
+use PHPUnit\Framework\TestCase;
+
+class ExAppProxyValidatorServiceTest extends TestCase {
+	private ExAppProxyValidatorService $service;
+	/** @var array<string, mixed> */
+	private array $cacheStore = [];
+	/** @var array<string, int> */
+	private array $cacheTtls = [];
+
+	protected function setUp(): void {
+		parent::setUp();
+
+		$cache = $this->createMock(ICache::class);
+		$cache->method('get')->willReturnCallback(fn (string $key) => $this->cacheStore[$key] ?? null);
+		$cache->method('set')->willReturnCallback(function (string $key, mixed $value, int $ttl) {
+			$this->cacheStore[$key] = $value;
+			$this->cacheTtls[$key] = $ttl;
+			return true;
+		});
+		$cacheFactory = $this->createMock(ICacheFactory::class);
+		$cacheFactory->method('isAvailable')->willReturn(true);
+		$cacheFactory->method('createDistributed')->willReturn($cache);
+
+		$appConfig = $this->createMock(IAppConfig::class);
+		$appConfig->method('getValueString')->willReturn('1');
+
+		$this->service = new ExAppProxyValidatorService($appConfig, $cacheFactory);
+	}
+
+	#[DataProvider('conditionalProvider')]
+	public function testIsNotModified(string $ifNoneMatch, string $ifModifiedSince, string $etag, string $lastModified, bool $expected): void {
+		self::assertSame($expected, ExAppProxyValidatorService::isNotModified($ifNoneMatch, $ifModifiedSince, $etag, $lastModified));
+	}
+
+	public static function conditionalProvider(): array {
+		$lastModified = 'Wed, 21 Oct 2015 07:28:00 GMT';
+		return [
+			'matching strong etag' => ['"abc"', '', '"abc"', '', true],
+			'weak comparison' => ['W/"abc"', '', '"abc"', '', true],
+			'one of several etags' => ['"x", "abc"', '', '"abc"', '', true],
+			'wildcard' => ['*', '', '"abc"', '', true],
+			'different etag' => ['"x"', '', '"abc"', '', false],
+			'etag takes precedence over date' => ['"x"', $lastModified, '"abc"', $lastModified, false],
+			'no stored etag' => ['"abc"', '', '', $lastModified, false],
+			'not modified since' => ['', $lastModified, '', $lastModified, true],
+			'modified since' => ['', 'Tue, 20 Oct 2015 07:28:00 GMT', '', $lastModified, false],
+			'no validators' => ['', '', '"abc"', $lastModified, false],
+		];
+	}
+
+	private function createExApp(string $version): ExApp {
+		return new ExApp(['appid' => 'test_app', 'version' => $version]);
+	}
+
+	private function createRequest(string $ifNoneMatch): IRequest {
+		$request = $this->createMock(IRequest::class);
+		$request->method('getHeader')->willReturnCallback(fn (string $name) => $name === 'If-None-Match' ? $ifNoneMatch : '');
+		return $request;
+	}
+
+	private function createResponse(array $headers, int $status = 200): IResponse {
+		$response = $this->createMock(IResponse::class);
+		$response->method('getStatusCode')->willReturn($status);
+		$response->method('getHeader')->willReturnCallback(fn (string $name) => $headers[$name] ?? '');
+		return $response;
+	}
+
+	public function testStoredValidatorsShortCircuitRevalidation(): void {
+		$exApp = $this->createExApp('1.0.0');
+		$this->service->storeValidators($exApp, 'alice', 'js/app.js', [], $this->createResponse(['ETag' => '"v1"', 'Cache-Control' => 'max-age=60']));
+
+		self::assertSame(
+			['ETag' => '"v1"', 'Cache-Control' => 'max-age=60'],
+			$this->service->getNotModifiedHeaders($exApp, 'alice', 'js/app.js', [], $this->createRequest('"v1"'))
+		);
+		self::assertNull($this->service->getNotModifiedHeaders($exApp, 'alice', 'js/app.js', [], $this->createRequest('"v0"')));
+		self::assertNull($this->service->getNotModifiedHeaders($exApp, 'alice', 'js/other.js', [], $this->createRequest('"v1"')));
+	}
+
+	public function testValidatorsAreScopedToExAppVersion(): void {
+		$this->service->storeValidators($this->createExApp('1.0.0'), null, 'js/app.js', [], $this->createResponse(['ETag' => '"v1"', 'Cache-Control' => 'max-age=60']));
+
+		self::assertNull($this->service->getNotModifiedHeaders($this->createExApp('1.1.0'), null, 'js/app.js', [], $this->createRequest('"v1"')));
+	}
+
+	public function testValidatorsAreScopedToUser(): void {
+		$exApp = $this->createExApp('1.0.0');
+		$this->service->storeValidators($exApp, 'alice', 'api/profile', [], $this->createResponse(['ETag' => '"alice"', 'Cache-Control' => 'max-age=60']));
+
+		self::assertNull($this->service->getNotModifiedHeaders($exApp, 'bob', 'api/profile', [], $this->createRequest('"alice"')));
+		self::assertNull($this->service->getNotModifiedHeaders($exApp, null, 'api/profile', [], $this->createRequest('"alice"')));
+	}
+
+	#[DataProvider('freshnessProvider')]
+	public function testValidatorsAreKeptForTheFreshnessLifetime(string $cacheControl, int $expectedTtl): void {
+		$this->service->storeValidators($this->createExApp('1.0.0'), null, 'js/app.js', [], $this->createResponse(['ETag' => '"v1"', 'Cache-Control' => $cacheControl]));
+
+		self::assertSame([$expectedTtl], array_values($this->cacheTtls));
+	}
+
+	public static function freshnessProvider(): array {
+		return [
+			'max-age' => ['public, max-age=60', 60],
+			's-maxage takes precedence' => ['max-age=60, s-maxage=300', 300],
+			'bounded' => ['max-age=31536000, immutable', 3600],
+		];
+	}
+
+	#[DataProvider('uncacheableResponseProvider')]
+	public function testUncacheableResponsesAreNotStored(array $headers, int $status): void {
+		$this->service->storeValidators($this->createExApp('1.0.0'), null, 'js/app.js', [], $this->createResponse($headers, $status));
+
+		self::assertSame([], $this->cacheStore);
+	}
+
+	public static function uncacheableResponseProvider(): array {
+		return [
+			'no validators' => [['Cache-Control' => 'max-age=60'], 200],
+			'no freshness lifetime' => [['ETag' => '"v1"'], 200],
+			'max-age=0' => [['ETag' => '"v1"', 'Cache-Control' => 'max-age=0'], 200],
+			'varies' => [['ETag' => '"v1"', 'Cache-Control' => 'max-age=60', 'Vary' => 'Accept-Language'], 200],
+			'private' => [['ETag' => '"v1"', 'Cache-Control' => 'private, max-age=60'], 200],
+			'no-store' => [['ETag' => '"v1"', 'Cache-Control' => 'no-store'], 200],
+			'sets cookie' => [['ETag' => '"v1"', 'Cache-Control' => 'max-age=60', 'Set-Cookie' => 'a=b'], 200],
+			'not a 200' => [['ETag' => '"v1"', 'Cache-Control' => 'max-age=60'], 404],
+		];
+	}
+}
@@ -0,0 +1,98 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\Service;
+
+use OCA\AppAPI\Service\ExAppRouteMatcher;
+use PHPUnit\Framework\Attributes\DataProvider;
+use PHPUnit\Framework\TestCase;
+
+class ExAppRouteMatcherTest extends TestCase {
+
+	private static function route(string $url, string $verb = 'GET', int $accessLevel = 1): array {
+		return [
+			'url' => $url,
+			'verb' => $verb,
+			'access_level' => $accessLevel,
+			'headers_to_exclude' => '[]',
+			'bruteforce_protection' => '[]',
+		];
+	}
+
+	private static function routes(): array {
+		return [
+			self::route('^/api/admin/.*', 'GET,POST', 2),
+			self::route('^/api/.*', 'GET,POST,PUT,DELETE', 1),
+			self::route('ws', 'GET', 1),
+			self::route('^/img/~icons/.*', 'GET', 0),
+			self::route('^/.*\.(js|css|svg)$', 'GET', 0),
+			self::route('^/upload$', 'PUT', 1),
+		];
+	}
+
+	/**
+	 * The combined alternation must pick the same route as matching the routes one by one:
+	 * first route (in registration order) whose URL matches and whose verb accepts the method.
+	 */
+	#[DataProvider('matchProvider')]
+	public function testMatchReturnsFirstMatchingRoute(string $method, string $path, ?int $expectedIndex, bool $expectedLegacy): void {
+		$routes = self::routes();
+		$match = ExAppRouteMatcher::match(ExAppRouteMatcher::compile($routes), $routes, $method, $path);
+		if ($expectedIndex === null) {
+			self::assertNull($match);
+			return;
+		}
+		self::assertNotNull($match);
+		self::assertSame($routes[$expectedIndex], $match['route']);
+		self::assertSame($expectedLegacy, $match['legacy']);
+	}
+
+	public static function matchProvider(): array {
+		return [
+			'admin route wins over broader api route' => ['GET', 'api/admin/users', 0, false],
+			'verb mismatch falls through to next route' => ['DELETE', 'api/admin/users', 1, false],
+			'case-insensitive match' => ['GET', 'API/items', 1, false],
+			'legacy bare-path fallback' => ['GET', 'ws', 2, true],
+			'tilde in url is escaped' => ['GET', 'img/~icons/a.svg', 3, false],
+			'asset route with alternation group' => ['GET', 'js/app.js', 4, false],
+			'method without any route' => ['POST', 'js/app.js', null, false],
+			'put-only route' => ['PUT', 'upload', 5, false],
+			'no match' => ['GET', 'unknown', null, false],
+			'method outside the compiled table' => ['PATCH', 'api/items', null, false],
+		];
+	}
+
+	public function testLegacyMatchOnEarlierRouteWinsOverLaterCanonicalMatch(): void {
+		$routes = [self::route('ws'), self::route('^/.*')];
+		$match = ExAppRouteMatcher::match(ExAppRouteMatcher::compile($routes), $routes, 'GET', 'ws');
+		self::assertSame($routes[0], $match['route']);
+		self::assertTrue($match['legacy']);
+	}
+
+	public function testInvalidRouteRegexFallsBackToPerRouteMatching(): void {
+		$routes = [self::route('^/broken(['), self::route('^/ok$')];
+		$compiled = ExAppRouteMatcher::compile($routes);
+		self::assertNull($compiled['GET']);
+		$match = ExAppRouteMatcher::match($compiled, $routes, 'GET', 'ok');
+		self::assertSame($routes[1], $match['route']);
+	}
+
+	public function testBackreferencesAreNotCombined(): void {
+		$routes = [self::route('^/(a)\1$'), self::route('^/(b)\1$')];
+		$compiled = ExAppRouteMatcher::compile($routes);
+		self::assertNull($compiled['GET']);
+		self::assertSame($routes[1], ExAppRouteMatcher::match($compiled, $routes, 'GET', 'bb')['route']);
+	}
+
+	public function testCompiledTableSurvivesJsonRoundTrip(): void {
+		$routes = self::routes();
+		$compiled = json_decode(json_encode(ExAppRouteMatcher::compile($routes)), true);
+		self::assertSame($routes[4], ExAppRouteMatcher::match($compiled, $routes, 'GET', 'css/app.css')['route']);
+	}
+}
@@ -17,6 +17,7 @@ use OCA\AppAPI\Service\ExAppOccService;
 use OCA\AppAPI\Service\ExAppService;
 use OCA\AppAPI\Service\ExAppSetupCheckService;
 use OCA\AppAPI\Service\ProvidersAI\TaskProcessingService;
+use OCA\AppAPI\Service\RegistryCacheFactory;
 use OCA\AppAPI\Service\TalkBotsService;
 use OCA\AppAPI\Service\UI\FilesActionsMenuService;
 use OCA\AppAPI\Service\UI\InitialStateService;
@@ -24,8 +25,6 @@ use OCA\AppAPI\Service\UI\ScriptsService;
 use OCA\AppAPI\Service\UI\SettingsService;
 use OCA\AppAPI\Service\UI\StylesService;
 use OCA\AppAPI\Service\UI\TopMenuService;
-use OCP\ICacheFactory;
-use OCP\IConfig;
 use OCP\IUserManager;
 use PHPUnit\Framework\TestCase;
 use Psr\Log\LoggerInterface;
@@ -43,7 +42,7 @@ class ExAppServiceGetAppInfoTest extends TestCase {
 	protected function setUp(): void {
 		parent::setUp();
 
-		$cacheFactory = $this->createMock(ICacheFactory::class);
+		$cacheFactory = $this->createMock(RegistryCacheFactory::class);
 		$cacheFactory->method('isAvailable')->willReturn(false);
 
 		$this->service = new ExAppService(
@@ -64,7 +63,6 @@ class ExAppServiceGetAppInfoTest extends TestCase {
 			$this->createMock(ExAppOccService::class),
 			$this->createMock(ExAppDeployOptionsService::class),
 			$this->createMock(ExAppSetupCheckService::class),
-			$this->createMock(IConfig::class),
 		);
 	}
 
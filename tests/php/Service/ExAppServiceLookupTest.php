@@ -0,0 +1,253 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\Service;
+
+use OCA\AppAPI\Db\ExApp;
+use OCA\AppAPI\Db\ExAppMapper;
+use OCA\AppAPI\Fetcher\ExAppArchiveFetcher;
+use OCA\AppAPI\Fetcher\ExAppFetcher;
+use OCA\AppAPI\Service\ExAppDeployOptionsService;
+use OCA\AppAPI\Service\ExAppOccService;
+use OCA\AppAPI\Service\ExAppService;
+use OCA\AppAPI\Service\ExAppSetupCheckService;
+use OCA\AppAPI\Service\ProvidersAI\TaskProcessingService;
+use OCA\AppAPI\Service\RegistryCacheFactory;
+use OCA\AppAPI\Service\TalkBotsService;
+use OCA\AppAPI\Service\UI\FilesActionsMenuService;
+use OCA\AppAPI\Service\UI\InitialStateService;
+use OCA\AppAPI\Service\UI\ScriptsService;
+use OCA\AppAPI\Service\UI\SettingsService;
+use OCA\AppAPI\Service\UI\StylesService;
+use OCA\AppAPI\Service\UI\TopMenuService;
+use OCP\AppFramework\Db\DoesNotExistException;
+use OCP\ICache;
+use OCP\IUserManager;
+use PHPUnit\Framework\Attributes\DataProvider;
+use PHPUnit\Framework\Attributes\Group;
+use PHPUnit\Framework\MockObject\MockObject;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\LoggerInterface;
+
+/**
+ * ExAppService::getExApp() sits on the hot path of every AppAPI-authenticated request, so a lookup
+ * must touch only the requested ExApp: one per-appid cache entry (or one DB row set on a miss),
+ * never the full `/ex_apps` list, regardless of how many ExApps are registered.
+ */
+class ExAppServiceLookupTest extends TestCase {
+	private ExAppService $service;
+	private ExAppMapper&MockObject $mapper;
+	/** @var array<string, mixed> */
+	private array $cacheStore = [];
+	/** @var string[] */
+	private array $cacheReads = [];
+
+	protected function setUp(): void {
+		parent::setUp();
+
+		$cache = $this->createMock(ICache::class);
+		$cache->method('get')->willReturnCallback(function (string $key) {
+			$this->cacheReads[] = $key;
+			return $this->cacheStore[$key] ?? null;
+		});
+		$cache->method('set')->willReturnCallback(function (string $key, mixed $value) {
+			// mimic the JSON-encoding distributed caches (Redis) so rehydration is exercised
+			$this->cacheStore[$key] = json_decode(json_encode($value), true);
+			return true;
+		});
+		$cache->method('remove')->willReturnCallback(function (string $key) {
+			unset($this->cacheStore[$key]);
+			return true;
+		});
+		$cacheFactory = $this->createMock(RegistryCacheFactory::class);
+		$cacheFactory->method('isAvailable')->willReturn(true);
+		$cacheFactory->method('createDistributed')->willReturn($cache);
+		$cacheFactory->method('batch')->willReturnCallback(fn (callable $removals) => $removals());
+
+		$this->mapper = $this->createMock(ExAppMapper::class);
+		$this->mapper->expects(self::never())->method('findAll');
+
+		$this->service = new ExAppService(
+			$this->createMock(LoggerInterface::class),
+			$cacheFactory,
+			$this->createMock(IUserManager::class),
+			$this->createMock(ExAppFetcher::class),
+			$this->createMock(ExAppArchiveFetcher::class),
+			$this->mapper,
+			$this->createMock(TopMenuService::class),
+			$this->createMock(InitialStateService::class),
+			$this->createMock(ScriptsService::class),
+			$this->createMock(StylesService::class),
+			$this->createMock(FilesActionsMenuService::class),
+			$this->createMock(TaskProcessingService::class),
+			$this->createMock(TalkBotsService::class),
+			$this->createMock(SettingsService::class),
+			$this->createMock(ExAppOccService::class),
+			$this->createMock(ExAppDeployOptionsService::class),
+			$this->createMock(ExAppSetupCheckService::class),
+		);
+	}
+
+	private function createExApp(string $appId): ExApp {
+		return new ExApp([
+			'id' => 1,
+			'appid' => $appId,
+			'version' => '1.0.0',
+			'name' => $appId,
+			'daemon_config_name' => 'test_daemon',
+			'port' => 23000,
+			'secret' => 'secret',
+			'status' => ['deploy' => 100, 'init' => 100, 'action' => '', 'type' => '', 'error' => ''],
+			'enabled' => 1,
+			'routes' => [],
+		]);
+	}
+
+	private function seedExApps(int $count): void {
+		for ($i = 0; $i < $count; $i++) {
+			$this->cacheStore['/ex_app/app_' . $i] = $this->createExApp('app_' . $i)->jsonSerialize();
+		}
+	}
+
+	/**
+	 * Seeds $count ExApps into the distributed cache and checks that looking up any of them reads
+	 * exactly one cache key and never falls back to the full list, so the cost stays flat.
+	 */
+	#[DataProvider('registeredAppsCountProvider')]
+	public function testLookupCostIsIndependentOfRegisteredAppsCount(int $count): void {
+		$this->seedExApps($count);
+		$this->mapper->expects(self::never())->method('findByAppId');
+
+		for ($i = 0; $i < 1000; $i++) {
+			$exApp = $this->service->getExApp('app_' . ($i % $count));
+			self::assertNotNull($exApp);
+		}
+
+		self::assertSame(min($count, 1000), count($this->cacheReads));
+		self::assertNotContains('/ex_apps', $this->cacheReads);
+	}
+
+	#[DataProvider('registeredAppsCountProvider')]
+	#[Group('benchmark')]
+	public function testBenchmarkLookups(int $count): void {
+		$this->seedExApps($count);
+
+		$start = hrtime(true);
+		for ($i = 0; $i < 1000; $i++) {
+			$this->service->getExApp('app_' . ($i % $count));
+		}
+		$elapsedNs = hrtime(true) - $start;
+
+		self::assertNotContains('/ex_apps', $this->cacheReads);
+		fwrite(STDERR, sprintf("\ngetExApp x1000 with %d registered ExApps: %.3f ms", $count, $elapsedNs / 1e6));
+	}
+
+	public static function registeredAppsCountProvider(): array {
+		return [
+			'1 app' => [1],
+			'50 apps' => [50],
+			'500 apps' => [500],
+		];
+	}
+
+	public function testCacheMissLoadsSingleAppAndPopulatesCache(): void {
+		$this->mapper->expects(self::once())
+			->method('findByAppId')
+			->with('app_a')
+			->willReturn($this->createExApp('app_a'));
+
+		self::assertSame('app_a', $this->service->getExApp('app_a')?->getAppid());
+		self::assertSame('app_a', $this->service->getExApp('app_a')?->getAppid());
+		self::assertArrayHasKey('/ex_app/app_a', $this->cacheStore);
+		self::assertNotNull($this->cacheStore['/ex_app/app_a']['compiled_routes'], 'routes are compiled once, into the cache entry');
+	}
+
+	public function testUnknownAppReturnsNull(): void {
+		$this->mapper->method('findByAppId')->willThrowException(new DoesNotExistException(''));
+
+		self::assertNull($this->service->getExApp('missing'));
+	}
+
+	public function testUnknownAppIsAnsweredFromCache(): void {
+		$this->mapper->expects(self::once())
+			->method('findByAppId')
+			->willThrowException(new DoesNotExistException(''));
+
+		self::assertNull($this->service->getExApp('missing'));
+		self::assertNull($this->service->getExApp('missing'));
+		self::assertFalse($this->service->isExAppRegistered('missing'));
+	}
+
+	public function testReturnedExAppIsACopy(): void {
+		$this->mapper->method('findByAppId')->willReturn($this->createExApp('app_a'));
+
+		$exApp = $this->service->getExApp('app_a');
+		$exApp->setEnabled(0);
+
+		self::assertSame(1, $this->service->getExApp('app_a')->getEnabled());
+	}
+
+	public function testUpdateExAppInvalidatesEntry(): void {
+		$this->mapper->expects(self::exactly(2))
+			->method('findByAppId')
+			->willReturnOnConsecutiveCalls($this->createExApp('app_a'), $this->createExApp('app_a'));
+
+		$exApp = $this->service->getExApp('app_a');
+		self::assertArrayHasKey('/ex_app/app_a', $this->cacheStore);
+
+		self::assertTrue($this->service->updateExApp($exApp, ['status']));
+		self::assertArrayNotHasKey('/ex_app/app_a', $this->cacheStore);
+
+		$this->service->getExApp('app_a');
+	}
+
+	public function testUpdateExAppPublishesStatus(): void {
+		$exApp = $this->createExApp('app_a');
+		$exApp->setStatus(['deploy' => 100, 'init' => 40, 'action' => 'init', 'type' => 'install', 'error' => '']);
+
+		self::assertTrue($this->service->updateExApp($exApp, ['status']));
+		self::assertSame(40, $this->cacheStore['/ex_app_status/app_a']['init']);
+	}
+
+	/**
+	 * Waiting for the init step reads only the published status and reports every change of the progress.
+	 */
+	public function testWaitInitStepFinishReportsProgressFromPublishedStatus(): void {
+		$this->mapper->expects(self::never())->method('findByAppId');
+		$steps = [0 => 35, 35 => 100];
+		$this->cacheStore['/ex_app_status/app_a'] = ['init' => 0, 'error' => ''];
+		$reported = [];
+
+		$error = $this->service->waitInitStepFinish('app_a', function (int $progress) use (&$reported, $steps) {
+			$reported[] = $progress;
+			if (isset($steps[$progress])) {
+				$this->cacheStore['/ex_app_status/app_a'] = ['init' => $steps[$progress], 'error' => ''];
+			}
+		});
+
+		self::assertSame('', $error);
+		self::assertSame([0, 35, 100], $reported);
+		self::assertSame(['/ex_app_status/app_a'], array_values(array_unique($this->cacheReads)));
+	}
+
+	public function testWaitInitStepFinishReturnsError(): void {
+		$this->cacheStore['/ex_app_status/app_a'] = ['init' => 20, 'error' => 'model download failed'];
+
+		self::assertSame(
+			'ExApp app_a initialization step failed. Error: model download failed',
+			$this->service->waitInitStepFinish('app_a')
+		);
+	}
+
+	public function testWaitInitStepFinishFallsBackToExAppWithoutPublishedStatus(): void {
+		$this->mapper->expects(self::once())->method('findByAppId')->willReturn($this->createExApp('app_a'));
+
+		self::assertSame('', $this->service->waitInitStepFinish('app_a'));
+	}
+}
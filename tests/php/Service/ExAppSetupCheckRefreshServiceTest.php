@@ -14,7 +14,9 @@ use OCA\AppAPI\Service\AppAPIService;
 use OCA\AppAPI\Service\ExAppService;
 use OCA\AppAPI\Service\ExAppSetupCheckRefreshService;
 use OCA\AppAPI\Service\ExAppSetupCheckService;
+use OCP\Http\Client\IPromise;
 use OCP\Http\Client\IResponse;
+use OCP\IAppConfig;
 use OCP\IL10N;
 use PHPUnit\Framework\Attributes\DataProvider;
 use PHPUnit\Framework\MockObject\MockObject;
@@ -27,6 +29,7 @@ class ExAppSetupCheckRefreshServiceTest extends TestCase {
 	private ExAppSetupCheckService&MockObject $setupCheckService;
 	private ExAppService&MockObject $exAppService;
 	private AppAPIService&MockObject $appAPIService;
+	private IAppConfig&MockObject $appConfig;
 	private ExAppSetupCheckRefreshService $refreshService;
 
 	protected function setUp(): void {
@@ -37,13 +40,15 @@ class ExAppSetupCheckRefreshServiceTest extends TestCase {
 		$this->setupCheckService = $this->createMock(ExAppSetupCheckService::class);
 		$this->exAppService = $this->createMock(ExAppService::class);
 		$this->appAPIService = $this->createMock(AppAPIService::class);
+		$this->appConfig = $this->createMock(IAppConfig::class);
+		$this->appConfig->method('getValueString')->willReturnCallback(fn (string $app, string $key, string $default) => $default);
 
 		$this->refreshService = $this->makeRefreshService();
 	}
 
 	private function makeRefreshService(float $budget = 120.0): ExAppSetupCheckRefreshService {
 		return new ExAppSetupCheckRefreshService(
-			$this->l10n, $this->logger, $this->setupCheckService, $this->exAppService, $this->appAPIService, $budget,
+			$this->l10n, $this->logger, $this->setupCheckService, $this->exAppService, $this->appAPIService, $this->appConfig, $budget,
 		);
 	}
 
@@ -85,6 +90,29 @@ class ExAppSetupCheckRefreshServiceTest extends TestCase {
 		return $response;
 	}
 
+	/**
+	 * A promise of a probe; `wait()` yields the response, or throws for a transport error (`['error' => ...]`).
+	 * It stays pending until it is waited for, like a request whose response has not arrived yet.
+	 */
+	private function promise(IResponse|array $result, ?callable $onWait = null): IPromise&MockObject {
+		$settled = false;
+		$promise = $this->createMock(IPromise::class);
+		$promise->method('getState')->willReturnCallback(function () use (&$settled): string {
+			return $settled ? IPromise::STATE_FULFILLED : IPromise::STATE_PENDING;
+		});
+		$promise->method('wait')->willReturnCallback(function () use ($result, $onWait, &$settled) {
+			$settled = true;
+			if ($onWait !== null) {
+				$onWait();
+			}
+			if (is_array($result)) {
+				throw new \RuntimeException($result['error']);
+			}
+			return $result;
+		});
+		return $promise;
+	}
+
 	/**
 	 * @param list<string> $optedIn opted-in app ids
 	 * @param array<string, ExApp> $appsById
@@ -100,8 +128,8 @@ class ExAppSetupCheckRefreshServiceTest extends TestCase {
 			$stored = $apps;
 		});
 		$this->exAppService->method('getExApp')->willReturnCallback(fn (string $id): ?ExApp => $appsById[$id] ?? null);
-		$this->appAPIService->method('requestToExApp')->willReturnCallback(
-			fn (ExApp $exApp) => $resultsByAppId[$exApp->getAppid()]
+		$this->appAPIService->method('requestToExAppAsync')->willReturnCallback(
+			fn (ExApp $exApp) => $this->promise($resultsByAppId[$exApp->getAppid()])
 		);
 		($service ?? $this->refreshService)->refresh();
 		return $stored;
@@ -166,7 +194,7 @@ class ExAppSetupCheckRefreshServiceTest extends TestCase {
 	}
 
 	public function testDisabledAppIsNotProbed(): void {
-		$this->appAPIService->expects(self::never())->method('requestToExApp');
+		$this->appAPIService->expects(self::never())->method('requestToExAppAsync');
 		$state = $this->runRefresh(
 			['a'],
 			['a' => $this->makeExApp('a', 0)],
@@ -178,7 +206,7 @@ class ExAppSetupCheckRefreshServiceTest extends TestCase {
 	/** Each initializing predicate independently must exclude the app (guards against `||` -> `&&`). */
 	#[DataProvider('initializingStatusProvider')]
 	public function testInitializingAppIsNotProbed(array $status): void {
-		$this->appAPIService->expects(self::never())->method('requestToExApp');
+		$this->appAPIService->expects(self::never())->method('requestToExAppAsync');
 		$state = $this->runRefresh(
 			['a'],
 			['a' => $this->makeExApp('a', 1, $status)],
@@ -317,4 +345,53 @@ class ExAppSetupCheckRefreshServiceTest extends TestCase {
 		$state = $this->runRefresh(['a'], ['a' => $this->makeExApp('a', 0)], [], $previous, $service);
 		self::assertArrayNotHasKey('a', $state);
 	}
+
+	public function testProbesRunConcurrentlyUpToTheLimit(): void {
+		$this->appConfig = $this->createMock(IAppConfig::class);
+		$this->appConfig->method('getValueString')->willReturnCallback(
+			fn (string $app, string $key, string $default) => $key === ExAppSetupCheckRefreshService::CONCURRENCY_KEY ? '3' : $default
+		);
+		$appIds = ['a', 'b', 'c', 'd', 'e', 'f', 'g'];
+		$inFlight = 0;
+		$maxInFlight = 0;
+		$this->setupCheckService->method('getOptedInAppIds')->willReturn($appIds);
+		$this->setupCheckService->method('getState')->willReturn(['apps' => [], 'updatedAt' => 1]);
+		$stored = [];
+		$this->setupCheckService->method('storeState')->willReturnCallback(function (array $apps) use (&$stored): void {
+			$stored = $apps;
+		});
+		$this->exAppService->method('getExApp')->willReturnCallback(fn (string $id): ExApp => $this->makeExApp($id));
+		$this->appAPIService->expects(self::exactly(count($appIds)))->method('requestToExAppAsync')->willReturnCallback(
+			function (ExApp $exApp) use (&$inFlight, &$maxInFlight): IPromise {
+				$inFlight++;
+				$maxInFlight = max($maxInFlight, $inFlight);
+				$body = json_encode(['c1' => ['status' => 'warning', 'text' => 'w ' . $exApp->getAppid()]]);
+				return $this->promise($this->response(200, $body), function () use (&$inFlight): void {
+					$inFlight--;
+				});
+			}
+		);
+
+		$this->makeRefreshService()->refresh();
+
+		self::assertSame(3, $maxInFlight);
+		self::assertSame(0, $inFlight);
+		self::assertSame($appIds, array_keys($stored), 'results keep the opted-in order');
+		self::assertSame('w g', $stored['g'][0]['text']);
+	}
+
+	public function testProbeThatCannotStartIsNotResponding(): void {
+		$this->setupCheckService->method('getOptedInAppIds')->willReturn(['a']);
+		$this->setupCheckService->method('getState')->willReturn(['apps' => [], 'updatedAt' => 1]);
+		$stored = [];
+		$this->setupCheckService->method('storeState')->willReturnCallback(function (array $apps) use (&$stored): void {
+			$stored = $apps;
+		});
+		$this->exAppService->method('getExApp')->willReturn($this->makeExApp('a'));
+		$this->appAPIService->method('requestToExAppAsync')->willThrowException(new \Exception('Bad HTTP method'));
+
+		$this->refreshService->refresh();
+
+		self::assertSame('not responding', $stored['a'][0]['text']);
+	}
 }
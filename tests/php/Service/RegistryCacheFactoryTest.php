@@ -0,0 +1,174 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\Service;
+
+use OCA\AppAPI\Service\LocalGenerationCache;
+use OCA\AppAPI\Service\RegistryCacheFactory;
+use OCP\DB\IResult;
+use OCP\DB\QueryBuilder\IExpressionBuilder;
+use OCP\DB\QueryBuilder\IQueryBuilder;
+use OCP\IAppConfig;
+use OCP\ICache;
+use OCP\ICacheFactory;
+use OCP\IConfig;
+use OCP\IDBConnection;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\LoggerInterface;
+
+/**
+ * With APCu as the only memcache, registry entries are read from the local cache of the process and
+ * invalidated through a generation per registry stored in the database, which is read at most once per request.
+ */
+class RegistryCacheFactoryTest extends TestCase {
+	/** @var array<string, mixed> APCu of the server, shared by the processes (requests) of the tests */
+	private array $localStore = [];
+	/** @var array<string, string> generations in appconfig, by config key */
+	private array $dbGenerations = [
+		'registry_cache_generation/service' => 'first',
+		'registry_cache_generation/ex_occ_commands' => 'first',
+	];
+	private int $generationReads = 0;
+	private int $generationWrites = 0;
+
+	private function createFactory(string $distributedCacheClass, bool $localCacheAvailable = true): RegistryCacheFactory {
+		$localCache = $localCacheAvailable ? $this->createLocalCache() : $this->createMock(ICache::class);
+		$cacheFactory = $this->createMock(ICacheFactory::class);
+		// with APCu off the server falls back to a null cache, so no memcache is reported at all
+		$cacheFactory->method('isAvailable')->willReturn($localCacheAvailable);
+		$cacheFactory->method('isLocalCacheAvailable')->willReturn($localCacheAvailable);
+		$cacheFactory->method('createLocal')->willReturn($localCache);
+		$cacheFactory->method('createDistributed')->willReturn($this->createMock(ICache::class));
+
+		$config = $this->createMock(IConfig::class);
+		$config->method('getSystemValueString')->willReturnMap([
+			['memcache.distributed', '', $distributedCacheClass],
+			['memcache.local', '', '\OC\Memcache\APCu'],
+		]);
+		$appConfig = $this->createMock(IAppConfig::class);
+		$appConfig->method('setValueString')->willReturnCallback(function (string $app, string $key, string $value) {
+			$this->dbGenerations[$key] = $value;
+			$this->generationWrites++;
+			return true;
+		});
+
+		$rows = [];
+		$result = $this->createMock(IResult::class);
+		$result->method('fetch')->willReturnCallback(function () use (&$rows) {
+			return array_shift($rows) ?? false;
+		});
+		$qb = $this->createMock(IQueryBuilder::class);
+		$qb->method('expr')->willReturn($this->createMock(IExpressionBuilder::class));
+		$qb->method('select')->willReturnSelf();
+		$qb->method('from')->willReturnSelf();
+		$qb->method('where')->willReturnSelf();
+		$qb->method('executeQuery')->willReturnCallback(function () use (&$rows, $result) {
+			$this->generationReads++;
+			$rows = [];
+			foreach ($this->dbGenerations as $configKey => $generation) {
+				$rows[] = ['configkey' => $configKey, 'configvalue' => $generation];
+			}
+			return $result;
+		});
+		$db = $this->createMock(IDBConnection::class);
+		$db->method('getQueryBuilder')->willReturn($qb);
+
+		return new RegistryCacheFactory($cacheFactory, $config, $appConfig, $db, $this->createMock(LoggerInterface::class));
+	}
+
+	private function createLocalCache(): ICache {
+		$localCache = $this->createMock(ICache::class);
+		$localCache->method('get')->willReturnCallback(fn (string $key) => $this->localStore[$key] ?? null);
+		$localCache->method('set')->willReturnCallback(function (string $key, mixed $value) {
+			$this->localStore[$key] = $value;
+			return true;
+		});
+		$localCache->method('remove')->willReturnCallback(function (string $key) {
+			unset($this->localStore[$key]);
+			return true;
+		});
+		return $localCache;
+	}
+
+	public function testDistributedCacheIsUsedWhenConfigured(): void {
+		$cache = $this->createFactory('\OC\Memcache\Redis')->createDistributed('app_api/service');
+
+		self::assertNotInstanceOf(LocalGenerationCache::class, $cache);
+		self::assertSame(0, $this->generationReads);
+	}
+
+	public function testGenerationIsReadOncePerRequest(): void {
+		$cache = $this->createFactory('\OC\Memcache\APCu')->createDistributed('app_api/service');
+		self::assertInstanceOf(LocalGenerationCache::class, $cache);
+
+		for ($i = 0; $i < 100; $i++) {
+			$cache->set('/ex_app/app_' . $i, ['appid' => 'app_' . $i]);
+			self::assertSame(['appid' => 'app_' . $i], $cache->get('/ex_app/app_' . $i));
+		}
+		self::assertSame(1, $this->generationReads);
+	}
+
+	public function testRemovalInvalidatesTheEntriesOfAllProcesses(): void {
+		$cache = $this->createFactory('\OC\Memcache\APCu')->createDistributed('app_api/service');
+		$cache->set('/ex_app/app_1', ['enabled' => 1]);
+		$cache->set('/ex_app/app_2', ['enabled' => 1]);
+
+		// e.g. `occ app_api:app:disable app_1`
+		$this->createFactory('\OC\Memcache\APCu')->createDistributed('app_api/service')->remove('/ex_app/app_1');
+		self::assertNotSame('first', $this->dbGenerations['registry_cache_generation/service']);
+
+		$cache = $this->createFactory('\OC\Memcache\APCu')->createDistributed('app_api/service');
+		self::assertNull($cache->get('/ex_app/app_1'));
+		self::assertNull($cache->get('/ex_app/app_2'));
+		$cache->set('/ex_app/app_1', ['enabled' => 0]);
+		self::assertSame(['enabled' => 0], $cache->get('/ex_app/app_1'));
+	}
+
+	public function testRemovalWithoutLocalCacheStillInvalidates(): void {
+		$cache = $this->createFactory('\OC\Memcache\APCu')->createDistributed('app_api/service');
+		$cache->set('/ex_app/app_1', ['enabled' => 1]);
+
+		// `occ app_api:app:disable app_1` with apc.enable_cli=0
+		$cliFactory = $this->createFactory('\OC\Memcache\APCu', localCacheAvailable: false);
+		self::assertTrue($cliFactory->isAvailable());
+		$cliFactory->createDistributed('app_api/service')->remove('/ex_app/app_1');
+		self::assertSame(1, $this->generationWrites);
+
+		$cache = $this->createFactory('\OC\Memcache\APCu')->createDistributed('app_api/service');
+		self::assertNull($cache->get('/ex_app/app_1'));
+	}
+
+	public function testRemovalKeepsTheEntriesOfOtherRegistries(): void {
+		$factory = $this->createFactory('\OC\Memcache\APCu');
+		$factory->createDistributed('app_api/ex_occ_commands')->set('/ex_occ_commands', ['command']);
+		$factory->createDistributed('app_api/service')->remove('/ex_apps');
+
+		$cache = $this->createFactory('\OC\Memcache\APCu')->createDistributed('app_api/ex_occ_commands');
+		self::assertSame(['command'], $cache->get('/ex_occ_commands'));
+		self::assertSame('first', $this->dbGenerations['registry_cache_generation/ex_occ_commands']);
+	}
+
+	public function testBatchReplacesEachGenerationOnce(): void {
+		$factory = $this->createFactory('\OC\Memcache\APCu');
+		$cache = $factory->createDistributed('app_api/service');
+		$cache->set('/ex_app/app_1', ['enabled' => 1]);
+
+		$factory->batch(function () use ($factory, $cache) {
+			$cache->remove('/ex_app/app_1');
+			$cache->remove('/ex_app_status/app_1');
+			$factory->batch(fn () => $cache->remove('/ex_apps'));
+			// the local entry is gone right away, the generation is only replaced when the batch ends
+			self::assertNull($cache->get('/ex_app/app_1'));
+			self::assertSame(0, $this->generationWrites);
+		});
+
+		self::assertSame(1, $this->generationWrites);
+		self::assertNotSame('first', $this->dbGenerations['registry_cache_generation/service']);
+	}
+}
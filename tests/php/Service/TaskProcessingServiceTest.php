@@ -0,0 +1,299 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\Service;
+
+use OCA\AppAPI\Db\ExApp;
+use OCA\AppAPI\Db\TaskProcessing\TaskProcessingProviderMapper;
+use OCA\AppAPI\Service\AppAPIService;
+use OCA\AppAPI\Service\ExAppService;
+use OCA\AppAPI\Service\ProvidersAI\TaskProcessingService;
+use OCA\AppAPI\Service\RegistryCacheFactory;
+use OCP\DB\Exception;
+use OCP\ICache;
+use OCP\TaskProcessing\Exception\NotFoundException;
+use OCP\TaskProcessing\IManager;
+use OCP\TaskProcessing\IProvider;
+use OCP\TaskProcessing\ShapeDescriptor;
+use OCP\TaskProcessing\Task;
+use PHPUnit\Framework\Attributes\Group;
+use PHPUnit\Framework\MockObject\MockObject;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Providers are listed for every request that loads the TaskProcessing providers, so listing them must
+ * only read the cached list and must not decode definitions or build shapes before they are used.
+ */
+class TaskProcessingServiceTest extends TestCase {
+	private const PROVIDERS_COUNT = 50;
+	private const APPS_COUNT = 10;
+
+	private TaskProcessingProviderMapper&MockObject $mapper;
+	private RegistryCacheFactory&MockObject $cacheFactory;
+	private IManager&MockObject $taskProcessingManager;
+	/** @var array<string, mixed> */
+	private array $cacheStore = [];
+	/** @var string[] */
+	private array $cacheReads = [];
+	/** @var array<string, array[]> */
+	private array $rows = [];
+
+	protected function setUp(): void {
+		parent::setUp();
+
+		$cache = $this->createMock(ICache::class);
+		$cache->method('get')->willReturnCallback(function (string $key) {
+			$this->cacheReads[] = $key;
+			return $this->cacheStore[$key] ?? null;
+		});
+		$cache->method('set')->willReturnCallback(function (string $key, mixed $value) {
+			$this->cacheStore[$key] = json_decode(json_encode($value), true);
+			return true;
+		});
+		$cache->method('remove')->willReturnCallback(function (string $key) {
+			unset($this->cacheStore[$key]);
+			return true;
+		});
+		$this->cacheFactory = $this->createMock(RegistryCacheFactory::class);
+		$this->cacheFactory->method('isAvailable')->willReturn(true);
+		$this->cacheFactory->method('createDistributed')->willReturn($cache);
+
+		for ($i = 0; $i < self::PROVIDERS_COUNT; $i++) {
+			$appId = 'app_' . ($i % self::APPS_COUNT);
+			$this->rows[$appId][] = $this->createRow($i, $appId);
+		}
+		$this->mapper = $this->createMock(TaskProcessingProviderMapper::class);
+		$this->mapper->expects(self::never())->method('findAllEnabled');
+		$this->mapper->method('findEnabledAppIds')->willReturnCallback(fn () => array_keys($this->rows));
+		$this->mapper->method('findAllByAppId')->willReturnCallback(fn (string $appId) => $this->rows[$appId] ?? []);
+		$this->taskProcessingManager = $this->createMock(IManager::class);
+	}
+
+	private function createRow(int $i, string $appId, int $maxBatchSize = 1): array {
+		$provider = [
+			'max_batch_size' => $maxBatchSize,
+			'id' => 'provider_' . $i,
+			'name' => 'Provider ' . $i,
+			'task_type' => 'core:text2text',
+			'expected_runtime' => 10,
+			'optional_input_shape' => [
+				['name' => 'max_tokens', 'description' => 'Maximum output words', 'shape_type' => 0],
+			],
+			'optional_output_shape' => [],
+			'input_shape_enum_values' => [],
+			'input_shape_defaults' => [],
+			'optional_input_shape_enum_values' => [],
+			'optional_input_shape_defaults' => ['max_tokens' => 1234],
+			'output_shape_enum_values' => [],
+			'optional_output_shape_enum_values' => [],
+		];
+		return [
+			'id' => $i + 1,
+			'app_id' => $appId,
+			'name' => $provider['id'],
+			'display_name' => $provider['name'],
+			'task_type' => $provider['task_type'],
+			'provider' => json_encode($provider),
+			'custom_task_type' => 'null',
+		];
+	}
+
+	private function createService(): TaskProcessingService {
+		$service = new TaskProcessingService($this->cacheFactory, $this->mapper, $this->createMock(LoggerInterface::class), $this->taskProcessingManager);
+		$service->setExAppService($this->createMock(ExAppService::class));
+		$service->setAppAPIService($this->createMock(AppAPIService::class));
+		return $service;
+	}
+
+	/**
+	 * What a request pays to list the providers: two cache reads (version and assembled list), nothing is decoded.
+	 */
+	public function testListingProvidersWithWarmCacheDoesNotQueryTheDatabase(): void {
+		$this->createService()->getRegisteredTaskProcessingProviders();
+
+		$this->mapper->expects(self::never())->method('findEnabledAppIds');
+		$this->mapper->expects(self::never())->method('findAllByAppId');
+		$this->cacheReads = [];
+		$service = $this->createService();
+		$providers = array_map(
+			$service->getAnonymousExAppProvider(...),
+			$service->getRegisteredTaskProcessingProviders(),
+		);
+
+		self::assertCount(2, $this->cacheReads);
+		$ids = array_map(static fn ($provider) => $provider->getId(), $providers);
+		sort($ids);
+		$expectedIds = array_map(static fn (int $i) => 'provider_' . $i, range(0, self::PROVIDERS_COUNT - 1));
+		sort($expectedIds);
+		self::assertSame($expectedIds, $ids);
+	}
+
+	#[Group('benchmark')]
+	public function testBenchmarkListingWithWarmCache(): void {
+		$this->createService()->getRegisteredTaskProcessingProviders();
+
+		$start = hrtime(true);
+		$service = $this->createService();
+		$providers = array_map(
+			$service->getAnonymousExAppProvider(...),
+			$service->getRegisteredTaskProcessingProviders(),
+		);
+		$elapsedNs = hrtime(true) - $start;
+
+		self::assertCount(self::PROVIDERS_COUNT, $providers);
+		fwrite(STDERR, sprintf("\nlisting %d TaskProcessing providers: %.3f ms", self::PROVIDERS_COUNT, $elapsedNs / 1e6));
+	}
+
+	public function testProviderShapesAreBuiltOnFirstUseOnly(): void {
+		$service = $this->createService();
+		$provider = $service->getAnonymousExAppProvider($service->getRegisteredTaskProcessingProviders()[0]);
+
+		self::assertSame('provider_0', $provider->getId());
+		self::assertSame('Provider 0', $provider->getName());
+		self::assertSame('core:text2text', $provider->getTaskTypeId());
+		self::assertSame(10, $provider->getExpectedRuntime());
+		$shape = $provider->getOptionalInputShape();
+		self::assertInstanceOf(ShapeDescriptor::class, $shape['max_tokens']);
+		self::assertSame($shape['max_tokens'], $provider->getOptionalInputShape()['max_tokens']);
+		self::assertSame(['max_tokens' => 1234], $provider->getOptionalInputShapeDefaults());
+	}
+
+	public function testInvalidationOnlyReloadsTheChangedExApp(): void {
+		$this->createService()->getRegisteredTaskProcessingProviders();
+
+		$reloaded = [];
+		$this->mapper = $this->createMock(TaskProcessingProviderMapper::class);
+		$this->mapper->method('findEnabledAppIds')->willReturnCallback(fn () => array_keys($this->rows));
+		$this->mapper->method('findAllByAppId')->willReturnCallback(function (string $appId) use (&$reloaded) {
+			$reloaded[] = $appId;
+			return $this->rows[$appId];
+		});
+		$this->rows['app_3'][] = $this->createRow(self::PROVIDERS_COUNT, 'app_3');
+		$service = $this->createService();
+		$service->resetCacheForApp('app_3');
+
+		self::assertCount(self::PROVIDERS_COUNT + 1, $service->getRegisteredTaskProcessingProviders());
+		self::assertSame(['app_3'], $reloaded);
+	}
+
+	public function testProviderLookupFailureIsLogged(): void {
+		$this->mapper = $this->createMock(TaskProcessingProviderMapper::class);
+		$this->mapper->method('findAllByAppId')->willThrowException(new Exception('connection lost'));
+		$logger = $this->createMock(LoggerInterface::class);
+		$logger->expects(self::once())->method('error')->with(self::stringContains('app_0'));
+		$service = new TaskProcessingService($this->cacheFactory, $this->mapper, $logger, $this->taskProcessingManager);
+
+		self::assertNull($service->getExAppTaskProcessingProvider('app_0', 'provider_0'));
+	}
+
+	public function testTriggersOfBatchProviderAreCoalesced(): void {
+		$exAppService = $this->createMock(ExAppService::class);
+		$exAppService->method('getExApp')->willReturn(new ExApp(['appid' => 'app_0']));
+		$appAPIService = $this->createMock(AppAPIService::class);
+		$appAPIService->expects(self::once())->method('requestToExApp')->with(
+			self::anything(),
+			'/trigger?providerId=provider_0',
+		)->willReturn([]);
+		$this->taskProcessingManager->expects(self::never())->method('getNextScheduledTasks');
+		$service = $this->createService();
+		$service->setExAppService($exAppService);
+		$service->setAppAPIService($appAPIService);
+		$exAppProvider = $service->getRegisteredTaskProcessingProviders()[0];
+
+		$service->triggerExAppProvider($exAppProvider, 10);
+		$service->triggerExAppProvider($exAppProvider, 10);
+	}
+
+	private function createTask(int $id, int $status = Task::STATUS_SCHEDULED, string $taskTypeId = 'core:text2text'): Task {
+		$task = new Task($taskTypeId, [], 'app_0', null);
+		$task->setId($id);
+		$task->setStatus($status);
+		return $task;
+	}
+
+	private function preferProvider(string $providerId): void {
+		$provider = $this->createMock(IProvider::class);
+		$provider->method('getId')->willReturn($providerId);
+		$this->taskProcessingManager->method('getPreferredProvider')->with('core:text2text')->willReturn($provider);
+	}
+
+	public function testClaimTaskBatchReadsScheduledTasksAtOnce(): void {
+		$this->rows['app_0'][0] = $this->createRow(0, 'app_0', 10);
+		$this->preferProvider('provider_0');
+		$this->taskProcessingManager->expects(self::once())->method('getNextScheduledTasks')
+			->with(['core:text2text'], [], 5)
+			->willReturn([$this->createTask(1), $this->createTask(2), $this->createTask(3)]);
+		$this->taskProcessingManager->expects(self::exactly(3))->method('lockTask')->willReturn(true);
+
+		$tasks = $this->createService()->claimTaskBatch('app_0', 'provider_0', 5);
+
+		self::assertSame([1, 2, 3], array_column($tasks, 'id'));
+	}
+
+	public function testClaimTaskBatchReplacesTasksClaimedMeanwhile(): void {
+		$this->rows['app_0'][0] = $this->createRow(0, 'app_0', 10);
+		$this->preferProvider('provider_0');
+		$this->taskProcessingManager->expects(self::exactly(2))->method('getNextScheduledTasks')
+			->willReturnCallback(fn (array $taskTypeIds, array $ignoredTaskIds, int $count) => match ($ignoredTaskIds) {
+				[] => [$this->createTask(1), $this->createTask(2)],
+				[1, 2] => [$this->createTask(3)],
+			});
+		// task 2 was claimed by another request between the read and the lock
+		$this->taskProcessingManager->method('lockTask')->willReturnCallback(static fn (Task $task) => $task->getId() !== 2);
+
+		$tasks = $this->createService()->claimTaskBatch('app_0', 'provider_0', 2);
+
+		self::assertSame([1, 3], array_column($tasks, 'id'));
+	}
+
+	public function testClaimTaskBatchIsCappedByMaxBatchSize(): void {
+		$this->rows['app_0'][0] = $this->createRow(0, 'app_0', 2);
+		$this->preferProvider('provider_0');
+		$this->taskProcessingManager->expects(self::once())->method('getNextScheduledTasks')
+			->with(['core:text2text'], [], 2)
+			->willReturn([]);
+
+		self::assertSame([], $this->createService()->claimTaskBatch('app_0', 'provider_0', 50));
+	}
+
+	public function testClaimTaskBatchOnlyServesThePreferredProvider(): void {
+		$this->preferProvider('provider_10');
+		$this->taskProcessingManager->expects(self::never())->method('getNextScheduledTasks');
+
+		self::assertSame([], $this->createService()->claimTaskBatch('app_0', 'provider_0', 5));
+		self::assertNull($this->createService()->claimTaskBatch('app_0', 'does_not_exist', 5));
+	}
+
+	public function testSetTaskResultsStoresResultsOfRunningTasksOnly(): void {
+		$this->taskProcessingManager->method('getTask')->willReturnCallback(fn (int $taskId) => match ($taskId) {
+			1 => $this->createTask(1, Task::STATUS_RUNNING),
+			2 => $this->createTask(2, Task::STATUS_RUNNING),
+			3 => $this->createTask(3, Task::STATUS_SUCCESSFUL),
+			4 => $this->createTask(4, Task::STATUS_RUNNING, 'core:text2image'),
+			default => throw new NotFoundException(),
+		});
+		$stored = [];
+		$this->taskProcessingManager->expects(self::exactly(2))->method('setTaskResult')
+			->willReturnCallback(function (int $taskId, ?string $error, ?array $output, bool $isUsingFileIds) use (&$stored) {
+				$stored[$taskId] = [$error, $output, $isUsingFileIds];
+			});
+
+		$result = $this->createService()->setTaskResults('app_0', 'provider_0', [
+			1 => ['output' => ['output' => 'text']],
+			2 => ['error_message' => 'failed', 'output' => ['output' => 'ignored']],
+			3 => ['output' => ['output' => 'late']],
+			4 => ['output' => ['output' => 'other task type']],
+			5 => ['output' => ['output' => 'unknown task']],
+		]);
+
+		self::assertSame([1 => true, 2 => true, 3 => false, 4 => false, 5 => false], $result);
+		self::assertSame([1 => [null, ['output' => 'text'], true], 2 => ['failed', null, true]], $stored);
+	}
+}
@@ -0,0 +1,231 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * SPDX-FileCopyrightText: 2026 Nextcloud GmbH and Nextcloud contributors
+ * SPDX-License-Identifier: AGPL-3.0-or-later
+ */
+
+namespace OCA\AppAPI\Tests\php\Service;
+
+use OCA\AppAPI\Db\UI\FilesActionsMenuMapper;
+use OCA\AppAPI\Db\UI\ScriptMapper;
+use OCA\AppAPI\Db\UI\StyleMapper;
+use OCA\AppAPI\Db\UI\TopMenuMapper;
+use OCA\AppAPI\Listener\LoadMenuEntriesListener;
+use OCA\AppAPI\Service\RegistryCacheFactory;
+use OCA\AppAPI\Service\UI\UiManifestService;
+use OCP\ICache;
+use OCP\IGroupManager;
+use OCP\INavigationManager;
+use OCP\IURLGenerator;
+use OCP\IUser;
+use OCP\IUserSession;
+use OCP\L10N\IFactory;
+use OCP\Navigation\Events\LoadAdditionalEntriesEvent;
+use PHPUnit\Framework\Attributes\Group;
+use PHPUnit\Framework\MockObject\MockObject;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Menu entries are added on every page load, so rendering them must read the UI manifest of the user class
+ * (and its version) only and never query the UI registries, however many ExApps registered UI elements.
+ */
+class UiManifestServiceTest extends TestCase {
+	private const APPS_COUNT = 30;
+
+	private RegistryCacheFactory&MockObject $cacheFactory;
+	private TopMenuMapper&MockObject $topMenuMapper;
+	private FilesActionsMenuMapper&MockObject $filesActionsMenuMapper;
+	private ScriptMapper&MockObject $scriptMapper;
+	private StyleMapper&MockObject $styleMapper;
+	/** @var array<string, mixed> */
+	private array $cacheStore = [];
+	/** @var string[] */
+	private array $cacheReads = [];
+
+	protected function setUp(): void {
+		parent::setUp();
+
+		$cache = $this->createMock(ICache::class);
+		$cache->method('get')->willReturnCallback(function (string $key) {
+			$this->cacheReads[] = $key;
+			return $this->cacheStore[$key] ?? null;
+		});
+		$cache->method('set')->willReturnCallback(function (string $key, mixed $value) {
+			$this->cacheStore[$key] = json_decode(json_encode($value), true);
+			return true;
+		});
+		$cache->method('remove')->willReturnCallback(function (string $key) {
+			unset($this->cacheStore[$key]);
+			return true;
+		});
+		$this->cacheFactory = $this->createMock(RegistryCacheFactory::class);
+		$this->cacheFactory->method('isAvailable')->willReturn(true);
+		$this->cacheFactory->method('createDistributed')->willReturn($cache);
+
+		$menuEntries = $fileActions = $scripts = $styles = [];
+		for ($i = 0; $i < self::APPS_COUNT; $i++) {
+			$appId = 'app_' . $i;
+			$menuEntries[] = [
+				'id' => $i + 1, 'appid' => $appId, 'name' => 'main', 'display_name' => 'App ' . $i,
+				'icon' => $i % 2 === 0 ? '' : 'img/icon.svg', 'admin_required' => (int)($i % 3 === 0),
+			];
+			$fileActions[] = [
+				'id' => $i + 1, 'appid' => $appId, 'name' => 'action', 'display_name' => 'Action ' . $i,
+				'mime' => 'file', 'permissions' => '31', 'order' => 0, 'icon' => '', 'action_handler' => 'handler',
+				'version' => '2.0', 'default_action' => null,
+			];
+			$scripts[] = ['appid' => $appId, 'name' => 'main', 'path' => 'js/main', 'after_app_id' => ''];
+			$scripts[] = ['appid' => $appId, 'name' => 'main', 'path' => 'js/extra', 'after_app_id' => 'files'];
+			$styles[] = ['appid' => $appId, 'name' => 'main', 'path' => 'css/main'];
+		}
+		$this->topMenuMapper = $this->createMock(TopMenuMapper::class);
+		$this->topMenuMapper->method('findAllEnabled')->willReturn($menuEntries);
+		$this->filesActionsMenuMapper = $this->createMock(FilesActionsMenuMapper::class);
+		$this->filesActionsMenuMapper->method('findAllEnabled')->willReturn($fileActions);
+		$this->scriptMapper = $this->createMock(ScriptMapper::class);
+		$this->scriptMapper->method('findAllEnabledByType')->with('top_menu')->willReturn($scripts);
+		$this->styleMapper = $this->createMock(StyleMapper::class);
+		$this->styleMapper->method('findAllEnabledByType')->with('top_menu')->willReturn($styles);
+	}
+
+	private function createService(?RegistryCacheFactory $cacheFactory = null): UiManifestService {
+		$urlGenerator = $this->createMock(IURLGenerator::class);
+		$urlGenerator->method('linkToRoute')->willReturnCallback(
+			static fn (string $route, array $params) => '/' . $route . '/' . implode('/', $params)
+		);
+		$urlGenerator->method('imagePath')->willReturn('/apps/app_api/img/app.svg');
+		return new UiManifestService(
+			$cacheFactory ?? $this->cacheFactory,
+			$this->topMenuMapper,
+			$this->filesActionsMenuMapper,
+			$this->scriptMapper,
+			$this->styleMapper,
+			$urlGenerator,
+			$this->createMock(LoggerInterface::class),
+		);
+	}
+
+	public function testManifestsOfBothUserClassesAreBuiltOnce(): void {
+		$this->topMenuMapper->expects(self::once())->method('findAllEnabled');
+		$service = $this->createService();
+
+		$adminEntries = $service->getMenuEntries(true);
+		$otherService = $this->createService();
+		$userEntries = $otherService->getMenuEntries(false);
+
+		self::assertCount(self::APPS_COUNT, $adminEntries);
+		self::assertCount(self::APPS_COUNT - 10, $userEntries);
+		self::assertCount(self::APPS_COUNT, $otherService->getFileActions(false));
+		self::assertSame('/apps/app_api/img/app.svg', $adminEntries[0]['icon']);
+		self::assertSame('/app_api.ExAppProxy.ExAppGet/app_1/img/icon.svg', $adminEntries[1]['icon']);
+		self::assertSame([
+			'scripts' => [
+				['path' => 'js/main', 'after_app_id' => null],
+				['path' => 'js/extra', 'after_app_id' => 'files'],
+			],
+			'styles' => ['css/main'],
+		], $service->getPage(true, 'app_3', 'main'));
+		self::assertNull($service->getPage(false, 'app_3', 'main'));
+		self::assertNotNull($service->getPage(false, 'app_4', 'main'));
+		self::assertNull($service->getPage(true, 'app_4', 'other'));
+	}
+
+	public function testResetCacheRebuildsTheManifest(): void {
+		$this->topMenuMapper->expects(self::exactly(2))->method('findAllEnabled');
+		$service = $this->createService();
+		$service->getMenuEntries(true);
+
+		$service->resetCache();
+		self::assertArrayNotHasKey('/version', $this->cacheStore);
+		self::assertCount(self::APPS_COUNT, $service->getMenuEntries(true));
+	}
+
+	/**
+	 * A request that read the registries before a change must not store its (stale) manifest for later requests.
+	 */
+	public function testRebuildRacingWithAChangeDoesNotStoreAStaleManifest(): void {
+		$menuEntries = $this->topMenuMapper->findAllEnabled();
+		$builds = 0;
+		$this->topMenuMapper = $this->createMock(TopMenuMapper::class);
+		$this->topMenuMapper->method('findAllEnabled')->willReturnCallback(function () use ($menuEntries, &$builds) {
+			if (++$builds === 1) {
+				// a menu entry is unregistered while the first request builds the manifest
+				$this->createService()->resetCache();
+				return $menuEntries;
+			}
+			return array_slice($menuEntries, 1);
+		});
+
+		self::assertCount(self::APPS_COUNT, $this->createService()->getMenuEntries(true));
+		self::assertCount(self::APPS_COUNT - 1, $this->createService()->getMenuEntries(true));
+		self::assertSame(2, $builds);
+	}
+
+	/**
+	 * Without a cache every accessor runs only the queries of the part it returns.
+	 */
+	public function testWithoutCacheOnlyTheRequestedPartIsQueried(): void {
+		$cacheFactory = $this->createMock(RegistryCacheFactory::class);
+		$cacheFactory->method('isAvailable')->willReturn(false);
+		$cacheFactory->expects(self::never())->method('createDistributed');
+		$this->scriptMapper->expects(self::never())->method('findAllEnabledByType');
+		$this->styleMapper->expects(self::never())->method('findAllEnabledByType');
+		$service = $this->createService($cacheFactory);
+
+		$this->filesActionsMenuMapper->expects(self::never())->method('findAllEnabled');
+		self::assertCount(self::APPS_COUNT - 10, $service->getMenuEntries(false));
+
+		$this->scriptMapper->expects(self::once())->method('findByAppIdTypeName')->with('app_4', 'top_menu', 'main')
+			->willReturn([['path' => 'js/main', 'after_app_id' => '']]);
+		$this->styleMapper->expects(self::once())->method('findByAppIdTypeName')->with('app_4', 'top_menu', 'main')
+			->willReturn([['path' => 'css/main']]);
+		self::assertSame([
+			'scripts' => [['path' => 'js/main', 'after_app_id' => null]],
+			'styles' => ['css/main'],
+		], $service->getPage(false, 'app_4', 'main'));
+		self::assertNull($service->getPage(false, 'app_3', 'main'));
+	}
+
+	private function createMenuEntriesListener(): LoadMenuEntriesListener {
+		$user = $this->createMock(IUser::class);
+		$user->method('getUID')->willReturn('alice');
+		$userSession = $this->createMock(IUserSession::class);
+		$userSession->method('getUser')->willReturn($user);
+		$groupManager = $this->createMock(IGroupManager::class);
+		$groupManager->method('isAdmin')->willReturn(false);
+		$navigationManager = $this->createMock(INavigationManager::class);
+		$navigationManager->expects(self::exactly(self::APPS_COUNT - 10))->method('add');
+		return new LoadMenuEntriesListener(
+			$this->createService(), $userSession, $groupManager, $navigationManager, $this->createMock(IFactory::class),
+		);
+	}
+
+	/**
+	 * Page-load overhead of the menu entries with a warm manifest.
+	 */
+	public function testPageLoadReadsTheManifestOnly(): void {
+		$this->createService()->getMenuEntries(false);
+		$this->cacheReads = [];
+
+		$this->topMenuMapper->expects(self::never())->method('findAllEnabled');
+		$this->scriptMapper->expects(self::never())->method('findAllEnabledByType');
+		$this->createMenuEntriesListener()->handle(new LoadAdditionalEntriesEvent());
+
+		self::assertSame(['/version', '/manifest/' . $this->cacheStore['/version'] . '/user'], $this->cacheReads);
+	}
+
+	#[Group('benchmark')]
+	public function testBenchmarkPageLoad(): void {
+		$this->createService()->getMenuEntries(false);
+
+		$start = hrtime(true);
+		$this->createMenuEntriesListener()->handle(new LoadAdditionalEntriesEvent());
+		$elapsedNs = hrtime(true) - $start;
+
+		fwrite(STDERR, sprintf("\nmenu entries of %d ExApps on page load: %.3f ms", self::APPS_COUNT, $elapsedNs / 1e6));
+	}
+}